@@ -0,0 +1,26 @@
+// ============================================================================
+// Map 페이지 dash-leaflet GeoJSON 함수 (브라우저에서 마커 생성)
+// ============================================================================
+// 파이썬에서 {'variable': 'snugeoshm.map.pointToLayer'}로 참조한다 (pages/map_overlay.py).
+// 마커 모양은 feature 속성(type)과 hideout(colors, analyzed, anomalous)으로 정하므로
+// 분석 결과가 바뀌어도 서버는 좌표를 다시 보내지 않고 hideout만 보낸다.
+window.snugeoshm = Object.assign({}, window.snugeoshm, {
+    map: {
+        pointToLayer: function (feature, latlng, context) {
+            const props = feature.properties || {};
+            const hideout = context.hideout || {};
+            const colors = hideout.colors || {};
+            const color = colors[props.type || 'turbine'] || 'blue';
+            const analyzed = Boolean((hideout.analyzed || {})[props.id]);
+            const anomalous = Boolean((hideout.anomalous || {})[props.id]);
+            const marker = L.circleMarker(latlng, {
+                radius: 8,                                          // 점 크기 (픽셀)
+                color: anomalous ? hideout.anomaly_color : color,   // 테두리 색 (이상 윈도우가 있으면 강조)
+                fillColor: color,                                   // 채우기 색 (자산 종류별)
+                fillOpacity: analyzed ? 0.8 : 0.3,                  // 분석 전이면 옅게
+                weight: anomalous ? 4 : 2                           // 테두리 두께
+            });
+            return marker.bindTooltip(props.name || String(props.id || ''));   // 마우스 오버 시 이름 표시
+        }
+    }
+});
@@ -0,0 +1,28 @@
+import os
+from datetime import datetime
+
+from flask import abort, send_file
+
+from backend.pipelines.reports import FORMATS, get_reports
+
+
+# ============================================================================
+# Flask 라우트 (Dash 콜백을 거치지 않는 파일 다운로드)
+# ============================================================================
+def register_routes(server):
+    """Dash app.server에 다운로드 라우트 등록"""
+
+    @server.route('/reports/<report_id>.<fmt>')
+    def download_report(report_id, fmt):
+        """
+        생성한 보고서 파일 다운로드
+
+        파일을 메모리에 올리지 않고 send_file로 스트리밍한다 (Range / 조건부 요청 지원).
+        보고서 ID는 추측할 수 없는 uuid라 링크를 받은 세션만 내려받을 수 있다.
+        """
+        path = get_reports().path(report_id, fmt)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        day = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y%m%d')
+        return send_file(path, mimetype=FORMATS[fmt], as_attachment=True,
+                         download_name=f'snugeoshm_report_{day}.{fmt}', conditional=True, max_age=0)
@@ -0,0 +1,416 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# 환경 변수 설정 (없으면 기본값 사용)
+#   SNUGEOSHM_WEATHER_PROVIDER : 'file' (로컬 CSV/SQLite, 오프라인), 'openweathermap', 'none' (캐시만 사용)
+#                                (없으면 SNUGEOSHM_WEATHER_FILE이 있을 때 'file', 아니면 'none')
+#   SNUGEOSHM_WEATHER_FILE     : file provider 원본 (.csv 또는 weather 테이블이 있는 .sqlite/.db)
+#   SNUGEOSHM_WEATHER_DB       : 날씨 캐시 SQLite 파일 (워커 프로세스들이 공유)
+#   SNUGEOSHM_WEATHER_TTL      : 현재 날씨 캐시 유효 시간 (초)
+#   OPENWEATHERMAP_API_KEY     : openweathermap provider API 키
+DEFAULT_WEATHER_DB = os.path.join(tempfile.gettempdir(), 'snugeoshm_weather.sqlite')
+DEFAULT_TTL_SECONDS = 600
+WEATHER_FIELDS = ('wind_speed', 'wind_direction', 'temperature', 'humidity', 'pressure')
+FETCH_SPAN = 7 * 86400          # provider 이력 요청 1회 최대 구간 (OpenWeatherMap history: 1주)
+FETCH_WORKERS = 4               # 이력 구간 동시 요청 수 (세션 연결 풀 크기)
+ALIGN_TOLERANCE = 3 * 3600      # as-of 결합 시 허용하는 가장 오래된 날씨 관측 (초)
+
+
+class WeatherError(Exception):
+    """provider 설정 오류 / 요청 실패 (화면에 그대로 표시하는 메시지)"""
+
+
+# ============================================================================
+# Provider (원본 데이터)
+# ============================================================================
+# provider는 두 메서드만 구현한다. 시각은 모두 epoch 초.
+#   current(location) → {'time', 필드...}
+#   history(location, start, end) → {'time': (n,), 필드: (n,)} (시간순, 구간 [start, end))
+class FileProvider:
+    """
+    로컬 CSV / SQLite 날씨 기록 (네트워크 없이 쓰는 대체 provider)
+
+    CSV는 time 컬럼(날짜 문자열 또는 epoch 초)과 WEATHER_FIELDS 중 있는 컬럼,
+    선택적으로 location 컬럼을 가진다. SQLite는 같은 컬럼의 weather 테이블을 읽는다.
+    location 컬럼이 없으면 모든 위치에 같은 기록을 쓴다. 파일은 수정 시각이 바뀔 때만 다시 읽는다.
+    """
+
+    name = 'file'
+
+    def __init__(self, path):
+        if not path or not os.path.exists(path):
+            raise WeatherError(f"Weather file not found: {path or '(SNUGEOSHM_WEATHER_FILE unset)'}")
+        self.path = path
+        self._loaded = (None, None)     # (mtime, DataFrame)
+        self._lock = threading.Lock()
+
+    def _frame(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        with self._lock:
+            if self._loaded[0] != mtime:
+                if self.path.endswith(('.sqlite', '.db')):
+                    with sqlite3.connect(self.path) as conn:
+                        frame = pd.read_sql('SELECT * FROM weather', conn)
+                else:
+                    frame = pd.read_csv(self.path)
+                time_column = frame['time']
+                if pd.api.types.is_numeric_dtype(time_column):
+                    frame['time'] = time_column.astype(float)
+                else:
+                    frame['time'] = pd.to_datetime(time_column).astype('datetime64[ms]').astype('int64') / 1e3
+                self._loaded = (mtime, frame.sort_values('time', kind='stable'))
+            return self._loaded[1]
+
+    def _rows(self, location):
+        frame = self._frame()
+        if 'location' in frame:
+            frame = frame[frame['location'].astype(str).str.lower() == str(location).lower()]
+        return frame
+
+    def history(self, location, start, end):
+        frame = self._rows(location)
+        frame = frame[(frame['time'] >= start) & (frame['time'] < end)]
+        return _columns(frame)
+
+    def current(self, location):
+        frame = self._rows(location)
+        frame = frame[frame['time'] <= time.time()]
+        if not len(frame):
+            raise WeatherError(f"No weather records for {location} in {os.path.basename(self.path)}")
+        return {k: (v[-1] if len(v) else None) for k, v in _columns(frame.tail(1)).items()}
+
+
+class OpenWeatherMapProvider:
+    """
+    OpenWeatherMap (현재 날씨 2.5 API, 시간별 이력 history API)
+
+    모든 요청이 같은 requests.Session을 쓴다 (연결 풀 FETCH_WORKERS개, 재시도 포함).
+    location은 도시 이름('Seoul') 또는 'lat,lon'.
+    """
+
+    name = 'openweathermap'
+    CURRENT_URL = 'https://api.openweathermap.org/data/2.5/weather'
+    HISTORY_URL = 'https://history.openweathermap.org/data/2.5/history/city'
+
+    def __init__(self, api_key, timeout=10.0):
+        if not api_key:
+            raise WeatherError("OPENWEATHERMAP_API_KEY is not set")
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=FETCH_WORKERS,
+                              max_retries=Retry(total=3, backoff_factor=0.5,
+                                                status_forcelist=(429, 500, 502, 503, 504)))
+        self.session.mount('https://', adapter)
+
+    def _get(self, url, location, **params):
+        query = {'appid': self.api_key, 'units': 'metric', **params}
+        try:
+            lat, lon = (float(v) for v in str(location).split(','))
+            query.update(lat=lat, lon=lon)
+        except ValueError:
+            query['q'] = location
+        response = self.session.get(url, params=query, timeout=self.timeout)
+        if response.status_code != 200:
+            raise WeatherError(f"OpenWeatherMap {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    @staticmethod
+    def _record(item):
+        main, wind = item.get('main', {}), item.get('wind', {})
+        return {'time': float(item['dt']), 'wind_speed': wind.get('speed'), 'wind_direction': wind.get('deg'),
+                'temperature': main.get('temp'), 'humidity': main.get('humidity'),
+                'pressure': main.get('pressure')}
+
+    def current(self, location):
+        return self._record(self._get(self.CURRENT_URL, location))
+
+    def history(self, location, start, end):
+        payload = self._get(self.HISTORY_URL, location, type='hour', start=int(start), end=int(end))
+        records = [self._record(item) for item in payload.get('list', [])]
+        return _columns(pd.DataFrame(records, columns=('time',) + WEATHER_FIELDS))
+
+
+def _columns(frame):
+    """DataFrame → {'time', 필드} float64 배열 (없는 필드는 NaN)"""
+    out = {'time': frame['time'].to_numpy(dtype=float)}
+    for name in WEATHER_FIELDS:
+        out[name] = (pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=float) if name in frame
+                     else np.full(len(frame), np.nan))
+    return out
+
+
+def make_provider(name=None):
+    """이름(없으면 SNUGEOSHM_WEATHER_PROVIDER)으로 provider 생성 ('none'이면 None = 캐시만 사용)"""
+    name = (name or os.environ.get('SNUGEOSHM_WEATHER_PROVIDER')
+            or ('file' if os.environ.get('SNUGEOSHM_WEATHER_FILE') else 'none')).lower()
+    if name == 'none':
+        return None
+    if name == 'file':
+        return FileProvider(os.environ.get('SNUGEOSHM_WEATHER_FILE'))
+    if name == 'openweathermap':
+        return OpenWeatherMapProvider(os.environ.get('OPENWEATHERMAP_API_KEY'))
+    raise WeatherError(f"Unknown weather provider: {name}")
+
+
+# ============================================================================
+# SQLite 캐시 (관측값 + 받아 둔 구간 + 현재 날씨 TTL)
+# ============================================================================
+class WeatherStore:
+    """
+    위치별 날씨 관측값과 provider에서 이미 받은 구간(coverage)을 SQLite 파일에 보관
+
+    coverage에 들어 있는 구간은 관측이 없더라도 다시 요청하지 않는다.
+    gunicorn 워커들이 같은 파일을 공유한다.
+    """
+
+    def __init__(self, path=DEFAULT_WEATHER_DB):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            columns = ', '.join(f'{name} REAL' for name in WEATHER_FIELDS)
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS observations (
+                    location TEXT, time REAL, {columns}, PRIMARY KEY (location, time)
+                ) WITHOUT ROWID""")
+            conn.execute('CREATE TABLE IF NOT EXISTS coverage (location TEXT, start REAL, end REAL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS coverage_location ON coverage (location, start)')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS current (
+                    location TEXT PRIMARY KEY, fetched REAL, payload TEXT
+                )""")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:      # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def missing(self, location, start, end):
+        """[start, end) 중 아직 받지 않은 구간 [(start, end), ...]"""
+        with self._connect() as conn:
+            covered = conn.execute(
+                'SELECT start, end FROM coverage WHERE location = ? AND end > ? AND start < ? ORDER BY start',
+                (location, start, end)).fetchall()
+        gaps, cursor = [], start
+        for lo, hi in covered:
+            if lo > cursor:
+                gaps.append((cursor, lo))
+            cursor = max(cursor, hi)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def put(self, location, data, start, end):
+        """관측값 저장 + [start, end) 구간을 받은 것으로 기록 (겹치거나 맞닿은 구간은 합침)"""
+        rows = zip(*([location] * len(data['time']), data['time'], *(data[name] for name in WEATHER_FIELDS)))
+        marks = ', '.join('?' * (2 + len(WEATHER_FIELDS)))
+        with self._connect() as conn:
+            conn.executemany(f'INSERT OR REPLACE INTO observations VALUES ({marks})',
+                             ([None if v != v else v for v in row] for row in rows))
+            merged = conn.execute(
+                'SELECT MIN(start), MAX(end) FROM coverage WHERE location = ? AND end >= ? AND start <= ?',
+                (location, start, end)).fetchone()
+            lo = min(start, merged[0]) if merged[0] is not None else start
+            hi = max(end, merged[1]) if merged[1] is not None else end
+            conn.execute('DELETE FROM coverage WHERE location = ? AND end >= ? AND start <= ?',
+                         (location, start, end))
+            conn.execute('INSERT INTO coverage VALUES (?, ?, ?)', (location, lo, hi))
+
+    def get(self, location, start, end):
+        """[start, end) 관측값 {'time', 필드} (시간순, 결측은 NaN)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT time, {', '.join(WEATHER_FIELDS)} FROM observations "
+                'WHERE location = ? AND time >= ? AND time < ? ORDER BY time',
+                (location, start, end)).fetchall()
+        table = np.array(rows, dtype=float).reshape(len(rows), 1 + len(WEATHER_FIELDS))
+        return {name: table[:, k] for k, name in enumerate(('time',) + WEATHER_FIELDS)}
+
+    def get_current(self, location, ttl):
+        with self._connect() as conn:
+            row = conn.execute('SELECT fetched, payload FROM current WHERE location = ?', (location,)).fetchone()
+        if row is None or time.time() - row[0] > ttl:
+            return None
+        return json.loads(row[1])
+
+    def put_current(self, location, payload):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO current VALUES (?, ?, ?)',
+                         (location, time.time(), json.dumps(payload)))
+
+
+# ============================================================================
+# 서비스 (캐시 우선, 빠진 구간만 provider에 일괄 요청)
+# ============================================================================
+class WeatherService:
+    """
+    provider + WeatherStore
+
+    history()는 캐시에 없는 구간만 FETCH_SPAN 단위로 나눠 provider에 동시에 요청하고 저장한 뒤
+    캐시에서 읽는다 (일부 구간이 실패하면 받은 구간만 저장하고 WeatherError). 한 번 채운 구간은 다시 네트워크를 쓰지 않는다 (현재 시각 이후는 받은 것으로
+    기록하지 않으므로 나중에 다시 채워진다). current()는 ttl초 동안 캐시한다.
+    """
+
+    def __init__(self, provider, store, ttl=DEFAULT_TTL_SECONDS):
+        self.provider = provider
+        self.store = store
+        self.ttl = ttl
+        self.requests = 0               # provider 호출 수 (캐시 효과 확인용)
+
+    @staticmethod
+    def _key(location):
+        return str(location).strip().lower()
+
+    def current(self, location):
+        key = self._key(location)
+        cached = self.store.get_current(key, self.ttl)
+        if cached is not None:
+            return {**cached, 'cached': True}
+        if self.provider is None:
+            raise WeatherError(f"No cached weather for {location} (weather provider disabled)")
+        self.requests += 1
+        payload = {k: (None if v is None or v != v else float(v))
+                   for k, v in self.provider.current(location).items()}
+        self.store.put_current(key, payload)
+        return {**payload, 'cached': False}
+
+    def history(self, location, start, end):
+        """
+        [start, end) 시간별 날씨 (캐시에 없는 구간만 provider에서 받음)
+
+        Returns:
+            dict: {'time', 필드...} (n,) float64 배열, 시간순
+        """
+        key = self._key(location)
+        now = time.time()
+        gaps = self.store.missing(key, start, min(end, now))
+        if gaps and self.provider is not None:
+            spans = [(lo, min(lo + FETCH_SPAN, hi)) for a, hi in gaps
+                     for lo in np.arange(a, hi, FETCH_SPAN).tolist()]
+            self.requests += len(spans)
+            failed = []
+            with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(spans)),
+                                    thread_name_prefix='weather-fetch') as pool:
+                futures = [pool.submit(self.provider.history, location, *span) for span in spans]
+                # 구간별로 결과 확인: 받은 구간은 실패한 구간과 관계없이 캐시에 저장 (재시도 시 재요청 안 함)
+                for (lo, hi), future in zip(spans, futures):
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        failed.append(e)
+                        continue
+                    self.store.put(key, data, lo, hi)
+            if failed:
+                raise WeatherError(f"{len(failed)} of {len(spans)} weather history requests failed "
+                                   f"(received spans were cached): {failed[0]}") from failed[0]
+        return self.store.get(key, start, end)
+
+
+def align(times, weather, tolerance=ALIGN_TOLERANCE):
+    """
+    윈도우 시각마다 그 시각 이전 가장 가까운 날씨 관측을 붙임 (정렬된 as-of 결합, searchsorted 한 번)
+
+    Args:
+        times: (n,) 윈도우 시각 (epoch 초, 정렬 불필요)
+        weather: {'time' (정렬됨), 필드...} — WeatherService.history 결과
+        tolerance: 이보다 오래된 관측은 붙이지 않음 (NaN)
+
+    Returns:
+        dict: 필드별 (n,) 배열 + 'lag' (관측 후 경과 초, 없으면 NaN)
+    """
+    times = np.asarray(times, dtype=float)
+    observed = weather['time']
+    index = np.searchsorted(observed, times, side='right') - 1
+    safe = np.clip(index, 0, max(len(observed) - 1, 0))
+    lag = times - observed[safe] if len(observed) else np.full(len(times), np.inf)
+    valid = (index >= 0) & (lag <= tolerance)
+    out = {name: np.where(valid, weather[name][safe], np.nan) if len(observed)
+           else np.full(len(times), np.nan) for name in WEATHER_FIELDS}
+    out['lag'] = np.where(valid, lag, np.nan)
+    return out
+
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def get_weather():
+    """환경 변수 설정으로 만든 기본 WeatherService 반환 (워커당 1개, provider 설정 오류는 WeatherError)"""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            store = WeatherStore(os.environ.get('SNUGEOSHM_WEATHER_DB', DEFAULT_WEATHER_DB))
+            ttl = float(os.environ.get('SNUGEOSHM_WEATHER_TTL', DEFAULT_TTL_SECONDS))
+            _default_service = WeatherService(make_provider(), store, ttl)
+        return _default_service
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def simulate_weather(start, days=365, step=3600.0, seed=0):
+    """시간별 날씨 모사 (풍속 Weibull + 일/연 변동 기온)"""
+    rng = np.random.default_rng(seed)
+    t = start + np.arange(int(days * 86400 / step)) * step
+    day, year = 2 * np.pi * (t % 86400) / 86400, 2 * np.pi * (t - start) / (365 * 86400)
+    return pd.DataFrame({
+        'time': t,
+        'wind_speed': 7.0 * rng.weibull(2.0, len(t)),
+        'wind_direction': rng.uniform(0, 360, len(t)),
+        'temperature': 12 - 12 * np.cos(year) - 4 * np.cos(day) + rng.normal(0, 1, len(t)),
+        'humidity': rng.uniform(40, 90, len(t)),
+        'pressure': 1013 + rng.normal(0, 5, len(t)),
+    })
+
+
+def benchmark(days=365, window=600.0):
+    """
+    1년 시간별 날씨: 첫 채우기 (provider 요청) vs 캐시 재사용, 10분 윈도우 as-of 결합
+
+    Returns:
+        dict: 관측 수, 요청 수, 소요 ms, 결합된 윈도우 비율
+    """
+    start = time.time() - days * 86400 - 3600
+    with tempfile.TemporaryDirectory() as root:
+        source = os.path.join(root, 'weather.csv')
+        simulate_weather(start, days).to_csv(source, index=False)
+        service = WeatherService(FileProvider(source), WeatherStore(os.path.join(root, 'cache.sqlite')))
+        started = time.perf_counter()
+        first = service.history('Seoul', start, start + days * 86400)
+        fill_ms = 1e3 * (time.perf_counter() - started)
+        fill_requests = service.requests
+        started = time.perf_counter()
+        again = service.history('Seoul', start, start + days * 86400)
+        cached_ms = 1e3 * (time.perf_counter() - started)
+        windows = start + np.arange(int(days * 86400 / window)) * window
+        started = time.perf_counter()
+        joined = align(windows, again)
+        align_ms = 1e3 * (time.perf_counter() - started)
+    return {'observations': len(first['time']), 'fill_requests': fill_requests, 'fill_ms': round(fill_ms, 1),
+            'cached_requests': service.requests - fill_requests, 'cached_ms': round(cached_ms, 1),
+            'windows': len(windows), 'align_ms': round(align_ms, 2),
+            'aligned': round(float(np.mean(np.isfinite(joined['wind_speed']))), 4)}
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Weather cache fill/reuse and as-of join")
+    parser.add_argument('--days', type=float, default=365)
+    args = parser.parse_args()
+    print(benchmark(args.days))
@@ -0,0 +1,388 @@
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+from backend.ml.features import STATISTICS, extract
+
+# 환경 변수 설정 (없으면 기본값 사용)
+#   SNUGEOSHM_MODEL_DIR   : 터빈별 Isolation Forest 모델(.joblib) 저장 경로
+#                           (joblib.load는 pickle이므로 현재 사용자 전용 디렉터리여야 함)
+#   SNUGEOSHM_MODEL_CACHE : 워커당 메모리에 올려 두는 모델 수 (LRU)
+DEFAULT_MODEL_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                                 'snugeoshm', 'models')
+DEFAULT_MODEL_CACHE = 32
+WINDOW_SECONDS = 60.0           # 특징 추출 윈도우 길이 (초)
+TRAIN_WINDOWS = 2048            # 학습에 쓰는 최근 윈도우 수 (슬라이딩 학습 구간)
+REFIT_WINDOWS = 512             # 마지막 학습 이후 이만큼 새 윈도우가 쌓이면 백그라운드 재학습
+MIN_TRAIN_WINDOWS = 32          # 이보다 적으면 모델을 만들지 않음
+N_ESTIMATORS = 100
+CONTAMINATION = 0.01            # 학습 구간 중 이상으로 볼 비율 (IsolationForest 임계값)
+MAX_EVENTS = 200                # turbine-data['anomalies'] 에 남기는 터빈당 최근 이상 윈도우 수
+FEATURES = ('log_rms', 'log_peak', 'crest', 'log_kurtosis', 'centroid')
+
+
+# ============================================================================
+# 윈도우 특징 추출
+# ============================================================================
+def window_features(values, fs, window_seconds=WINDOW_SECONDS):
+    """
+    채널 × 윈도우 통계 특징 (features.extract의 통계 특징에서 선택, 전체 윈도우를 한 번에 계산)
+
+    채널별 특징: log RMS, log peak, crest factor, log kurtosis, 스펙트럼 중심 주파수(Hz).
+    RMS/peak는 진폭, crest/kurtosis는 충격성, 중심 주파수는 강성 변화(주파수 이동)에 민감하다.
+
+    Args:
+        values: (n_channels, n_samples)
+        fs: 샘플링 주파수
+        window_seconds: 윈도우 길이 (초), 마지막 불완전 윈도우는 버림
+
+    Returns:
+        tuple: (features (W, n_channels × len(FEATURES)) float32, starts (W,) 기록 시작 기준 초)
+    """
+    stats, starts = extract(values, fs, window_seconds, bands=(), n_peaks=0)
+    rms, peak, crest, kurtosis, centroid = (stats[..., STATISTICS.index(name)]
+                                            for name in ('rms', 'peak', 'crest', 'kurtosis', 'centroid'))
+    tiny = np.finfo(np.float32).tiny
+    features = np.stack([np.log(np.maximum(rms, tiny)), np.log(np.maximum(peak, tiny)), crest,
+                         np.log(np.maximum(kurtosis, tiny)), centroid], axis=-1)
+    # (C, W, F) → (W, C·F)  — 열 순서: 채널별로 FEATURES
+    return features.transpose(1, 0, 2).reshape(len(starts), -1).astype(np.float32), starts
+
+
+def feature_names(channels):
+    return [f'{channel}:{name}' for channel in channels for name in FEATURES]
+
+
+# ============================================================================
+# 터빈별 모델
+# ============================================================================
+class AnomalyModel:
+    """
+    터빈 하나의 Isolation Forest + 슬라이딩 학습 구간
+
+    Isolation Forest 입력은 채널 × 특징 원본이 아니라, 학습 구간 중앙값/MAD 기준 편차(|z|)의
+    특징 종류별 채널 최댓값이다. 채널 하나의 이상이 수십 차원 중 한 축에 묻히지 않고
+    어느 채널에서 생겨도 같은 축에 나타난다.
+
+    score()는 학습된 모델로 배치 채점만 하고(재학습 없음), 새 윈도우는 학습 버퍼에 쌓는다.
+    마지막 학습 후 REFIT_WINDOWS개가 쌓이면 refit_due가 True가 되어 ModelCache가
+    백그라운드에서 최근 TRAIN_WINDOWS개로 다시 학습한다.
+    add/score/fit의 상태 교체와 pickle 저장은 모델별 lock으로 직렬화한다 (학습 자체는 lock 밖).
+    """
+
+    def __init__(self, names, contamination=CONTAMINATION, train_windows=TRAIN_WINDOWS,
+                 refit_windows=REFIT_WINDOWS):
+        self.names = list(names)
+        self.contamination = contamination
+        self.train_windows = train_windows
+        self.refit_windows = refit_windows
+        self.forest = None
+        self.buffer = np.zeros((0, len(self.names)), dtype=np.float32)
+        self.center = None              # 학습 구간 특징별 중앙값
+        self.spread = None              # 학습 구간 특징별 MAD (정규분포 환산)
+        self.since_fit = 0
+        self.fitted_at = None
+        self.n_fits = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # 저장 중 다른 스레드의 add/재학습과 겹치지 않도록 lock 아래에서 속성 복사 (lock은 제외)
+        with self._lock:
+            state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def refit_due(self):
+        return self.forest is None or self.since_fit >= self.refit_windows
+
+    def add(self, features):
+        """학습 버퍼에 윈도우 추가 (최근 train_windows개만 유지)"""
+        with self._lock:
+            self.buffer = np.concatenate([self.buffer, features])[-self.train_windows:]
+            self.since_fit += len(features)
+
+    def fit(self, features=None, random_state=0):
+        """
+        학습 버퍼(또는 지정 특징)로 새 모델 학습
+
+        시작 시점의 버퍼로 lock 밖에서 학습한 뒤 lock 아래에서 결과를 교체하므로, 다른 스레드의
+        score()는 이전 모델 또는 새 모델 중 하나를 온전히 쓰고, 학습 중 add된 윈도우는 다음 재학습
+        몫으로 남는다.
+        """
+        with self._lock:
+            data = self.buffer if features is None else features
+            counted = self.since_fit
+        if len(data) < MIN_TRAIN_WINDOWS:
+            raise ValueError(f"Need at least {MIN_TRAIN_WINDOWS} windows to train "
+                             f"(got {len(data)}; use a longer record or shorter window)")
+        center = np.median(data, axis=0)
+        spread = np.median(np.abs(data - center), axis=0) * 1.4826
+        spread = np.where(spread > 0, spread, 1.0)
+        forest = IsolationForest(n_estimators=N_ESTIMATORS, contamination=self.contamination,
+                                 random_state=random_state).fit(self._inputs(data, center, spread)[0])
+        with self._lock:
+            self.forest, self.center, self.spread = forest, center, spread
+            self.since_fit -= counted
+            self.fitted_at = time.time()
+            self.n_fits += 1
+        return self
+
+    def score(self, features):
+        """
+        배치 채점 (재학습 없음)
+
+        Returns:
+            dict: {'score' (높을수록 이상, 0 초과 = 이상), 'anomaly' (bool), 'feature' (이상 원인 특징 인덱스)}
+        """
+        with self._lock:
+            forest, center, spread = self.forest, self.center, self.spread
+        inputs, deviation = self._inputs(features, center, spread)
+        score = -forest.decision_function(inputs)
+        return {'score': score, 'anomaly': score > 0, 'feature': np.argmax(deviation, axis=1)}
+
+    @staticmethod
+    def _inputs(features, center, spread):
+        """(Isolation Forest 입력 (W, len(FEATURES)), 특징별 |z| (W, C·F))"""
+        deviation = np.abs(features - center) / spread
+        return deviation.reshape(len(features), -1, len(FEATURES)).max(axis=1), deviation
+
+
+def _private(path):
+    """현재 사용자 소유이고 group/other 쓰기 권한이 없는지 (getuid가 없는 플랫폼은 검사 생략)"""
+    if not hasattr(os, 'getuid'):
+        return True
+    info = os.stat(path)
+    return info.st_uid == os.getuid() and not info.st_mode & 0o022
+
+
+class ModelCache:
+    """
+    터빈 ID → AnomalyModel (LRU 메모리 캐시 + .joblib 파일)
+
+    재학습은 단일 백그라운드 스레드에서 실행하고, 끝나면 파일에 다시 기록한다.
+    파일은 학습/재학습 때만 기록한다 (그 사이 학습 버퍼에 쌓인 윈도우는 워커 메모리에만 있음).
+    파일 수정 시각이 바뀌면(다른 워커가 재학습) 다시 읽는다.
+    .joblib는 pickle이라 다른 사용자가 쓸 수 있는 디렉터리/파일은 쓰지 않는다: 디렉터리는 0700으로
+    만들고 소유자/권한을 확인하며, 조건에 맞지 않는 모델 파일은 읽지 않는다.
+    """
+
+    def __init__(self, root=DEFAULT_MODEL_DIR, capacity=DEFAULT_MODEL_CACHE):
+        self.root = root
+        self.capacity = capacity
+        self._entries = OrderedDict()   # turbine_id -> (mtime, AnomalyModel)
+        self._lock = threading.RLock()
+        self._refitting = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='anomaly-refit')
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        if not _private(root):
+            raise ValueError(f"Model directory {root} must be owned by the current user "
+                             f"and not writable by group or others")
+
+    def path(self, turbine_id):
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', str(turbine_id)).lstrip('.') or '_'
+        return os.path.join(self.root, f'{name}.joblib')
+
+    def get(self, turbine_id):
+        """모델 반환 (없으면 None)"""
+        path = self.path(turbine_id)
+        with self._lock:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                entry = self._entries.get(turbine_id)
+                return entry[1] if entry else None
+            entry = self._entries.get(turbine_id)
+            if entry is None or entry[0] != mtime:
+                if not _private(path):
+                    return None         # 다른 사용자가 쓸 수 있는 파일은 unpickle하지 않음 (재학습 후 교체)
+                entry = (mtime, joblib.load(path))
+                self._entries[turbine_id] = entry
+            self._touch(turbine_id)
+            return entry[1]
+
+    def put(self, turbine_id, model):
+        """모델 저장 (임시 파일 후 교체)"""
+        path = self.path(turbine_id)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        joblib.dump(model, tmp)
+        os.replace(tmp, path)
+        with self._lock:
+            self._entries[turbine_id] = (os.stat(path).st_mtime_ns, model)
+            self._touch(turbine_id)
+
+    def refit_async(self, turbine_id, model):
+        """백그라운드 재학습 예약 (같은 터빈의 재학습이 이미 대기 중이면 무시). 예약 여부 반환"""
+        with self._lock:
+            if turbine_id in self._refitting:
+                return False
+            self._refitting.add(turbine_id)
+        return bool(self._executor.submit(self._refit, turbine_id, model))
+
+    def _refit(self, turbine_id, model):
+        try:
+            self.put(turbine_id, model.fit())
+        finally:
+            with self._lock:
+                self._refitting.discard(turbine_id)
+
+    def _touch(self, turbine_id):
+        self._entries.move_to_end(turbine_id)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_models():
+    """환경 변수 설정으로 만든 기본 ModelCache 반환 (워커당 1개)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            root = os.environ.get('SNUGEOSHM_MODEL_DIR', DEFAULT_MODEL_DIR)
+            capacity = int(os.environ.get('SNUGEOSHM_MODEL_CACHE', DEFAULT_MODEL_CACHE))
+            _default_cache = ModelCache(root, capacity)
+        return _default_cache
+
+
+# ============================================================================
+# 탐지 실행
+# ============================================================================
+def detect(values, fs, channels, turbine_id, models, window_seconds=WINDOW_SECONDS,
+           contamination=CONTAMINATION, progress=None):
+    """
+    윈도우 특징 추출 → 터빈 모델로 배치 채점 → 학습 버퍼 갱신 (재학습은 필요 시 백그라운드)
+
+    모델이 없거나 특징 구성(채널)/contamination이 바뀌었으면 이번 데이터로 먼저 학습한다.
+
+    Returns:
+        dict: {'starts', 'score', 'anomaly', 'feature' (이름), 'model' (학습 정보), 'seconds'}
+    """
+    started = time.perf_counter()
+    if progress is not None:
+        progress(0.0, 'Extracting window features')
+    features, starts = window_features(values, fs, window_seconds)
+    names = feature_names(channels)
+    model = models.get(turbine_id)
+    trained = False
+    if model is None or model.names != names or model.contamination != contamination:
+        if progress is not None:
+            progress(0.3, 'Training Isolation Forest')
+        model = AnomalyModel(names, contamination)
+        model.add(features)
+        model.fit()
+        models.put(turbine_id, model)
+        trained = True
+    if progress is not None:
+        progress(0.6, 'Scoring windows')
+    scored = model.score(features)
+    refit = False
+    if not trained:
+        # 버퍼 추가는 메모리에서만, 파일 기록은 재학습이 끝난 뒤 (_refit)
+        model.add(features)
+        refit = model.refit_due and models.refit_async(turbine_id, model)
+    return {
+        'starts': starts,
+        'score': scored['score'],
+        'anomaly': scored['anomaly'],
+        'feature': [names[k] for k in scored['feature']],
+        'model': {'trained': trained, 'refit': refit, 'fits': model.n_fits,
+                  'buffer': len(model.buffer), 'since_fit': model.since_fit, 'fitted_at': model.fitted_at},
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def detect_dataset(dataset, turbine_id, models=None, window_seconds=WINDOW_SECONDS,
+                   contamination=CONTAMINATION, progress=None):
+    """Dataset에 대해 detect 실행 (sampling rate 필요, 기본 ModelCache 사용)"""
+    if not dataset.fs:
+        raise ValueError("Sampling rate unknown (no time column)")
+    return detect(dataset.values, dataset.fs, dataset.channels, turbine_id, models or get_models(),
+                  window_seconds, contamination, progress)
+
+
+def anomaly_events(result, start_time, max_events=MAX_EVENTS):
+    """
+    탐지 결과 → turbine-data['anomalies'] 항목 (이상 윈도우만, 최근 max_events개)
+
+    Args:
+        start_time: 기록 시작 시각 (epoch 초, tracking.record_start)
+    """
+    index = np.flatnonzero(result['anomaly'])[-max_events:]
+    when = ((start_time + result['starts'][index]) * 1e3).astype('datetime64[ms]').astype('datetime64[s]')
+    return [{'time': str(t).replace('T', ' '), 'score': round(float(result['score'][k]), 4),
+             'feature': result['feature'][k]} for t, k in zip(when, index)]
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def benchmark(n_channels=8, fs=100.0, hours=24.0, window_seconds=WINDOW_SECONDS, batch_hours=1.0):
+    """
+    하루치 학습 후 1시간 배치 채점: 재학습 없는 채점 vs 배치마다 재학습, 모델 캐시 로드 시간
+
+    Returns:
+        dict: 윈도우 수, 학습/채점/재학습/로드 시간 (ms), 주입한 이상 검출 수
+    """
+    from backend.ml.ssi import simulate_response
+    values = simulate_response(n_channels, fs, hours + batch_hours).astype(np.float32)
+    split = int(hours * 3600 * fs)
+    batch = values[:, split:].copy()
+    # 이상 주입: 배치 중간 10분간 한 채널 진폭 3배 + 충격
+    n = int(window_seconds * fs)
+    batch[0, 20 * n:30 * n] *= 3.0
+    batch[1, 40 * n:40 * n + 50] += 20 * batch[1].std()
+    channels = [f'ch{i + 1}' for i in range(n_channels)]
+    with tempfile.TemporaryDirectory() as root:
+        models = ModelCache(root)
+        started = time.perf_counter()
+        detect(values[:, :split], fs, channels, 'T01', models, window_seconds)
+        train_ms = 1e3 * (time.perf_counter() - started)
+        started = time.perf_counter()
+        result = detect(batch, fs, channels, 'T01', models, window_seconds)
+        score_ms = 1e3 * (time.perf_counter() - started)
+        model = models.get('T01')
+        features, _ = window_features(batch, fs, window_seconds)
+        started = time.perf_counter()
+        model.fit(np.concatenate([model.buffer, features])[-model.train_windows:])
+        refit_ms = 1e3 * (time.perf_counter() - started)
+        models._entries.clear()
+        started = time.perf_counter()
+        models.get('T01')
+        load_ms = 1e3 * (time.perf_counter() - started)
+    flagged = np.flatnonzero(result['anomaly'])
+    return {
+        'train_windows': int(split // n),
+        'batch_windows': len(result['score']),
+        'train_ms': round(train_ms, 1),
+        'score_ms': round(score_ms, 1),
+        'refit_ms': round(refit_ms, 1),
+        'load_ms': round(load_ms, 1),
+        'flagged': flagged.tolist(),
+        'injected': list(range(20, 30)) + [40],
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Isolation Forest anomaly detection benchmark")
+    parser.add_argument('--channels', type=int, default=8)
+    parser.add_argument('--fs', type=float, default=100.0)
+    parser.add_argument('--hours', type=float, default=24.0, help="training history length")
+    parser.add_argument('--window', type=float, default=WINDOW_SECONDS)
+    args = parser.parse_args()
+    print(benchmark(args.channels, args.fs, args.hours, args.window))
@@ -0,0 +1,212 @@
+import time
+
+import numpy as np
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+
+from backend.ml.ssi import MAX_DAMPING, N_MODES, mac
+
+# ============================================================================
+# 안정화 다이어그램 극점 클러스터링 (자동 모드 선택)
+# ============================================================================
+# 극점 사이 거리 d = |Δf|/max(f) + DAMPING_WEIGHT·|Δζ|/max(ζ) + (1 - MAC)
+# 같은 물리 모드의 극점은 차수가 바뀌어도 주파수/형상이 거의 같으므로 작은 거리로 묶인다.
+DAMPING_WEIGHT = 0.2            # 감쇠비는 추정 분산이 커서 가중치를 낮게 둠
+CLUSTER_THRESHOLD = 0.06        # 덴드로그램 절단 거리
+CLUSTER_LINKAGE = 'average'     # scipy linkage 방식
+MIN_SUPPORT = 0.3               # 전체 차수 중 이 비율 이상에 극점이 있는 클러스터만 모드로 채택
+
+
+def flatten_poles(poles, diagram):
+    """
+    차수별 극점을 diagram 배열 순서와 같은 (채널 × 극점) 모드 형상 행렬로 결합
+
+    stabilization()은 poles 순서대로 극점을 이어 붙이므로 열 순서가 diagram과 일치한다.
+    """
+    return np.concatenate([entry['shapes'] for entry in poles], axis=1)
+
+
+def pole_distances(freq, damping, shapes, damping_weight=DAMPING_WEIGHT):
+    """
+    극점 쌍 거리 행렬 (모든 쌍을 브로드캐스팅 한 번으로 계산)
+
+    Args:
+        freq, damping: (n,) 극점 주파수/감쇠비
+        shapes: (n_channels, n) 복소 모드 형상
+
+    Returns:
+        ndarray: (n, n) 대칭 거리 행렬 (대각 0)
+    """
+    df = np.abs(freq[:, None] - freq[None, :]) / np.maximum(freq[:, None], freq[None, :])
+    dz = np.abs(damping[:, None] - damping[None, :]) / np.maximum(
+        np.maximum(np.abs(damping[:, None]), np.abs(damping[None, :])), 1e-12)
+    distance = df + damping_weight * dz + (1.0 - mac(shapes, shapes))
+    np.fill_diagonal(distance, 0.0)
+    return np.maximum(distance, 0.0)
+
+
+def candidate_pairs(freq, threshold):
+    """
+    상대 주파수 차가 threshold 미만인 극점 쌍 (freq는 오름차순 정렬)
+
+    거리 d ≥ |Δf|/max(f) 이므로 이 쌍 밖의 극점끼리는 거리가 threshold 이상이다.
+
+    Returns:
+        tuple: (rows, cols) — rows < cols 인 인덱스 배열
+    """
+    n = len(freq)
+    with np.errstate(divide='ignore'):
+        hi = np.searchsorted(freq, freq / (1.0 - threshold), side='left')
+    counts = np.maximum(hi - np.arange(n) - 1, 0)
+    rows = np.repeat(np.arange(n), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, rows + 1 + offsets
+
+
+def pair_distances(freq, damping, unit_shapes, rows, cols, damping_weight=DAMPING_WEIGHT):
+    """
+    pole_distances와 같은 거리를 지정한 쌍에 대해서만 계산 (벡터 연산)
+
+    Args:
+        unit_shapes: (n, n_channels) 노름 1로 정규화한 모드 형상 (행 = 극점)
+
+    Returns:
+        ndarray: 쌍별 거리
+    """
+    df = np.abs(freq[rows] - freq[cols]) / np.maximum(freq[rows], freq[cols])
+    dz = np.abs(damping[rows] - damping[cols]) / np.maximum(
+        np.maximum(np.abs(damping[rows]), np.abs(damping[cols])), 1e-12)
+    distance = df + damping_weight * dz
+    # 정규화된 형상의 MAC = |<a, b>|²
+    modal = np.abs(np.einsum('ij,ij->i', unit_shapes[rows].conj(), unit_shapes[cols])) ** 2
+    return distance + (1.0 - modal)
+
+
+def cluster_modes(poles, diagram, n_orders=None, n_modes=N_MODES, threshold=CLUSTER_THRESHOLD,
+                  method=CLUSTER_LINKAGE, min_support=MIN_SUPPORT, max_damping=MAX_DAMPING,
+                  stable_only=False):
+    """
+    극점 계층 클러스터링으로 물리 모드 자동 선택
+
+    1. 물리적으로 가능한 극점(0 < ζ < max_damping)을 주파수순으로 정렬하고, 주파수 차가
+       threshold 미만인 쌍만 골라 거리를 계산한다 (candidate_pairs / pair_distances).
+    2. 인접 차수에 거리 threshold 미만의 극점이 없는 극점(잡음 극점)을 제외한다.
+    3. 거리 threshold 미만 쌍을 간선으로 한 연결 성분마다 linkage를 실행한다.
+       average/complete linkage에서 절단 거리 threshold 이하로 합쳐지는 두 클러스터는
+       반드시 threshold 미만 쌍을 가지므로, 성분별 결과는 전체에 linkage를 돌린 결과와 같다.
+    4. 여러 차수(min_support 이상)에 걸친 클러스터를 모드로 채택한다.
+
+    Args:
+        poles: poles_from_subspace 결과
+        diagram: stabilization 결과
+        n_orders: 전체 차수 수 (None이면 len(poles))
+        n_modes: 반환할 모드 수 (confidence 상위, 주파수 순 정렬)
+        threshold: 덴드로그램 절단 거리
+        method: linkage 방식 ('average', 'complete', 'single' ...)
+        min_support: 채택에 필요한 차수 비율
+        stable_only: True면 안정 극점만 클러스터링
+
+    Returns:
+        list: [{'frequency', 'damping', 'shape', 'support', 'confidence', 'poles'}, ...]
+              confidence = support × 대표 형상과의 평균 MAC (0~1)
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n_orders = n_orders or len(poles)
+    freq, damping = diagram['freq'], diagram['damping']
+    keep = (damping > 0) & (damping < max_damping) & (freq > 0)
+    if stable_only:
+        keep &= diagram['stable'].astype(bool)
+    index = np.flatnonzero(keep)
+    index = index[np.argsort(freq[index], kind='stable')]
+    if len(index) < 2:
+        return []
+    freq, damping, order = freq[index], damping[index], diagram['order'][index]
+    shapes = flatten_poles(poles, diagram)[:, index]
+    rank = np.unique(order, return_inverse=True)[1]
+
+    rows, cols = candidate_pairs(freq, threshold)
+    # 1 - MAC ≥ 0 이므로 주파수/감쇠 항만으로 threshold를 넘는 쌍은 MAC 계산 전에 제외
+    dz = np.abs(damping[rows] - damping[cols]) / np.maximum(
+        np.maximum(np.abs(damping[rows]), np.abs(damping[cols])), 1e-12)
+    near = (np.abs(freq[rows] - freq[cols]) / freq[cols] + DAMPING_WEIGHT * dz) < threshold
+    rows, cols = rows[near], cols[near]
+    norms = np.linalg.norm(shapes, axis=0)
+    unit_shapes = np.ascontiguousarray((shapes / np.where(norms > 0, norms, 1.0)).T)
+    close = pair_distances(freq, damping, unit_shapes, rows, cols) < threshold
+    rows, cols = rows[close], cols[close]
+    # 잡음 극점 제거: 인접 차수에 가까운 극점이 있어야 함
+    adjacent = np.abs(rank[rows] - rank[cols]) == 1
+    consistent = np.zeros(len(freq), dtype=bool)
+    consistent[rows[adjacent]] = True
+    consistent[cols[adjacent]] = True
+    edge = consistent[rows] & consistent[cols]
+    graph = coo_matrix((np.ones(edge.sum()), (rows[edge], cols[edge])), shape=(len(freq), len(freq)))
+    _, component = connected_components(graph, directed=False)
+
+    modes = []
+    for label in np.unique(component[consistent]):
+        members = np.flatnonzero((component == label) & consistent)
+        if len(np.unique(order[members])) / n_orders < min_support:
+            continue        # 하위 클러스터는 지지 차수가 더 적으므로 linkage 불필요
+        distance = pole_distances(freq[members], damping[members], shapes[:, members])
+        labels = fcluster(linkage(squareform(distance, checks=False), method=method), t=threshold,
+                          criterion='distance')
+        for sub in np.unique(labels):
+            local = np.flatnonzero(labels == sub)
+            cluster = members[local]
+            support = min(len(np.unique(order[cluster])) / n_orders, 1.0)
+            if support < min_support:
+                continue
+            # 대표 극점: 클러스터 내 다른 극점과의 거리 합이 가장 작은 극점 (medoid)
+            medoid = cluster[np.argmin(distance[np.ix_(local, local)].sum(axis=1))]
+            cohesion = float(np.mean(mac(shapes[:, [medoid]], shapes[:, cluster])))
+            modes.append({
+                'frequency': float(np.median(freq[cluster])),
+                'damping': float(np.median(damping[cluster])),
+                'shape': shapes[:, medoid],
+                'support': float(support),
+                'confidence': float(support * cohesion),
+                'poles': int(len(cluster)),
+            })
+    # confidence(동률이면 support) 상위 n_modes개를 고른 뒤 주파수 순으로 정렬
+    modes.sort(key=lambda m: (m['confidence'], m['support']), reverse=True)
+    return sorted(modes[:n_modes], key=lambda m: m['frequency'])
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def benchmark(n_channels=8, fs=100.0, hours=1.0, max_order=200, block_rows=None, repeat=5):
+    """
+    극점 수천 개 규모의 클러스터링 소요 시간 (거리 행렬 + linkage + 모드 요약)
+
+    Returns:
+        dict: 극점 수, 클러스터링 ms, 선택된 모드 (주파수, 감쇠비 %, confidence)
+    """
+    from backend.ml.ssi import simulate_response, ssi_cov
+    values = simulate_response(n_channels, fs, hours)
+    result = ssi_cov(values, fs, block_rows, max_order, selection='stable')
+    started = time.perf_counter()
+    for _ in range(repeat):
+        modes = cluster_modes(result['poles'], result['diagram'])
+    elapsed = (time.perf_counter() - started) / repeat
+    return {
+        'poles': int(len(result['diagram']['freq'])),
+        'orders': len(result['orders']),
+        'cluster_ms': round(1e3 * elapsed, 1),
+        'modes': [(round(m['frequency'], 3), round(100 * m['damping'], 2), round(m['confidence'], 2))
+                  for m in modes],
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Stabilization diagram pole clustering benchmark")
+    parser.add_argument('--channels', type=int, default=8)
+    parser.add_argument('--fs', type=float, default=100.0)
+    parser.add_argument('--hours', type=float, default=1.0)
+    parser.add_argument('--max-order', type=int, default=200)
+    args = parser.parse_args()
+    print(benchmark(args.channels, args.fs, args.hours, args.max_order))
@@ -0,0 +1,419 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from scipy.signal import lfilter
+
+# ============================================================================
+# 고유진동수 드리프트 탐지 (EWMA + CUSUM + Page-Hinkley)
+# ============================================================================
+# 시계열 하나 = (터빈, 모드 track). 모든 시계열의 상태를 같은 길이의 배열로 보관해
+# 새 윈도우 하나를 전체 fleet에 대해 배열 연산 한 번으로 갱신한다 (시계열당 O(1) 시간/메모리).
+#   - 기준값(initial): 처음 WARMUP개 관측의 평균 — 정상 상태 기준, 이후 고정
+#   - level: 빠른 EWMA. |level / initial - 1| > DRIFT_THRESHOLD 이면 'threshold' 이벤트
+#     (DRIFT_CLEAR 아래로 돌아올 때까지 다시 발생하지 않음)
+#   - CUSUM: r = f / reference - 1 의 양/음 누적합 (Lindley 재귀), CUSUM_H 초과 시 'cusum'
+#     허용 편차 CUSUM_K는 상대값이라 온도에 의한 일변동(±0.5% 이내)은 누적되지 않는다.
+#   - Page-Hinkley: r 의 누적 평균 대비 누적 편차가 PH_LAMBDA 초과 시 'page_hinkley'
+#   CUSUM/Page-Hinkley 이벤트 후에는 다음 REBASE개 관측 평균을 새 reference로 삼고 통계를
+#   다시 시작한다 (같은 변화로 이벤트가 반복되지 않고, 추가 변화만 다시 탐지).
+WARMUP = 36                     # 기준값 추정에 쓰는 초기 관측 수 (10분 윈도우 6시간)
+LEVEL_ALPHA = 0.1               # level EWMA 계수
+DRIFT_THRESHOLD = 0.10          # 기준값 대비 상대 변화 임계 (10%)
+DRIFT_CLEAR = 0.08              # 이 값 아래로 돌아오면 threshold 상태 해제 (임계 부근 반복 이벤트 방지)
+CUSUM_K = 0.005                 # CUSUM 허용 편차 (상대, 1% 이상 변화 탐지)
+CUSUM_H = 0.05                  # CUSUM 경보 임계 (상대 누적)
+PH_DELTA = 0.005                # Page-Hinkley 허용 편차 (상대)
+PH_LAMBDA = 0.1                 # Page-Hinkley 경보 임계 (상대 누적)
+REBASE = 6                      # 경보 후 새 reference를 정하는 관측 수
+BACKFILL_CHUNK = 4096           # backfill 한 번에 벡터 연산하는 관측 수
+MAX_EVENTS = 100                # 터빈당 보관하는 최근 이벤트 수
+
+STATE_FIELDS = ('count', 'total', 'initial', 'reference', 'level', 'active', 'rebase', 'rebase_total',
+                'cusum_pos', 'cusum_neg', 'ph_count', 'ph_mean', 'ph_pos', 'ph_pos_min',
+                'ph_neg', 'ph_neg_max')
+DETECTOR_FIELDS = STATE_FIELDS[8:]
+
+
+def new_state(n):
+    """시계열 n개의 초기 상태 (필드별 (n,) 배열)"""
+    state = {name: np.zeros(n) for name in STATE_FIELDS}
+    state['active'] = np.zeros(n, dtype=bool)
+    return state
+
+
+# ============================================================================
+# 온라인 갱신 (모든 시계열 한 번에)
+# ============================================================================
+def update(state, values):
+    """
+    시계열별 새 관측 하나로 상태 갱신 (NaN인 시계열은 건너뜀)
+
+    상태 필드는 제자리 수정 대신 항상 새 배열로 다시 대입한다 (DriftMonitor가 일부 시계열만
+    넘길 때 대입을 원래 배열에 기록하기 위함).
+
+    Args:
+        state: new_state 결과
+        values: (n,) 새 고유진동수
+
+    Returns:
+        list: [(시계열 인덱스, detector, 상대 변화), ...] 이번 관측에서 발생한 이벤트
+    """
+    s = state
+    valid = np.isfinite(values)
+    x = np.where(valid, values, 0.0)
+    s['level'] = np.where(valid & (s['count'] == 0), x,
+                          np.where(valid, s['level'] + LEVEL_ALPHA * (x - s['level']), s['level']))
+    warm = valid & (s['count'] < WARMUP)
+    s['total'] = s['total'] + np.where(warm, x, 0.0)
+    s['count'] = s['count'] + valid
+    ready = warm & (s['count'] == WARMUP)
+    s['initial'] = np.where(ready, s['total'] / WARMUP, s['initial'])
+    s['reference'] = np.where(ready, s['total'] / WARMUP, s['reference'])
+    live = valid & (s['count'] > WARMUP)
+    if not live.any():
+        return []
+
+    events = []
+    # threshold: 정상 기준 대비 level 변화 (구간에 들어갈 때 한 번)
+    drift = np.where(live, s['level'] / np.where(s['initial'] > 0, s['initial'], 1.0) - 1, 0.0)
+    crossed = live & (np.abs(drift) > DRIFT_THRESHOLD)
+    for i in np.flatnonzero(crossed & ~s['active']):
+        events.append((int(i), 'threshold', float(drift[i])))
+    s['active'] = (s['active'] | crossed) & ~(live & (np.abs(drift) < DRIFT_CLEAR))
+
+    # 경보 후 reference 재설정 구간
+    rebasing = live & (s['rebase'] > 0)
+    s['rebase_total'] = s['rebase_total'] + np.where(rebasing, x, 0.0)
+    s['rebase'] = s['rebase'] - rebasing
+    done = rebasing & (s['rebase'] == 0)
+    s['reference'] = np.where(done, s['rebase_total'] / REBASE, s['reference'])
+    live = live & ~rebasing
+
+    # CUSUM (Lindley 재귀) / Page-Hinkley
+    rel = x / np.where(s['reference'] > 0, s['reference'], 1.0) - 1
+    s['cusum_pos'] = np.where(live, np.maximum(0.0, s['cusum_pos'] + rel - CUSUM_K), s['cusum_pos'])
+    s['cusum_neg'] = np.where(live, np.maximum(0.0, s['cusum_neg'] - rel - CUSUM_K), s['cusum_neg'])
+    s['ph_count'] = s['ph_count'] + live
+    s['ph_mean'] = np.where(live, s['ph_mean'] + (rel - s['ph_mean']) / np.maximum(s['ph_count'], 1),
+                            s['ph_mean'])
+    s['ph_pos'] = np.where(live, s['ph_pos'] + rel - s['ph_mean'] - PH_DELTA, s['ph_pos'])
+    s['ph_neg'] = np.where(live, s['ph_neg'] + rel - s['ph_mean'] + PH_DELTA, s['ph_neg'])
+    s['ph_pos_min'] = np.minimum(s['ph_pos_min'], s['ph_pos'])
+    s['ph_neg_max'] = np.maximum(s['ph_neg_max'], s['ph_neg'])
+    cusum = live & ((s['cusum_pos'] > CUSUM_H) | (s['cusum_neg'] > CUSUM_H))
+    hinkley = live & ~cusum & ((s['ph_pos'] - s['ph_pos_min'] > PH_LAMBDA)
+                               | (s['ph_neg_max'] - s['ph_neg'] > PH_LAMBDA))
+    alarm = cusum | hinkley
+    for i in np.flatnonzero(alarm):
+        events.append((int(i), 'cusum' if cusum[i] else 'page_hinkley', float(rel[i])))
+    if alarm.any():
+        for name in DETECTOR_FIELDS:
+            s[name] = np.where(alarm, 0.0, s[name])
+        s['rebase'] = np.where(alarm, REBASE, s['rebase'])
+        s['rebase_total'] = np.where(alarm, 0.0, s['rebase_total'])
+    return events
+
+
+# ============================================================================
+# 저장된 이력에서 벡터 연산으로 상태 재구성 (backfill)
+# ============================================================================
+def backfill(values):
+    """
+    시계열 하나의 관측 이력 전체를 처리 (update를 차례로 호출한 것과 같은 결과)
+
+    EWMA는 lfilter, CUSUM은 Lindley 재귀의 닫힌 형태 S_t = C_t - min(-S_0, min_{s≤t} C_s),
+    Page-Hinkley는 누적합/누적 최솟값으로 BACKFILL_CHUNK개씩 계산하며 상태를 다음 구간으로
+    넘긴다. 경보가 나면 그 지점부터 다시 계산하므로 연산량은 관측 수 + 경보 수 × 구간 길이.
+
+    Args:
+        values: (W,) 고유진동수 이력 (NaN = 해당 윈도우에서 검출되지 않음)
+
+    Returns:
+        tuple: (state (시계열 1개), events [(이력 위치, detector, 상대 변화), ...])
+    """
+    state = new_state(1)
+    position = np.flatnonzero(np.isfinite(values))
+    x = np.asarray(values, dtype=float)[position]
+    if not len(x):
+        return state, []
+    level, _ = lfilter([LEVEL_ALPHA], [1, LEVEL_ALPHA - 1], x[1:], zi=[(1 - LEVEL_ALPHA) * x[0]])
+    level = np.concatenate([x[:1], level])
+    state['count'][0] = len(x)
+    state['total'][0] = x[:WARMUP].sum()
+    state['level'][0] = level[-1]
+    if len(x) <= WARMUP:
+        return state, []
+    initial = x[:WARMUP].mean()
+    state['initial'][0] = initial
+
+    events = []
+    # threshold: 임계 구간에 들어가는 관측 (마지막 진입이 마지막 해제보다 뒤면 활성 상태)
+    drift = level[WARMUP:] / initial - 1
+    index = np.arange(len(drift))
+    last_on = np.maximum.accumulate(np.where(np.abs(drift) > DRIFT_THRESHOLD, index, -1))
+    last_off = np.maximum.accumulate(np.where(np.abs(drift) < DRIFT_CLEAR, index, -1))
+    active = last_on > last_off
+    entered = np.flatnonzero(active & ~np.concatenate([[False], active[:-1]]))
+    events += [(WARMUP + int(k), 'threshold', float(drift[k])) for k in entered]
+    state['active'][0] = active[-1]
+
+    start, reference = WARMUP, initial
+    carry = dict.fromkeys(DETECTOR_FIELDS, 0.0)
+    rebase = 0
+    while start < len(x):
+        if rebase:
+            # 경보 직후: 다음 REBASE개 관측 평균을 새 reference로
+            block = x[start:start + REBASE]
+            if len(block) < REBASE:
+                state['rebase'][0], state['rebase_total'][0] = REBASE - len(block), block.sum()
+                rebase = 0
+                break
+            reference, start, rebase = block.mean(), start + REBASE, 0
+            continue
+        rel = x[start:start + BACKFILL_CHUNK] / reference - 1
+        scan = _scan(rel, carry)
+        alarm = np.flatnonzero(scan['cusum'] | scan['hinkley'])
+        if not len(alarm):
+            carry = {name: scan[name][-1] for name in DETECTOR_FIELDS}
+            start += len(rel)
+            continue
+        k = alarm[0]
+        events.append((start + int(k), 'cusum' if scan['cusum'][k] else 'page_hinkley', float(rel[k])))
+        carry = dict.fromkeys(DETECTOR_FIELDS, 0.0)
+        start += k + 1
+        rebase = REBASE
+    if rebase:
+        state['rebase'][0] = REBASE
+    state['reference'][0] = reference
+    for name in DETECTOR_FIELDS:
+        state[name][0] = carry[name]
+    events.sort(key=lambda e: e[0])
+    return state, [(int(position[k]), detector, change) for k, detector, change in events]
+
+
+def _scan(rel, carry):
+    """
+    CUSUM/Page-Hinkley 재귀를 관측 구간 전체에 대해 닫힌 형태로 계산 (carry = 구간 시작 상태)
+
+    Returns:
+        dict: DETECTOR_FIELDS 필드별 (n,) 시계열 + 'cusum', 'hinkley' 경보 여부
+    """
+    out = {}
+    for name, steps in (('cusum_pos', rel - CUSUM_K), ('cusum_neg', -rel - CUSUM_K)):
+        total = np.cumsum(steps)
+        out[name] = total - np.minimum(np.minimum.accumulate(total), -carry[name])
+    out['ph_count'] = carry['ph_count'] + np.arange(1, len(rel) + 1)
+    out['ph_mean'] = (carry['ph_count'] * carry['ph_mean'] + np.cumsum(rel)) / out['ph_count']
+    out['ph_pos'] = carry['ph_pos'] + np.cumsum(rel - out['ph_mean'] - PH_DELTA)
+    out['ph_neg'] = carry['ph_neg'] + np.cumsum(rel - out['ph_mean'] + PH_DELTA)
+    out['ph_pos_min'] = np.minimum(np.minimum.accumulate(out['ph_pos']), carry['ph_pos_min'])
+    out['ph_neg_max'] = np.maximum(np.maximum.accumulate(out['ph_neg']), carry['ph_neg_max'])
+    out['cusum'] = (out['cusum_pos'] > CUSUM_H) | (out['cusum_neg'] > CUSUM_H)
+    out['hinkley'] = ((out['ph_pos'] - out['ph_pos_min'] > PH_LAMBDA)
+                      | (out['ph_neg_max'] - out['ph_neg'] > PH_LAMBDA))
+    return out
+
+
+# ============================================================================
+# Fleet 모니터 (터빈 × 모드 시계열 등록부)
+# ============================================================================
+class DriftMonitor:
+    """
+    터빈별 모드 track 시계열의 드리프트 상태 (프로세스당 1개)
+
+    observe()는 ModeHistory에서 아직 보지 않은 윈도우만 처리한다. 처음 보는 터빈은
+    저장된 이력 전체를 backfill로 한 번에 처리하고, 이후 새 윈도우는 update로 fleet의
+    모든 시계열을 배열 연산 한 번에 갱신한다 (update_fleet).
+    """
+
+    def __init__(self):
+        self._index = {}                # (turbine_id, track) -> 상태 배열 인덱스
+        self._seen = {}                 # turbine_id -> 처리한 이력 윈도우 수
+        self._events = {}               # turbine_id -> deque(이벤트)
+        self._state = new_state(0)
+        self._lock = threading.RLock()
+
+    def _register(self, turbine_id, n_tracks):
+        missing = [(turbine_id, t) for t in range(n_tracks) if (turbine_id, t) not in self._index]
+        if missing:
+            grown = new_state(len(missing))
+            for name in STATE_FIELDS:
+                self._state[name] = np.concatenate([self._state[name], grown[name]])
+            for key in missing:
+                self._index[key] = len(self._index)
+        return np.array([self._index[(turbine_id, t)] for t in range(n_tracks)])
+
+    def observe(self, turbine_id, history):
+        """
+        ModeHistory의 새 윈도우를 반영하고 새 이벤트를 반환
+
+        Returns:
+            list: [{'turbine_id', 'mode', 'time', 'detector', 'change'}, ...]
+        """
+        with self._lock:
+            seen = self._seen.get(turbine_id, 0)
+            if len(history) < seen:
+                seen = 0                # 이력이 새로 만들어짐 → 처음부터 다시
+            index = self._register(turbine_id, history.n_tracks)
+            new = []
+            if seen == 0:
+                for track, i in enumerate(index):
+                    state, events = backfill(history.frequency[:, track])
+                    for name in STATE_FIELDS:
+                        self._state[name][i] = state[name][0]
+                    new += [self._event(turbine_id, track, history.time[k], detector, change)
+                            for k, detector, change in events]
+            else:
+                for w in range(seen, len(history)):
+                    for i, detector, change in update(self._sub(index), history.frequency[w]):
+                        new.append(self._event(turbine_id, i, history.time[w], detector, change))
+            self._seen[turbine_id] = len(history)
+            log = self._events.setdefault(turbine_id, deque(maxlen=MAX_EVENTS))
+            log.extend(sorted(new, key=lambda e: e['time']))
+            return new
+
+    def update_fleet(self, turbine_ids, values, when):
+        """
+        여러 터빈의 새 윈도우 하나를 한 번에 반영 (실시간 스트림용)
+
+        Args:
+            turbine_ids: 터빈 ID 목록 (이미 observe/등록된 터빈)
+            values: (n_turbines, n_tracks) 새 고유진동수
+            when: 윈도우 시각 (epoch 초)
+        """
+        with self._lock:
+            index = np.concatenate([self._register(tid, values.shape[1]) for tid in turbine_ids])
+            # 등록된 시계열 전체를 순서대로 갱신하면 보기 없이 상태 배열을 직접 갱신
+            whole = len(index) == len(self._index) and np.array_equal(index, np.arange(len(index)))
+            events = update(self._state if whole else _View(self._state, index),
+                            np.asarray(values, dtype=float).ravel())
+            out = []
+            for k, detector, change in events:
+                turbine_id, track = turbine_ids[k // values.shape[1]], k % values.shape[1]
+                event = self._event(turbine_id, track, when, detector, change)
+                self._events.setdefault(turbine_id, deque(maxlen=MAX_EVENTS)).append(event)
+                out.append(event)
+            for turbine_id in turbine_ids:
+                self._seen[turbine_id] = self._seen.get(turbine_id, 0) + 1
+            return out
+
+    def summary(self, turbine_id):
+        """터빈의 모드별 현재 드리프트 (정상 기준 대비 %, 워밍업 전은 None) + 최근 이벤트"""
+        with self._lock:
+            drift = []
+            for track in range(len([k for k in self._index if k[0] == turbine_id])):
+                i = self._index[(turbine_id, track)]
+                ready = self._state['count'][i] >= WARMUP and self._state['initial'][i] > 0
+                drift.append(round(100 * (self._state['level'][i] / self._state['initial'][i] - 1), 2)
+                             if ready else None)
+            return {'drift': drift, 'events': list(self._events.get(turbine_id, []))}
+
+    def _sub(self, index):
+        return _View(self._state, index)
+
+    @staticmethod
+    def _event(turbine_id, track, when, detector, change):
+        return {'turbine_id': turbine_id, 'mode': int(track) + 1, 'time': float(when),
+                'detector': detector, 'change': round(100 * change, 2)}
+
+
+class _View(dict):
+    """
+    상태 배열의 일부 인덱스를 update()에 넘기기 위한 보기
+
+    update()는 필드를 읽고 새 배열로 다시 대입하므로, 대입 시 원래 배열의 해당 위치에 기록한다.
+    """
+
+    def __init__(self, state, index):
+        super().__init__({name: state[name][index] for name in STATE_FIELDS})
+        self._state, self._index = state, index
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        self._state[name][self._index] = value
+
+
+_default_monitor = None
+_default_lock = threading.Lock()
+
+
+def get_monitor():
+    """기본 DriftMonitor 반환 (워커당 1개, 상태는 모드 이력에서 재구성 가능하므로 저장하지 않음)"""
+    global _default_monitor
+    with _default_lock:
+        if _default_monitor is None:
+            _default_monitor = DriftMonitor()
+        return _default_monitor
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def simulate_frequency(n_windows, f0=0.3, noise=0.002, daily=0.003, change_at=None, step=-0.03,
+                       ramp_to=-0.12, seed=0):
+    """
+    10분 윈도우 고유진동수 이력 모사 (일변동 + 잡음, change_at 이후 step 변화 후 ramp_to까지 선형 감소)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_windows)
+    f = f0 * (1 + daily * np.sin(2 * np.pi * t / 144) + noise * rng.standard_normal(n_windows))
+    if change_at is not None:
+        after = t >= change_at
+        ramp = np.clip((t - change_at) / max(n_windows - change_at, 1), 0, 1)
+        f *= np.where(after, 1 + step + (ramp_to - step) * ramp, 1.0)
+    f[rng.random(n_windows) < 0.05] = np.nan
+    return f
+
+
+def benchmark(turbines=1000, n_tracks=3, days=365, repeat=50):
+    """
+    fleet 전체 한 윈도우 갱신 시간, 1년 이력 backfill 시간, 온라인/backfill 일치 여부, 탐지 지연
+
+    Returns:
+        dict: 갱신 µs (fleet 전체 / 시계열당), backfill ms, 이벤트, 일치 여부
+    """
+    n_windows = int(days * 144)
+    change_at = n_windows // 2
+    history = simulate_frequency(n_windows, change_at=change_at)
+    started = time.perf_counter()
+    for _ in range(repeat // 10 or 1):
+        _, batch_events = backfill(history)
+    backfill_ms = 1e3 * (time.perf_counter() - started) / (repeat // 10 or 1)
+    state, online_events = new_state(1), []
+    for w, value in enumerate(history):
+        online_events += [(w, detector, change) for _, detector, change in update(state, history[w:w + 1])]
+    same = ([(w, d) for w, d, _ in online_events] == [(w, d) for w, d, _ in batch_events])
+
+    monitor = DriftMonitor()
+    ids = [f'T{k:04d}' for k in range(turbines)]
+    rng = np.random.default_rng(1)
+    base = rng.uniform(0.25, 0.35, (turbines, n_tracks))
+    for w in range(WARMUP + 1):
+        monitor.update_fleet(ids, base * (1 + 0.002 * rng.standard_normal(base.shape)), w * 600.0)
+    started = time.perf_counter()
+    for w in range(repeat):
+        monitor.update_fleet(ids, base * (1 + 0.002 * rng.standard_normal(base.shape)), w * 600.0)
+    fleet_ms = 1e3 * (time.perf_counter() - started) / repeat
+    first = next((e for e in batch_events if e[0] >= change_at), None)
+    return {
+        'windows': n_windows,
+        'backfill_ms': round(backfill_ms, 2),
+        'online_matches_backfill': same,
+        'n_events': len(batch_events),
+        'threshold_events': [(w - change_at, round(100 * c, 1)) for w, d, c in batch_events if d == 'threshold'],
+        'detection_delay_windows': None if first is None else first[0] - change_at,
+        'fleet_series': turbines * n_tracks,
+        'fleet_update_ms': round(fleet_ms, 3),
+        'per_series_us': round(1e3 * fleet_ms / (turbines * n_tracks), 3),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Frequency drift detector benchmark")
+    parser.add_argument('--turbines', type=int, default=1000)
+    parser.add_argument('--days', type=float, default=365)
+    args = parser.parse_args()
+    print(benchmark(args.turbines, days=args.days))
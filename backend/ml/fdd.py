@@ -0,0 +1,313 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+import scipy.fft
+from scipy import signal
+
+from backend.ml.ssi import N_MODES, mac
+
+# ============================================================================
+# FDD / EFDD (Frequency Domain Decomposition)
+# ============================================================================
+DEFAULT_RESOLUTION = 0.005      # 목표 주파수 해상도 (Hz) → Welch 구간 길이 결정
+WELCH_OVERLAP = 0.5             # Welch 구간 겹침 비율
+MIN_SEGMENTS = 8                # 기록 길이 / 구간 길이 최소값 (평균 횟수가 적으면 누설 피크가 모드로 잡힘)
+MIN_PROMINENCE_DB = 3.0         # 첫 번째 특이값 스펙트럼 피크의 최소 돌출도 (dB)
+EFDD_MAC = 0.8                  # SDOF bell 구간: 피크 특이벡터와의 MAC가 이 값 이상인 bin
+EFDD_BANDWIDTH = 0.2            # bell 최대 반폭 (피크 주파수 대비 비율, 이웃 모드 침범 방지)
+EFDD_MAX_LEVEL = 0.9            # 감쇠 추정에 쓰는 자기상관 극값 범위 (정규화 진폭)
+EFDD_MIN_LEVEL = 0.3            # 이보다 낮은 꼬리는 bell 절단/추정 잡음이 지배
+
+
+def welch_segment(fs, resolution=DEFAULT_RESOLUTION, n_samples=None):
+    """
+    주파수 해상도를 만족하는 Welch 구간 길이 (2의 거듭제곱, 기록 길이의 1/MIN_SEGMENTS 이하)
+    """
+    nperseg = 1 << int(np.ceil(np.log2(fs / resolution)))
+    if n_samples:
+        nperseg = min(nperseg, 1 << int(np.floor(np.log2(max(n_samples // MIN_SEGMENTS, 16)))))
+    return nperseg
+
+
+@lru_cache(maxsize=16)
+def window_correlation(nperseg):
+    """
+    Hann 창의 정규화 자기상관 (lag 0 ~ nperseg/2 - 1)
+
+    Welch 스펙트럼의 역변환은 실제 자기상관 × 창 자기상관이므로, 이것으로 나누어
+    창 때문에 감쇠비가 과대 추정되는 편향을 제거한다.
+
+    Returns:
+        ndarray: (nperseg // 2,) (캐시 공유 — 수정 금지)
+    """
+    window = signal.get_window('hann', nperseg)
+    corr = np.fft.irfft(np.abs(np.fft.rfft(window, 2 * nperseg)) ** 2)[:nperseg // 2]
+    return corr / corr[0]
+
+
+def cross_spectral_density(values, fs, nperseg, overlap=WELCH_OVERLAP, f_max=None):
+    """
+    전체 채널 쌍의 상호 스펙트럼 밀도 행렬 (Welch, 모든 구간/채널을 한 번에 FFT)
+
+    모드 피크 탐색용이므로 FFT는 float32로 계산한다 (float64 대비 약 2배 빠름, 피크 위치 동일).
+    평균은 구간별이 아니라 채널 전체에서 한 번 제거한다 (Hann 창이 DC 누설을 억제).
+
+    Args:
+        values: (n_channels, n_samples)
+        fs: 샘플링 주파수
+        nperseg: 구간 길이
+        overlap: 구간 겹침 비율
+        f_max: 이 주파수 이하의 bin만 반환 (None이면 Nyquist까지)
+
+    Returns:
+        tuple: (freq (n_freq,), G (n_freq, l, l) 복소 에르미트 행렬)
+    """
+    values = np.array(values, dtype=np.float32)
+    values -= values.mean(axis=1, keepdims=True)
+    step = max(1, int(nperseg * (1 - overlap)))
+    segments = np.lib.stride_tricks.sliding_window_view(values, nperseg, axis=-1)[:, ::step]
+    window = signal.get_window('hann', nperseg)
+    # 창 함수 적용 후 전체 구간/채널 한 번에 FFT → (l, n_seg, n_freq)
+    spectra = scipy.fft.rfft(segments * window.astype(np.float32), axis=-1)
+    freq = np.fft.rfftfreq(nperseg, 1.0 / fs)
+    if f_max is not None:
+        stop = np.searchsorted(freq, f_max, side='right')
+        freq, spectra = freq[:stop], spectra[..., :stop]
+    scale = 2.0 / (fs * np.sum(window ** 2) * segments.shape[1])
+    # bin별 X X^H (X: l × n_seg) → 배치 행렬곱 한 번
+    X = np.ascontiguousarray(spectra.transpose(2, 0, 1))
+    G = X @ X.conj().transpose(0, 2, 1)
+    return freq, G.astype(np.complex128) * scale
+
+
+def singular_spectrum(G):
+    """
+    bin별 SVD (에르미트 행렬 묶음에 대한 한 번의 배치 호출)
+
+    G는 양의 준정부호이므로 고유값 분해와 같다 (svd(hermitian=True)의 정렬/부호 처리 생략).
+
+    Returns:
+        tuple: (s (n_freq, l) 내림차순 특이값, u (n_freq, l, l) 좌특이벡터)
+    """
+    w, v = np.linalg.eigh(G)
+    return np.maximum(w[:, ::-1], 0.0), v[:, :, ::-1]
+
+
+def pick_peaks(freq, sv1, n_modes=N_MODES, f_min=None, prominence_db=MIN_PROMINENCE_DB):
+    """
+    첫 번째 특이값 스펙트럼(dB)에서 돌출도 기준으로 모드 피크 자동 선택
+
+    Returns:
+        ndarray: 선택된 bin 인덱스 (주파수 오름차순, 최대 n_modes개)
+    """
+    level = 10 * np.log10(np.maximum(sv1, np.finfo(float).tiny))
+    peaks, props = signal.find_peaks(level, prominence=prominence_db)
+    if f_min is not None:
+        keep = freq[peaks] >= f_min
+        peaks, props = peaks[keep], {k: v[keep] for k, v in props.items()}
+    if len(peaks) > n_modes:
+        peaks = peaks[np.argsort(props['prominences'])[::-1][:n_modes]]
+    return np.sort(peaks)
+
+
+def efdd_mode(freq, sv1, u1, peak, fs, nperseg, min_mac=EFDD_MAC, bandwidth=EFDD_BANDWIDTH):
+    """
+    EFDD: 피크 주변 SDOF bell을 자기상관 함수로 변환해 주파수/감쇠비 추정
+
+    bell은 MAC ≥ min_mac인 연속 구간을 피크 ± bandwidth × 피크 주파수 안의 양쪽 sv1 최솟값
+    (이웃 모드와의 골)에서 자른다. 보정 주파수가 bell 밖이면 피크 bin 주파수를 유지한다 (damping=None).
+    자기상관은 Hann 창 자기상관으로 나누어 창에 의한 감쇠 편향을 보정한다.
+
+    Args:
+        freq, sv1: 주파수 축과 첫 번째 특이값
+        u1: (n_freq, l) 첫 번째 특이벡터
+        peak: 피크 bin 인덱스
+        bandwidth: bell 최대 반폭 (피크 주파수 대비 비율)
+
+    Returns:
+        dict: {'frequency', 'damping', 'shape', 'bins'} (감쇠 추정 실패 시 damping=None)
+    """
+    shape = u1[peak]
+    modal = mac(shape[:, None], u1.T)[0]
+    # 피크에서 양쪽으로 MAC가 기준 이상인 연속 구간
+    below = np.flatnonzero(modal < min_mac)
+    lo = below[below < peak].max() + 1 if (below < peak).any() else 0
+    hi = below[below > peak].min() if (below > peak).any() else len(freq)
+    # 최대 반폭 안에서 양쪽 sv1 최솟값까지로 제한
+    half = max(1, int(round(bandwidth * freq[peak] / (freq[1] - freq[0]))))
+    left = max(lo, peak - half)
+    right = min(hi, peak + half + 1)
+    lo = left + int(np.argmin(sv1[left:peak + 1]))
+    hi = peak + int(np.argmin(sv1[peak:right])) + 1
+    bell = np.zeros(nperseg // 2 + 1)
+    bell[lo:hi] = sv1[lo:hi]
+    corr = np.fft.irfft(bell, nperseg)[:nperseg // 2] / window_correlation(nperseg)
+    corr /= corr[0] if corr[0] else 1.0
+
+    result = {'frequency': float(freq[peak]), 'damping': None, 'shape': shape, 'bins': int(hi - lo)}
+    # 정규화 진폭 EFDD_MAX_LEVEL ~ EFDD_MIN_LEVEL 사이 극값만 사용 (bell 절단 영향이 작은 구간)
+    # 처음 EFDD_MIN_LEVEL 아래로 떨어진 뒤 되살아나는 절단 부엽은 연속 반주기가 아니므로 제외
+    extrema = signal.argrelextrema(np.abs(corr), np.greater)[0]
+    amplitude = np.abs(corr[extrema])
+    low = np.flatnonzero(amplitude < EFDD_MIN_LEVEL)
+    stop = low[0] if len(low) else len(extrema)
+    use = extrema[:stop][amplitude[:stop] <= EFDD_MAX_LEVEL]
+    if len(use) < 3:
+        return result
+    # 극값은 반주기 간격 → 로그 감소율 / 주기
+    k = np.arange(len(use))
+    slope = np.polyfit(k, np.log(np.abs(corr[use])), 1)[0]
+    delta = -2.0 * slope
+    damping = delta / np.sqrt(4 * np.pi ** 2 + delta ** 2)
+    period = 2.0 * np.polyfit(k, use / fs, 1)[0]
+    if period > 0 and 0 < damping < 1:
+        frequency = 1.0 / period / np.sqrt(1 - damping ** 2)
+        # bell 밖 주파수는 다른 성분을 따라간 것이므로 감쇠비와 함께 버림
+        if freq[lo] <= frequency <= freq[hi - 1]:
+            result['frequency'] = float(frequency)
+            result['damping'] = float(damping)
+    return result
+
+
+def fdd(values, fs, resolution=DEFAULT_RESOLUTION, n_modes=N_MODES, f_min=None, f_max=None,
+        efdd=True, progress=None):
+    """
+    FDD/EFDD 모드 추정
+
+    Args:
+        values: (n_channels, n_samples)
+        fs: 샘플링 주파수
+        resolution: 목표 주파수 해상도 (Hz)
+        n_modes: 선택할 피크 수
+        f_min, f_max: 피크 탐색 대역 (Hz)
+        efdd: True면 EFDD로 주파수/감쇠비 보정, False면 피크 bin 주파수만
+        progress: progress(fraction, message) (백그라운드 작업용, optional)
+
+    Returns:
+        dict: {'method', 'fs', 'nperseg', 'freq', 'sv' (n_freq, l), 'modes', 'seconds'}
+    """
+    started = time.perf_counter()
+    values = np.asarray(values)
+    if not np.isfinite(values).all():
+        values = np.nan_to_num(values)
+    nperseg = welch_segment(fs, resolution, values.shape[1])
+    if values.shape[1] < 2 * nperseg:
+        raise ValueError("Record too short for FDD at this frequency resolution")
+    if progress is not None:
+        progress(0.0, 'Computing cross-spectral density')
+    freq, G = cross_spectral_density(values, fs, nperseg, f_max=f_max)
+    if progress is not None:
+        progress(0.5, 'Decomposing spectral matrices')
+    s, u = singular_spectrum(G)
+    u1 = u[:, :, 0]
+    peaks = pick_peaks(freq, s[:, 0], n_modes, f_min)
+    modes = []
+    for peak in peaks:
+        if efdd:
+            mode = efdd_mode(freq, s[:, 0], u1, peak, fs, nperseg)
+        else:
+            mode = {'frequency': float(freq[peak]), 'damping': None, 'shape': u1[peak], 'bins': 1}
+        # 피크 bin의 1·2번 특이값 비 → 단일 모드 지배 정도 (confidence)
+        ratio = s[peak, 1] / s[peak, 0] if s.shape[1] > 1 else 0.0
+        mode['confidence'] = float(1.0 - ratio)
+        mode['support'] = 1.0
+        modes.append(mode)
+    return {
+        'method': 'fdd',
+        'fs': fs,
+        'nperseg': nperseg,
+        'freq': freq,
+        'sv': s,
+        'modes': modes,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def fdd_dataset(dataset, resolution=DEFAULT_RESOLUTION, progress=None):
+    """Dataset에 대해 FDD/EFDD 실행 (sampling rate 필요, Step 3 대역통과 범위를 피크 탐색 대역으로 사용)"""
+    if not dataset.fs:
+        raise ValueError("Sampling rate unknown (no time column)")
+    band = (dataset.meta.get('step3') or {}).get('bandpass') or (None, None)
+    return fdd(dataset.values, dataset.fs, resolution, f_min=band[0], f_max=band[1], progress=progress)
+
+
+def summarize_result(result, channels=None, max_points=2000):
+    """
+    화면/Store용 JSON 요약 (특이값 스펙트럼 + 모드 목록)
+
+    스펙트럼은 bin이 max_points를 넘으면 구간 최댓값으로 줄인다 (피크 보존).
+    """
+    freq, sv = result['freq'], result['sv'][:, :min(3, result['sv'].shape[1])]
+    if len(freq) > max_points:
+        step = -(-len(freq) // max_points)
+        n = len(freq) // step * step
+        freq = freq[:n].reshape(-1, step).mean(axis=1)
+        sv = sv[:n].reshape(-1, step, sv.shape[1]).max(axis=1)
+    level = 10 * np.log10(np.maximum(sv, np.finfo(float).tiny))
+    return {
+        'method': 'fdd',
+        'fs': result['fs'],
+        'nperseg': result['nperseg'],
+        'seconds': result['seconds'],
+        'spectrum': {'freq': np.round(freq, 5).tolist(),
+                     'sv_db': np.round(level.T, 2).tolist()},
+        'modes': [{
+            'frequency': mode['frequency'],
+            'damping': mode['damping'],
+            'support': mode['support'],
+            'confidence': mode['confidence'],
+            'shape': np.round(np.real(mode['shape'] / mode['shape'][np.argmax(np.abs(mode['shape']))]), 4).tolist(),
+        } for mode in result['modes']],
+        'channels': list(channels) if channels is not None else None,
+    }
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def benchmark(n_channels=8, fs=100.0, hours=1.0, resolution=DEFAULT_RESOLUTION, f_max=5.0, repeat=5):
+    """
+    같은 데이터에서 FDD/EFDD와 SSI-COV 비교 (소요 시간, 모드 주파수/감쇠비)
+
+    소요 시간은 repeat회 중 최솟값 (SSI는 오래 걸리므로 최대 3회).
+
+    Returns:
+        dict: 방식별 소요 시간, 속도 비, 모드 목록과 시뮬레이션 참값
+    """
+    from backend.ml.ssi import simulate_response, ssi_cov
+    frequencies, dampings = (0.3, 1.1, 2.4), (0.01, 0.015, 0.02)
+    values = simulate_response(n_channels, fs, hours, frequencies, dampings)
+    runs = [fdd(values, fs, resolution, f_max=f_max) for _ in range(max(1, repeat))]
+    result = runs[0]
+    fdd_seconds = min(run['seconds'] for run in runs)
+    ssi_runs = [ssi_cov(values, fs) for _ in range(max(1, min(repeat, 3)))]
+    ssi, ssi_seconds = ssi_runs[0], min(run['seconds'] for run in ssi_runs)
+
+    def fmt(modes):
+        return [(round(m['frequency'], 3), None if m['damping'] is None else round(100 * m['damping'], 2))
+                for m in modes]
+
+    return {
+        'samples': values.size,
+        'nperseg': result['nperseg'],
+        'fdd_seconds': round(fdd_seconds, 3),
+        'ssi_seconds': round(ssi_seconds, 3),
+        'speedup': round(ssi_seconds / fdd_seconds, 1),
+        'true_modes': [(f, round(100 * z, 2)) for f, z in zip(frequencies, dampings)],
+        'fdd_modes': fmt(result['modes']),
+        'ssi_modes': fmt(ssi['modes']),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="FDD/EFDD vs SSI-COV benchmark")
+    parser.add_argument('--channels', type=int, default=8)
+    parser.add_argument('--fs', type=float, default=100.0)
+    parser.add_argument('--hours', type=float, default=1.0)
+    parser.add_argument('--resolution', type=float, default=DEFAULT_RESOLUTION)
+    parser.add_argument('--f-max', type=float, default=5.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(benchmark(args.channels, args.fs, args.hours, args.resolution, args.f_max, args.repeat))
@@ -0,0 +1,740 @@
+import time
+
+import numpy as np
+from scipy import linalg
+
+# ============================================================================
+# SSI-COV (Covariance-driven Stochastic Subspace Identification)
+# ============================================================================
+DEFAULT_MAX_ORDER = 60          # 최대 모델 차수 (짝수 단위로 2 ~ max_order)
+DEFAULT_MIN_FREQUENCY = 0.2     # block row 수 자동 결정 기준 (가장 낮은 관심 주파수, Hz)
+MAX_BLOCK_ROWS = 120            # 자동 block row 상한 (Toeplitz 크기 = 채널 × block rows)
+CORRELATION_SEGMENT = 4096      # FFT 상관 계산 구간 길이 (샘플)
+
+# 안정 극점 판정 기준 (직전 차수 극점과 비교)
+STABLE_FREQUENCY = 0.01         # |Δf| / f
+STABLE_DAMPING = 0.05           # |Δζ| / ζ
+STABLE_MAC = 0.98
+MAX_DAMPING = 0.2               # 물리적 모드로 인정하는 감쇠비 상한
+
+# 모드 선택 (안정 극점 그룹)
+MODE_TOLERANCE = 0.02           # 같은 모드로 묶는 상대 주파수 간격
+MODE_MIN_SUPPORT = 0.3          # 전체 차수 중 이 비율 이상에서 안정이어야 모드로 채택
+N_MODES = 3
+
+# 추적 모드 (연속 윈도우)
+TRACK_OVERSAMPLE = 8            # warm-start 부분공간에 더하는 여유 열 수
+TRACK_ITERATIONS = 2            # 윈도우당 부분공간 반복 횟수
+TRACK_REFRESH = 36              # 이 윈도우 수마다 전체 SVD로 부분공간 재설정
+TRACK_FREQUENCY = 0.05          # 이전 모드와 매칭 가능한 최대 상대 주파수 차
+TRACK_MAC = 0.8                 # 이전 모드와 매칭 가능한 최소 MAC
+TRACK_CANDIDATES = 8            # 매칭 후보로 뽑는 안정 모드 수
+TRACK_STEP_SECONDS = 60.0       # 기본 윈도우 이동 간격 (윈도우 길이의 약수가 아니면 윈도우 길이 = 겹침 없음)
+
+
+def default_block_rows(fs, n_channels, max_order=DEFAULT_MAX_ORDER,
+                       min_frequency=DEFAULT_MIN_FREQUENCY):
+    """
+    block row 수 i 자동 결정
+
+    관측 행렬의 행 수(채널 × i)가 최대 차수 이상이어야 하고, 시간 지연 2i가
+    가장 낮은 관심 주파수의 반 주기 이상을 덮어야 한다.
+    """
+    by_order = int(np.ceil(max_order / n_channels)) + 1
+    by_frequency = int(np.ceil(fs / (2.0 * min_frequency))) if fs else by_order
+    return int(min(MAX_BLOCK_ROWS, max(by_order, by_frequency)))
+
+
+# ============================================================================
+# 출력 상관 (FFT, 구간 합산)
+# ============================================================================
+def cross_spectra(values, n_lags, refs=None, segment=CORRELATION_SEGMENT, count=None):
+    """
+    구간별 상호 스펙트럼 합 (상관 함수의 주파수 영역 누적값)
+
+    길이 M 구간 x_j와, 그 구간에 다음 n_lags 샘플을 이어 붙인 z_j의 상호 스펙트럼
+    Σ_j Z_j · conj(X_j)를 역변환하면 지연 0..n_lags-1의 Σ_t y[t+k] y_ref[t]가 정확히 나온다.
+    모든 구간/채널 쌍을 한 번의 einsum으로 누적한다.
+
+    Args:
+        values: (n_channels, n_samples)
+        n_lags: 필요한 최대 지연 + 1
+        refs: 기준 채널 인덱스 (None이면 전체)
+        segment: 구간 길이
+        count: 합산할 기준 시점 수 t < count (None이면 전체). count 이후 샘플은
+               지연 항 y[t+k]에만 쓰인다 (연속 블록 합산용).
+
+    Returns:
+        tuple: (spectra (l, r, n_fft//2+1) complex, n_fft)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    l, n = values.shape
+    count = n if count is None else count
+    refs = np.arange(l) if refs is None else np.asarray(refs)
+    segment = max(segment, n_lags)
+    n_seg = -(-count // segment)
+    n_fft = 1 << int(np.ceil(np.log2(segment + n_lags)))
+
+    width = n_seg * segment + n_lags
+    padded = np.zeros((l, width))
+    padded[:, :min(n, width)] = values[:, :width]
+    # 구간 j: [jM, jM+M) (count 이후는 0) / 확장 구간: [jM, jM+M+n_lags)
+    seg = padded[refs, :n_seg * segment].copy()
+    seg[:, count:] = 0.0
+    seg = seg.reshape(len(refs), n_seg, segment)
+    ext = np.lib.stride_tricks.sliding_window_view(padded, segment + n_lags, axis=-1)[:, ::segment][:, :n_seg]
+    x = np.fft.rfft(seg, n_fft, axis=-1)
+    z = np.fft.rfft(ext, n_fft, axis=-1)
+    return np.einsum('asf,bsf->abf', z, np.conj(x), optimize=True), n_fft
+
+
+def lag_sums(values, n_lags, refs=None, segment=CORRELATION_SEGMENT, count=None):
+    """
+    지연 곱의 합 Σ_{t<count} y(t+k) y_ref(t)ᵀ, k = 0..n_lags-1
+
+    Returns:
+        ndarray: (n_lags, n_channels, n_refs)
+    """
+    spectra, n_fft = cross_spectra(values, n_lags, refs, segment, count)
+    return np.moveaxis(np.fft.irfft(spectra, n_fft, axis=-1)[..., :n_lags], -1, 0)
+
+
+def correlations(values, n_lags, refs=None, segment=CORRELATION_SEGMENT):
+    """
+    출력 상관 행렬 R_k = E[y(t+k) y_ref(t)ᵀ], k = 0..n_lags-1 (비편향 추정)
+
+    Returns:
+        ndarray: (n_lags, n_channels, n_refs)
+    """
+    n = np.shape(values)[1]
+    return lag_sums(values, n_lags, refs, segment) / (n - np.arange(n_lags))[:, None, None]
+
+
+def block_toeplitz(corr, block_rows):
+    """
+    Toeplitz 행렬 T_{1|i} (블록 (p, q) = R_{i + p - q}), 인덱스 배열로 한 번에 조립
+
+    Args:
+        corr: (2i, l, r) 상관 행렬
+        block_rows: i
+
+    Returns:
+        ndarray: (l·i, r·i)
+    """
+    i = block_rows
+    _, l, r = corr.shape
+    p = np.arange(i)
+    lags = i + p[:, None] - p[None, :]           # (i, i), 범위 1 .. 2i-1
+    blocks = corr[lags]                          # (i, i, l, r)
+    return blocks.transpose(0, 2, 1, 3).reshape(i * l, i * r)
+
+
+# ============================================================================
+# 극점 추출 (SVD 한 번 + QR 한 번으로 모든 차수 처리)
+# ============================================================================
+def _modal(eigvals, eigvecs, c, fs):
+    """이산 극점 → 주파수(Hz), 감쇠비, 모드 형상 (양의 허수부만)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu = np.log(eigvals) * fs
+    keep = np.isfinite(mu) & (mu.imag > 0)
+    mu = mu[keep]
+    freq = np.abs(mu) / (2 * np.pi)
+    damping = -mu.real / np.abs(mu)
+    shapes = c @ eigvecs[:, keep]
+    # 모드 형상 정규화: 최대 성분이 1(실수)이 되도록 회전
+    ref = shapes[np.argmax(np.abs(shapes), axis=0), np.arange(shapes.shape[1])]
+    shapes = shapes / np.where(ref == 0, 1, ref)
+    order = np.argsort(freq)
+    return freq[order], damping[order], shapes[:, order]
+
+
+def mac(a, b):
+    """MAC 행렬 (a: (l, m), b: (l, n) 복소 모드 형상) → (m, n)"""
+    num = np.abs(a.conj().T @ b) ** 2
+    den = np.outer(np.sum(np.abs(a) ** 2, axis=0), np.sum(np.abs(b) ** 2, axis=0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(den > 0, num / den, 0.0)
+
+
+def poles_from_subspace(u, s, n_channels, fs, orders):
+    """
+    관측 행렬 O = U·√S 의 앞 n열로 차수별 극점 계산
+
+    A_n = O_up⁺ O_down 을 차수마다 풀지 않고, 최대 차수의 O_up = QR 분해 한 번과
+    M = Qᵀ O_down 으로 A_n = R[:n,:n]⁻¹ M[:n,:n] (삼각 행렬 풀이)만 수행한다.
+    O의 앞 n열은 차수 n 관측 행렬과 같으므로 QR도 앞 블록이 그대로 유효하다.
+
+    Returns:
+        list: 차수별 {'order', 'freq', 'damping', 'shapes'}
+    """
+    n_max = max(orders)
+    obs = u[:, :n_max] * np.sqrt(s[:n_max])
+    up, down = obs[:-n_channels], obs[n_channels:]
+    q, r = linalg.qr(up, mode='economic')
+    m = q.T @ down
+    c = obs[:n_channels]
+    poles = []
+    for n in orders:
+        a = linalg.solve_triangular(r[:n, :n], m[:n, :n], check_finite=False)
+        eigvals, eigvecs = linalg.eig(a, check_finite=False)
+        freq, damping, shapes = _modal(eigvals, eigvecs, c[:, :n], fs)
+        poles.append({'order': int(n), 'freq': freq, 'damping': damping, 'shapes': shapes})
+    return poles
+
+
+# ============================================================================
+# 안정화 다이어그램 / 모드 선택
+# ============================================================================
+def stabilization(poles, fs, max_damping=MAX_DAMPING):
+    """
+    차수별 극점에 안정 여부 표시 (직전 차수와 주파수/감쇠/MAC 비교, 벡터 연산)
+
+    Returns:
+        dict: 평탄화된 배열 {'order', 'freq', 'damping', 'stable', 'index'}
+              (index: 같은 차수 내 극점 번호 → poles[k]['shapes'][:, index])
+    """
+    rows = {'order': [], 'freq': [], 'damping': [], 'stable': [], 'index': []}
+    previous = None
+    for entry in poles:
+        freq, damping, shapes = entry['freq'], entry['damping'], entry['shapes']
+        physical = (damping > 0) & (damping < max_damping) & (freq > 0) & (freq < fs / 2)
+        stable = np.zeros(len(freq), dtype=bool)
+        if previous is not None and len(freq) and len(previous['freq']):
+            pf, pd, ps = previous['freq'], previous['damping'], previous['shapes']
+            df = np.abs(freq[:, None] - pf[None, :]) / np.maximum(freq[:, None], 1e-12)
+            dd = np.abs(damping[:, None] - pd[None, :]) / np.maximum(np.abs(damping[:, None]), 1e-12)
+            ok = (df < STABLE_FREQUENCY) & (dd < STABLE_DAMPING) & (mac(shapes, ps) > STABLE_MAC)
+            stable = ok.any(axis=1)
+        stable &= physical
+        rows['order'].append(np.full(len(freq), entry['order']))
+        rows['freq'].append(freq)
+        rows['damping'].append(damping)
+        rows['stable'].append(stable)
+        rows['index'].append(np.arange(len(freq)))
+        previous = entry
+    return {key: np.concatenate(value) if value else np.array([]) for key, value in rows.items()}
+
+
+def pick_modes(poles, diagram, n_modes=N_MODES, tolerance=MODE_TOLERANCE,
+               min_support=MODE_MIN_SUPPORT):
+    """
+    안정 극점을 주파수 순으로 묶어 물리 모드 선택
+
+    정렬된 안정 극점 사이의 상대 간격이 tolerance를 넘으면 새 그룹으로 나누고,
+    전체 차수의 min_support 비율 이상에서 나타난 그룹을 낮은 주파수부터 채택한다.
+
+    Returns:
+        list: [{'frequency', 'damping', 'shape', 'support'}, ...] (최대 n_modes개)
+    """
+    stable = diagram['stable']
+    if not stable.any():
+        return []
+    freq = diagram['freq'][stable]
+    damping = diagram['damping'][stable]
+    order = diagram['order'][stable]
+    index = diagram['index'][stable]
+    sort = np.argsort(freq)
+    freq, damping, order, index = freq[sort], damping[sort], order[sort], index[sort]
+    breaks = np.flatnonzero(np.diff(freq) / freq[1:] > tolerance) + 1
+    by_order = {entry['order']: entry for entry in poles}
+
+    modes = []
+    for group in np.split(np.arange(len(freq)), breaks):
+        support = len(np.unique(order[group])) / len(poles)
+        if support < min_support:
+            continue
+        # 대표 형상: 그룹 내 가장 높은 차수의 극점
+        top = group[np.argmax(order[group])]
+        shape = by_order[int(order[top])]['shapes'][:, index[top]]
+        modes.append({
+            'frequency': float(np.median(freq[group])),
+            'damping': float(np.median(damping[group])),
+            'shape': shape,
+            'support': float(support),
+        })
+        if len(modes) == n_modes:
+            break
+    return modes
+
+
+SELECTIONS = ('cluster', 'stable')   # 모드 선택 방식 (clustering.cluster_modes / pick_modes)
+
+
+def select_modes(poles, diagram, selection='cluster', n_modes=N_MODES):
+    """
+    모드 선택 방식 분기
+
+    Args:
+        selection: 'cluster' (극점 계층 클러스터링) 또는 'stable' (안정 극점 주파수 그룹)
+    """
+    if selection == 'cluster':
+        from backend.ml.clustering import cluster_modes
+        return cluster_modes(poles, diagram, n_modes=n_modes)
+    if selection == 'stable':
+        return pick_modes(poles, diagram, n_modes=n_modes)
+    raise ValueError(f"Unknown mode selection: {selection}")
+
+
+# ============================================================================
+# 전체 실행
+# ============================================================================
+def ssi_cov(values, fs, block_rows=None, max_order=DEFAULT_MAX_ORDER, min_order=2,
+            order_step=2, refs=None, selection='cluster', progress=None):
+    """
+    SSI-COV 안정화 다이어그램 + 모드 추출
+
+    Args:
+        values: (n_channels, n_samples) 응답 (Step 3 출력 권장)
+        fs: 샘플링 주파수 (Hz)
+        block_rows: i (None이면 default_block_rows)
+        max_order, min_order, order_step: 모델 차수 범위
+        refs: 기준 채널 인덱스 (None이면 전체)
+        selection: 모드 선택 방식 ('cluster' 또는 'stable', select_modes 참고)
+        progress: progress(fraction, message) (백그라운드 작업용, optional)
+
+    Returns:
+        dict: {'fs', 'block_rows', 'orders', 'poles', 'diagram', 'modes', 'singular_values', 'seconds'}
+    """
+    started = time.perf_counter()
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    l = values.shape[0]
+    n_refs = l if refs is None else len(refs)
+    if block_rows is None:
+        block_rows = default_block_rows(fs, n_refs, max_order)
+    max_order = int(min(max_order, block_rows * n_refs, (block_rows - 1) * l))
+    orders = list(range(min_order, max_order + 1, order_step))
+    if not orders:
+        raise ValueError("Model order range is empty (increase block rows or max order)")
+
+    report = progress or (lambda fraction, message=None: None)
+    report(0.0, 'Computing correlations')
+    corr = correlations(values, 2 * block_rows, refs)
+    report(0.4, 'Decomposing block Toeplitz matrix')
+    toeplitz = block_toeplitz(corr, block_rows)
+    u, s, _ = linalg.svd(toeplitz, full_matrices=False, check_finite=False)
+    report(0.6, 'Extracting poles')
+    poles = poles_from_subspace(u, s, l, fs, orders)
+    diagram = stabilization(poles, fs)
+    report(0.9, 'Selecting modes')
+    modes = select_modes(poles, diagram, selection)
+    return {
+        'fs': fs,
+        'block_rows': block_rows,
+        'orders': orders,
+        'poles': poles,
+        'diagram': diagram,
+        'modes': modes,
+        'singular_values': s,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def ssi_dataset(dataset, block_rows=None, max_order=DEFAULT_MAX_ORDER, selection='cluster', progress=None):
+    """Dataset에 대해 SSI-COV 실행 (sampling rate 필요)"""
+    if not dataset.fs:
+        raise ValueError("Sampling rate unknown (no time column)")
+    if block_rows is not None and block_rows < 2:
+        raise ValueError("Block rows must be at least 2")
+    if max_order < 2:
+        raise ValueError("Max order must be at least 2")
+    rows = block_rows or default_block_rows(dataset.fs, dataset.n_channels, max_order)
+    if dataset.n_samples < 20 * rows:
+        raise ValueError(f"Record too short for SSI-COV ({dataset.n_samples} samples, {rows} block rows)")
+    return ssi_cov(dataset.values, dataset.fs, block_rows, max_order, selection=selection, progress=progress)
+
+
+def summarize_result(result, channels=None):
+    """
+    화면/Store용 JSON 요약 (안정화 다이어그램 점 + 모드 목록)
+
+    Returns:
+        dict: {'fs', 'block_rows', 'seconds', 'diagram': {...}, 'modes': [...]}
+    """
+    diagram = result['diagram']
+    keep = diagram['freq'] < result['fs'] / 2
+    return {
+        'fs': result['fs'],
+        'block_rows': result['block_rows'],
+        'seconds': result['seconds'],
+        'diagram': {
+            'order': diagram['order'][keep].tolist(),
+            'freq': np.round(diagram['freq'][keep], 5).tolist(),
+            'damping': np.round(diagram['damping'][keep], 5).tolist(),
+            'stable': diagram['stable'][keep].tolist(),
+        },
+        'modes': [{
+            'frequency': mode['frequency'],
+            'damping': mode['damping'],
+            'support': mode['support'],
+            'confidence': mode.get('confidence'),
+            'shape': np.round(np.real(mode['shape']), 4).tolist(),
+        } for mode in result['modes']],
+        'channels': list(channels) if channels is not None else None,
+    }
+
+
+# ============================================================================
+# 추적 모드 (연속 윈도우 모니터링)
+# ============================================================================
+def warm_svd(toeplitz, basis, iterations=TRACK_ITERATIONS):
+    """
+    이전 윈도우의 좌특이벡터로 시작하는 부분공간 반복 (절단 SVD 근사)
+
+    Q ← orth(T Tᵀ Q)를 iterations번 반복한 뒤 작은 행렬 QᵀT의 SVD만 계산한다.
+    인접 윈도우의 T는 거의 같으므로 1~2회 반복으로 주요 부분공간이 수렴하고,
+    비용은 전체 SVD O(N³) 대신 O(N²·k)이다.
+
+    Returns:
+        tuple: (u (N, k), s (k,))
+    """
+    q = basis
+    for _ in range(iterations):
+        q, _ = linalg.qr(toeplitz @ (toeplitz.T @ q), mode='economic', check_finite=False)
+    small_u, s, _ = linalg.svd(q.T @ toeplitz, full_matrices=False, check_finite=False)
+    return q @ small_u, s
+
+
+def match_modes(previous, candidates, max_frequency=TRACK_FREQUENCY, min_mac=TRACK_MAC):
+    """
+    이전 윈도우 모드와 새 후보 모드 매칭 (주파수 차 + (1 - MAC) 비용의 최소 할당)
+
+    Args:
+        previous, candidates: [{'frequency', 'shape', ...}, ...]
+        max_frequency: 허용 상대 주파수 차
+        min_mac: 허용 최소 MAC
+
+    Returns:
+        list: previous 순서대로 (candidates 인덱스 또는 None, MAC)
+    """
+    from scipy.optimize import linear_sum_assignment
+    if not previous or not candidates:
+        return [(None, 0.0)] * len(previous)
+    f0 = np.array([m['frequency'] for m in previous])
+    f1 = np.array([m['frequency'] for m in candidates])
+    modal = mac(np.column_stack([m['shape'] for m in previous]),
+                np.column_stack([m['shape'] for m in candidates]))
+    df = np.abs(f1[None, :] - f0[:, None]) / f0[:, None]
+    allowed = (df < max_frequency) & (modal > min_mac)
+    cost = np.where(allowed, df / max_frequency + (1 - modal), 1e6)
+    rows, cols = linear_sum_assignment(cost)
+    matches = [(None, 0.0)] * len(previous)
+    for r, c in zip(rows, cols):
+        if allowed[r, c]:
+            matches[r] = (int(c), float(modal[r, c]))
+    return matches
+
+
+class SSITracker:
+    """
+    연속 윈도우 SSI-COV (상시 모니터링용)
+
+    - 상관 행렬: 윈도우 이동 간격(step) 단위 블록의 지연 곱 합을 보관하고,
+      새 블록을 더하고 윈도우를 벗어난 블록을 빼서 갱신한다 (겹친 구간 재계산 없음).
+    - 부분공간: 직전 윈도우의 좌특이벡터로 warm_svd 반복 (TRACK_REFRESH 윈도우마다 전체 SVD).
+    - 모드: 안정 모드 후보를 직전 윈도우 모드와 match_modes로 연결해 같은 모드 번호를 유지.
+
+    update()에 샘플을 순서대로 넣으면 완성된 윈도우마다 결과를 반환한다.
+    """
+
+    def __init__(self, n_channels, fs, window_seconds=600.0, step_seconds=None, block_rows=None,
+                 max_order=DEFAULT_MAX_ORDER, min_order=2, order_step=2, n_modes=N_MODES,
+                 iterations=TRACK_ITERATIONS, refresh=TRACK_REFRESH, selection='cluster'):
+        step_seconds = step_seconds or window_seconds
+        self.fs = fs
+        self.step = int(round(step_seconds * fs))
+        self.blocks_per_window = int(round(window_seconds / step_seconds))
+        if self.step < 1 or abs(self.blocks_per_window * step_seconds - window_seconds) > 1e-6 * window_seconds:
+            raise ValueError("Window length must be a whole multiple of the window step")
+        self.window = self.step * self.blocks_per_window
+        self.n_channels = n_channels
+        self.block_rows = block_rows or default_block_rows(fs, n_channels, max_order)
+        if self.window < 20 * self.block_rows:
+            raise ValueError(f"Window too short for SSI-COV ({self.window} samples, "
+                             f"{self.block_rows} block rows)")
+        self.max_order = int(min(max_order, (self.block_rows - 1) * n_channels))
+        self.orders = list(range(min_order, self.max_order + 1, order_step))
+        self.n_lags = 2 * self.block_rows
+        self.n_modes = n_modes
+        self.iterations = iterations
+        self.refresh = refresh
+        self.selection = selection
+
+        self._pending = np.zeros((n_channels, 0))
+        self._blocks = []               # 윈도우 안의 블록별 지연 곱 합
+        self._sum = np.zeros((self.n_lags, n_channels, n_channels))
+        self._basis = None
+        self._since_refresh = 0
+        self._consumed = 0              # 블록으로 확정된 샘플 수
+        self.modes = []                 # 추적 중인 모드 [{'id', 'frequency', 'damping', 'shape'}]
+        self._next_id = 1
+
+    def update(self, values):
+        """
+        새 샘플 추가
+
+        Args:
+            values: (n_channels, n) 이어지는 샘플
+
+        Returns:
+            list: 이번 호출에서 완성된 윈도우 결과 (window_result 형식)
+        """
+        values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+        self._pending = np.concatenate([self._pending, values], axis=1)
+        results = []
+        # 블록 확정에는 다음 블록 앞부분 n_lags 샘플이 필요
+        while self._pending.shape[1] >= self.step + self.n_lags:
+            self._add_block(self._pending[:, :self.step + self.n_lags])
+            self._pending = self._pending[:, self.step:]
+            if len(self._blocks) == self.blocks_per_window:
+                results.append(self._identify())
+        return results
+
+    def flush(self):
+        """스트림 끝: 남은 샘플로 마지막 블록 확정 (지연 항은 0으로 채움)"""
+        results = []
+        if self._pending.shape[1] >= self.step:
+            self._add_block(self._pending[:, :self.step])
+            self._pending = self._pending[:, self.step:]
+            if len(self._blocks) == self.blocks_per_window:
+                results.append(self._identify())
+        return results
+
+    def _add_block(self, chunk):
+        block = lag_sums(chunk, self.n_lags, count=self.step)
+        self._blocks.append(block)
+        self._sum += block
+        if len(self._blocks) > self.blocks_per_window:
+            self._sum -= self._blocks.pop(0)
+        self._consumed += self.step
+
+    def _subspace(self, toeplitz):
+        rank = min(self.max_order + TRACK_OVERSAMPLE, toeplitz.shape[0])
+        if self._basis is None or self._since_refresh >= self.refresh:
+            u, s, _ = linalg.svd(toeplitz, full_matrices=False, check_finite=False)
+            self._since_refresh = 0
+        else:
+            u, s = warm_svd(toeplitz, self._basis, self.iterations)
+            self._since_refresh += 1
+        self._basis = u[:, :rank]
+        return u[:, :rank], s[:rank]
+
+    def _identify(self):
+        started = time.perf_counter()
+        corr = self._sum / self.window
+        toeplitz = block_toeplitz(corr, self.block_rows)
+        u, s = self._subspace(toeplitz)
+        poles = poles_from_subspace(u, s, self.n_channels, self.fs, self.orders)
+        diagram = stabilization(poles, self.fs)
+        candidates = select_modes(poles, diagram, self.selection, n_modes=TRACK_CANDIDATES)
+        modes = self._track(candidates)
+        return {
+            'start': (self._consumed - self.window) / self.fs,
+            'modes': modes,
+            'poles': poles,
+            'diagram': diagram,
+            'seconds': time.perf_counter() - started,
+        }
+
+    def _track(self, candidates):
+        """후보 모드를 추적 중인 모드에 연결 (처음에는 낮은 주파수부터 n_modes개 채택)"""
+        if not self.modes:
+            for mode in candidates[:self.n_modes]:
+                self.modes.append({**mode, 'id': self._next_id})
+                self._next_id += 1
+            return [{**mode, 'mac': 1.0} for mode in self.modes]
+        out, used = [], set()
+        for mode, (index, modal) in zip(self.modes, match_modes(self.modes, candidates)):
+            if index is None:
+                # 이번 윈도우에서 보이지 않는 모드는 이전 추정을 유지하고 표시만 비움
+                out.append({**mode, 'frequency': None, 'damping': None, 'mac': 0.0})
+                continue
+            used.add(index)
+            mode.update({k: v for k, v in candidates[index].items() if k != 'id'})
+            out.append({**mode, 'mac': modal})
+        # 아직 n_modes개를 못 채웠으면 매칭되지 않은 후보를 새 모드로 등록
+        for index, mode in enumerate(candidates):
+            if len(self.modes) >= self.n_modes:
+                break
+            if index not in used:
+                self.modes.append({**mode, 'id': self._next_id})
+                self._next_id += 1
+                out.append({**self.modes[-1], 'mac': 1.0})
+        return out
+
+
+def default_track_step(window_seconds, step_seconds=None):
+    """
+    추적 윈도우 이동 간격 (초)
+
+    겹치는 윈도우여야 상관 행렬을 블록 단위로 증분 갱신할 수 있으므로, 지정하지 않으면
+    TRACK_STEP_SECONDS (윈도우 길이의 약수가 아니면 윈도우 길이)를 쓴다.
+    """
+    if step_seconds:
+        return float(step_seconds)
+    blocks = window_seconds / TRACK_STEP_SECONDS
+    if blocks > 1 and abs(blocks - round(blocks)) < 1e-6:
+        return TRACK_STEP_SECONDS
+    return float(window_seconds)
+
+
+def track_dataset(dataset, window_seconds=600.0, step_seconds=None, block_rows=None,
+                  max_order=DEFAULT_MAX_ORDER, selection='cluster', progress=None):
+    """
+    Dataset을 연속 윈도우로 나누어 추적 SSI 실행 (step_seconds가 없으면 default_track_step)
+
+    Returns:
+        tuple: (windows, last) — windows는 윈도우별 {'start', 'modes'} 리스트,
+               last는 마지막 윈도우 결과 (ssi_cov와 같은 형식, 화면 표시용)
+    """
+    if not dataset.fs:
+        raise ValueError("Sampling rate unknown (no time column)")
+    started = time.perf_counter()
+    tracker = SSITracker(dataset.n_channels, dataset.fs, window_seconds,
+                         default_track_step(window_seconds, step_seconds), block_rows, max_order,
+                         selection=selection)
+    if dataset.n_samples < tracker.window:
+        raise ValueError(f"Record shorter than one window ({window_seconds:g} s)")
+    windows, last = [], None
+    chunk = tracker.step
+    for start in range(0, dataset.n_samples, chunk):
+        if progress is not None:
+            progress(start / dataset.n_samples, f"Tracking window {len(windows) + 1}")
+        results = tracker.update(dataset.values[:, start:start + chunk])
+        if start + chunk >= dataset.n_samples:
+            results += tracker.flush()
+        for result in results:
+            windows.append({'start': result['start'], 'modes': result['modes'],
+                            'seconds': result['seconds']})
+            last = result
+    last = {
+        'fs': dataset.fs,
+        'block_rows': tracker.block_rows,
+        'orders': tracker.orders,
+        'poles': last['poles'],
+        'diagram': last['diagram'],
+        'modes': sorted((m for m in last['modes'] if m['frequency'] is not None),
+                        key=lambda m: m['frequency']),
+        'seconds': time.perf_counter() - started,
+    }
+    return windows, last
+
+
+def summarize_tracking(windows, n_modes=N_MODES):
+    """추적 결과 → 모드 번호별 주파수/감쇠 시계열 (JSON, 찾지 못한 윈도우는 None)"""
+    ids = sorted({m['id'] for w in windows for m in w['modes']})[:n_modes]
+    series = []
+    for mode_id in ids:
+        values = [next((m for m in w['modes'] if m['id'] == mode_id), None) for w in windows]
+        series.append({
+            'id': mode_id,
+            'frequency': [None if m is None or m['frequency'] is None else round(m['frequency'], 5)
+                          for m in values],
+            'damping': [None if m is None or m['damping'] is None else round(m['damping'], 5)
+                        for m in values],
+        })
+    return {'start': [w['start'] for w in windows], 'modes': series,
+            'window_seconds': [round(w['seconds'], 4) for w in windows]}
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def simulate_response(n_channels=8, fs=100.0, hours=1.0, frequencies=(0.3, 1.1, 2.4),
+                      dampings=(0.01, 0.015, 0.02), noise=0.1, seed=0):
+    """
+    백색 잡음 가진 다자유도 응답 (모드 중첩, 모드별 2차 IIR 필터)
+
+    Returns:
+        ndarray: (n_channels, n_samples)
+    """
+    from scipy import signal
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 * fs)
+    height = np.linspace(0.2, 1.0, n_channels)
+    out = np.zeros((n_channels, n))
+    for k, (f, z) in enumerate(zip(frequencies, dampings)):
+        wn = 2 * np.pi * f
+        pole = np.exp((-z * wn + 1j * wn * np.sqrt(1 - z ** 2)) / fs)
+        a = np.poly([pole, np.conj(pole)]).real
+        q = signal.lfilter([1.0], a, rng.normal(size=n))
+        shape = np.sin((2 * k + 1) * np.pi / 2 * height)
+        out += np.outer(shape, q / q.std())
+    return out + noise * rng.normal(size=out.shape)
+
+
+def benchmark(n_channels=8, fs=100.0, hours=1.0, max_order=DEFAULT_MAX_ORDER, block_rows=None):
+    """1시간 × 8채널 기록의 전체 안정화 다이어그램 소요 시간"""
+    values = simulate_response(n_channels, fs, hours)
+    started = time.perf_counter()
+    corr = correlations(values, 2 * (block_rows or default_block_rows(fs, n_channels, max_order)))
+    corr_seconds = time.perf_counter() - started
+    result = ssi_cov(values, fs, block_rows, max_order)
+    return {
+        'samples': values.size,
+        'block_rows': result['block_rows'],
+        'orders': len(result['orders']),
+        'correlation_seconds': round(corr_seconds, 3),
+        'total_seconds': round(result['seconds'], 3),
+        'modes': [(round(m['frequency'], 3), round(m['damping'] * 100, 2)) for m in result['modes']],
+    }
+
+
+def benchmark_tracking(n_channels=8, fs=100.0, hours=1.0, window_seconds=600.0, step_seconds=60.0,
+                       max_order=DEFAULT_MAX_ORDER, block_rows=None):
+    """
+    슬라이딩 윈도우 추적 SSI vs 윈도우마다 처음부터 ssi_cov 실행
+
+    Returns:
+        dict: 윈도우당 소요 시간, 실시간 처리 가능한 터빈 수 (step / 윈도우당 시간),
+              두 방식의 모드 주파수 최대 차이
+    """
+    values = simulate_response(n_channels, fs, hours)
+    tracker = SSITracker(n_channels, fs, window_seconds, step_seconds, block_rows, max_order)
+    started = time.perf_counter()
+    tracked = []
+    for start in range(0, values.shape[1], tracker.step):
+        tracked += tracker.update(values[:, start:start + tracker.step])
+    tracked_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    diff = 0.0
+    for result in tracked:
+        first = int(round(result['start'] * fs))
+        scratch = ssi_cov(values[:, first:first + tracker.window], fs, tracker.block_rows, max_order)
+        found = [m['frequency'] for m in result['modes'] if m['frequency'] is not None]
+        # 처음부터 계산한 각 모드에 대해 가장 가까운 추적 모드와의 차이
+        for mode in scratch['modes']:
+            if found:
+                nearest = min(abs(f - mode['frequency']) for f in found)
+                diff = max(diff, nearest / mode['frequency'])
+    scratch_seconds = time.perf_counter() - started
+
+    per_window = tracked_seconds / max(len(tracked), 1)
+    return {
+        'windows': len(tracked),
+        'tracking_ms_per_window': round(1e3 * per_window, 1),
+        'scratch_ms_per_window': round(1e3 * scratch_seconds / max(len(tracked), 1), 1),
+        'realtime_turbines': int(step_seconds / per_window),
+        'max_relative_frequency_diff': float(f'{diff:.2e}'),
+        'last_modes': [(m['id'], round(m['frequency'], 3)) for m in tracked[-1]['modes']
+                       if m['frequency'] is not None] if tracked else [],
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="SSI-COV stabilization diagram benchmark")
+    parser.add_argument('--channels', type=int, default=8)
+    parser.add_argument('--fs', type=float, default=100.0)
+    parser.add_argument('--hours', type=float, default=1.0)
+    parser.add_argument('--max-order', type=int, default=DEFAULT_MAX_ORDER)
+    parser.add_argument('--block-rows', type=int, default=None)
+    parser.add_argument('--tracking', action='store_true', help="benchmark the sliding-window tracker")
+    parser.add_argument('--window', type=float, default=600.0, help="tracking window (s)")
+    parser.add_argument('--step', type=float, default=60.0, help="tracking window step (s)")
+    args = parser.parse_args()
+    if args.tracking:
+        print(benchmark_tracking(args.channels, args.fs, args.hours, args.window, args.step,
+                                 args.max_order, args.block_rows))
+    else:
+        print(benchmark(args.channels, args.fs, args.hours, args.max_order, args.block_rows))
@@ -0,0 +1,505 @@
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from backend.ml.ssi import N_MODES, TRACK_FREQUENCY, TRACK_MAC
+
+# 환경 변수 설정 (없으면 기본값 사용)
+#   SNUGEOSHM_MODE_DIR : 터빈별 모드 추적 이력(.npz) 저장 경로
+DEFAULT_HISTORY_DIR = os.path.join(tempfile.gettempdir(), 'snugeoshm_modes')
+N_TRACKS = N_MODES              # 터빈당 추적 모드 수 (track 0 = Mode 1, 낮은 주파수부터)
+HISTORY_CACHE = 64              # 메모리에 올려 두는 터빈 이력 수 (LRU)
+QUERY_POINTS = 2000             # 조회 시 기본 최대 점 수 (구간 min/max 축약)
+SEED_WINDOWS = 3                # 빈 track을 채우려면 후보가 이만큼 연속 윈도우에서 이어져야 함
+RESEED_WINDOWS = 36             # 이만큼 연속 윈도우 동안 연결이 없으면 track을 비워 다시 채움
+
+
+# ============================================================================
+# MAC 기반 윈도우 간 모드 연결
+# ============================================================================
+def unit_shapes(shapes):
+    """마지막 축(채널) 노름을 1로 정규화한 모드 형상 (정규화 형상끼리 MAC = |<a, b>|²)"""
+    shapes = np.asarray(shapes, dtype=np.complex64)
+    norms = np.linalg.norm(shapes, axis=-1, keepdims=True)
+    return shapes / np.where(norms > 0, norms, 1.0)
+
+
+def consecutive_mac(units):
+    """
+    이웃 윈도우 후보 사이 MAC 행렬을 한 번에 계산
+
+    Args:
+        units: (W, K, C) 정규화 형상
+
+    Returns:
+        ndarray: (W-1, K, K) — [w, i, j] = MAC(윈도우 w의 후보 i, 윈도우 w+1의 후보 j)
+    """
+    return np.abs(np.einsum('wic,wjc->wij', units[:-1].conj(), units[1:])) ** 2
+
+
+def assign(cost, allowed):
+    """
+    최소 비용 할당 (행 = track, 열 = 후보)
+
+    행마다 최솟값 열이 모두 다르면 그것이 최적해이므로 linear_sum_assignment를 생략한다
+    (이웃 윈도우 사이 대부분의 경우).
+
+    Returns:
+        list: 행별 연결된 열 (없으면 -1)
+    """
+    best = [min(range(len(row)), key=row.__getitem__) if any(ok) else -1
+            for row, ok in zip(cost, allowed)]
+    chosen = [b for b in best if b >= 0]
+    if len(chosen) == len(set(chosen)):
+        return best
+    rows, cols = linear_sum_assignment(np.array(cost))
+    out = [-1] * len(cost)
+    for r, c in zip(rows, cols):
+        if allowed[r][c]:
+            out[r] = int(c)
+    return out
+
+
+def link_windows(frequency, damping, shapes, ref_frequency=None, ref_shape=None,
+                 max_frequency=TRACK_FREQUENCY, min_mac=TRACK_MAC, n_tracks=N_TRACKS,
+                 ref_missed=None, seeds=None, seed_windows=SEED_WINDOWS, reseed_windows=RESEED_WINDOWS):
+    """
+    연속 윈도우의 모드 후보를 track으로 연결
+
+    이웃 윈도우 사이 MAC 행렬은 consecutive_mac으로 한 번에 계산하고, 윈도우마다
+    비용 = 상대 주파수 차 / max_frequency + (1 - MAC)의 최소 할당(assign)으로 연결한다.
+    각 track의 기준은 마지막으로 연결된 후보라 온도 등에 의한 느린 주파수 변화와
+    일시적인 검출 누락을 견딘다 (누락 뒤에는 기준 형상과의 MAC를 따로 계산).
+    track에 연결되지 않은 후보는 seed가 되고, 같은 기준으로 seed_windows개 윈도우에서 이어진
+    (중간 누락은 seed_windows개 미만까지 허용) seed만 빈 track을 채운다 — 한 윈도우짜리 잡음 모드가
+    track을 차지하지 않는다. 빈 자리는 기존 track과 이어지고 있는 seed 사이 주파수 순위에 가장
+    가까운 track을 고른다 (track 0 = Mode 1 순서 유지). reseed_windows개 연속 윈도우 동안 연결이
+    없는 track은 비워서 다시 채울 수 있게 한다.
+
+    Args:
+        frequency, damping: (W, K) 윈도우별 후보 (주파수 오름차순, 모자란 자리는 뒤쪽 NaN)
+        shapes: (W, K, C) 후보 모드 형상
+        ref_frequency, ref_shape: 이전 이력의 track 기준 (None이면 새로 시작)
+        ref_missed: (n_tracks,) track별 연속 미연결 윈도우 수 (None이면 0)
+        seeds: 이전 이력의 seed (seed_frequency (P,), seed_shape (P, C), seed_count (P,), seed_missed (P,))
+
+    Returns:
+        dict: {'frequency', 'damping', 'mac'} (W, n_tracks) float32 (연결 없음은 NaN/0),
+              {'ref_frequency', 'ref_shape', 'ref_missed'} 마지막 기준,
+              {'seed_frequency', 'seed_shape', 'seed_count', 'seed_missed'} 아직 track이 되지 않은 seed
+    """
+    n_windows, _, n_channels = shapes.shape
+    units = unit_shapes(shapes)
+    neighbours = consecutive_mac(units).tolist() if n_windows > 1 else []
+    counts = np.isfinite(frequency).sum(axis=1).tolist()
+    freq_list = frequency.tolist()
+    # track별 기준: (주파수, 윈도우, 후보) — 이전 이력에서 이어지면 윈도우 -1 + 기준 형상
+    if ref_frequency is None:
+        ref_frequency = np.full(n_tracks, np.nan)
+        ref_shape = np.zeros((n_tracks, n_channels), dtype=np.complex64)
+    ref_frequency, ref_shape = np.array(ref_frequency, dtype=float), ref_shape.copy()
+    refs = [None if np.isnan(f) else (float(f), -1, t) for t, f in enumerate(ref_frequency)]
+    missed = [0] * n_tracks if ref_missed is None else [int(m) for m in ref_missed]
+    # seed: [주파수, 정규화 형상, 연결된 윈도우 수, 현재 윈도우의 후보 번호 (없으면 -1), 연속 누락 수]
+    pending = [] if seeds is None else [[float(f), np.asarray(u, dtype=np.complex64), int(c), -1, int(m)]
+                                        for f, u, c, m in zip(*seeds)]
+    index = np.full((n_windows, n_tracks), -1)
+    modal_out = np.zeros((n_windows, n_tracks), dtype=np.float32)
+    for w in range(n_windows):
+        n = counts[w]
+        freqs = freq_list[w][:n]
+        cost, allowed, macs = [], [], []
+        for ref in refs:
+            if ref is None or not n:
+                cost.append([1e6] * n)
+                allowed.append([False] * n)
+                macs.append([0.0] * n)
+                continue
+            f0, last_w, last_k = ref
+            if last_w == w - 1 and last_w >= 0:
+                row = neighbours[last_w][last_k][:n]
+            else:
+                shape = ref_shape[last_k] if last_w < 0 else units[last_w, last_k]
+                row = (np.abs(units[w, :n] @ shape.conj()) ** 2).tolist()
+            ok = [abs(f - f0) / f0 < max_frequency and m > min_mac for f, m in zip(freqs, row)]
+            cost.append([abs(f - f0) / f0 / max_frequency + 1 - m if good else 1e6
+                         for f, m, good in zip(freqs, row, ok)])
+            allowed.append(ok)
+            macs.append(row)
+        linked = assign(cost, allowed) if n else [-1] * n_tracks
+        # seed 갱신: 연결되지 않은 후보를 이전 seed와 같은 기준으로 잇고, seed_windows번 연속 누락된 seed는 버림
+        free = [k for k in range(n) if k not in linked]
+        if pending and free:
+            seed_cost, seed_allowed = [], []
+            for f0, shape, *_ in pending:
+                row = (np.abs(units[w, free] @ shape.conj()) ** 2).tolist()
+                ok = [abs(freqs[k] - f0) / f0 < max_frequency and m > min_mac for k, m in zip(free, row)]
+                seed_cost.append([abs(freqs[k] - f0) / f0 / max_frequency + 1 - m if good else 1e6
+                                  for k, m, good in zip(free, row, ok)])
+                seed_allowed.append(ok)
+            matched = assign(seed_cost, seed_allowed)
+        else:
+            matched = [-1] * len(pending)
+        pending = [[freqs[free[j]], units[w, free[j]], seed[2] + 1, free[j], 0] if j >= 0
+                   else [seed[0], seed[1], seed[2], -1, seed[4] + 1]
+                   for seed, j in zip(pending, matched) if j >= 0 or seed[4] + 1 < seed_windows]
+        taken = {seed[3] for seed in pending}
+        pending += [[freqs[k], units[w, k], 1, k, 0] for k in free if k not in taken]
+        # 새 track: 이번 윈도우에 있고 seed_windows개 윈도우 이상 이어진 seed를 낮은 주파수부터 배정
+        ready = sorted((seed for seed in pending if seed[3] >= 0 and seed[2] >= seed_windows),
+                       key=lambda seed: seed[0])
+        for seed in ready:
+            empty = [t for t, ref in enumerate(refs) if ref is None and linked[t] < 0]
+            if not empty:
+                break
+            ranked = [ref[0] for ref in refs if ref is not None] + \
+                     [other[0] for other in pending if other[2] > 1 and other is not seed]
+            rank = sum(f < seed[0] for f in ranked)
+            t = min(empty, key=lambda t: abs(t - rank))
+            pending = [other for other in pending if other is not seed]
+            linked[t] = seed[3]
+            macs[t] = [1.0] * n
+            refs[t] = (seed[0], w, seed[3])
+        for t, k in enumerate(linked):
+            if k >= 0:
+                index[w, t] = k
+                modal_out[w, t] = macs[t][k]
+                refs[t] = (freqs[k], w, k)
+                missed[t] = 0
+            elif refs[t] is not None:
+                missed[t] += 1
+                if missed[t] >= reseed_windows:
+                    refs[t], missed[t] = None, 0
+    rows, tracks = np.nonzero(index >= 0)
+    out_frequency = np.full((n_windows, n_tracks), np.nan, dtype=np.float32)
+    out_damping = np.full((n_windows, n_tracks), np.nan, dtype=np.float32)
+    out_frequency[rows, tracks] = frequency[rows, index[rows, tracks]]
+    out_damping[rows, tracks] = damping[rows, index[rows, tracks]]
+    for t, ref in enumerate(refs):
+        if ref is None:
+            ref_frequency[t] = np.nan
+            ref_shape[t] = 0
+        elif ref[1] >= 0:
+            ref_frequency[t] = ref[0]
+            ref_shape[t] = units[ref[1], ref[2]]
+    return {'frequency': out_frequency, 'damping': out_damping, 'mac': modal_out,
+            'ref_frequency': ref_frequency, 'ref_shape': ref_shape,
+            'ref_missed': np.array(missed, dtype=np.int32),
+            'seed_frequency': np.array([seed[0] for seed in pending], dtype=float),
+            'seed_shape': np.array([seed[1] for seed in pending], dtype=np.complex64).reshape(-1, n_channels),
+            'seed_count': np.array([seed[2] for seed in pending], dtype=np.int32),
+            'seed_missed': np.array([seed[4] for seed in pending], dtype=np.int32)}
+
+
+def stack_windows(windows):
+    """
+    [{'time', 'modes': [{'frequency', 'damping', 'shape'}, ...]}, ...] → 배열 (주파수순, NaN 채움)
+
+    Returns:
+        tuple: (time (W,), frequency (W, K), damping (W, K), shapes (W, K, C))
+    """
+    modes = [sorted((m for m in w['modes'] if m.get('frequency') is not None and m.get('shape') is not None),
+                    key=lambda m: m['frequency'])
+             for w in windows]
+    k = max((len(m) for m in modes), default=0)
+    c = next((len(m[0]['shape']) for m in modes if m), 0)
+    frequency = np.full((len(windows), k), np.nan)
+    damping = np.full((len(windows), k), np.nan)
+    shapes = np.zeros((len(windows), k, c), dtype=np.complex64)
+    for w, entries in enumerate(modes):
+        for j, mode in enumerate(entries):
+            frequency[w, j] = mode['frequency']
+            damping[w, j] = np.nan if mode.get('damping') is None else mode['damping']
+            shapes[w, j] = mode['shape']
+    time_arr = np.array([w['time'] for w in windows], dtype=float)
+    return time_arr, frequency, damping, shapes
+
+
+def record_start(dataset):
+    """
+    기록 시작 시각 (epoch 초)
+
+    시간 컬럼이 datetime이면 첫 샘플 시각, 상대 시간(초)이거나 없으면 기록이 방금 끝난 것으로 본다.
+    """
+    if dataset.time is not None and np.issubdtype(np.asarray(dataset.time).dtype, np.datetime64):
+        return float(np.asarray(dataset.time[:1], dtype='datetime64[ms]').astype(np.int64)[0]) / 1e3
+    duration = dataset.n_samples / dataset.fs if dataset.fs else 0.0
+    return time.time() - duration
+
+
+# ============================================================================
+# 터빈별 배열 기반 이력
+# ============================================================================
+class ModeHistory:
+    """
+    터빈 하나의 모드 추적 이력 (윈도우 × track 배열)
+
+    Attributes:
+        time: (n,) 윈도우 시작 시각 (epoch 초, 오름차순)
+        frequency, damping, mac: (n, n_tracks) float32 (연결 없음은 NaN / 0)
+        ref_frequency, ref_shape, ref_missed: 다음 append에서 이어 붙일 track 기준
+        seed_frequency, seed_shape, seed_count, seed_missed: 아직 track이 되지 않은 seed
+    """
+
+    FIELDS = ('time', 'frequency', 'damping', 'mac', 'ref_frequency', 'ref_shape', 'ref_missed',
+              'seed_frequency', 'seed_shape', 'seed_count', 'seed_missed')
+    STATE = ('ref_frequency', 'ref_shape', 'ref_missed', 'seed_frequency', 'seed_shape', 'seed_count',
+             'seed_missed')
+
+    def __init__(self, n_tracks=N_TRACKS, **arrays):
+        self.n_tracks = n_tracks
+        self.time = arrays.get('time', np.zeros(0))
+        self.frequency = arrays.get('frequency', np.zeros((0, n_tracks), dtype=np.float32))
+        self.damping = arrays.get('damping', np.zeros((0, n_tracks), dtype=np.float32))
+        self.mac = arrays.get('mac', np.zeros((0, n_tracks), dtype=np.float32))
+        for name in self.STATE:
+            setattr(self, name, arrays.get(name))
+
+    def __len__(self):
+        return len(self.time)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.FIELDS if getattr(self, name) is not None)
+
+    def append(self, windows, max_frequency=TRACK_FREQUENCY, min_mac=TRACK_MAC):
+        """
+        새 윈도우 연결 후 배열 끝에 추가
+
+        이력은 시간순 추가 전용이며, 마지막 기록 시각 이전의 윈도우(같은 기록 재분석 등)는 버린다.
+
+        Returns:
+            int: 추가된 윈도우 수
+        """
+        if not windows:
+            return 0
+        time_arr, frequency, damping, shapes = stack_windows(sorted(windows, key=lambda w: w['time']))
+        keep = time_arr > (self.time[-1] if len(self.time) else -np.inf)
+        if not keep.any() or not shapes.shape[1]:
+            return 0
+        ref_frequency, ref_shape, ref_missed = self.ref_frequency, self.ref_shape, self.ref_missed
+        seeds = None if self.seed_count is None else (self.seed_frequency, self.seed_shape, self.seed_count,
+                                                      self.seed_missed)
+        if ref_shape is not None and ref_shape.shape[1] != shapes.shape[2]:
+            ref_frequency = ref_shape = ref_missed = seeds = None     # 채널 구성이 바뀌면 track을 새로 시작
+        linked = link_windows(frequency[keep], damping[keep], shapes[keep], ref_frequency, ref_shape,
+                              max_frequency, min_mac, self.n_tracks, ref_missed, seeds)
+        self.time = np.concatenate([self.time, time_arr[keep]])
+        for name in ('frequency', 'damping', 'mac'):
+            setattr(self, name, np.concatenate([getattr(self, name), linked[name]]))
+        for name in self.STATE:
+            setattr(self, name, linked[name])
+        return int(keep.sum())
+
+    def query(self, start=None, end=None, max_points=QUERY_POINTS):
+        """
+        시간 범위 조회 (이진 탐색), 점이 많으면 구간별 min/max로 축약 (피크 보존)
+
+        Args:
+            start, end: epoch 초 (None이면 처음/끝)
+            max_points: 반환할 최대 점 수 (None이면 축약 없음)
+
+        Returns:
+            dict: {'time' (m,), 'frequency', 'damping' (m, n_tracks), 'windows' (범위 내 윈도우 수)}
+        """
+        lo = 0 if start is None else np.searchsorted(self.time, start, side='left')
+        hi = len(self.time) if end is None else np.searchsorted(self.time, end, side='right')
+        time_arr, frequency, damping = self.time[lo:hi], self.frequency[lo:hi], self.damping[lo:hi]
+        if max_points and len(time_arr) > max_points:
+            step = -(-len(time_arr) // (max_points // 2))
+            n = len(time_arr) // step * step
+            buckets = time_arr[:n].reshape(-1, step)
+            time_arr = np.column_stack([buckets[:, 0], buckets[:, -1]]).ravel()
+            # (track, 구간, step) 연속 배열로 바꿔 마지막 축으로 축약 (NaN은 무시)
+            reduced = []
+            for values in (frequency, damping):
+                values = np.ascontiguousarray(values[:n].T).reshape(self.n_tracks, -1, step)
+                pairs = np.stack([np.fmin.reduce(values, axis=2), np.fmax.reduce(values, axis=2)], axis=2)
+                reduced.append(pairs.reshape(self.n_tracks, -1).T)
+            frequency, damping = reduced
+        return {'time': time_arr, 'frequency': frequency, 'damping': damping, 'windows': int(hi - lo)}
+
+    def save(self, path):
+        """비압축 .npz로 저장 (임시 파일 후 교체 — 읽는 쪽은 항상 완전한 파일을 본다)"""
+        arrays = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        return cls(arrays['frequency'].shape[1], **arrays)
+
+
+class ModeHistoryStore:
+    """
+    터빈 ID → ModeHistory (.npz 파일, 최근 사용 이력은 메모리에 유지)
+
+    파일 수정 시각이 바뀌면(다른 워커가 추가) 다시 읽는다.
+    """
+
+    def __init__(self, root=DEFAULT_HISTORY_DIR, capacity=HISTORY_CACHE):
+        self.root = root
+        self.capacity = capacity
+        self._entries = OrderedDict()   # turbine_id -> (mtime, ModeHistory)
+        self._lock = threading.RLock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, turbine_id):
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', str(turbine_id)).lstrip('.') or '_'
+        return os.path.join(self.root, f'{name}.npz')
+
+    def get(self, turbine_id):
+        """이력 반환 (없으면 빈 ModeHistory)"""
+        path = self.path(turbine_id)
+        with self._lock:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                return ModeHistory()
+            entry = self._entries.get(turbine_id)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, ModeHistory.load(path))
+                self._entries[turbine_id] = entry
+            self._entries.move_to_end(turbine_id)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            return entry[1]
+
+    def append(self, turbine_id, windows):
+        """윈도우 결과를 이력에 연결/추가 후 저장 (추가된 윈도우 수 반환)"""
+        with self._lock:
+            history = self.get(turbine_id)
+            added = history.append(windows)
+            if added:
+                path = self.path(turbine_id)
+                history.save(path)
+                self._entries[turbine_id] = (os.stat(path).st_mtime_ns, history)
+            return added
+
+    def query(self, turbine_id, start=None, end=None, max_points=QUERY_POINTS):
+        return self.get(turbine_id).query(start, end, max_points)
+
+    def turbines(self):
+        return sorted(name[:-4] for name in os.listdir(self.root) if name.endswith('.npz'))
+
+
+# ============================================================================
+# 기본 저장소 (프로세스당 1개)
+# ============================================================================
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_history():
+    """환경 변수 설정으로 만든 기본 ModeHistoryStore 반환 (워커당 1개)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ModeHistoryStore(os.environ.get('SNUGEOSHM_MODE_DIR', DEFAULT_HISTORY_DIR))
+        return _default_store
+
+
+def result_windows(result, start_time, tracking_windows=None):
+    """
+    SSI/FDD 결과 → ModeHistory.append 입력 (추적 모드면 윈도우별, 아니면 기록 전체 1개)
+
+    Args:
+        result: ssi_cov / fdd / track_dataset 마지막 결과 (modes에 'shape' 포함)
+        start_time: 기록 시작 시각 (epoch 초, record_start)
+        tracking_windows: track_dataset의 windows (start는 기록 시작 기준 초)
+    """
+    if tracking_windows:
+        return [{'time': start_time + w['start'], 'modes': w['modes']} for w in tracking_windows]
+    return [{'time': start_time, 'modes': result['modes']}]
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def simulate_windows(n_windows, n_channels=8, frequencies=(0.3, 1.1, 2.4), step=600.0, drop=0.05,
+                     spurious=0.3, seed=0):
+    """
+    1년치 윈도우 모드 후보 모사 (온도에 따른 주파수 일변동, 검출 누락, 잡음 모드, 순서 섞임)
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal((len(frequencies), n_channels))
+    t = np.arange(n_windows) * step
+    daily = 1 + 0.01 * np.sin(2 * np.pi * t / 86400)[:, None]
+    windows = []
+    for w in range(n_windows):
+        modes = []
+        for k, f in enumerate(frequencies):
+            if rng.random() < drop:
+                continue
+            modes.append({'frequency': f * daily[w, 0] * (1 + 0.002 * rng.standard_normal()),
+                          'damping': 0.01 + 0.002 * rng.standard_normal(),
+                          'shape': base[k] + 0.05 * rng.standard_normal(n_channels)})
+        if rng.random() < spurious:
+            modes.append({'frequency': rng.uniform(0.2, 3.0), 'damping': 0.05,
+                          'shape': rng.standard_normal(n_channels)})
+        rng.shuffle(modes)
+        windows.append({'time': t[w], 'modes': modes})
+    return windows
+
+
+def benchmark(days=365, step=600.0, n_channels=8, repeat=20):
+    """
+    1년치 이력 연결/저장/조회 시간 (10분 윈도우 ≈ 52,560개)
+
+    Returns:
+        dict: 윈도우 수, 연결·저장·로드·조회 시간, 이력 크기, Mode 1/2 연결 정확도
+    """
+    n_windows = int(days * 86400 / step)
+    windows = simulate_windows(n_windows, n_channels, step=step)
+    with tempfile.TemporaryDirectory() as root:
+        store = ModeHistoryStore(root)
+        started = time.perf_counter()
+        store.append('T01', windows)
+        append_seconds = time.perf_counter() - started
+        history = store.get('T01')
+        started = time.perf_counter()
+        ModeHistory.load(store.path('T01'))
+        load_ms = 1e3 * (time.perf_counter() - started)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            full = store.query('T01')
+        query_ms = 1e3 * (time.perf_counter() - started) / repeat
+        started = time.perf_counter()
+        for _ in range(repeat):
+            store.query('T01', start=100 * 86400, end=130 * 86400)
+        month_ms = 1e3 * (time.perf_counter() - started) / repeat
+    # 정확도: track k의 주파수가 k번째 실제 모드 근처(±3%)인 비율 (검출된 윈도우 기준)
+    accuracy = []
+    for k, f in enumerate((0.3, 1.1)[:history.n_tracks]):
+        found = history.frequency[:, k][np.isfinite(history.frequency[:, k])]
+        accuracy.append(float(np.mean(np.abs(found / f - 1) < 0.03)) if len(found) else 0.0)
+    return {
+        'windows': n_windows,
+        'append_seconds': round(append_seconds, 2),
+        'history_kb': round(history.nbytes / 1024, 1),
+        'load_ms': round(load_ms, 2),
+        'query_full_ms': round(query_ms, 2),
+        'query_month_ms': round(month_ms, 2),
+        'points': len(full['time']),
+        'mode_accuracy': [round(a, 4) for a in accuracy],
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="MAC-based mode tracking history benchmark")
+    parser.add_argument('--days', type=float, default=365)
+    parser.add_argument('--step', type=float, default=600.0, help="window step (s)")
+    parser.add_argument('--channels', type=int, default=8)
+    args = parser.parse_args()
+    print(benchmark(args.days, args.step, args.channels))
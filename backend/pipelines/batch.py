@@ -0,0 +1,392 @@
+import multiprocessing
+import os
+import re
+import tarfile
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+# 환경 변수 설정 (없으면 기본값 사용)
+#   SNUGEOSHM_BATCH_WORKERS   : 터빈 단위 작업을 실행할 프로세스 수 (기본: CPU 코어 수)
+#   SNUGEOSHM_BATCH_MEMORY_MB : 워커 프로세스당 메모리 상한 (MB, 0이면 제한 없음)
+#   SNUGEOSHM_BATCH_ROOT      : 화면에서 지정 가능한 입력 경로의 최상위 디렉터리 (비우면 화면에서 배치 실행 불가)
+DEFAULT_BATCH_MEMORY_MB = 2048
+TASKS_PER_WORKER = 8            # 이 수만큼 터빈을 처리한 워커는 새 프로세스로 교체 (메모리 단편화 방지)
+RECORD_SUFFIXES = ('.csv', '.csv.gz')
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+
+class BatchError(ValueError):
+    """배치 입력(디렉터리/압축 파일)을 처리할 수 없을 때 발생"""
+
+
+# ============================================================================
+# 입력 목록 / 터빈 매칭
+# ============================================================================
+def _is_record(name):
+    name = name.lower()
+    return name.endswith(RECORD_SUFFIXES) and not os.path.basename(name).startswith('.')
+
+
+def list_records(source):
+    """
+    디렉터리 또는 압축 파일 안의 CSV 기록 목록
+
+    Args:
+        source: 디렉터리, .zip, .tar(.gz) 경로
+
+    Returns:
+        list: [(archive 경로 또는 None, 파일 경로/멤버 이름), ...] (이름순)
+
+    Raises:
+        BatchError: 경로가 없거나 지원하지 않는 형식
+    """
+    if os.path.isdir(source):
+        records = []
+        for root, _, files in os.walk(source):
+            records += [(None, os.path.join(root, f)) for f in files if _is_record(f)]
+        return sorted(records, key=lambda r: r[1])
+    if not os.path.isfile(source):
+        raise BatchError(f"Path not found: {source}")
+    lower = source.lower()
+    if lower.endswith('.zip'):
+        with zipfile.ZipFile(source) as archive:
+            names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    elif lower.endswith(ARCHIVE_SUFFIXES):
+        with tarfile.open(source) as archive:
+            names = [member.name for member in archive.getmembers() if member.isfile()]
+    else:
+        raise BatchError(f"Unsupported input (expected a directory, {', '.join(ARCHIVE_SUFFIXES)}): {source}")
+    return [(source, name) for name in sorted(names) if _is_record(name)]
+
+
+def _stem(name):
+    base = os.path.basename(name)
+    for suffix in RECORD_SUFFIXES:
+        if base.lower().endswith(suffix):
+            return base[:-len(suffix)]
+    return base
+
+
+def match_records(records, turbine_ids=None):
+    """
+    파일 이름으로 기록을 터빈에 배정
+
+    파일 이름(확장자 제외)이 터빈 ID와 같거나 'ID_', 'ID-', 'ID.', 'ID ' 로 시작하면
+    그 터빈의 기록으로 본다 (T1/T10처럼 겹치면 더 긴 ID 우선, 대소문자 무시).
+    turbine_ids가 없으면 파일 이름 앞부분(구분자 전)을 터빈 ID로 쓴다.
+
+    Returns:
+        tuple: (groups {turbine_id: [record, ...]}, unmatched [record, ...])
+    """
+    groups, unmatched = {}, []
+    ids = sorted(turbine_ids or [], key=len, reverse=True)
+    for record in records:
+        stem = _stem(record[1])
+        if not ids:
+            turbine_id = re.split(r'[_\-. ]', stem, maxsplit=1)[0]
+        else:
+            lower = stem.lower()
+            turbine_id = next((t for t in ids if lower == t.lower()
+                               or re.match(re.escape(t.lower()) + r'[_\-. ]', lower)), None)
+        if turbine_id is None:
+            unmatched.append(record)
+        else:
+            groups.setdefault(turbine_id, []).append(record)
+    return groups, unmatched
+
+
+def geojson_turbine_ids(geojson):
+    """Map에서 업로드한 GeoJSON의 터빈 ID 목록 (Point feature의 properties.id, 변전소 등 다른 type 제외)"""
+    if not geojson or not isinstance(geojson, dict):
+        return []
+    return [str(f['properties']['id']) for f in geojson.get('features', [])
+            if f.get('geometry', {}).get('type') == 'Point' and (f.get('properties') or {}).get('id')
+            and f['properties'].get('type', 'turbine') == 'turbine']
+
+
+def resolve_source(path):
+    """
+    화면에서 입력한 경로 검증
+
+    SNUGEOSHM_BATCH_ROOT가 없으면 서버의 임의 경로를 읽을 수 있으므로 거부한다. 상대 경로는 root 기준.
+    """
+    root = os.environ.get('SNUGEOSHM_BATCH_ROOT')
+    if not root:
+        raise BatchError("Fleet batch from the UI is disabled: set SNUGEOSHM_BATCH_ROOT on the server")
+    if not path or not str(path).strip():
+        raise BatchError("Enter a directory or archive path")
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, str(path).strip()))
+    if os.path.commonpath([root, path]) != root:
+        raise BatchError(f"Path must be inside {root}")
+    if not os.path.exists(path):
+        raise BatchError(f"Path not found: {path}")
+    return path
+
+
+# ============================================================================
+# 워커 (별도 프로세스)
+# ============================================================================
+def _init_worker(memory_mb):
+    """워커 메모리 상한 설정 (초과 시 해당 터빈만 MemoryError로 실패)"""
+    if memory_mb:
+        try:
+            import resource
+            limit = int(memory_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+
+
+def _open_record(record):
+    archive, name = record
+    if archive is None:
+        return open(name, 'rb'), None
+    if archive.lower().endswith('.zip'):
+        handle = zipfile.ZipFile(archive)
+        return handle.open(name), handle
+    handle = tarfile.open(archive)
+    return handle.extractfile(name), handle
+
+
+def _read_record(record):
+    from backend.pipelines.ingest import ingest_csv
+    stream, handle = _open_record(record)
+    try:
+        if record[1].lower().endswith('.gz'):
+            import gzip
+            stream = gzip.GzipFile(fileobj=stream)
+        return ingest_csv(stream, meta={'filename': record[1]})
+    finally:
+        stream.close()
+        if handle is not None:
+            handle.close()
+
+
+def process_turbine(turbine_id, records, params=None, block_rows=None, max_order=None,
+                    window_seconds=None, selection='cluster', step_seconds=None):
+    """
+    터빈 하나의 기록을 차례로 전처리(Step 1~3) + SSI-COV
+
+    기록은 한 번에 하나씩만 메모리에 올린다. 모드는 성공한 기록 중 가장 마지막(이름순) 기록의 결과를 쓴다.
+    일부 기록이 실패해도 나머지가 성공하면 터빈은 성공으로 보고, 실패는 errors에 기록별로 남긴다.
+
+    Returns:
+        dict: {'turbine_id', 'files', 'hours' (성공한 기록만), 'modes', 'windows', 'seconds',
+               'error' (모든 기록이 실패했을 때만), 'errors' (기록별 실패 메시지), 'timestamp',
+               'history' (모드 추적 이력용 윈도우 목록, run_fleet이 꺼내 저장)}
+    """
+    from backend.ml.ssi import DEFAULT_MAX_ORDER, ssi_dataset, track_dataset
+    from backend.ml.tracking import record_start, result_windows
+    from backend.pipelines.workflow import run_preparation
+
+    started = time.perf_counter()
+    hours, modes, windows, history, errors = 0.0, [], 0, [], []
+    succeeded = 0
+    for record in records:
+        try:
+            dataset = _read_record(record)
+            record_hours = dataset.n_samples / dataset.fs / 3600 if dataset.fs else 0.0
+            start_time = record_start(dataset)
+            prepared, _ = run_preparation(dataset, params or {})
+            del dataset
+            tracked = None
+            if window_seconds:
+                tracked, result = track_dataset(prepared, window_seconds, step_seconds, block_rows=block_rows,
+                                                max_order=max_order or DEFAULT_MAX_ORDER,
+                                                selection=selection)
+                windows += len(tracked)
+            else:
+                result = ssi_dataset(prepared, block_rows, max_order or DEFAULT_MAX_ORDER, selection)
+            modes = [{'frequency': m['frequency'], 'damping': m['damping']} for m in result['modes']]
+            history += result_windows(result, start_time, tracked)
+            hours += record_hours
+            succeeded += 1
+        except MemoryError:
+            errors.append(f"{os.path.basename(record[1])}: worker memory limit exceeded")
+        except Exception as e:
+            errors.append(f"{os.path.basename(record[1])}: {e or type(e).__name__}")
+    return {
+        'turbine_id': turbine_id,
+        'files': len(records),
+        'hours': hours,
+        'modes': modes,
+        'windows': windows,
+        'seconds': time.perf_counter() - started,
+        'error': None if succeeded or not errors else errors[-1],
+        'errors': errors,
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'history': history,
+    }
+
+
+# ============================================================================
+# 배치 실행
+# ============================================================================
+def default_workers():
+    return int(os.environ.get('SNUGEOSHM_BATCH_WORKERS') or os.cpu_count() or 1)
+
+
+def run_fleet(source, turbine_ids=None, params=None, block_rows=None, max_order=None,
+              window_seconds=None, selection='cluster', workers=None, memory_mb=None, history=None,
+              progress=None, step_seconds=None):
+    """
+    여러 터빈 기록을 프로세스 풀로 병렬 처리
+
+    터빈 하나가 작업 하나이며, 동시에 제출하는 작업 수를 워커 수로 제한해
+    결과 대기열이 쌓이지 않게 한다. 워커는 spawn으로 시작하므로 Dash 서버의
+    스레드/소켓을 물려받지 않는다.
+
+    Args:
+        source: 디렉터리 또는 압축 파일 경로
+        turbine_ids: GeoJSON 터빈 ID 목록 (None이면 파일 이름에서 추출)
+        params: {stage_name: {param: value}} 전처리 파라미터
+        block_rows, max_order, window_seconds: SSI 설정 (window_seconds가 있으면 추적 모드)
+        step_seconds: 추적 윈도우 이동 간격 (None이면 ssi.default_track_step)
+        selection: 모드 선택 방식 ('cluster' 또는 'stable')
+        workers: 프로세스 수 (None이면 SNUGEOSHM_BATCH_WORKERS 또는 CPU 수)
+        memory_mb: 워커당 메모리 상한 (None이면 SNUGEOSHM_BATCH_MEMORY_MB)
+        history: ModeHistoryStore (있으면 터빈별 모드 추적 이력에 윈도우 결과를 추가)
+        progress: progress(fraction, message) (백그라운드 작업용)
+
+    Returns:
+        dict: {'turbines': [process_turbine 결과, ...], 'missing', 'unmatched', 'workers',
+               'turbine_hours', 'seconds', 'turbine_hours_per_minute'}
+    """
+    records = list_records(source)
+    if not records:
+        raise BatchError(f"No CSV records found in {source}")
+    groups, unmatched = match_records(records, turbine_ids)
+    if not groups:
+        raise BatchError("No record file names match the turbine IDs")
+    workers = max(1, min(workers or default_workers(), len(groups)))
+    if memory_mb is None:
+        memory_mb = int(os.environ.get('SNUGEOSHM_BATCH_MEMORY_MB', DEFAULT_BATCH_MEMORY_MB))
+
+    started = time.perf_counter()
+    todo = sorted(groups.items())
+    results, running = [], {}
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker, initargs=(memory_mb,),
+                               max_tasks_per_child=TASKS_PER_WORKER)
+    try:
+        while todo or running:
+            while todo and len(running) < workers:
+                turbine_id, group = todo.pop(0)
+                future = pool.submit(process_turbine, turbine_id, group, params, block_rows,
+                                     max_order, window_seconds, selection, step_seconds)
+                running[future] = turbine_id
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                turbine_id = running.pop(future)
+                try:
+                    result = future.result()
+                    windows = result.pop('history')
+                    if history is not None and windows:
+                        history.append(turbine_id, windows)
+                    results.append(result)
+                except Exception as e:
+                    # 워커 프로세스가 비정상 종료한 경우 (BrokenProcessPool 등)
+                    results.append({'turbine_id': turbine_id, 'files': len(groups[turbine_id]),
+                                    'hours': 0.0, 'modes': [], 'windows': 0, 'seconds': 0.0,
+                                    'error': str(e) or type(e).__name__, 'errors': [], 'timestamp': None})
+            if progress is not None:
+                progress(len(results) / len(groups), f"{len(results)}/{len(groups)} turbines")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    seconds = time.perf_counter() - started
+    turbine_hours = sum(r['hours'] for r in results)   # 성공한 기록의 시간만 들어 있음
+    return {
+        'turbines': sorted(results, key=lambda r: r['turbine_id']),
+        'missing': sorted(set(turbine_ids or []) - set(groups)),
+        'unmatched': [name for _, name in unmatched],
+        'workers': workers,
+        'turbine_hours': turbine_hours,
+        'seconds': seconds,
+        'turbine_hours_per_minute': 60.0 * turbine_hours / seconds if seconds else 0.0,
+    }
+
+
+# ============================================================================
+# 벤치마크 / CLI
+# ============================================================================
+def make_fleet(directory, turbines=8, hours=1.0, fs=100.0, n_channels=8, seed=0):
+    """벤치마크용 터빈별 합성 응답 CSV 생성 (T01.csv, T02.csv, ...; 터빈마다 고유진동수를 조금씩 다르게)"""
+    import numpy as np
+    import pandas as pd
+    from backend.ml.ssi import simulate_response
+
+    os.makedirs(directory, exist_ok=True)
+    ids = []
+    for k in range(turbines):
+        turbine_id = f'T{k + 1:02d}'
+        shift = 1 + 0.01 * k
+        values = simulate_response(n_channels, fs, hours, frequencies=(0.3 * shift, 1.1 * shift, 2.4 * shift),
+                                   seed=seed + k)
+        frame = pd.DataFrame(values.T.round(6), columns=[f'ch{i + 1}' for i in range(n_channels)])
+        start = np.datetime64('2024-01-01T00:00:00', 'ns')
+        times = start + np.timedelta64(int(1e9 / fs), 'ns') * np.arange(values.shape[1])
+        frame.insert(0, 'time', pd.to_datetime(times).strftime('%Y-%m-%dT%H:%M:%S.%f'))
+        frame.to_csv(os.path.join(directory, f'{turbine_id}.csv'), index=False)
+        ids.append(turbine_id)
+    return ids
+
+
+def benchmark(turbines=8, hours=1.0, fs=100.0, n_channels=8, workers=None):
+    """합성 fleet 배치 처리량 (turbine-hours / minute)"""
+    with tempfile.TemporaryDirectory() as directory:
+        ids = make_fleet(directory, turbines, hours, fs, n_channels)
+        result = run_fleet(directory, ids, workers=workers)
+    failed = [r['turbine_id'] for r in result['turbines'] if r['error']]
+    return {
+        'turbines': turbines,
+        'workers': result['workers'],
+        'turbine_hours': round(result['turbine_hours'], 2),
+        'seconds': round(result['seconds'], 2),
+        'turbine_hours_per_minute': round(result['turbine_hours_per_minute'], 1),
+        'failed': failed,
+        'mode1': {r['turbine_id']: round(r['modes'][0]['frequency'], 3)
+                  for r in result['turbines'] if r['modes']},
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    from backend.ml.tracking import get_history
+
+    parser = argparse.ArgumentParser(description="Fleet-wide batch modal identification")
+    parser.add_argument('source', nargs='?', help="directory or archive of per-turbine CSVs (omit to benchmark)")
+    parser.add_argument('--geojson', help="GeoJSON with turbine IDs (properties.id)")
+    parser.add_argument('--params', help="JSON file: {\"step1\": {...}, \"step2\": {...}, ...}")
+    parser.add_argument('--window', type=float, default=None, help="tracking window (s)")
+    parser.add_argument('--step', type=float, default=None, help="tracking window step (s, default 60)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--turbines', type=int, default=8)
+    parser.add_argument('--hours', type=float, default=1.0)
+    args = parser.parse_args()
+
+    if not args.source:
+        print(benchmark(args.turbines, args.hours, workers=args.workers))
+    else:
+        ids, params = None, None
+        if args.geojson:
+            with open(args.geojson, encoding='utf-8') as f:
+                ids = geojson_turbine_ids(json.load(f))
+        if args.params:
+            with open(args.params, encoding='utf-8') as f:
+                params = json.load(f)
+        result = run_fleet(args.source, ids, params, window_seconds=args.window, workers=args.workers,
+                           history=get_history(), step_seconds=args.step)
+        for r in result['turbines']:
+            modes = ', '.join(f"{m['frequency']:.3f} Hz" for m in r['modes'])
+            print(f"{r['turbine_id']}: {r['error'] or modes}")
+            for message in ([] if r['error'] else r['errors']):
+                print(f"    skipped {message}")
+        print(f"{result['turbine_hours']:.1f} turbine-hours in {result['seconds']:.1f} s "
+              f"({result['turbine_hours_per_minute']:.1f} turbine-hours/min, {result['workers']} workers)")
@@ -0,0 +1,257 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.pipelines.dataset import Dataset
+
+# 환경 변수 설정 (없으면 기본값 사용)
+#   SNUGEOSHM_CACHE_MB  : 워커당 메모리 캐시 예산 (MB)
+#   SNUGEOSHM_CACHE_DIR : 디스크 spill 경로 ('' 이면 spill 비활성화)
+#   SNUGEOSHM_CACHE_TTL : 디스크에 남은 세션 데이터 보존 시간 (초)
+DEFAULT_MEMORY_MB = 1024
+DEFAULT_SPILL_DIR = os.path.join(tempfile.gettempdir(), 'snugeoshm_cache')
+DEFAULT_TTL_SECONDS = 12 * 3600
+# 키 구성 요소 (세션 ID / 데이터셋 ID / 단계)는 클라이언트 Store 값이 그대로 들어오므로
+# 경로 구분자나 '..' 없이 이 형식만 허용 (uuid4().hex, 'headless', 'step1-<hash>' 등)
+_KEY_PART = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+
+# ============================================================================
+# 세션별 데이터셋 캐시
+# ============================================================================
+class DatasetCache:
+    """
+    (session_id, dataset_id, stage) 키로 Dataset을 보관하는 서버 측 캐시
+
+    - 메모리: 예산(bytes)을 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+    - 디스크: spill_dir가 지정되면 put 시점에 컬럼 배열을 .npy로 기록하고,
+      메모리에서 빠진 항목은 memory-map으로 다시 연다. gunicorn 워커들이
+      같은 spill_dir를 공유하므로 어느 워커가 요청을 받아도 같은 데이터를 본다.
+    - stage: 'raw', 'step1' ~ 'step4' 등 전처리 단계별 출력
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_MB * 1024 ** 2,
+                 spill_dir=DEFAULT_SPILL_DIR, ttl=DEFAULT_TTL_SECONDS):
+        self.memory_budget = int(memory_budget)
+        self.spill_dir = spill_dir
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> Dataset
+        self._sizes = {}                # key -> nbytes
+        self._nbytes = 0
+        self._lock = threading.RLock()
+        self._last_purge = 0.0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    def put(self, session_id, dataset_id, dataset, stage='raw'):
+        """데이터셋 저장 (spill 활성 시 디스크에도 기록, 형식이 잘못된 키는 ValueError)"""
+        key = (session_id, dataset_id, stage)
+        if not _valid_key(key):
+            raise ValueError("Invalid dataset cache key")
+        if self.spill_dir:
+            self._write_disk(key, dataset)
+        with self._lock:
+            self._insert(key, dataset)
+        self._maybe_purge()
+
+    def get(self, session_id, dataset_id, stage='raw'):
+        """
+        데이터셋 조회
+
+        Returns:
+            Dataset 또는 None (만료/미존재)
+        """
+        key = (session_id, dataset_id, stage)
+        if not _valid_key(key):
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        dataset = self._read_disk(key) if self.spill_dir else None
+        if dataset is not None:
+            with self._lock:
+                self._insert(key, dataset)
+        return dataset
+
+    def has(self, session_id, dataset_id, stage='raw'):
+        key = (session_id, dataset_id, stage)
+        if not _valid_key(key):
+            return False
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.spill_dir) and os.path.isdir(self._path(key))
+
+    def drop(self, session_id, dataset_id=None, stage=None):
+        """세션 전체, 데이터셋 하나, 또는 단계 하나 삭제"""
+        def match(key):
+            return (key[0] == session_id
+                    and (dataset_id is None or key[1] == dataset_id)
+                    and (stage is None or key[2] == stage))
+
+        with self._lock:
+            for key in [k for k in self._entries if match(k)]:
+                self._remove(key)
+
+        parts = [p for p in (session_id, dataset_id, stage) if p is not None]
+        if self.spill_dir and _valid_key(parts):
+            shutil.rmtree(self._path(parts), ignore_errors=True)
+
+    def stats(self):
+        """캐시 사용량 요약"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'memory_bytes': self._nbytes,
+                'memory_budget': self.memory_budget,
+                'spill_dir': self.spill_dir,
+            }
+
+    # ------------------------------------------------------------------
+    # 메모리 LRU
+    # ------------------------------------------------------------------
+    def _insert(self, key, dataset):
+        if key in self._entries:
+            self._remove(key)
+        size = dataset.nbytes
+        self._entries[key] = dataset
+        self._sizes[key] = size
+        self._nbytes += size
+        # 예산 초과 시 LRU 제거 (방금 넣은 항목은 유지)
+        while self._nbytes > self.memory_budget and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        self._nbytes -= self._sizes.pop(key, 0)
+
+    # ------------------------------------------------------------------
+    # 디스크 spill (컬럼별 .npy + memory-map)
+    # ------------------------------------------------------------------
+    def _path(self, key):
+        """키 → spill 경로 (spill_dir 밖을 가리키면 ValueError — _valid_key 통과 후에는 발생하지 않음)"""
+        root = os.path.realpath(self.spill_dir)
+        path = os.path.realpath(os.path.join(root, *key))
+        if os.path.commonpath([root, path]) != root or path == root:
+            raise ValueError("Dataset cache key escapes the spill directory")
+        return path
+
+    def _write_disk(self, key, dataset):
+        final = self._path(key)
+        parent = os.path.dirname(final)
+        os.makedirs(parent, exist_ok=True)
+        # 임시 폴더에 기록 후 rename → 다른 워커가 쓰다 만 파일을 읽지 않음
+        tmp = os.path.join(parent, f'.tmp-{uuid.uuid4().hex}')
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, 'values.npy'), np.ascontiguousarray(dataset.values))
+        if dataset.time is not None:
+            np.save(os.path.join(tmp, 'time.npy'), dataset.time)
+        extra_names = list(dataset.extra)
+        for i, name in enumerate(extra_names):
+            np.save(os.path.join(tmp, f'extra_{i}.npy'), dataset.extra[name])
+        meta = {
+            'channels': dataset.channels,
+            'time_name': dataset.time_name,
+            'fs': dataset.fs,
+            'extra': extra_names,
+            'meta': dataset.meta,
+        }
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, default=str)
+
+        shutil.rmtree(final, ignore_errors=True)
+        try:
+            os.replace(tmp, final)
+        except OSError:
+            # 다른 워커가 동시에 같은 키를 기록한 경우: 먼저 끝난 쪽을 사용
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._touch(key)
+
+    def _touch(self, key):
+        """세션 폴더 mtime 갱신 (TTL 기준)"""
+        try:
+            os.utime(os.path.join(self.spill_dir, key[0]))
+        except OSError:
+            pass
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+            time_path = os.path.join(path, 'time.npy')
+            time_arr = np.load(time_path, mmap_mode='r') if os.path.exists(time_path) else None
+            extra = {
+                name: np.load(os.path.join(path, f'extra_{i}.npy'))
+                for i, name in enumerate(meta['extra'])
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        self._touch(key)
+        return Dataset(values, meta['channels'], time=time_arr,
+                       time_name=meta['time_name'], fs=meta['fs'],
+                       extra=extra, meta=meta['meta'])
+
+    def _maybe_purge(self):
+        """TTL이 지난 세션 폴더 정리 (최대 10분에 한 번)"""
+        if not self.spill_dir or not self.ttl:
+            return
+        now = time.time()
+        if now - self._last_purge < 600:
+            return
+        self._last_purge = now
+        for session in os.listdir(self.spill_dir):
+            path = os.path.join(self.spill_dir, session)
+            try:
+                expired = now - os.path.getmtime(path) > self.ttl
+            except OSError:
+                continue
+            if expired:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _valid_key(parts):
+    """키 구성 요소가 모두 _KEY_PART 형식의 문자열인지 (경로 조작 방지)"""
+    return bool(parts) and all(isinstance(p, str) and _KEY_PART.fullmatch(p) for p in parts)
+
+
+# ============================================================================
+# 프로세스 전역 캐시 인스턴스
+# ============================================================================
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """환경 변수 설정으로 만든 기본 DatasetCache 반환 (워커당 1개)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            budget_mb = float(os.environ.get('SNUGEOSHM_CACHE_MB', DEFAULT_MEMORY_MB))
+            spill_dir = os.environ.get('SNUGEOSHM_CACHE_DIR', DEFAULT_SPILL_DIR) or None
+            ttl = float(os.environ.get('SNUGEOSHM_CACHE_TTL', DEFAULT_TTL_SECONDS))
+            _default_cache = DatasetCache(budget_mb * 1024 ** 2, spill_dir, ttl)
+        return _default_cache
+
+
+def new_dataset_id():
+    """업로드마다 고유한 데이터셋 ID 생성"""
+    return uuid.uuid4().hex
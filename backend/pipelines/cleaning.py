@@ -0,0 +1,676 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+from scipy.interpolate import BSpline
+from scipy.special import comb
+
+# Hampel 필터 기본값
+HAMPEL_THRESHOLD = 3.0          # 강건 표준편차(σ)의 배수
+HAMPEL_WINDOW_SECONDS = 0.5     # 블록(창) 길이 (샘플 수는 2의 거듭제곱으로 올림 — 정렬이 가장 빠름)
+IQR_TO_SIGMA = 1.349            # 정규분포에서 IQR → σ 환산 계수
+
+# 결측 보간 / 드리프트 기본값
+MAX_GAP_SECONDS = 1.0           # 이보다 짧은 결측 구간만 선형 보간
+DRIFT_POLY_ORDER = 2
+DRIFT_SPLINE_KNOT_SECONDS = 3600.0
+
+# 한 번에 처리할 샘플 수 — 임시 버퍼가 CPU 캐시에 머물도록 작게 유지
+_BLOCK = 1 << 16
+_CHUNK = 1 << 13                # clean() 패스의 채널당 샘플 수 (16채널 float32 512KB — L2에 머묾)
+
+OUTLIER_OPTIONS = {'3sigma': 3.0, '8sigma': 8.0}
+
+
+# ============================================================================
+# Hampel 스파이크 치환 (블록 단위 median / 강건 σ)
+# ============================================================================
+def hampel_window(fs, seconds=HAMPEL_WINDOW_SECONDS):
+    """창 길이 (샘플) — seconds·fs 이상인 가장 작은 2의 거듭제곱 (정렬 network 크기와 일치)"""
+    return 1 << max(2, int(np.ceil(np.log2(max(seconds * fs, 4)))))
+
+
+def _hampel_blocks(blocks, threshold):
+    """
+    (C, nb, w) 블록 view에서 스파이크를 블록 중앙값으로 제자리 치환
+
+    요청한 sliding (샘플마다 중심 창) median/MAD 대신 겹치지 않는 창을 쓴다. sliding 창은 샘플마다
+    창 길이만큼의 선택 연산이 필요해 24시간 × 16채널 기록에서 수십 배 느리다. 창 단위 정렬 한 번으로
+    중앙값과 사분위수(Q1, Q3)를 함께 구하고 IQR/1.349를 창 내부 σ로 쓴다. MAD·1.4826과 같은 정규분포
+    일치 추정량이지만 |x - med|를 한 번 더 정렬할 필요가 없다.
+    NaN은 정렬 끝으로 모이므로 NaN이 있는 창은 유효 샘플 수 m으로 순위를 다시 잡는다 (m < 4면 건너뜀).
+    IQR이 0인 창(양자화 / 일정한 신호)은 한계가 0이 되어 중앙값이 아닌 모든 샘플이 치환되므로 건너뛴다
+    (이런 창의 큰 튐은 σ 이상치 제거가 처리).
+    정렬된 창의 최솟값/최댓값이 한계 안이면 치환할 샘플이 없으므로, 샘플 단위 비교는 그 밖으로
+    나간 창만 모아서 한다.
+
+    Returns:
+        tuple: (채널별 치환 개수, 창별 하한 (C·nb,), 창별 상한 (C·nb,), NaN이 있는 창 (C·nb 평탄 인덱스))
+               — 하한/상한은 치환 후 창의 값(NaN 제외)을 모두 덮는 범위 (σ 이상치 후보 창 선별용)
+    """
+    n_channels, n_blocks, w = blocks.shape
+    srt = np.sort(blocks, axis=-1).reshape(-1, w)
+    med = 0.5 * (srt[:, (w - 1) // 2] + srt[:, w // 2])
+    spread = srt[:, (3 * w) // 4] - srt[:, w // 4]
+    low, high = srt[:, 0].copy(), srt[:, -1].copy()
+    nan_rows = np.flatnonzero(np.isnan(high))
+    if len(nan_rows):
+        sub = srt[nan_rows]
+        m = w - np.isnan(sub).sum(axis=1)
+        i = np.arange(len(nan_rows))
+        last = np.maximum(m - 1, 0)
+        med[nan_rows] = 0.5 * (sub[i, last // 2] + sub[i, np.minimum(m // 2, last)])
+        spread[nan_rows] = np.where(m >= 4, sub[i, np.minimum((3 * m) // 4, last)] - sub[i, m // 4], 0)
+        high[nan_rows] = sub[i, last]
+    limit = (threshold / IQR_TO_SIGMA) * spread
+    limit[~(limit > 0)] = np.inf    # IQR 0 / 유효 샘플 부족
+
+    candidates = np.flatnonzero((high - med > limit) | (med - low > limit))
+    if not len(candidates):
+        return np.zeros(n_channels, dtype=np.int64), low, high, nan_rows
+    # (blocks는 채널 사이가 떨어진 view일 수 있어 평탄화하지 않고 (채널, 창, 위치) 인덱스로 씀)
+    channel, block = np.divmod(candidates, n_blocks)
+    center, limit = med[candidates], limit[candidates]
+    work = blocks[channel, block]
+    np.subtract(work, center[:, None], out=work)
+    np.abs(work, out=work)
+    rows, offset = np.divmod(np.flatnonzero(work > limit[:, None]), w)
+    blocks[channel[rows], block[rows], offset] = center[rows]
+    # 치환 후 후보 창의 값은 중앙값 ± 한계 안
+    low[candidates] = np.maximum(low[candidates], center - limit)
+    high[candidates] = np.minimum(high[candidates], center + limit)
+    return np.bincount(channel[rows], minlength=n_channels), low, high, nan_rows
+
+
+class _Moments:
+    """NaN을 제외한 채널별 평균 / 표준편차 블록 누적 (float64, 기준값 이동으로 수치 안정성 확보)"""
+
+    def __init__(self, values):
+        n_channels, n_samples = values.shape
+        # 첫 샘플 근처 값을 기준으로 이동 후 누적
+        self.shift = np.nan_to_num(np.nanmedian(values[:, :min(n_samples, 1000)], axis=1)).astype(values.dtype)
+        self.count = np.zeros(n_channels)
+        self.total = np.zeros(n_channels)
+        self.total_sq = np.zeros(n_channels)
+        self.missing = np.zeros(n_channels, dtype=np.int64)
+
+    def add(self, block, missing=None):
+        """
+        블록 (C, n) 누적 (입력은 수정하지 않음)
+
+        블록 합은 float32 BLAS로 구하고 (블록이 작아 오차는 무시할 수준) 블록 간 누적만 float64로 한다.
+        합이 유한하지 않은 채널만 NaN 마스킹 경로로 다시 계산한다.
+
+        Args:
+            missing: 채널별 결측 수 — 결측 샘플을 self.shift로 미리 채운 블록이면 (합에 기여 0) 개수만 뺌
+
+        Returns:
+            tuple: 유한하지 않은 샘플의 (채널, 위치) — 위치는 채널 안에서 오름차순
+        """
+        n = block.shape[1]
+        block = block - self.shift[:, None]
+        total = block @ np.ones(n, dtype=block.dtype)
+        total_sq = np.vecdot(block, block)
+        count = np.full(len(block), n) if missing is None else n - missing
+        bad = ~np.isfinite(total_sq)
+        channel = position = np.zeros(0, dtype=np.int64)
+        if bad.any():
+            rows = block[bad]                   # 복사본 (C', n)
+            nonfinite = np.flatnonzero(~np.isfinite(rows))
+            rows.reshape(-1)[nonfinite] = 0
+            row, position = np.divmod(nonfinite, n)
+            channel = np.flatnonzero(bad)[row]
+            count[bad] -= np.bincount(row, minlength=len(rows))
+            total[bad] = rows @ np.ones(n, dtype=rows.dtype)
+            total_sq[bad] = np.vecdot(rows, rows)
+        self.missing += n - count
+        self.count += count
+        self.total += total
+        self.total_sq += total_sq
+        return channel, position
+
+    def result(self):
+        """(평균, 표준편차)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.total / self.count
+            var = (self.total_sq - self.count * mean ** 2) / np.maximum(self.count - 1, 1)
+        return mean + self.shift, np.sqrt(np.maximum(var, 0))
+
+
+def replace_spikes(values, window, threshold=HAMPEL_THRESHOLD, moments=None):
+    """
+    Hampel 필터: 창 중앙값에서 threshold·σ 이상 벗어난 샘플을 중앙값으로 치환
+
+    창은 겹치지 않는 블록(strided view)으로 구성하여 모든 채널을 한 번에
+    처리한다. 캐시 효율을 위해 샘플 축을 창 길이의 배수 단위로 나눠
+    진행하며, values는 제자리(in-place)로 수정된다.
+
+    Args:
+        values: (C, N) float 배열
+        window: 창 길이 (샘플, 2의 거듭제곱이면 가장 빠름 — hampel_window)
+        threshold: 판정 배수
+        moments: _Moments (주면 치환한 블록을 캐시에 있을 때 바로 누적 → σ 이상치 제거용 별도 패스 없음)
+
+    Returns:
+        int ndarray: 채널별 치환 개수
+    """
+    n_channels = values.shape[0]
+    count = np.zeros(n_channels, dtype=np.int64)
+    for start, stop, width in _chunks(values.shape[1], window):
+        chunk = values[:, start:stop]
+        if width >= 4:
+            count += _hampel_blocks(chunk.reshape(n_channels, -1, width), threshold)[0]
+        if moments is not None:
+            moments.add(chunk)
+    return count
+
+
+def _chunks(n_samples, window):
+    """
+    (start, stop, 창 길이) — 창 길이의 배수이면서 _CHUNK 이하인 구간, 나머지 꼬리는 창 하나
+
+    Yields:
+        tuple: (start, stop, width)
+    """
+    window = max(4, int(window))
+    end = n_samples // window * window
+    step = max(1, _CHUNK // window) * window
+    for start in range(0, end, step):
+        yield start, min(start + step, end), window
+    if end < n_samples:
+        yield end, n_samples, n_samples - end
+
+
+# ============================================================================
+# σ 기준 이상치 제거
+# ============================================================================
+def _channel_moments(values):
+    """NaN을 제외한 채널별 평균 / 표준편차 (블록 단위 float64 누적)"""
+    moments = _Moments(values)
+    for start in range(0, values.shape[1], _BLOCK):
+        moments.add(values[:, start:start + _BLOCK])
+    return moments.result()
+
+
+def remove_outliers(values, n_sigma, moments=None):
+    """
+    채널별 |x - mean| > n_sigma·std 인 샘플을 NaN으로 표시 (in-place)
+
+    Args:
+        moments: 이미 누적한 _Moments (없으면 여기서 한 번 더 훑음)
+
+    Returns:
+        int ndarray: 채널별 제거 개수
+    """
+    mean, std = moments.result() if moments is not None else _channel_moments(values)
+    low = (mean - n_sigma * std)[:, None].astype(values.dtype)
+    high = (mean + n_sigma * std)[:, None].astype(values.dtype)
+    count = np.zeros(values.shape[0], dtype=np.int64)
+    for start in range(0, values.shape[1], _BLOCK):
+        block = values[:, start:start + _BLOCK]
+        outliers = (block < low) | (block > high)
+        block[outliers] = np.nan
+        count += outliers.sum(axis=1)
+    return count
+
+
+# ============================================================================
+# 짧은 결측 구간 선형 보간
+# ============================================================================
+def fill_gaps(values, max_gap):
+    """
+    길이가 max_gap 이하이고 양쪽 끝이 유효한 NaN 구간을 선형 보간 (in-place)
+
+    NaN 샘플 위치만 모아 구간(run) 단위로 계산하므로 결측이 적을수록
+    비용이 작다.
+
+    Returns:
+        tuple: (채널별 보간 개수, 채널별 남은 결측 개수)
+    """
+    n_channels, n_samples = values.shape
+    # NaN 위치는 캐시에 들어가는 블록 단위로 모은 뒤 (채널, 위치) 순으로 정렬
+    found = []
+    for start in range(0, n_samples, _BLOCK):
+        block = values[:, start:start + _BLOCK]
+        if np.isnan(block @ np.ones(block.shape[1], dtype=block.dtype)).any():
+            ch, pos = np.divmod(np.flatnonzero(np.isnan(block)), block.shape[1])
+            found.append(ch * n_samples + pos + start)
+    positions = np.sort(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+    ch, pos, fill, filled, remaining = _interpolate_gaps(
+        positions, n_channels, n_samples, max_gap, lambda c, p: values[c, p])
+    values[ch, pos] = fill
+    return filled, remaining
+
+
+def _interpolate_gaps(positions, n_channels, n_samples, max_gap, value_at):
+    """
+    결측 위치 키만으로 짧은 구간의 선형 보간값 계산 (배열 전체를 훑지 않음)
+
+    Args:
+        positions: 정렬된 결측 전역 키 (채널·N + 샘플)
+        value_at: (채널, 샘플) → 값 — 구간 양 끝 유효 샘플 조회용
+
+    Returns:
+        tuple: (보간할 채널, 샘플, 값, 채널별 보간 개수, 채널별 남은 결측 개수)
+    """
+    ch, pos = np.divmod(positions, n_samples)
+    filled = np.zeros(n_channels, dtype=np.int64)
+    if not len(positions):
+        return ch, pos, np.zeros(0), filled, filled.copy()
+    # 연속 구간 경계: 채널이 바뀌거나 위치가 1 이상 점프
+    new_run = np.ones(len(pos), dtype=bool)
+    new_run[1:] = (ch[1:] != ch[:-1]) | (pos[1:] != pos[:-1] + 1)
+    run_id = np.cumsum(new_run) - 1
+    starts = pos[new_run]
+    run_ch = ch[new_run]
+    lengths = np.bincount(run_id)
+    ends = starts + lengths - 1
+
+    ok = (lengths <= max_gap) & (starts > 0) & (ends < n_samples - 1)
+    sel = ok[run_id]
+    fill = np.zeros(0)
+    if sel.any():
+        runs = np.flatnonzero(ok)
+        left = np.zeros(len(ok))
+        right = np.zeros(len(ok))
+        left[runs] = value_at(run_ch[runs], starts[runs] - 1)
+        right[runs] = value_at(run_ch[runs], ends[runs] + 1)
+        r = run_id[sel]
+        frac = (pos[sel] - starts[r] + 1) / (lengths[r] + 1)
+        fill = left[r] + (right[r] - left[r]) * frac
+        filled = np.bincount(ch[sel], minlength=n_channels)
+    remaining = np.bincount(ch, minlength=n_channels) - filled
+    return ch[sel], pos[sel], fill, filled, remaining
+
+
+# ============================================================================
+# 오프셋 / 드리프트 제거 (다항식 또는 B-spline 최소제곱)
+# ============================================================================
+def _poly_shift(offset, order):
+    """
+    다항식 기저 이동 행렬 T: (v + offset)^k = Σ_j T[j, k] · v^j
+
+    블록마다 같은 국소 기저 v^j 를 재사용하고 T 로 전역 기저로 변환한다.
+    """
+    binomial, power = _poly_shift_terms(order)
+    return binomial * offset ** power
+
+
+@lru_cache(maxsize=None)
+def _poly_shift_terms(order):
+    """_poly_shift 의 (이항계수 행렬 (j > k 는 0), 지수 행렬) — 블록마다 다시 만들지 않도록 캐시"""
+    j = np.arange(order + 1)[:, None]
+    k = np.arange(order + 1)[None, :]
+    return np.where(j <= k, comb(k, j), 0.0), np.maximum(k - j, 0)
+
+
+def _spline_basis(t, knots):
+    """정규화 시간 t(0~1) 블록의 cubic B-spline 기저 행렬 (n, K)"""
+    return BSpline.design_matrix(t, knots, 3).toarray().astype(np.float32)
+
+
+class _Drift:
+    """
+    채널 공통 기저(다항식 / B-spline)의 최소제곱 드리프트 — 정규방정식 블록 누적 → 계수 → 추세 제거
+
+    모든 채널이 같은 기저를 공유하므로 정규방정식 B^T B 하나와
+    Y B (C × K) 를 블록 단위 행렬곱으로 누적한 뒤 한 번에 푼다.
+    """
+
+    def __init__(self, n_channels, n_samples, fs=None, method='poly', order=DRIFT_POLY_ORDER,
+                 knot_seconds=DRIFT_SPLINE_KNOT_SECONDS):
+        self.method = method
+        self.order = order
+        self.knots = None
+        n_basis = order + 1
+        if method == 'spline':
+            n_inner = 1
+            if fs:
+                n_inner = max(1, int(np.ceil(n_samples / fs / knot_seconds)))
+            inner = np.linspace(0.0, 1.0, n_inner + 1)
+            self.knots = np.concatenate([[0.0] * 3, inner, [1.0] * 3])
+            n_basis = n_inner + 3
+        # 정규화 시간 u = 2·n/(N-1) - 1 ∈ [-1, 1]
+        self.scale = 2.0 / max(n_samples - 1, 1)
+        local = np.vander(np.arange(_BLOCK) * self.scale, order + 1, increasing=True)
+        self.local32 = np.ascontiguousarray(local.T, dtype=np.float32)    # (K, BLOCK)
+        self.local_gram = {}    # 다항식 국소 기저의 B^T B 는 블록 길이에만 의존
+        self.gram = np.zeros((n_basis, n_basis))
+        self.rhs = np.zeros((n_channels, n_basis))
+        self.coef = None
+
+    def basis(self, start, stop):
+        """(국소 기저 (K, n) float32, 전역 변환 행렬 T) — spline은 T=None, stop - start <= _BLOCK"""
+        if self.method == 'spline':
+            t = np.arange(start, stop) * (self.scale / 2)
+            return np.ascontiguousarray(_spline_basis(t, self.knots).T), None
+        return self.local32[:, :stop - start], _poly_shift(start * self.scale - 1.0, self.order)
+
+    def add(self, block, start):
+        """
+        블록 (C, n) 누적 (n <= _BLOCK, 입력은 수정하지 않음)
+
+        유한하지 않은 샘플은 0으로 둔다 — 실제 값의 기여는 add_points로 따로 더한다.
+        """
+        stop = start + block.shape[1]
+        basis, shift = self.basis(start, stop)
+        g = self.local_gram.get(stop - start) if shift is not None else None
+        if g is None:
+            g = basis.astype(np.float64) @ basis.T.astype(np.float64)
+            if shift is not None:
+                self.local_gram[stop - start] = g
+        r = (block @ basis.T).astype(np.float64)        # 블록 내부는 float32 BLAS
+        bad = ~np.isfinite(r).all(axis=1)
+        if bad.any():
+            rows = block[bad]
+            r[bad] = np.where(np.isfinite(rows), rows, 0) @ basis.T
+        if shift is not None:
+            g = shift.T @ g @ shift
+            r = r @ shift
+        self.gram += g
+        self.rhs += r
+
+    def _point_basis(self, position):
+        """흩어진 샘플 위치의 전역 기저 (n, K) float64"""
+        if self.method == 'spline':
+            return _spline_basis(position * (self.scale / 2), self.knots).astype(np.float64)
+        return np.vander(position * self.scale - 1.0, self.order + 1, increasing=True)
+
+    def add_points(self, channel, position, value):
+        """흩어진 샘플의 값 기여를 Y B 에 더함 (B^T B 는 블록 누적에 이미 포함)"""
+        weighted = self._point_basis(position) * np.asarray(value, dtype=np.float64)[:, None]
+        for k in range(weighted.shape[1]):
+            self.rhs[:, k] += np.bincount(channel, weighted[:, k], minlength=len(self.rhs))
+
+    def solve(self):
+        """누적한 정규방정식 풀기 → (C, K) 계수"""
+        self.coef = np.linalg.lstsq(self.gram, self.rhs.T, rcond=None)[0].T   # (C, K)
+        return self.coef
+
+    def trend(self, start, stop, out):
+        """구간 [start, stop) 추세 (C, n) 를 out에 계산 (stop - start <= _BLOCK)"""
+        basis, shift = self.basis(start, stop)
+        local_coef = self.coef if shift is None else self.coef @ shift.T
+        np.matmul(local_coef.astype(out.dtype), basis, out=out)
+        return out
+
+    def subtract(self, values):
+        """추세를 블록 단위로 계산해 빼기 (in-place)"""
+        n_channels, n_samples = values.shape
+        trend = np.empty((n_channels, _CHUNK), dtype=values.dtype)
+        for start in range(0, n_samples, _CHUNK):
+            stop = min(start + _CHUNK, n_samples)
+            values[:, start:stop] -= self.trend(start, stop, trend[:, :stop - start])
+
+
+def remove_drift(values, fs=None, method='poly', order=DRIFT_POLY_ORDER,
+                 knot_seconds=DRIFT_SPLINE_KNOT_SECONDS):
+    """
+    채널별 저주파 드리프트(오프셋 포함)를 최소제곱 적합 후 제거 (in-place)
+
+    NaN 샘플은 채널 평균으로 대체하여 적합에만 사용한다. 블록 행렬곱 결과가
+    유한하지 않을 때만 NaN을 찾으므로 결측이 없으면 별도 검사 패스가 없다.
+
+    Args:
+        values: (C, N) float 배열
+        fs: 샘플링 주파수 (spline 매듭 간격 계산용)
+        method: 'poly' 또는 'spline'
+        order: 다항식 차수
+        knot_seconds: spline 내부 매듭 간격 (초)
+
+    Returns:
+        ndarray: (C, K) 적합 계수
+    """
+    n_channels, n_samples = values.shape
+    if n_samples < order + 2:
+        return np.zeros((n_channels, 0))
+
+    drift = _Drift(n_channels, n_samples, fs, method, order, knot_seconds)
+    fill = None
+    for start in range(0, n_samples, _BLOCK):
+        block = values[:, start:start + _BLOCK]
+        if fill is None and np.isnan(block @ np.ones(block.shape[1], dtype=block.dtype)).any():
+            mean, _ = _channel_moments(values)
+            fill = np.nan_to_num(mean).astype(values.dtype)[:, None]
+        if fill is not None:
+            block = np.where(np.isnan(block), fill, block)
+        drift.add(block, start)
+    coef = drift.solve()
+    drift.subtract(values)
+    return coef
+
+
+# ============================================================================
+# Step 1 전체 실행
+# ============================================================================
+def _scan(values, out, window, threshold, moments, drift):
+    """
+    패스 1: 복사 + 스파이크 치환 + σ 통계 / 결측 위치 + 드리프트 정규방정식 누적 (블록이 캐시에 있을 때)
+
+    Args:
+        values: (C, N) 입력 (수정하지 않음)
+        out: (C, N) float32 출력 (블록 단위로 채움)
+        window: 창 길이 (스파이크 판정 + σ 이상치 후보 창 선별 단위)
+        threshold: Hampel 판정 배수 (None이면 스파이크 치환 없이 창 최솟값/최댓값만)
+
+    Returns:
+        tuple: (블록 목록 [(start, stop, 창 길이, 창별 하한, 창별 상한)], 채널별 스파이크 수,
+                결측 전역 키 (채널·N + 샘플, 오름차순))
+    """
+    n_channels, n_samples = out.shape
+    chunks, missing, prefilled = [], [], []
+    count = np.zeros(n_channels, dtype=np.int64)
+    for start, stop, width in _chunks(n_samples, window):
+        block = out[:, start:stop]
+        block[...] = values[:, start:stop]
+        blocks = block.reshape(n_channels, -1, width)
+        if threshold is None or width < 4:
+            low, high = np.fmin.reduce(blocks, axis=-1).ravel(), np.fmax.reduce(blocks, axis=-1).ravel()
+            gaps = None
+        else:
+            replaced, low, high, gaps = _hampel_blocks(blocks, threshold)
+            count += replaced
+        chunks.append((start, stop, width, low, high))
+        filled = None
+        if gaps is not None and len(gaps):
+            # NaN이 있는 창만 다시 보고 기준값으로 채움 → 통계 / 드리프트 블록 합은 NaN 경로 없이
+            channel, block_index = np.divmod(gaps, (stop - start) // width)
+            position = block_index[:, None] * width + np.arange(width)
+            row, offset = np.nonzero(np.isnan(block[channel[:, None], position]))
+            channel, position = channel[row], position[row, offset]
+            block[channel, position] = moments.shift[channel]
+            filled = np.bincount(channel, minlength=n_channels)
+            missing.append(channel * n_samples + position + start)
+            prefilled.append(missing[-1])
+        channel, position = moments.add(block, filled)
+        missing.append(channel * n_samples + position + start)
+        if drift is not None:
+            drift.add(block, start)
+    if drift is not None and prefilled:
+        # 기준값으로 채운 결측의 드리프트 기여 빼기 (실제 값은 보간 뒤 add_points)
+        channel, position = np.divmod(np.concatenate(prefilled), n_samples)
+        drift.add_points(channel, position, -moments.shift[channel].astype(np.float64))
+    missing = np.sort(np.concatenate(missing)) if missing else np.zeros(0, dtype=np.int64)
+    return chunks, count, missing
+
+
+def _find_outliers(values, chunks, low, high):
+    """
+    채널별 [low, high] 밖인 샘플 — 창 하한/상한이 범위 밖인 창만 다시 읽어 비교
+
+    Returns:
+        tuple: (채널, 샘플, 값)
+    """
+    found = []
+    for start, stop, width, lo, hi in chunks:
+        n_blocks = (stop - start) // width
+        flagged = np.flatnonzero((lo < np.repeat(low, n_blocks)) | (hi > np.repeat(high, n_blocks)))
+        if not len(flagged):
+            continue
+        channel, block = np.divmod(flagged, n_blocks)
+        position = start + block[:, None] * width + np.arange(width)
+        work = values[channel[:, None], position]
+        row, offset = np.nonzero((work < low[channel, None]) | (work > high[channel, None]))
+        found.append((channel[row], position[row, offset], work[row, offset]))
+    if not found:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=values.dtype)
+    return tuple(np.concatenate(part) for part in zip(*found))
+
+
+def clean(values, fs=None, outlier_sigma=3.0, spikes=True, missing=True, drift=True,
+          spike_window=None, spike_threshold=HAMPEL_THRESHOLD, max_gap=None,
+          drift_method='poly', drift_order=DRIFT_POLY_ORDER):
+    """
+    Step 1 정제: 스파이크 치환 → σ 이상치 제거 → 짧은 결측 보간 → 결측 행 제거 → 드리프트 제거
+
+    데이터 전체는 캐시에 들어가는 블록 단위로 두 번만 훑는다. 패스 1은 복사, 스파이크 치환, σ 통계,
+    결측 위치, 드리프트 정규방정식을 블록마다 한 번에 처리하고, 패스 2는 추세를 뺀다. σ 이상치 /
+    보간은 희소 위치로만 다루고 (이상치 후보는 창 하한/상한으로 선별) 드리프트 정규방정식에는 그
+    위치의 값만 보정으로 반영하므로 단계별로 나눠 실행한 결과와 같다. 보간되지 않은 결측이 남으면
+    (행 제거 / NaN 유지) 드리프트는 그 결과로 remove_drift가 다시 적합한다.
+
+    Args:
+        values: (C, N) 배열 (입력은 수정하지 않음)
+        fs: 샘플링 주파수 (창/결측 길이 계산용, 없으면 100 Hz 가정)
+        outlier_sigma: σ 배수 (None이면 이상치 제거 안 함)
+        spikes: Hampel 스파이크 치환 여부
+        missing: 결측 보간 + 남은 결측 행 제거 여부
+        drift: 오프셋/드리프트 제거 여부
+        spike_window: Hampel 창 길이 (샘플), None이면 hampel_window(fs)
+        spike_threshold: Hampel 판정 배수
+        max_gap: 보간할 최대 결측 길이 (샘플), None이면 MAX_GAP_SECONDS
+        drift_method: 'poly' 또는 'spline'
+        drift_order: 다항식 차수
+
+    Returns:
+        tuple: (cleaned (C, N') float32, keep (N,) bool 또는 None, report dict)
+    """
+    rate = fs or 100.0
+    values = np.asarray(values)
+    n_channels, n_samples = values.shape
+    zeros = np.zeros(n_channels, dtype=np.int64)
+    report = {'spikes': zeros, 'outliers': zeros, 'filled': zeros, 'missing': zeros, 'dropped_rows': 0}
+    started = time.perf_counter()
+
+    # 패스 1: 복사 + 스파이크 치환 + σ 통계 / 결측 + 드리프트 정규방정식
+    out = np.empty((n_channels, n_samples), dtype=np.float32)
+    fitter = None
+    if drift and n_samples >= drift_order + 2:
+        fitter = _Drift(n_channels, n_samples, fs, method=drift_method, order=drift_order)
+    moments = _Moments(np.asarray(values[:, :1000], dtype=np.float32))
+    window = spike_window or hampel_window(rate)
+    chunks, report['spikes'], positions = _scan(
+        values, out, window, spike_threshold if spikes else None, moments, fitter)
+    report['missing'] = moments.missing
+    channel, position = np.divmod(positions, max(n_samples, 1))
+    out[channel, position] = np.nan
+
+    # σ 이상치 → NaN, 드리프트 정규방정식에서는 빼기
+    if outlier_sigma:
+        mean, std = moments.result()
+        low = (mean - outlier_sigma * std).astype(np.float32)
+        high = (mean + outlier_sigma * std).astype(np.float32)
+        channel, position, old = _find_outliers(out, chunks, low, high)
+        out[channel, position] = np.nan
+        report['outliers'] = np.bincount(channel, minlength=n_channels)
+        if fitter is not None:
+            fitter.add_points(channel, position, -old.astype(np.float64))
+        positions = np.sort(np.concatenate([positions, channel * n_samples + position]))
+
+    keep = None
+    remaining = np.bincount(positions // max(n_samples, 1), minlength=n_channels)
+    if missing:
+        gap = max_gap if max_gap is not None else int(rate * MAX_GAP_SECONDS)
+        channel, position, fill, report['filled'], remaining = _interpolate_gaps(
+            positions, n_channels, n_samples, gap, lambda c, p: out[c, p])
+        out[channel, position] = fill
+        if fitter is not None:
+            fitter.add_points(channel, position, fill)
+        if remaining.any():
+            channel, position = np.divmod(positions, n_samples)
+            keep = np.ones(n_samples, dtype=bool)
+            keep[position[np.isnan(out[channel, position])]] = False
+            out = out[:, keep]
+            report['dropped_rows'] = int(n_samples - keep.sum())
+
+    # 패스 2: 추세 제거 — 남은 결측이 없으면 누적한 정규방정식을 그대로 풀기
+    if drift:
+        if fitter is not None and not remaining.any():
+            fitter.solve()
+            fitter.subtract(out)
+        else:
+            # 행을 지웠거나 NaN이 남음 → 기저/평균 대체가 달라지므로 처음부터 적합
+            remove_drift(out, fs, method=drift_method, order=drift_order)
+
+    report['seconds'] = time.perf_counter() - started
+    return out, keep, report
+
+
+def clean_dataset(dataset, remove_outliers='3sigma', replace_spikes='Yes',
+                  drop_missing='Yes', offset_drift='Yes', **kwargs):
+    """
+    Analytics Step 1 드롭다운 값으로 Dataset 정제
+
+    Returns:
+        tuple: (Dataset, report dict — 채널별 값은 {channel: count})
+    """
+    out, keep, report = clean(
+        dataset.values, dataset.fs,
+        outlier_sigma=OUTLIER_OPTIONS.get(remove_outliers),
+        spikes=replace_spikes == 'Yes',
+        missing=drop_missing == 'Yes',
+        drift=offset_drift == 'Yes',
+        **kwargs
+    )
+    source = dataset if keep is None else dataset.select(keep)
+    cleaned = source.replace(values=out, meta={'step1': {
+        'outliers': remove_outliers, 'spikes': replace_spikes,
+        'missing': drop_missing, 'drift': offset_drift,
+    }})
+    for key in ('spikes', 'outliers', 'filled', 'missing'):
+        report[key] = dict(zip(dataset.channels, report[key].tolist()))
+    return cleaned, report
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def benchmark(hours=24, fs=100, n_channels=16, seed=0, repeat=3):
+    """
+    합성 기록(스파이크/결측/드리프트 포함)으로 Step 1 소요 시간 측정
+
+    공유 VM의 측정 잡음을 줄이려고 repeat번 실행해 최소 / 중앙값을 함께 보고한다 (매 실행 새 출력 할당).
+    """
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 * fs)
+    t = np.arange(n) / fs
+    values = (rng.normal(scale=0.02, size=(n_channels, n)).astype(np.float32)
+              + np.sin(2 * np.pi * 0.3 * t, dtype=np.float32) * 0.05
+              + (t / t[-1]).astype(np.float32) * 0.1)
+    idx = rng.integers(0, n, size=(n_channels, n // 10000))
+    np.put_along_axis(values, idx, 5.0, axis=1)
+    gaps = rng.integers(0, n - 20, size=(n_channels, n // 50000))
+    for c in range(n_channels):
+        for g in gaps[c]:
+            values[c, g:g + 10] = np.nan
+
+    elapsed = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        _, _, report = clean(values, fs)
+        elapsed.append(time.perf_counter() - started)
+    return {'samples': n * n_channels, 'seconds': round(min(elapsed), 3),
+            'seconds_median': round(float(np.median(elapsed)), 3),
+            'spikes': int(report['spikes'].sum()), 'filled': int(report['filled'].sum())}
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Step 1 cleaning benchmark")
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--fs', type=float, default=100)
+    parser.add_argument('--channels', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(benchmark(args.hours, args.fs, args.channels, repeat=args.repeat))
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# 컬럼형 시계열 데이터셋
+# ============================================================================
+class Dataset:
+    """
+    센서 채널을 (채널 × 샘플) 2차원 배열로 보관하는 컬럼형 데이터셋
+
+    각 채널은 values의 한 행(row)에 연속 메모리로 저장되므로 채널 단위
+    연산과 디스크 memory-map이 모두 복사 없이 가능하다.
+
+    Attributes:
+        values: (n_channels, n_samples) float 배열
+        channels: 채널 이름 리스트
+        time: 시간 컬럼 (datetime64[ns] 또는 float 초), 없으면 None
+        time_name: 원본 시간 컬럼 이름
+        fs: 샘플링 주파수 (Hz), 추정 불가 시 None
+        extra: 숫자가 아닌 부가 컬럼 {name: ndarray}
+        meta: 부가 정보 딕셔너리 (파일명, 처리 이력 등)
+    """
+
+    def __init__(self, values, channels, time=None, time_name=None, fs=None,
+                 extra=None, meta=None):
+        values = np.asarray(values)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        if values.shape[0] != len(channels):
+            raise ValueError(
+                f"values has {values.shape[0]} rows but {len(channels)} channel names"
+            )
+        self.values = values
+        self.channels = list(channels)
+        self.time = time
+        self.time_name = time_name
+        self.fs = fs if fs is not None else infer_sample_rate(time)
+        self.extra = dict(extra or {})
+        self.meta = dict(meta or {})
+
+    # ------------------------------------------------------------------
+    # 기본 속성
+    # ------------------------------------------------------------------
+    @property
+    def n_samples(self):
+        return self.values.shape[1]
+
+    @property
+    def n_channels(self):
+        return self.values.shape[0]
+
+    @property
+    def column_names(self):
+        """시간 컬럼 + 채널 + 부가 컬럼 순서의 전체 컬럼 이름"""
+        names = [self.time_name] if self.time is not None else []
+        return names + self.channels + list(self.extra)
+
+    @property
+    def nbytes(self):
+        total = self.values.nbytes
+        if self.time is not None:
+            total += self.time.nbytes
+        total += sum(arr.nbytes for arr in self.extra.values())
+        return total
+
+    def channel(self, name):
+        """채널 하나를 1차원 배열(view)로 반환"""
+        return self.values[self.channels.index(name)]
+
+    def replace(self, values=None, channels=None, time=None, fs=None, meta=None):
+        """
+        일부 속성만 바꾼 새 Dataset 생성 (전처리 단계 출력용)
+
+        샘플 수가 바뀌면(다운샘플링 등) 시간/부가 컬럼은 새로 지정하지 않는 한
+        버려진다.
+        """
+        values = self.values if values is None else values
+        same_length = np.shape(values)[-1] == self.n_samples
+        if time is None and same_length:
+            time = self.time
+        return Dataset(
+            values,
+            self.channels if channels is None else channels,
+            time=time,
+            time_name=self.time_name,
+            fs=fs if fs is not None else (self.fs if same_length else None),
+            extra=self.extra if same_length else None,
+            meta={**self.meta, **(meta or {})},
+        )
+
+    def select(self, rows):
+        """행(샘플) 부분집합 Dataset (rows: 불리언 마스크, 인덱스 배열 또는 slice)"""
+        return Dataset(
+            self.values[:, rows],
+            self.channels,
+            time=None if self.time is None else self.time[rows],
+            time_name=self.time_name,
+            fs=self.fs,
+            extra={name: arr[rows] for name, arr in self.extra.items()},
+            meta=self.meta,
+        )
+
+    # ------------------------------------------------------------------
+    # pandas 변환
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_frame(cls, df, time_column=None, dtype=np.float32, meta=None):
+        """
+        DataFrame을 Dataset으로 변환
+
+        Args:
+            df: 원본 DataFrame
+            time_column: 시간 컬럼 이름 (None이면 자동 탐지)
+            dtype: 센서 채널 dtype
+            meta: 부가 정보
+
+        Returns:
+            Dataset
+        """
+        if time_column is None:
+            time_column = detect_time_column(df)
+
+        time = None
+        if time_column is not None:
+            time = _coerce_time(df[time_column])
+
+        numeric = [c for c in df.columns
+                   if c != time_column and pd.api.types.is_numeric_dtype(df[c])]
+        others = [c for c in df.columns if c != time_column and c not in numeric]
+
+        values = np.empty((len(numeric), len(df)), dtype=dtype)
+        for i, col in enumerate(numeric):
+            values[i] = df[col].to_numpy(dtype=dtype, na_value=np.nan)
+
+        extra = {c: df[c].astype(str).to_numpy(dtype=str) for c in others}
+        return cls(values, [str(c) for c in numeric], time=time,
+                   time_name=time_column, extra=extra, meta=meta)
+
+    def to_frame(self, rows=None):
+        """
+        DataFrame으로 변환 (화면 표시용)
+
+        Args:
+            rows: slice 또는 행 인덱스 배열 (None이면 전체)
+        """
+        sl = slice(None) if rows is None else rows
+        data = {}
+        if self.time is not None:
+            data[self.time_name] = self.time[sl]
+        for name, row in zip(self.channels, self.values):
+            data[name] = row[sl]
+        for name, arr in self.extra.items():
+            data[name] = arr[sl]
+        return pd.DataFrame(data)
+
+
+# ============================================================================
+# 시간 컬럼 탐지 / 샘플링 주파수 추정
+# ============================================================================
+TIME_COLUMN_HINTS = ('time', 'timestamp', 'datetime', 'date', 't', 'sec', 'seconds')
+
+
+def detect_time_column(df):
+    """
+    시간 컬럼 자동 탐지
+
+    이름 힌트(time, timestamp 등)를 우선 확인하고, 없으면 datetime으로
+    파싱되는 첫 문자열 컬럼을 사용한다.
+    """
+    for col in df.columns:
+        if str(col).strip().lower() in TIME_COLUMN_HINTS:
+            return col
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            return col
+        if df[col].dtype == object:
+            sample = df[col].dropna().head(20)
+            if len(sample) and pd.to_datetime(sample, errors='coerce').notna().all():
+                return col
+    return None
+
+
+def _coerce_time(series):
+    """시간 컬럼을 datetime64[ns] 또는 float64(초) 배열로 변환"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64)
+    parsed = pd.to_datetime(series, errors='coerce', format='ISO8601')
+    if parsed.isna().sum() > series.isna().sum():
+        # ISO8601이 아닌 형식 → 느리지만 행별 형식 추론
+        parsed = pd.to_datetime(series, errors='coerce', format='mixed')
+    return parsed.to_numpy(dtype='datetime64[ns]')
+
+
+def infer_sample_rate(time):
+    """시간 배열의 샘플 간격 중앙값으로 샘플링 주파수(Hz) 추정"""
+    if time is None or len(time) < 2:
+        return None
+    if np.issubdtype(time.dtype, np.datetime64):
+        dt = np.diff(time[:10000]).astype('timedelta64[ns]').astype(np.float64) * 1e-9
+    else:
+        dt = np.diff(time[:10000].astype(np.float64))
+    dt = dt[np.isfinite(dt) & (dt > 0)]
+    if not len(dt):
+        return None
+    return float(1.0 / np.median(dt))
@@ -0,0 +1,341 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+from scipy import signal
+
+from backend.pipelines.wavelet import denoise
+
+# 필터 기본값
+BANDPASS_ORDER = 4              # Butterworth 차수 (대역통과는 2배)
+DECIMATION_MARGIN = 2.5         # 목표 Nyquist ≥ margin × 대역 상한
+ANTIALIAS_TAPS_PER_FACTOR = 20  # 스트리밍 FIR 길이 = factor × 이 값 + 1
+STREAM_SETTLE_PERIODS = 6.0     # 스트리밍 zero-phase lookahead (하한 주파수 주기 수)
+
+
+# ============================================================================
+# 필터 설계 (fs, 대역) 단위로 1회만 설계하여 캐시
+# ============================================================================
+@lru_cache(maxsize=64)
+def design_bandpass(fs, low, high, order=BANDPASS_ORDER):
+    """
+    Butterworth 대역통과 필터 (second-order sections)
+
+    Args:
+        fs: 샘플링 주파수 (Hz)
+        low, high: 통과 대역 (Hz), low가 0/None이면 저역통과
+        order: 필터 차수
+
+    Returns:
+        ndarray: (n_sections, 6) SOS 계수 (캐시 공유 — 수정 금지)
+    """
+    nyquist = fs / 2.0
+    if not high or high >= nyquist:
+        raise ValueError(f"Bandpass high ({high} Hz) must be below Nyquist ({nyquist:g} Hz)")
+    if low and low >= high:
+        raise ValueError(f"Bandpass low ({low} Hz) must be below high ({high} Hz)")
+    if low:
+        sos = signal.butter(order, [low, high], btype='bandpass', fs=fs, output='sos')
+    else:
+        sos = signal.butter(order, high, btype='lowpass', fs=fs, output='sos')
+    return sos
+
+
+@lru_cache(maxsize=64)
+def design_antialias(factor, numtaps=None):
+    """
+    정수배 decimation용 저역통과 FIR (cutoff = 새 Nyquist)
+
+    Returns:
+        ndarray: FIR 계수 (캐시 공유 — 수정 금지)
+    """
+    numtaps = numtaps or ANTIALIAS_TAPS_PER_FACTOR * factor + 1
+    taps = signal.firwin(numtaps, 1.0 / factor, window=('kaiser', 5.0))
+    return taps
+
+
+def decimation_factor(fs, high, margin=DECIMATION_MARGIN):
+    """
+    대역 상한을 보존하는 최대 정수 decimation 배수
+
+    새 Nyquist(fs / 2q)가 margin × high 이상이 되도록 q를 고른다.
+    """
+    if not fs or not high:
+        return 1
+    return max(1, int(fs // (2.0 * margin * high)))
+
+
+# ============================================================================
+# 일괄(전체 배열) 처리
+# ============================================================================
+def decimate(values, factor, antialias=True):
+    """
+    정수배 다운샘플링 (모든 채널을 한 번에)
+
+    Args:
+        values: (C, N) 배열
+        factor: 정수 decimation 배수
+        antialias: True면 polyphase FIR 저역통과 후 추출 (resample_poly),
+                   False면 단순 간격 추출 (aliasing 가능)
+
+    Returns:
+        ndarray: (C, ceil(N / factor))
+    """
+    if factor <= 1:
+        return values
+    if not antialias:
+        return np.ascontiguousarray(values[:, ::factor])
+    out = signal.resample_poly(values, 1, factor, axis=-1, window=('kaiser', 5.0))
+    return out.astype(values.dtype, copy=False)
+
+
+def bandpass(values, fs, low, high, order=BANDPASS_ORDER, zero_phase=True):
+    """
+    SOS 대역통과 필터 (모든 채널을 2차원 배열 연산 한 번으로)
+
+    Args:
+        values: (C, N) 배열
+        fs: 샘플링 주파수
+        low, high: 통과 대역 (Hz)
+        zero_phase: True면 sosfiltfilt (위상 지연 없음), False면 인과 sosfilt
+
+    Returns:
+        ndarray: (C, N)
+    """
+    sos = design_bandpass(float(fs), float(low or 0), float(high), order)
+    if zero_phase:
+        # 짧은 기록에서도 동작하도록 padlen을 기록 길이에 맞게 제한
+        padlen = min(3 * (2 * len(sos) + 1), values.shape[-1] - 1)
+        out = signal.sosfiltfilt(sos, values, axis=-1, padlen=padlen)
+    else:
+        zi = signal.sosfilt_zi(sos)[:, None, :] * values[:, :1][None, :, :]
+        out, _ = signal.sosfilt(sos, values, axis=-1, zi=zi)
+    return out.astype(values.dtype, copy=False)
+
+
+def filter_values(values, fs, low, high, antialiasing=True, downsampling=True,
+                  order=BANDPASS_ORDER):
+    """
+    Step 3 필터링: (선택) decimation → zero-phase 대역통과
+
+    대역 상한이 충분히 낮으면 먼저 decimation하여 이후 필터 비용을 줄인다.
+
+    Returns:
+        tuple: (filtered (C, N'), 새 fs)
+    """
+    factor = decimation_factor(fs, high) if downsampling else 1
+    out = decimate(values, factor, antialias=antialiasing)
+    new_fs = fs / factor
+    return bandpass(out, new_fs, low, high, order=order), new_fs
+
+
+def filter_dataset(dataset, antialiasing='Yes', downsampling='Yes', bp_low=0.1, bp_high=3.2,
+                   wavelet='No'):
+    """
+    Analytics Step 3 입력값으로 Dataset 필터링 (wavelet='Yes'면 대역통과 후 웨이블릿 잡음 제거)
+
+    Returns:
+        tuple: (Dataset, report dict)
+    """
+    if not dataset.fs:
+        raise ValueError("Sampling rate unknown (no time column)")
+    started = time.perf_counter()
+    values = np.nan_to_num(dataset.values) if np.isnan(dataset.values).any() else dataset.values
+    out, new_fs = filter_values(values, dataset.fs, bp_low, bp_high,
+                                antialiasing=antialiasing == 'Yes',
+                                downsampling=downsampling == 'Yes')
+    if wavelet == 'Yes':
+        out = denoise(out)
+    factor = int(round(dataset.fs / new_fs))
+    time_arr = None if dataset.time is None else dataset.time[::factor][:out.shape[1]]
+    filtered = dataset.replace(values=out, time=time_arr, fs=new_fs, meta={'step3': {
+        'bandpass': [bp_low, bp_high], 'antialiasing': antialiasing,
+        'downsampling': downsampling, 'wavelet': wavelet, 'fs': new_fs,
+    }})
+    report = {'fs_in': dataset.fs, 'fs_out': new_fs, 'factor': factor,
+              'seconds': time.perf_counter() - started}
+    return filtered, report
+
+
+# ============================================================================
+# 블록 스트리밍 처리 (필터 상태를 청크 사이에 전달)
+# ============================================================================
+class StreamingFilter:
+    """
+    여러 날짜의 기록을 청크 단위로 필터링하는 상태 유지 필터
+
+    - decimation: FIR 저역통과(lfilter 상태 전달) 후 위상을 이어가며 추출
+    - 대역통과: 순방향 sosfilt 상태를 청크 사이에 전달
+    - zero_phase=True: 역방향 패스를 lookahead 구간만큼 지연시켜 적용
+      (하한 주파수 주기의 STREAM_SETTLE_PERIODS배 만큼 뒤 샘플까지 보고
+      역방향 필터를 돌리므로 출력이 그만큼 늦게 나온다). 잘림 오차는
+      lookahead 길이에 따라 지수적으로 감소한다.
+
+    사용 예:
+        stream = StreamingFilter(fs=100, low=0.1, high=3.2, n_channels=8)
+        for chunk in chunks:
+            out = stream.process(chunk)
+        out = stream.flush()
+    """
+
+    def __init__(self, fs, low, high, n_channels, antialiasing=True, downsampling=True,
+                 zero_phase=True, order=BANDPASS_ORDER, dtype=np.float32):
+        self.fs_in = float(fs)
+        self.factor = decimation_factor(fs, high) if downsampling else 1
+        self.fs = self.fs_in / self.factor
+        self.antialiasing = antialiasing
+        self.zero_phase = zero_phase
+        self.dtype = dtype
+        self.n_channels = n_channels
+
+        # decimation 상태
+        self._fir = design_antialias(self.factor) if self.factor > 1 and antialiasing else None
+        self._fir_zi = None
+        self._phase = 0                     # 다음 청크에서 추출할 첫 샘플 위치
+        self._fir_delay = 0 if self._fir is None else (len(self._fir) - 1) // 2
+        self._to_skip = self._fir_delay     # FIR 군지연 보정 (출력 앞부분 버림)
+        self._last = None                   # 마지막 입력 샘플 (flush 시 끝단 연장용)
+
+        # 대역통과 상태
+        self.sos = design_bandpass(self.fs, float(low or 0), float(high), order)
+        self._zi = None
+        self._lookahead = 0
+        if zero_phase:
+            period = 1.0 / low if low else 1.0 / high
+            self._lookahead = int(np.ceil(STREAM_SETTLE_PERIODS * period * self.fs))
+        self._pending = np.empty((n_channels, 0), dtype=np.float64)
+
+    # ------------------------------------------------------------------
+    def _decimate(self, chunk):
+        if self.factor == 1:
+            return chunk
+        if self._fir is not None:
+            if self._fir_zi is None:
+                zi = signal.lfilter_zi(self._fir, 1.0)
+                self._fir_zi = zi[None, :] * chunk[:, :1]
+            chunk, self._fir_zi = signal.lfilter(self._fir, 1.0, chunk, axis=-1, zi=self._fir_zi)
+            # 군지연만큼 출력 앞부분 버림 → 일괄 처리와 시간축 정렬
+            if self._to_skip:
+                drop = min(self._to_skip, chunk.shape[1])
+                chunk = chunk[:, drop:]
+                self._to_skip -= drop
+        out = chunk[:, self._phase::self.factor]
+        self._phase = (self._phase - chunk.shape[1]) % self.factor
+        return out
+
+    def _forward(self, chunk):
+        if self._zi is None:
+            self._zi = signal.sosfilt_zi(self.sos)[:, None, :] * chunk[:, :1][None, :, :]
+        out, self._zi = signal.sosfilt(self.sos, chunk, axis=-1, zi=self._zi)
+        return out
+
+    def _backward(self, forward, emit):
+        """forward 버퍼를 역방향 필터링하여 앞쪽 emit 샘플 반환"""
+        reversed_ = forward[:, ::-1]
+        zi = signal.sosfilt_zi(self.sos)[:, None, :] * reversed_[:, :1][None, :, :]
+        out, _ = signal.sosfilt(self.sos, reversed_, axis=-1, zi=zi)
+        return out[:, ::-1][:, :emit]
+
+    def process(self, chunk):
+        """
+        청크 하나 처리
+
+        Args:
+            chunk: (C, n) 배열 (입력 fs)
+
+        Returns:
+            ndarray: 지금까지 확정된 출력 샘플 (C, m) — zero_phase면 lookahead만큼 지연
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if not chunk.shape[1]:
+            return np.empty((self.n_channels, 0), dtype=self.dtype)
+        self._last = chunk[:, -1:]
+        return self._run(chunk)
+
+    def _run(self, chunk):
+        low_rate = self._decimate(chunk)
+        if not low_rate.shape[1]:
+            return np.empty((self.n_channels, 0), dtype=self.dtype)
+        forward = self._forward(low_rate)
+        if not self.zero_phase:
+            return forward.astype(self.dtype)
+
+        self._pending = np.concatenate([self._pending, forward], axis=1)
+        emit = self._pending.shape[1] - self._lookahead
+        if emit <= 0:
+            return np.empty((self.n_channels, 0), dtype=self.dtype)
+        out = self._backward(self._pending, emit)
+        self._pending = self._pending[:, emit:]
+        return out.astype(self.dtype)
+
+    def flush(self):
+        """남은 FIR 지연 / lookahead 구간 출력 (기록 끝)"""
+        parts = []
+        if self._fir is not None and self._last is not None and self._fir_delay:
+            # FIR 군지연만큼 마지막 값을 연장하여 밀어냄
+            self._to_skip = 0
+            tail = self._run(np.repeat(self._last, self._fir_delay, axis=1))
+            if tail.shape[1]:
+                parts.append(tail)
+            self._last = None
+        if self.zero_phase and self._pending.shape[1]:
+            parts.append(self._backward(self._pending, self._pending.shape[1]).astype(self.dtype))
+            self._pending = self._pending[:, :0]
+        if not parts:
+            return np.empty((self.n_channels, 0), dtype=self.dtype)
+        return np.concatenate(parts, axis=1)
+
+
+def stream_filter(chunks, fs, low, high, n_channels, **kwargs):
+    """
+    청크 iterable을 StreamingFilter로 처리하는 generator
+
+    Args:
+        chunks: (C, n) 배열들의 iterable (예: ingest.iter_csv_chunks의 .values)
+
+    Yields:
+        ndarray: 필터링된 출력 청크
+    """
+    stream = StreamingFilter(fs, low, high, n_channels, **kwargs)
+    for chunk in chunks:
+        out = stream.process(chunk)
+        if out.shape[1]:
+            yield out
+    tail = stream.flush()
+    if tail.shape[1]:
+        yield tail
+
+
+def benchmark(hours=24, fs=100, n_channels=16, chunk_seconds=600, seed=0):
+    """합성 기록으로 Step 3 일괄 처리 / 청크 스트리밍 소요 시간 측정"""
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 * fs)
+    t = np.arange(n) / fs
+    values = (rng.normal(scale=0.02, size=(n_channels, n)).astype(np.float32)
+              + np.sin(2 * np.pi * 1.2 * t, dtype=np.float32) * 0.05)
+
+    started = time.perf_counter()
+    batch, new_fs = filter_values(values, fs, 0.1, 3.2)
+    batch_seconds = time.perf_counter() - started
+
+    chunk = int(chunk_seconds * fs)
+    started = time.perf_counter()
+    streamed = np.concatenate(list(stream_filter(
+        (values[:, i:i + chunk] for i in range(0, n, chunk)), fs, 0.1, 3.2, n_channels)), axis=1)
+    stream_seconds = time.perf_counter() - started
+    # 양 끝(필터 안정화 구간)은 일괄 처리의 padding 방식에 따라 달라지므로 제외
+    edge = int(STREAM_SETTLE_PERIODS / 0.1 * new_fs)
+    m = min(batch.shape[1], streamed.shape[1]) - edge
+    return {'samples': n * n_channels, 'fs_out': new_fs,
+            'batch_seconds': round(batch_seconds, 3), 'stream_seconds': round(stream_seconds, 3),
+            'max_abs_diff': float(np.abs(batch[:, edge:m] - streamed[:, edge:m]).max())}
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Step 3 filtering benchmark")
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--fs', type=float, default=100)
+    parser.add_argument('--channels', type=int, default=16)
+    args = parser.parse_args()
+    print(benchmark(args.hours, args.fs, args.channels))
@@ -0,0 +1,613 @@
+import base64
+import binascii
+import gc
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+from scipy.spatial import Delaunay, QhullError
+
+try:
+    import orjson                   # 선택 의존성: 있으면 JSON 파싱이 몇 배 빠름
+except ImportError:
+    orjson = None
+
+# ============================================================================
+# wind farm 배치 GeoJSON 파싱 / 검증 (터빈, 해저 케이블, 변전소)
+# ============================================================================
+# 업로드는 한 번만 파싱하고, 모든 feature의 좌표를 (M, 2) [lon, lat] 배열 하나로 모은 뒤
+# 범위 / geometry 형식 / 구조 검사를 배열 연산으로 한 번에 한다. 오류는 첫 번째에서 멈추지 않고
+# 모두 모아 보고한다. 중심 / 범위 / 외곽선은 여기서 한 번 계산해 turbine-data Store에 넣는다.
+DEFAULT_CENTER = (34.87, 126.17)        # 데이터가 없을 때 지도 중심 (한국 서해안, lat, lon)
+ASSET_KINDS = ('turbine', 'substation', 'cable', 'boundary')
+# geometry 형식 → properties.type이 없을 때의 자산 종류
+DEFAULT_KINDS = {'Point': 'turbine', 'MultiPoint': 'turbine', 'LineString': 'cable', 'MultiLineString': 'cable',
+                 'Polygon': 'boundary', 'MultiPolygon': 'boundary'}
+MAX_ERRORS = 20                 # 화면에 표시하는 최대 오류 수 (나머지는 개수만)
+_NUMBER_KINDS = 'iuf'           # numpy dtype.kind: 정수 / 부호 없는 정수 / 실수 (bool, 문자열 제외)
+
+# 외곽선 (convex hull / alpha shape)은 좌표 내용 해시로 메모한다 → 같은 배치면 다시 계산하지 않음
+OUTLINE_CACHE_SIZE = 16         # 메모할 배치 수
+HULL_TOLERANCE = 1e-12          # 일직선 판정 외적 허용치 (좌표 범위² 대비)
+ALPHA_SPACING = 3.0             # concave hull 외접원 반지름 상한 = 터빈 간격 중앙값 × 이 값
+EARTH_RADIUS_M = 6371008.8      # 경위도 → 평면 (m) 근사용 평균 지구 반지름
+_outline_cache = OrderedDict()
+_outline_lock = threading.Lock()
+
+
+class GeometryError(ValueError):
+    """
+    GeoJSON 검증 실패 (errors: 발견한 모든 오류 메시지 목록)
+    """
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        shown = self.errors[:MAX_ERRORS]
+        more = len(self.errors) - len(shown)
+        super().__init__('\n'.join(shown + ([f'... and {more} more'] if more > 0 else [])))
+
+
+@contextmanager
+def _gc_paused():
+    """
+    큰 JSON을 파싱하는 동안 순환 참조 GC 정지
+
+    파싱은 컨테이너 객체 수만 개를 한꺼번에 만들어 세대별 GC가 반복 실행되는데, 새로 만든 객체에는
+    순환 참조가 없으므로 이 구간만 멈추면 파싱 / 구조 추출 시간이 절반 이하로 준다.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def loads(data):
+    """JSON 바이트 / 문자열 파싱 (orjson이 있으면 사용)"""
+    try:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    except ValueError:              # json.JSONDecodeError, orjson.JSONDecodeError 모두 ValueError
+        raise GeometryError(["Invalid JSON format"]) from None
+
+
+def decode_upload(contents):
+    """dcc.Upload contents ('data:...;base64,XXXX') → 원본 바이트"""
+    header, sep, encoded = contents.partition(',')
+    if not sep:
+        raise GeometryError(["Upload contents are not a data URL"])
+    try:
+        return binascii.a2b_base64(encoded)
+    except binascii.Error as e:
+        raise GeometryError([f"Invalid base64 content: {e}"]) from None
+
+
+def _flatten(geometry_type, coordinates):
+    """
+    geometry 좌표 → (위치 목록 [[lon, lat], ...], 선/링 목록 [(위치 수, ring 여부)])
+
+    고도(3번째 값)는 버린다. 구조가 맞지 않으면 TypeError / IndexError / KeyError.
+    """
+    if geometry_type == 'Point':
+        return [coordinates[:2]], []
+    if geometry_type == 'MultiPoint':
+        return [p[:2] for p in coordinates], []
+    if geometry_type == 'LineString':
+        lines, ring = [coordinates], False
+    elif geometry_type == 'MultiLineString':
+        lines, ring = coordinates, False
+    elif geometry_type == 'Polygon':
+        lines, ring = coordinates, True
+    else:
+        lines, ring = [r for polygon in coordinates for r in polygon], True
+    return [p[:2] for line in lines for p in line], [(len(line), ring) for line in lines]
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# ============================================================================
+# 외곽선: convex hull (monotone chain) / concave hull (alpha shape)
+# ============================================================================
+def _cross(o, a, b):
+    """(a - o) × (b - o) — 양수: 반시계, 음수: 시계, 0: 일직선"""
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _chain(points, tolerance):
+    """정렬된 점 목록의 반쪽 껍질 (일직선 / 시계 방향 꺾임은 제거, |외적| ≤ tolerance는 일직선으로 봄)"""
+    chain = []
+    for p in points:
+        while len(chain) >= 2 and _cross(chain[-2], chain[-1], p) <= tolerance:
+            chain.pop()
+        chain.append(p)
+    return chain
+
+
+def _interior_mask(points):
+    """
+    Akl–Toussaint 사전 필터: 8방향 극점이 이루는 볼록 다각형 안쪽에 엄격히 들어가는 점
+
+    이 점들은 껍질 꼭짓점이 될 수 없으므로 monotone chain 루프 전에 배열 연산으로 한 번에 버린다.
+    """
+    x, y = points[:, 0], points[:, 1]
+    s, d = x + y, x - y
+    # 지지 방향 순서(반시계)대로: 아래, 오른쪽 아래, 오른쪽, 오른쪽 위, 위, 왼쪽 위, 왼쪽, 왼쪽 아래
+    extremes = points[[y.argmin(), d.argmax(), x.argmax(), s.argmax(), y.argmax(), d.argmin(), x.argmin(),
+                       s.argmin()]]
+    extremes = extremes[np.any(extremes != np.roll(extremes, 1, axis=0), axis=1)]  # 겹친 극점 제거
+    if len(extremes) < 3:
+        return np.zeros(len(points), dtype=bool)
+    inside = np.ones(len(points), dtype=bool)
+    for a, b in zip(extremes, np.roll(extremes, -1, axis=0)):
+        inside &= (b[0] - a[0]) * (y - a[1]) - (b[1] - a[1]) * (x - a[0]) > 0
+    return inside
+
+
+def convex_hull(points):
+    """
+    Andrew monotone chain convex hull (O(n log n))
+
+    x, y 사전식 정렬 후 아래 / 위 껍질을 한 번씩 훑는다. 각도(atan2) 정렬이 없어 일직선 / 중복 점에서도
+    결과가 안정적이고, 일직선 위의 점은 꼭짓점에서 제외한다.
+
+    Args:
+        points: (N, 2) 좌표 [x, y] (경위도면 [lon, lat])
+
+    Returns:
+        ndarray: (H, 2) 반시계 방향 꼭짓점 (시작점 반복 없음), 서로 다른 점이 3개 미만이거나 모두 일직선이면 H < 3
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) > 8:
+        points = points[~_interior_mask(points)]
+    points = points[np.lexsort((points[:, 1], points[:, 0]))]
+    if len(points) > 1:
+        points = points[np.r_[True, np.any(points[1:] != points[:-1], axis=1)]]
+    if len(points) < 3:
+        return points
+    # 부동소수점 반올림으로 일직선 점이 미세하게 꺾여 보이는 것을 막는 외적 허용치 (좌표 범위 기준 상대값)
+    tolerance = HULL_TOLERANCE * float(np.ptp(points, axis=0).max()) ** 2
+    ordered = points.tolist()
+    lower, upper = _chain(ordered, tolerance), _chain(reversed(ordered), tolerance)
+    return np.array(lower[:-1] + upper[:-1])
+
+
+def _project(points):
+    """경위도 [lon, lat] → 배치 중심 기준 평면 좌표 (m, 등장방형 근사 — wind farm 규모에서 충분)"""
+    lat0 = math.radians(float(points[:, 1].mean()))
+    scale = math.radians(1.0) * EARTH_RADIUS_M
+    return np.column_stack([points[:, 0] * scale * math.cos(lat0), points[:, 1] * scale])
+
+
+def _ring_area(ring):
+    """닫히지 않은 고리 (K, 2)의 부호 있는 면적 (반시계 > 0)"""
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def concave_hull(points, radius=None):
+    """
+    alpha shape 외곽선 (concave hull)
+
+    Delaunay 삼각형 중 외접원 반지름이 radius 이하인 것만 남기고, 남은 영역의 경계 변을 고리로 잇는다.
+    L자 / 여러 군집처럼 볼록하지 않은 배치에서 convex hull이 덮는 빈 바다를 잘라낸다.
+
+    Args:
+        points: (N, 2) 좌표 [lon, lat]
+        radius: 외접원 반지름 상한 (m), None이면 터빈 간격 중앙값 × ALPHA_SPACING
+
+    Returns:
+        list: 바깥 고리 [(K, 2) [lon, lat], ...] (반시계, 면적 큰 순, 내부 구멍은 제외)
+              남는 삼각형이 없거나 일직선이면 convex hull 하나 (3점 미만이면 빈 목록)
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    hull = convex_hull(points)
+    if len(hull) < 3:
+        return []
+    xy = _project(points)
+    try:
+        simplices = Delaunay(xy).simplices
+    except QhullError:
+        return [hull]
+    a, b, c = xy[simplices[:, 0]], xy[simplices[:, 1]], xy[simplices[:, 2]]
+    ab, bc, ca = (np.hypot(*(q - p).T) for p, q in ((a, b), (b, c), (c, a)))
+    cross = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        circumradius = ab * bc * ca / (2.0 * np.abs(cross))         # R = abc / (4 × 면적)
+    if radius is None:
+        spacing = np.minimum(np.minimum(ab, bc), ca)              # 삼각형별 최단 변 ≈ 이웃 터빈 간격
+        radius = ALPHA_SPACING * float(np.median(spacing[spacing > 0])) if np.any(spacing > 0) else np.inf
+    keep = circumradius <= radius
+    if not keep.any():
+        return [hull]
+    # 반시계로 맞춘 삼각형의 방향 변 중 역방향 변이 없는 것이 경계 (안쪽이 왼쪽 → 바깥 고리는 반시계)
+    tri = simplices[keep]
+    flip = cross[keep] < 0
+    tri[flip] = tri[flip][:, [0, 2, 1]]
+    starts, ends = tri.ravel(), tri[:, [1, 2, 0]].ravel()
+    n = len(points)
+    boundary = ~np.isin(starts * n + ends, ends * n + starts)
+    following = {}
+    for i, j in zip(starts[boundary].tolist(), ends[boundary].tolist()):
+        following.setdefault(i, []).append(j)
+    rings = []
+    while following:
+        start = next(iter(following))
+        ring, vertex = [start], start
+        while True:
+            targets = following[vertex]
+            nxt = targets.pop()
+            if not targets:
+                del following[vertex]
+            if nxt == start:
+                break
+            ring.append(nxt)
+            vertex = nxt
+            if vertex not in following:       # 경계가 끊긴 경우 (수치 오차) — 지금까지의 고리로 마감
+                break
+        ring = points[ring]
+        if len(ring) >= 3 and _ring_area(ring) > 0:
+            rings.append(ring)
+    rings.sort(key=_ring_area, reverse=True)
+    return rings or [hull]
+
+
+def farm_outline(points, radius=None):
+    """
+    배치 외곽선 (convex + concave), 좌표 내용 해시로 메모
+
+    같은 좌표 배열이면 (주파수 / 이상 탐지 결과만 바뀌어 지도를 다시 그려도) 다시 계산하지 않는다.
+
+    Args:
+        points: (N, 2) 좌표 [lon, lat]
+        radius: concave hull 외접원 반지름 상한 (m), None이면 자동
+
+    Returns:
+        dict: {key: 좌표 해시, hull: [[lat, lon], ...] | None, outline: [[[lat, lon], ...], ...]}
+    """
+    points = np.ascontiguousarray(points, dtype=float).reshape(-1, 2)
+    digest = hashlib.sha1(points.tobytes())
+    digest.update(repr(radius).encode())
+    key = digest.hexdigest()
+    with _outline_lock:
+        if key in _outline_cache:
+            _outline_cache.move_to_end(key)
+            return _outline_cache[key]
+    hull = convex_hull(points)
+    result = {'key': key,
+              'hull': hull[:, ::-1].tolist() if len(hull) >= 3 else None,
+              'outline': [ring[:, ::-1].tolist() for ring in concave_hull(points, radius)]}
+    with _outline_lock:
+        _outline_cache[key] = result
+        while len(_outline_cache) > OUTLINE_CACHE_SIZE:
+            _outline_cache.popitem(last=False)
+    return result
+
+
+# ============================================================================
+# 배치 (파싱 결과)
+# ============================================================================
+class FleetLayout:
+    """
+    검증된 wind farm 배치
+
+    Attributes:
+        geojson: 원본 FeatureCollection (dict)
+        kinds: feature별 자산 종류 ('turbine', 'substation', 'cable', 'boundary')
+        coords: (M, 2) 모든 위치 [lon, lat] — 앞의 P개는 Point feature (feature 순서), 나머지는 선/면 꼭짓점
+        owner: (M,) 각 위치의 feature 번호
+        n_points: Point feature 수
+        turbine_ids: Point 터빈 feature의 properties.id (순서대로)
+        turbines: (T, 2) 터빈 위치 [lon, lat]
+    """
+
+    def __init__(self, geojson, kinds, coords, owner, n_points, turbine_ids, turbines):
+        self.geojson = geojson
+        self.kinds = kinds
+        self.coords = coords
+        self.owner = owner
+        self.n_points = n_points
+        self.turbine_ids = turbine_ids
+        self.turbines = turbines
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @property
+    def points(self):
+        """(P, 2) Point 자산 위치 (터빈 + 변전소)"""
+        return self.coords[:self.n_points]
+
+    def counts(self):
+        """자산 종류별 feature 수"""
+        return dict(Counter(self.kinds))
+
+    def center(self):
+        """지도 중심 [lat, lon] (터빈 평균, 터빈이 없으면 전체 위치 평균)"""
+        points = self.turbines if len(self.turbines) else self.coords
+        if not len(points):
+            return list(DEFAULT_CENTER)
+        lon, lat = points.mean(axis=0)
+        return [float(lat), float(lon)]
+
+    def bounds(self):
+        """[[south, west], [north, east]] (dl.Map bounds 형식)"""
+        if not len(self.coords):
+            return None
+        (west, south), (east, north) = self.coords.min(axis=0), self.coords.max(axis=0)
+        return [[float(south), float(west)], [float(north), float(east)]]
+
+    def outline(self):
+        """Point 자산 외곽선 {key, hull, outline} (farm_outline, 같은 좌표면 메모된 결과)"""
+        return farm_outline(self.points)
+
+    def hull(self):
+        """Point 자산 convex hull [[lat, lon], ...] (반시계 방향, 3점 미만 / 일직선이면 None)"""
+        return self.outline()['hull']
+
+    def summary(self):
+        """turbine-data['geometry'] 항목 (JSON 직렬화 가능)"""
+        outline = self.outline()
+        return {'center': self.center(), 'bounds': self.bounds(), 'hull': outline['hull'],
+                'outline': outline['outline'], 'outline_key': outline['key'], 'counts': self.counts(),
+                'features': len(self)}
+
+
+def _coordinate_array(positions, owner, flag):
+    """
+    위치 목록 → (M, 2) float 배열
+
+    보통은 numpy 변환 한 번으로 끝난다. 숫자가 아닌 값 / 길이가 다른 위치가 섞여 있으면
+    위치별로 골라 해당 feature에 오류를 표시하고 그 위치는 NaN으로 둔다.
+    """
+    if not positions:
+        return np.zeros((0, 2))
+    try:
+        coords = np.array(positions)
+    except ValueError:              # 길이가 다른 위치 (ragged)
+        coords = None
+    if coords is not None and coords.ndim == 2 and coords.shape[1] == 2 and coords.dtype.kind in _NUMBER_KINDS:
+        return coords.astype(np.float64, copy=False)
+    valid = np.array([isinstance(p, list) and len(p) == 2 and _is_number(p[0]) and _is_number(p[1])
+                      for p in positions], dtype=bool)
+    bad = np.unique(owner[~valid])
+    flag(bad, ['Invalid coordinates'] * len(bad))
+    coords = np.full((len(positions), 2), np.nan)
+    if valid.any():
+        coords[valid] = np.array([positions[k] for k in np.flatnonzero(valid)], dtype=np.float64)
+    return coords
+
+
+def validate(geojson):
+    """
+    FeatureCollection 검증 → FleetLayout
+
+    feature 목록은 구조(geometry 형식, 좌표, 자산 종류, ID)를 꺼내는 한 번만 순회하고,
+    좌표 숫자 / 범위 / 선·ring 구조 검사는 모은 배열에 한 번에 적용한다.
+
+    검사: FeatureCollection / features 존재, geometry 누락, 지원하지 않는 geometry 형식, 좌표 구조
+    (숫자 위치, 고도는 무시), 경도 [-180, 180] / 위도 [-90, 90], 선 2점 이상, polygon ring 4점 이상 + 닫힘,
+    자산 종류, 터빈 ID 중복. 모든 오류를 모아 GeometryError로 보고한다.
+    """
+    if not isinstance(geojson, dict) or geojson.get('type') != 'FeatureCollection':
+        raise GeometryError(["Invalid GeoJSON: Must be a FeatureCollection"])
+    features = geojson.get('features')
+    if not features or not isinstance(features, list):
+        raise GeometryError(["Invalid GeoJSON: No features found"])
+
+    problems = {}                   # feature 번호 → 첫 오류 메시지 (feature 순서로 보고)
+
+    def flag(index, messages):
+        for i, message in zip(np.asarray(index).tolist(), messages):
+            problems.setdefault(i, message)
+
+    # 구조 추출 (feature당 한 번)
+    kinds = [None] * len(features)
+    points, point_owner, turbine_ids, turbine_rows = [], [], [], []
+    positions, position_owner, parts = [], [], []   # part: (시작 위치, 위치 수, ring 여부, feature 번호)
+    for i, feature in enumerate(features):
+        try:
+            geometry = feature['geometry']
+            geometry_type = geometry['type']
+            coordinates = geometry['coordinates']
+        except (TypeError, KeyError):
+            problems[i] = 'Missing geometry'
+            continue
+        properties = feature.get('properties')
+        declared = properties.get('type') if isinstance(properties, dict) else None
+        kind = kinds[i] = declared or DEFAULT_KINDS.get(geometry_type)
+        if geometry_type not in DEFAULT_KINDS:
+            problems[i] = f'Unsupported geometry type ({geometry_type})'
+            continue
+        if kind not in ASSET_KINDS:
+            problems[i] = f'Unknown asset type ({kind})'
+        if geometry_type == 'Point':
+            if kind == 'turbine':
+                turbine_rows.append(len(points))
+                turbine_ids.append(str(properties.get('id', '')) if isinstance(properties, dict) else '')
+            points.append(coordinates[:2] if isinstance(coordinates, list) else coordinates)
+            point_owner.append(i)
+            continue
+        try:
+            vertices, lines = _flatten(geometry_type, coordinates)
+        except (TypeError, IndexError, KeyError):
+            problems.setdefault(i, 'Invalid coordinates')
+            continue
+        begin = len(positions)
+        for length, ring in lines:
+            parts.append((begin, length, ring, i))
+            begin += length
+        positions += vertices
+        position_owner += [i] * len(vertices)
+
+    # 좌표 배열 (Point 먼저, 그 뒤 선/면 꼭짓점) + 숫자 / 범위 검사
+    owner = np.array(point_owner + position_owner, dtype=np.int64)
+    coords = _coordinate_array(points + positions, owner, flag)
+    for axis, name, limit in ((0, 'longitude', 180), (1, 'latitude', 90)):
+        values = coords[:, axis]
+        bad = np.flatnonzero(np.abs(values) > limit)
+        features_bad, first = np.unique(owner[bad], return_index=True)
+        flag(features_bad, [f'Invalid {name} ({values[bad[k]]:g})' for k in first])
+    nonfinite = np.unique(owner[~np.isfinite(coords).all(axis=1)])
+    flag(nonfinite, ['Invalid coordinates'] * len(nonfinite))
+
+    # 선 / ring 구조 (위치 수, 닫힘)
+    if parts:
+        begin, lengths, rings, part_owner = (np.array(column) for column in zip(*parts))
+        begin = begin + len(points)
+        short_line = ~rings & (lengths < 2)
+        short_ring = rings & (lengths < 4)
+        closed = rings & ~short_ring
+        open_ring = np.zeros(len(parts), dtype=bool)
+        open_ring[closed] = np.any(coords[begin[closed]] != coords[begin[closed] + lengths[closed] - 1], axis=1)
+        flag(part_owner[short_line], ['LineString needs at least 2 positions'] * int(short_line.sum()))
+        flag(part_owner[short_ring], ['Polygon ring needs at least 4 positions'] * int(short_ring.sum()))
+        flag(part_owner[open_ring], ['Polygon ring is not closed'] * int(open_ring.sum()))
+
+    # 터빈 ID 중복 (빈 ID는 허용)
+    if len(set(turbine_ids)) != len(turbine_ids):
+        first = {}
+        for row, turbine_id in zip(turbine_rows, turbine_ids):
+            if turbine_id and first.setdefault(turbine_id, row) != row:
+                problems.setdefault(point_owner[row], f'Duplicate turbine id ({turbine_id})')
+
+    if problems:
+        raise GeometryError([f'Feature {i + 1}: {problems[i]}' for i in sorted(problems)])
+    return FleetLayout(geojson, kinds, coords, owner, len(points), turbine_ids, coords[turbine_rows])
+
+
+def parse_upload(contents):
+    """dcc.Upload contents → FleetLayout (검증 실패 시 GeometryError)"""
+    data = decode_upload(contents)
+    with _gc_paused():
+        return validate(loads(data))
+
+
+def layout_from_geojson(geojson):
+    """Store에 저장된 GeoJSON (이미 검증됨) → FleetLayout"""
+    return validate(geojson)
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def simulate_layout(turbines=10000, substations=20, cables=500, bad=0, seed=0):
+    """
+    wind farm 배치 GeoJSON 모사 (격자 배치 + 변전소 + 케이블 LineString + 경계 Polygon)
+
+    bad개 터빈은 잘못된 경도로 만든다 (오류 수집 확인용).
+    """
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(turbines)))
+    grid = np.stack(np.meshgrid(np.arange(side), np.arange(side)), axis=-1).reshape(-1, 2)[:turbines]
+    lonlat = np.array([126.0, 34.5]) + grid * 0.01 + rng.normal(0, 0.001, (turbines, 2))
+    features = [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [round(x, 6), round(y, 6)]},
+                 'properties': {'id': f'T{k:05d}', 'name': f'Turbine {k}', 'capacity': '8 MW',
+                                'install_year': 2024, 'status': 'operating'}}
+                for k, (x, y) in enumerate(lonlat.tolist())]
+    for k in rng.choice(turbines, bad, replace=False):
+        features[k]['geometry']['coordinates'][0] = 200.0
+    stations = lonlat[rng.choice(turbines, substations, replace=False)] + 0.003
+    features += [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': p},
+                  'properties': {'id': f'S{k:02d}', 'type': 'substation'}} for k, p in enumerate(stations.tolist())]
+    for k in range(cables):
+        path = lonlat[rng.choice(turbines, 5, replace=False)]
+        features.append({'type': 'Feature', 'geometry': {'type': 'LineString', 'coordinates': path.tolist()},
+                         'properties': {'id': f'C{k:03d}', 'type': 'cable'}})
+    (west, south), (east, north) = lonlat.min(axis=0) - 0.01, lonlat.max(axis=0) + 0.01
+    features.append({'type': 'Feature', 'properties': {'type': 'boundary'}, 'geometry': {
+        'type': 'Polygon', 'coordinates': [[[west, south], [east, south], [east, north], [west, north],
+                                            [west, south]]]}})
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def _legacy_parse(contents):
+    """기존 map_overlay 경로 (feature별 검증 + 중심 계산, 케이블 / 변전소 미지원이라 Point만)"""
+    geojson = json.loads(base64.b64decode(contents.split(',')[1]).decode('utf-8'))
+    points = [f for f in geojson['features'] if f['geometry']['type'] == 'Point']
+    for feature in points:
+        lon, lat = feature['geometry']['coordinates']
+        if not (-180 <= lon <= 180) or not (-90 <= lat <= 90):
+            return None
+    lats = [f['geometry']['coordinates'][1] for f in points]
+    lons = [f['geometry']['coordinates'][0] for f in points]
+    return [sum(lats) / len(lats), sum(lons) / len(lons)]
+
+
+def _legacy_hull(points):
+    """기존 map_overlay convex_hull (atan2 각도 정렬 Graham scan, [[lat, lon], ...])"""
+    start = min(points, key=lambda p: (p[0], p[1]))
+    ordered = sorted(points, key=lambda p: math.atan2(p[0] - start[0], p[1] - start[1]))
+    hull = []
+    for point in ordered:
+        while len(hull) > 1 and ((hull[-1][1] - hull[-2][1]) * (point[0] - hull[-2][0])
+                                 - (hull[-1][0] - hull[-2][0]) * (point[1] - hull[-2][1])) <= 0:
+            hull.pop()
+        hull.append(point)
+    return hull
+
+
+def _timed(fn, repeat):
+    """fn() 평균 실행 시간 (ms)와 마지막 결과"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return 1e3 * (time.perf_counter() - started) / repeat, result
+
+
+def benchmark(turbines=10000, repeat=5):
+    """
+    10,000+ 자산 배치 업로드: 파싱 + 검증 + 중심 / 범위 / 외곽선 vs 기존 경로, 오류 1% 수집
+
+    외곽선은 기존 Graham scan / monotone chain / alpha shape 각각, 그리고 같은 배치로 지도를 다시 그릴 때
+    (메모 적중)를 따로 잰다.
+
+    Returns:
+        dict: feature 수, 기존 / 새 경로 ms, 외곽선 ms, 오류 보고 ms / 개수, JSON 파서
+    """
+    data = json.dumps(simulate_layout(turbines)).encode()
+    contents = 'data:application/geo+json;base64,' + base64.b64encode(data).decode('ascii')
+    legacy_ms, _ = _timed(lambda: _legacy_parse(contents), repeat)
+
+    def upload():
+        _outline_cache.clear()
+        return parse_upload(contents).summary()
+    new_ms, summary = _timed(upload, repeat)
+    points = layout_from_geojson(json.loads(data)).points
+    latlon = points[:, ::-1].tolist()
+    legacy_hull_ms, _ = _timed(lambda: _legacy_hull(latlon), repeat)
+    hull_ms, _ = _timed(lambda: convex_hull(points), repeat)
+    concave_ms, rings = _timed(lambda: concave_hull(points), repeat)
+    cached_ms, _ = _timed(lambda: farm_outline(points.copy()), repeat)
+    broken = json.dumps(simulate_layout(turbines, bad=turbines // 100)).encode()
+    started = time.perf_counter()
+    try:
+        with _gc_paused():
+            validate(loads(broken))
+        errors = []
+    except GeometryError as e:
+        errors = e.errors
+    error_ms = 1e3 * (time.perf_counter() - started)
+    return {'features': summary['features'], 'counts': summary['counts'], 'mb': round(len(data) / 1e6, 1),
+            'legacy_ms': round(legacy_ms, 1), 'parse_validate_summary_ms': round(new_ms, 1),
+            'hull_vertices': len(summary['hull'] or []), 'legacy_hull_ms': round(legacy_hull_ms, 2),
+            'hull_ms': round(hull_ms, 2), 'concave_ms': round(concave_ms, 1), 'concave_rings': len(rings),
+            'outline_cached_ms': round(cached_ms, 3), 'errors_reported': len(errors),
+            'error_ms': round(error_ms, 1), 'parser': 'orjson' if orjson is not None else 'json'}
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Wind farm layout GeoJSON parsing/validation")
+    parser.add_argument('--turbines', type=int, default=10000)
+    args = parser.parse_args()
+    print(benchmark(args.turbines))
@@ -0,0 +1,339 @@
+import base64
+import binascii
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.pipelines.dataset import Dataset, detect_time_column, infer_sample_rate
+
+# 한 번에 파싱할 행 수 (청크 크기)
+DEFAULT_CHUNK_ROWS = 250_000
+
+# base64 입력을 한 번에 디코딩할 문자 수 (4의 배수)
+_B64_BLOCK = 4 * 1024 * 1024
+
+
+class IngestError(ValueError):
+    """CSV 파일을 Dataset으로 읽을 수 없을 때 발생"""
+
+
+# ============================================================================
+# base64 스트리밍 디코더
+# ============================================================================
+class Base64Reader(io.RawIOBase):
+    """
+    dcc.Upload의 base64 문자열을 블록 단위로 디코딩하는 읽기 전용 스트림
+
+    전체 바이트열 / 전체 문자열 사본을 만들지 않고 pandas 파서에
+    직접 바이트를 공급한다.
+    """
+
+    def __init__(self, encoded):
+        self._encoded = encoded
+        self._pos = 0
+        self._buffer = b''
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._offset
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # 처음으로 되감기만 지원 (헤더 재파싱용)
+        if whence == io.SEEK_SET and offset == 0:
+            self._pos, self._buffer, self._offset = 0, b'', 0
+            return 0
+        if whence == io.SEEK_CUR and offset == 0:
+            return self._offset
+        raise io.UnsupportedOperation("Base64Reader can only rewind to the start")
+
+    def readinto(self, b):
+        while not self._buffer and self._pos < len(self._encoded):
+            block = self._encoded[self._pos:self._pos + _B64_BLOCK]
+            self._pos += _B64_BLOCK
+            try:
+                self._buffer = base64.b64decode(block)
+            except binascii.Error as e:
+                raise IngestError(f"Invalid base64 content: {e}") from e
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        self._offset += n
+        return n
+
+
+def open_upload(contents):
+    """
+    dcc.Upload contents ('data:...;base64,XXXX')를 바이너리 스트림으로 변환
+
+    Returns:
+        io.BufferedReader
+    """
+    header, sep, encoded = contents.partition(',')
+    if not sep:
+        raise IngestError("Upload contents are not a data URL")
+    return io.BufferedReader(Base64Reader(encoded), buffer_size=1024 * 1024)
+
+
+# ============================================================================
+# 청크 단위 CSV 파싱
+# ============================================================================
+def _inspect(source, time_column, chunk_rows):
+    """
+    첫 청크로 CSV 구조 판별 후 source를 처음으로 되감기
+
+    Returns:
+        dict: {'columns', 'time_column', 'channels', 'others', 'time_format'}
+    """
+    try:
+        head = pd.read_csv(source, nrows=min(chunk_rows, 10_000))
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise IngestError(f"Could not parse CSV: {e}") from e
+    if head.empty:
+        raise IngestError("CSV contains no data rows")
+
+    if time_column is None:
+        time_column = detect_time_column(head)
+    channels = [c for c in head.columns
+                if c != time_column and pd.api.types.is_numeric_dtype(head[c])]
+    others = [c for c in head.columns if c != time_column and c not in channels]
+
+    # 시간 형식: 첫 청크에서 ISO8601로 파싱되면 이후에도 빠른 경로 사용
+    time_format = None
+    if time_column is not None and not pd.api.types.is_numeric_dtype(head[time_column]):
+        iso = pd.to_datetime(head[time_column], errors='coerce', format='ISO8601')
+        time_format = 'ISO8601' if iso.notna().sum() == head[time_column].notna().sum() else 'mixed'
+
+    # 판별이 끝나면 처음부터 다시 읽기
+    if hasattr(source, 'seek') and source.seekable():
+        source.seek(0)
+    elif not isinstance(source, (str, os.PathLike)):
+        raise IngestError("Source stream must be seekable")
+
+    return {'columns': list(head.columns), 'time_column': time_column,
+            'channels': channels, 'others': others, 'time_format': time_format}
+
+
+def iter_csv_chunks(source, time_column=None, dtype=np.float32,
+                    chunk_rows=DEFAULT_CHUNK_ROWS, lenient=False):
+    """
+    CSV를 청크 단위 Dataset으로 차례로 반환 (전체를 메모리에 올리지 않음)
+
+    첫 청크로 시간 컬럼과 센서(숫자) 컬럼을 판별한 뒤, 이후 청크는
+    센서 채널을 바로 dtype(float32)으로 파싱한다. 행 단위 파이썬 객체는
+    만들지 않는다.
+
+    Args:
+        source: 파일 경로, 바이너리 파일 객체, 또는 bytes
+        time_column: 시간 컬럼 이름 (None이면 자동 탐지)
+        dtype: 센서 채널 dtype
+        chunk_rows: 청크당 행 수
+        lenient: True면 숫자로 변환할 수 없는 값을 NaN으로 처리 (느림)
+
+    Yields:
+        Dataset: 청크 하나 (values, time, extra)
+
+    Raises:
+        IngestError: 빈 파일, 파싱 실패 등
+        ValueError: lenient=False에서 센서 컬럼에 숫자가 아닌 값이 섞인 경우
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    layout = _inspect(source, time_column, chunk_rows)
+    time_column = layout['time_column']
+    channels, others = layout['channels'], layout['others']
+    time_format = layout['time_format']
+
+    if lenient:
+        dtypes = str
+    else:
+        dtypes = {c: dtype for c in channels}
+        dtypes.update({c: str for c in others})
+        if time_format is not None:
+            dtypes[time_column] = str
+
+    reader = pd.read_csv(source, dtype=dtypes, chunksize=chunk_rows, usecols=layout['columns'])
+    for chunk in reader:
+        block = np.empty((len(channels), len(chunk)), dtype=dtype)
+        for i, col in enumerate(channels):
+            column = pd.to_numeric(chunk[col], errors='coerce') if lenient else chunk[col]
+            block[i] = column.to_numpy(dtype=dtype, na_value=np.nan)
+        time_block = None
+        if time_column is not None:
+            column = chunk[time_column]
+            if lenient and time_format is None:
+                column = pd.to_numeric(column, errors='coerce')
+            time_block = _parse_time(column, time_format)
+        extra = {c: chunk[c].fillna('').to_numpy(dtype=str) for c in others}
+        yield Dataset(block, [str(c) for c in channels], time=time_block,
+                      time_name=time_column, extra=extra)
+
+
+def ingest_csv(source, time_column=None, dtype=np.float32,
+               chunk_rows=DEFAULT_CHUNK_ROWS, meta=None):
+    """
+    CSV를 청크 단위로 파싱하여 컬럼형 Dataset 생성
+
+    iter_csv_chunks의 청크별 배열을 마지막에 한 번만 이어 붙인다.
+
+    Args:
+        source: 파일 경로, 바이너리 파일 객체, 또는 bytes
+        time_column: 시간 컬럼 이름 (None이면 자동 탐지)
+        dtype: 센서 채널 dtype
+        chunk_rows: 청크당 행 수
+        meta: Dataset.meta에 넣을 부가 정보
+
+    Returns:
+        Dataset
+
+    Raises:
+        IngestError: 빈 파일, 파싱 실패 등
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        chunks = list(iter_csv_chunks(source, time_column, dtype, chunk_rows))
+    except IngestError:
+        raise
+    except ValueError as e:
+        # 첫 청크 이후에 숫자가 아닌 값이 섞인 경우 → 느린 경로로 재시도
+        if not isinstance(source, (str, os.PathLike)):
+            if not source.seekable():
+                raise IngestError(f"Could not parse CSV: {e}") from e
+            source.seek(0)
+        chunks = list(iter_csv_chunks(source, time_column, dtype, chunk_rows, lenient=True))
+    return concat_chunks(chunks, meta)
+
+
+def concat_chunks(chunks, meta=None):
+    """청크 Dataset 리스트를 하나의 Dataset으로 결합 (입력 리스트는 비워짐)"""
+    first = chunks[0]
+    values = np.concatenate([c.values for c in chunks], axis=1) if len(chunks) > 1 else first.values
+    time_arr = None
+    if first.time is not None:
+        time_arr = np.concatenate([c.time for c in chunks]) if len(chunks) > 1 else first.time
+    extra = {name: np.concatenate([c.extra[name] for c in chunks]) for name in first.extra}
+    channels, time_name = first.channels, first.time_name
+    chunks.clear()
+    return Dataset(values, channels, time=time_arr, time_name=time_name,
+                   fs=infer_sample_rate(time_arr), extra=extra, meta=meta)
+
+
+def _parse_time(column, time_format):
+    """시간 컬럼 청크 → datetime64[ns] 또는 float64 배열"""
+    if time_format is None:
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.to_datetime(column, errors='coerce', format=time_format).to_numpy(dtype='datetime64[ns]')
+
+
+def ingest_upload(contents, filename=None, **kwargs):
+    """
+    dcc.Upload contents를 스트리밍 디코딩하여 Dataset 생성
+
+    Args:
+        contents: base64 data URL 문자열
+        filename: 원본 파일명 (meta에 기록)
+
+    Returns:
+        Dataset
+    """
+    meta = {'filename': filename} if filename else None
+    return ingest_csv(open_upload(contents), meta=meta, **kwargs)
+
+
+# ============================================================================
+# 벤치마크: 기존 경로(base64 → str → StringIO → read_csv) vs 스트리밍 경로
+# ============================================================================
+def make_sample_csv(path, hours=24, fs=100, n_channels=8, seed=0):
+    """벤치마크용 합성 가속도 CSV 생성 (time + ch1..chN)"""
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 * fs)
+    start = np.datetime64('2024-01-01T00:00:00', 'ns')
+    step = np.timedelta64(int(1e9 / fs), 'ns')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('time,' + ','.join(f'ch{i + 1}' for i in range(n_channels)) + '\n')
+        for begin in range(0, n, DEFAULT_CHUNK_ROWS):
+            rows = min(DEFAULT_CHUNK_ROWS, n - begin)
+            t = start + step * np.arange(begin, begin + rows)
+            frame = pd.DataFrame(rng.normal(scale=0.05, size=(rows, n_channels)).round(6),
+                                 columns=[f'ch{i + 1}' for i in range(n_channels)])
+            frame.insert(0, 'time', pd.to_datetime(t).strftime('%Y-%m-%dT%H:%M:%S.%f'))
+            frame.to_csv(f, header=False, index=False)
+    return path
+
+
+def _legacy_parse(contents):
+    content_type, content_string = contents.split(',')
+    decoded = base64.b64decode(content_string)
+    return pd.read_csv(io.StringIO(decoded.decode('utf-8')))
+
+
+def _bench_child(path, mode, queue):
+    import resource
+    with open(path, 'rb') as f:
+        contents = 'data:text/csv;base64,' + base64.b64encode(f.read()).decode('ascii')
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == 'legacy':
+        rows = len(_legacy_parse(contents))
+    else:
+        rows = ingest_upload(contents).n_samples
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((rows, elapsed, (peak - baseline) / 1024.0))
+
+
+def benchmark(hours=24, fs=100, n_channels=8, path=None):
+    """
+    기존 업로드 경로와 스트리밍 ingest의 로드 시간 / 최대 RSS 증가량 비교
+
+    각 경로는 별도 프로세스에서 실행된다 (ru_maxrss는 프로세스 단위 최댓값).
+    업로드 문자열 자체(두 경로 공통)는 기준값에 포함되어 차이에서 제외된다.
+
+    Returns:
+        dict: {mode: {'rows', 'seconds', 'peak_rss_mb'}}
+    """
+    import multiprocessing as mp
+    import tempfile
+
+    cleanup = path is None
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), f'snugeoshm_bench_{hours}h_{n_channels}ch.csv')
+    if not os.path.exists(path):
+        make_sample_csv(path, hours, fs, n_channels)
+
+    ctx = mp.get_context('spawn')
+    results = {}
+    try:
+        for mode in ('legacy', 'streaming'):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_bench_child, args=(path, mode, queue))
+            proc.start()
+            rows, elapsed, peak_mb = queue.get()
+            proc.join()
+            results[mode] = {'rows': rows, 'seconds': round(elapsed, 2),
+                             'peak_rss_mb': round(peak_mb, 1)}
+    finally:
+        if cleanup:
+            os.remove(path)
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="CSV ingestion benchmark")
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--fs', type=float, default=100)
+    parser.add_argument('--channels', type=int, default=8)
+    args = parser.parse_args()
+    for mode, result in benchmark(args.hours, args.fs, args.channels).items():
+        print(f"{mode:>10}: {result['rows']} rows, {result['seconds']} s, "
+              f"+{result['peak_rss_mb']} MB peak RSS")
@@ -0,0 +1,253 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# 환경 변수 설정 (없으면 기본값 사용)
+#   SNUGEOSHM_JOB_DB      : 작업 상태 SQLite 파일 (워커 프로세스들이 공유)
+#   SNUGEOSHM_JOB_WORKERS : 워커 프로세스당 백그라운드 스레드 수
+DEFAULT_JOB_DB = os.path.join(tempfile.gettempdir(), 'snugeoshm_jobs.sqlite')
+DEFAULT_JOB_WORKERS = 2
+JOB_TTL_SECONDS = 24 * 3600     # 끝난 작업 기록 보존 시간
+PROGRESS_INTERVAL = 0.25        # progress 기록/취소 확인 최소 간격 (초)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """사용자가 작업 취소를 요청했을 때 progress 콜백에서 발생"""
+
+
+# ============================================================================
+# 디스크 기반 작업 저장소
+# ============================================================================
+class JobStore:
+    """
+    작업 상태를 SQLite 파일에 보관
+
+    gunicorn 워커들이 같은 파일을 공유하므로 작업을 실행하는 워커와 진행 상황을
+    조회하는 워커가 달라도 된다. 작업 함수의 반환값은 크기와 상관없이 JSON으로 직렬화해
+    result 컬럼에 그대로 저장하고, 폴링할 때마다 읽어 세션 Store로 보낸다. 따라서 큰 배열
+    (전처리 Dataset, 상관 행렬 등)은 작업 함수가 DatasetCache나 파일에 두고 키와 요약만
+    반환해야 한다.
+    """
+
+    def __init__(self, path=DEFAULT_JOB_DB):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    session_id TEXT,
+                    kind TEXT,
+                    status TEXT,
+                    progress REAL,
+                    message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    cancel INTEGER DEFAULT 0,
+                    pid INTEGER,
+                    created REAL,
+                    updated REAL
+                )""")
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_session ON jobs (session_id, created)')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:      # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, session_id, kind):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, session_id, kind, status, progress, message, pid, created, updated) '
+                'VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)',
+                (job_id, session_id, kind, QUEUED, 'Queued', os.getpid(), now, now))
+        return job_id
+
+    def update(self, job_id, **fields):
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'], default=str)
+        fields['updated'] = time.time()
+        columns = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as conn:
+            conn.execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+
+    def get(self, job_id):
+        """
+        작업 상태 조회
+
+        Returns:
+            dict 또는 None: {'id', 'session_id', 'kind', 'status', 'progress', 'message',
+                            'result', 'error', 'cancel', 'pid', 'created', 'updated'}
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def active(self, session_id):
+        """세션에서 아직 끝나지 않은 작업 ID 목록"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id FROM jobs WHERE session_id = ? AND status IN (?, ?)',
+                (session_id, QUEUED, RUNNING)).fetchall()
+        return [row[0] for row in rows]
+
+    def cancel_requested(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute('SELECT cancel FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def purge(self, ttl=JOB_TTL_SECONDS):
+        """끝난 지 ttl초가 지난 작업 기록 삭제"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated < ?',
+                         (*FINISHED, time.time() - ttl))
+
+
+# ============================================================================
+# 로컬 작업 실행기
+# ============================================================================
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class JobManager:
+    """
+    무거운 Analytics 단계를 요청 스레드 밖에서 실행하는 스레드 풀
+
+    작업 함수는 func(progress, *args, **kwargs) 형태이며, progress(fraction, message)를
+    호출해 진행률을 남긴다. 취소가 요청된 상태에서 progress를 호출하면 JobCancelled가
+    발생하므로 단계 사이에서 작업이 중단된다. numpy/scipy 연산은 GIL을 놓으므로 스레드로
+    충분하고, 결과 Dataset은 같은 프로세스의 DatasetCache에 바로 넣을 수 있다.
+    """
+
+    def __init__(self, store, max_workers=DEFAULT_JOB_WORKERS):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='snugeoshm-job')
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def submit(self, session_id, kind, func, *args, **kwargs):
+        """
+        작업 등록 후 즉시 반환
+
+        Returns:
+            str: job_id
+        """
+        job_id = self.store.create(session_id, kind)
+        future = self._executor.submit(self._run, job_id, func, args, kwargs)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._forget(job_id))
+        self._maybe_purge()
+        return job_id
+
+    def _forget(self, job_id):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _run(self, job_id, func, args, kwargs):
+        if self.store.cancel_requested(job_id):
+            self.store.update(job_id, status=CANCELLED, message='Cancelled')
+            return
+        self.store.update(job_id, status=RUNNING, message='Running')
+
+        last = {'time': 0.0, 'message': None}
+
+        def progress(fraction, message=None):
+            # 청크 루프에서 자주 호출되므로 메시지가 바뀔 때만 매번 기록하고 나머지는 간격 제한
+            now = time.time()
+            if message == last['message'] and now - last['time'] < PROGRESS_INTERVAL:
+                return
+            last['time'], last['message'] = now, message
+            if self.store.cancel_requested(job_id):
+                raise JobCancelled()
+            fields = {'progress': float(min(max(fraction, 0.0), 1.0))}
+            if message is not None:
+                fields['message'] = message
+            self.store.update(job_id, **fields)
+
+        try:
+            result = func(progress, *args, **kwargs)
+        except JobCancelled:
+            self.store.update(job_id, status=CANCELLED, message='Cancelled')
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, message='Failed', error=str(e) or type(e).__name__)
+            # 입력값 오류(ValueError)는 화면에 표시하는 것으로 충분, 그 외는 서버 로그에 남김
+            if not isinstance(e, ValueError):
+                traceback.print_exc()
+        else:
+            self.store.update(job_id, status=DONE, progress=1.0, message='Done', result=result)
+
+    def status(self, job_id):
+        """
+        작업 상태 조회 (실행하던 워커 프로세스가 사라진 작업은 failed로 정리)
+
+        Returns:
+            dict 또는 None (JobStore.get 형식)
+        """
+        job = self.store.get(job_id)
+        if job and job['status'] not in FINISHED and job['pid'] != os.getpid() \
+                and not _pid_alive(job['pid']):
+            self.store.update(job_id, status=FAILED, error='Worker process exited')
+            job = self.store.get(job_id)
+        return job
+
+    def cancel(self, job_id):
+        """취소 요청 (대기 중이면 바로 취소, 실행 중이면 다음 progress 호출에서 중단)"""
+        self.store.update(job_id, cancel=1)
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self.store.update(job_id, status=CANCELLED, message='Cancelled')
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge > 600:
+            self._last_purge = now
+            self.store.purge()
+
+
+# ============================================================================
+# 프로세스 전역 인스턴스
+# ============================================================================
+_default_jobs = None
+_default_lock = threading.Lock()
+
+
+def get_jobs():
+    """환경 변수 설정으로 만든 기본 JobManager 반환 (워커당 1개)"""
+    global _default_jobs
+    with _default_lock:
+        if _default_jobs is None:
+            path = os.environ.get('SNUGEOSHM_JOB_DB', DEFAULT_JOB_DB)
+            workers = int(os.environ.get('SNUGEOSHM_JOB_WORKERS', DEFAULT_JOB_WORKERS))
+            _default_jobs = JobManager(JobStore(path), workers)
+        return _default_jobs
@@ -0,0 +1,523 @@
+import base64
+import hashlib
+import html
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend.ml.rules import score_fleet
+from backend.ml.tracking import get_history
+
+# 환경 변수 설정 (없으면 기본값 사용)
+#   SNUGEOSHM_REPORT_DIR : 생성한 보고서 파일 + 차트 이미지 캐시 경로 (워커 프로세스들이 공유)
+DEFAULT_REPORT_DIR = os.path.join(tempfile.gettempdir(), 'snugeoshm_reports')
+REPORT_TTL_SECONDS = 24 * 3600  # 보고서 파일 / 쓰이지 않은 차트 보존 시간
+REPORT_DAYS = 30                # 기본 보고 기간 (일, 현재 시각까지)
+CHART_POINTS = 600              # 터빈별 모드 이력 차트 최대 점 수 (구간 min/max 축약)
+CHART_SIZE = (8.0, 2.6)         # 차트 크기 (inch)
+CHART_DPI = 100
+FLEET_CHART_TURBINES = 30       # fleet 우선순위 차트에 그리는 상위 터빈 수
+SUMMARY_ROWS = 40               # PDF 요약 페이지당 터빈 수
+FORMATS = {
+    'html': 'text/html',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+_REPORT_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class ReportError(ValueError):
+    """보고서 형식 / 선택 의존성 오류 (화면에 그대로 표시하는 메시지)"""
+
+
+def _utc(t):
+    return datetime.fromtimestamp(t, timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def _number(value, digits=3):
+    return None if value is None or value != value else round(float(value), digits)
+
+
+def mode_stats(window):
+    """
+    기간 내 모드 이력 (ModeHistory.query, 축약 없음) → track별 통계
+
+    Returns:
+        list: [{'mode', 'windows' (값이 있는 윈도우 수), 'mean', 'min', 'max' (Hz), 'damping' (평균 %)}]
+    """
+    stats = []
+    for k in range(window['frequency'].shape[1]):
+        frequency = window['frequency'][:, k]
+        found = np.isfinite(frequency)
+        if not found.any():
+            stats.append({'mode': k + 1, 'windows': 0, 'mean': None, 'min': None, 'max': None, 'damping': None})
+            continue
+        values = frequency[found]
+        damping = window['damping'][found, k]
+        damping = damping[np.isfinite(damping)]
+        stats.append({'mode': k + 1, 'windows': int(found.sum()), 'mean': _number(values.mean(), 4),
+                      'min': _number(values.min(), 4), 'max': _number(values.max(), 4),
+                      'damping': _number(100 * damping.mean()) if len(damping) else None})
+    return stats
+
+
+# ============================================================================
+# 보고서 저장소 (생성 / 차트 캐시 / 다운로드 경로)
+# ============================================================================
+class ReportStore:
+    """
+    보고서 파일과 차트 PNG를 디스크에 보관
+
+    차트는 그린 데이터의 해시를 파일 이름으로 한 번만 렌더링하고, 같은 보고서의 다른 형식이나
+    같은 기간을 다시 내보낼 때 그대로 재사용한다. 보고서는 터빈 하나씩 읽어 바로 파일에 쓰므로
+    (HTML 스트림 쓰기, openpyxl write-only, PDF 페이지 단위) fleet 전체 내용을 메모리에 모으지 않는다.
+    """
+
+    def __init__(self, root=DEFAULT_REPORT_DIR):
+        self.root = root
+        self.chart_dir = os.path.join(root, 'charts')
+        os.makedirs(self.chart_dir, exist_ok=True)
+
+    def path(self, report_id, fmt):
+        """다운로드 경로 (잘못된 ID / 형식이면 None)"""
+        if fmt not in FORMATS or not _REPORT_ID.fullmatch(str(report_id)):
+            return None
+        return os.path.join(self.root, f'{report_id}.{fmt}')
+
+    def purge(self, ttl=REPORT_TTL_SECONDS):
+        """ttl보다 오래된 보고서 파일 / 최근에 쓰이지 않은 차트 삭제"""
+        cutoff = time.time() - ttl
+        for folder in (self.root, self.chart_dir):
+            for entry in os.scandir(folder):
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def chart(self, spec):
+        """
+        차트 PNG 경로 (같은 키의 파일이 없을 때만 렌더링)
+
+        Args:
+            spec: (key, draw, size) — draw(figure)가 figure에 차트를 그림 (_history_chart, _fleet_chart)
+
+        Returns:
+            tuple: (경로, 이번에 렌더링했는지)
+        """
+        key, draw, size = spec
+        path = os.path.join(self.chart_dir, f'{key}.png')
+        if os.path.exists(path):
+            os.utime(path)              # purge 기준 시각 갱신 (자주 쓰는 차트는 유지)
+            return path, False
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=size, dpi=CHART_DPI)
+        FigureCanvasAgg(figure)
+        draw(figure)
+        fd, tmp = tempfile.mkstemp(dir=self.chart_dir, suffix='.png.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                figure.savefig(fh, format='png')
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return path, True
+
+    def generate(self, fmt, turbine_data, turbine_ids=None, days=REPORT_DAYS, end=None, histories=None,
+                 progress=None):
+        """
+        fleet 보고서 파일 생성 (모드 이력 통계/차트, 이상 윈도우, 드리프트, 유지보수 권고)
+
+        Args:
+            fmt: 'html', 'xlsx', 'pdf'
+            turbine_data: turbine-data Store 값 (이상 / 드리프트 / 권고 입력)
+            turbine_ids: 데이터가 없어도 포함할 터빈 (Map GeoJSON 등)
+            days: 보고 기간 (일, end까지)
+            end: 기간 끝 (epoch 초, None이면 현재)
+            histories: ModeHistoryStore (None이면 기본 저장소)
+            progress: progress(fraction, message) 콜백 (작업 취소 시 예외 발생)
+
+        Returns:
+            dict: {'report_id', 'format', 'filename', 'turbines', 'windows', 'period', 'size_kb',
+                   'charts_rendered', 'charts_reused', 'seconds', 'timestamp'}
+        """
+        if fmt not in FORMATS:
+            raise ReportError(f"Unknown report format {fmt!r}")
+        writer = {'html': _write_html, 'xlsx': _write_xlsx, 'pdf': _write_pdf}[fmt]
+        started = time.perf_counter()
+        self.purge()
+        histories = histories or get_history()
+        turbine_data = turbine_data or {}
+        end = time.time() if end is None else end
+        start = end - days * 86400
+        suggestions = score_fleet(turbine_data, turbine_ids, histories=histories)
+        if not suggestions:
+            raise ReportError("No turbine data to report (run an analysis or load turbine locations first)")
+        counts = {'rendered': 0, 'reused': 0, 'windows': 0}
+
+        def chart(spec):
+            path, rendered = self.chart(spec)
+            counts['rendered' if rendered else 'reused'] += 1
+            return path
+
+        def sections():
+            anomalies = turbine_data.get('anomalies') or {}
+            drift = turbine_data.get('drift') or {}
+            for k, suggestion in enumerate(suggestions):
+                tid = suggestion['turbine_id']
+                if progress:
+                    progress(k / len(suggestions), f'{tid} ({k + 1}/{len(suggestions)})')
+                history = histories.get(tid)
+                window = history.query(start, end, max_points=None)
+                events = anomalies.get(tid) or []
+                counts['windows'] += window['windows']
+                yield {**suggestion, 'windows': window['windows'], 'modes': mode_stats(window),
+                       'anomalies': events, 'drift': (drift.get(tid) or {}).get('drift') or [],
+                       'chart': _history_chart(tid, history.query(start, end, CHART_POINTS), events)
+                       if window['windows'] else None}
+
+        meta = {'title': 'SNUGeoSHM Fleet Report', 'period': f'{_utc(start)} ~ {_utc(end)} UTC',
+                'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'turbines': len(suggestions)}
+        fleet = _fleet_chart(suggestions)
+        report_id = uuid.uuid4().hex
+        path = self.path(report_id, fmt)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=f'.{fmt}.tmp')
+        os.close(fd)
+        try:
+            writer(tmp, meta, suggestions, fleet, sections(), chart)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return {'report_id': report_id, 'format': fmt,
+                'filename': f"snugeoshm_report_{datetime.now().strftime('%Y%m%d')}.{fmt}",
+                'turbines': len(suggestions), 'windows': counts['windows'], 'period': meta['period'],
+                'size_kb': round(os.path.getsize(path) / 1024, 1), 'charts_rendered': counts['rendered'],
+                'charts_reused': counts['reused'], 'seconds': round(time.perf_counter() - started, 2),
+                'timestamp': meta['generated']}
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_reports():
+    """환경 변수 설정으로 만든 기본 ReportStore 반환 (워커당 1개)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ReportStore(os.environ.get('SNUGEOSHM_REPORT_DIR', DEFAULT_REPORT_DIR))
+        return _default_store
+
+
+# ============================================================================
+# 차트 (데이터 해시 키로 한 번만 렌더링)
+# ============================================================================
+# 차트는 (key, draw, size)로 넘긴다. HTML / Excel은 ReportStore.chart로 PNG를 캐시해 쓰고,
+# PDF는 같은 draw를 페이지 위 영역(rect)에 벡터로 그린다 (PdfPages는 래스터 이미지를
+# 파일을 닫을 때까지 메모리에 들고 있으므로 PNG를 다시 넣지 않음).
+def _key(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.tobytes() if isinstance(part, np.ndarray) else repr(part).encode())
+    return digest.hexdigest()
+
+
+def _history_chart(turbine_id, window, events):
+    """모드별 고유진동수 이력 + 이상 윈도우 시각 (세로선)"""
+    event_times = np.array([e['time'] for e in events], dtype='datetime64[s]')
+
+    def draw(figure, rect=(0.08, 0.14, 0.9, 0.76)):
+        from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+        ax = figure.add_axes(rect)
+        locator = AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        when = (window['time'] * 1e3).astype('datetime64[ms]')
+        for k in range(window['frequency'].shape[1]):
+            ax.plot(when, window['frequency'][:, k], '.', markersize=2, label=f'Mode {k + 1}')
+        for t in event_times:
+            ax.axvline(t, color='#c62828', linewidth=0.6, alpha=0.5)
+        ax.set_title(f'{turbine_id}: modal frequency', fontsize=10)
+        ax.set_ylabel('Hz', fontsize=9)
+        ax.tick_params(labelsize=8)
+        ax.legend(fontsize=7, loc='upper right', markerscale=3)
+        ax.grid(alpha=0.3)
+    return _key('history', turbine_id, window['time'], window['frequency'], event_times), draw, CHART_SIZE
+
+
+def _fleet_chart(suggestions):
+    """우선순위 상위 터빈 막대 그래프"""
+    top = suggestions[:FLEET_CHART_TURBINES]
+    names = [s['turbine_id'] for s in top]
+    priority = np.array([s['priority'] for s in top], dtype=float)
+
+    def draw(figure, rect=(0.08, 0.25, 0.9, 0.66)):
+        ax = figure.add_axes(rect)
+        colors = np.where(priority >= 50, '#c62828', np.where(priority >= 20, '#ef6c00', '#2e7d32'))
+        ax.bar(range(len(names)), priority, color=colors)
+        ax.set_xticks(range(len(names)), names, rotation=90, fontsize=7)
+        ax.set_ylim(0, 100)
+        ax.set_ylabel('Priority', fontsize=9)
+        ax.set_title('Maintenance priority (highest first)', fontsize=10)
+        ax.grid(axis='y', alpha=0.3)
+    return _key('fleet', names, priority), draw, (CHART_SIZE[0], 3.2)
+
+
+# ============================================================================
+# 형식별 쓰기 (sections는 터빈 하나씩 만드는 generator)
+# ============================================================================
+def _top_action(section):
+    return section['actions'][0]['message'] if section['actions'] else ''
+
+
+def _drift_max(section):
+    values = [v for v in section['drift'] if v is not None]
+    return _number(max(values, key=abs), 2) if values else None
+
+
+def _image_uri(path):
+    with open(path, 'rb') as fh:
+        return 'data:image/png;base64,' + base64.b64encode(fh.read()).decode('ascii')
+
+
+def _write_html(path, meta, suggestions, fleet_chart, sections, chart):
+    """단일 HTML 파일 (차트는 data URI로 포함, 터빈 section마다 바로 파일에 씀)"""
+    e = html.escape
+
+    def cell(value, digits=3):
+        return '-' if value is None else e(f'{value:.{digits}f}' if isinstance(value, float) else str(value))
+
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{e(meta['title'])}</title>
+<style>
+body {{ font-family: sans-serif; font-size: 13px; margin: 24px; }}
+table {{ border-collapse: collapse; margin: 6px 0 12px; }}
+th, td {{ border: 1px solid #ccc; padding: 3px 8px; text-align: left; }}
+th {{ background: #f0f0f0; }}
+.critical {{ color: #c62828; font-weight: bold; }} .warning {{ color: #ef6c00; font-weight: bold; }}
+.info {{ color: #1565c0; font-weight: bold; }}
+section {{ page-break-inside: avoid; border-top: 2px solid #ccc; margin-top: 16px; }}
+</style></head><body>
+<h1>{e(meta['title'])}</h1>
+<p>Period: {e(meta['period'])} | Turbines: {meta['turbines']} | Generated: {e(meta['generated'])}</p>
+<img src="{_image_uri(chart(fleet_chart))}" alt="Fleet priority">
+<h2>Priority</h2>
+<table><tr><th>Turbine</th><th>Priority</th><th>Rules</th><th>Top recommendation</th></tr>
+""")
+        for s in suggestions:
+            fh.write(f"<tr><td>{e(s['turbine_id'])}</td><td>{s['priority']:.0f}</td><td>{len(s['actions'])}</td>"
+                     f"<td>{e(_top_action(s))}</td></tr>\n")
+        fh.write('</table>\n<h2>Turbines</h2>\n')
+        for section in sections:
+            fh.write(f"<section><h3>{e(section['turbine_id'])} — priority {section['priority']:.0f}</h3>\n")
+            if section['actions']:
+                fh.write('<ul>' + ''.join(
+                    f"<li><span class=\"{e(a['severity'])}\">{e(a['severity'].upper())}</span> "
+                    f"{e(a['message'])} (+{a['points']:.0f})</li>" for a in section['actions']) + '</ul>\n')
+            fh.write(f"<p>Mode history windows: {section['windows']}</p>\n")
+            if section['windows']:
+                fh.write('<table><tr><th>Mode</th><th>Windows</th><th>Mean (Hz)</th><th>Min</th><th>Max</th>'
+                         '<th>Damping (%)</th><th>Drift (%)</th></tr>\n')
+                for m in section['modes']:
+                    drift = section['drift'][m['mode'] - 1] if m['mode'] <= len(section['drift']) else None
+                    fh.write(f"<tr><td>{m['mode']}</td><td>{m['windows']}</td><td>{cell(m['mean'], 4)}</td>"
+                             f"<td>{cell(m['min'], 4)}</td><td>{cell(m['max'], 4)}</td>"
+                             f"<td>{cell(m['damping'], 2)}</td><td>{cell(drift, 2)}</td></tr>\n")
+                fh.write('</table>\n')
+            if section['chart']:
+                fh.write(f"<img src=\"{_image_uri(chart(section['chart']))}\" alt=\"{e(section['turbine_id'])}\">\n")
+            if section['anomalies']:
+                fh.write('<table><tr><th>Anomalous window</th><th>Score</th><th>Top feature</th></tr>\n')
+                for event in section['anomalies']:
+                    fh.write(f"<tr><td>{e(event['time'])}</td><td>{event['score']:.3f}</td>"
+                             f"<td>{e(str(event['feature']))}</td></tr>\n")
+                fh.write('</table>\n')
+            fh.write('</section>\n')
+        fh.write('</body></html>\n')
+
+
+def _write_xlsx(path, meta, suggestions, fleet_chart, sections, chart):
+    """Excel 통합 문서 (openpyxl write-only: 행은 임시 파일로 바로 내려가고 차트는 Charts 시트에 배치)"""
+    try:
+        from openpyxl import Workbook
+        from openpyxl.drawing.image import Image
+    except ImportError:
+        raise ReportError("Excel export requires openpyxl (pip install openpyxl)") from None
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet('Summary')
+    modes = workbook.create_sheet('Modes')
+    actions = workbook.create_sheet('Suggestions')
+    anomalies = workbook.create_sheet('Anomalies')
+    charts = workbook.create_sheet('Charts')
+    summary.append([meta['title']])
+    summary.append(['Period', meta['period']])
+    summary.append(['Generated', meta['generated']])
+    summary.append([])
+    summary.append(['Turbine', 'Priority', 'Rules', 'Windows', 'Mode 1 mean (Hz)', 'Drift max (%)',
+                    'Top recommendation'])
+    modes.append(['Turbine', 'Mode', 'Windows', 'Mean (Hz)', 'Min (Hz)', 'Max (Hz)', 'Damping (%)', 'Drift (%)'])
+    actions.append(['Turbine', 'Priority', 'Severity', 'Rule', 'Points', 'Message'])
+    anomalies.append(['Turbine', 'Window', 'Score', 'Top feature'])
+    # 이미지 하나가 차지하는 행 수 (기본 행 높이 20 px)
+    rows_per_chart = int(CHART_SIZE[1] * CHART_DPI / 20) + 2
+    image = Image(chart(fleet_chart))
+    charts.add_image(image, 'A1')
+    row = int(image.height / 20) + 3
+    for section in sections:
+        tid = section['turbine_id']
+        summary.append([tid, section['priority'], len(section['actions']), section['windows'],
+                        section['modes'][0]['mean'] if section['modes'] else None, _drift_max(section),
+                        _top_action(section)])
+        for m in section['modes']:
+            drift = section['drift'][m['mode'] - 1] if m['mode'] <= len(section['drift']) else None
+            modes.append([tid, m['mode'], m['windows'], m['mean'], m['min'], m['max'], m['damping'], drift])
+        for a in section['actions']:
+            actions.append([tid, section['priority'], a['severity'], a['rule'], a['points'], a['message']])
+        for event in section['anomalies']:
+            anomalies.append([tid, event['time'], event['score'], str(event['feature'])])
+        if section['chart']:
+            charts.add_image(Image(chart(section['chart'])), f'A{row}')
+            row += rows_per_chart
+    workbook.save(path)
+
+
+def _write_pdf(path, meta, suggestions, fleet_chart, sections, chart):
+    """
+    PDF (matplotlib PdfPages: 요약 페이지 + 터빈당 1페이지, 페이지마다 바로 씀)
+
+    차트는 PNG 캐시 대신 같은 draw로 페이지에 벡터로 그리고, 표는 고정폭 글꼴 텍스트 한 덩어리로 쓴다
+    (셀마다 Text를 만드는 matplotlib 표보다 훨씬 빠름).
+    """
+    try:
+        from matplotlib.backends.backend_pdf import PdfPages
+        from matplotlib.figure import Figure
+    except ImportError:
+        raise ReportError("PDF export requires matplotlib (pip install matplotlib)") from None
+    a4 = (8.27, 11.69)
+    line = 0.0125                   # 7 pt 고정폭 한 줄 높이 (페이지 비율)
+
+    def clip(value, width):
+        value = str(value)
+        return value if len(value) <= width else value[:width - 1] + '…'
+
+    def table(figure, y, header, rows, widths):
+        """고정폭 표를 y (페이지 위쪽 기준 비율)부터 쓰고 다음 y 반환"""
+        def format_row(values):
+            return '  '.join(clip(v, w).ljust(w) for v, w in zip(values, widths))
+        lines = [format_row(header), '-' * (sum(widths) + 2 * (len(widths) - 1))] + [format_row(r) for r in rows]
+        figure.text(0.06, y, '\n'.join(lines), family='monospace', fontsize=7, va='top', linespacing=1.25)
+        return y - line * len(lines) - 0.01
+
+    def number(value, digits):
+        return '-' if value is None else f'{value:.{digits}f}'
+
+    with PdfPages(path) as pdf:
+        for page, first in enumerate(range(0, len(suggestions), SUMMARY_ROWS)):
+            figure = Figure(figsize=a4)
+            y = 0.95
+            if page == 0:
+                figure.text(0.06, 0.96, meta['title'], fontsize=16, weight='bold')
+                figure.text(0.06, 0.94, f"Period: {meta['period']} | Turbines: {meta['turbines']} | "
+                                        f"Generated: {meta['generated']}", fontsize=8)
+                fleet_chart[1](figure, (0.1, 0.68, 0.85, 0.22))
+                y = 0.6
+            rows = [[s['turbine_id'], f"{s['priority']:.0f}", len(s['actions']), _top_action(s)]
+                    for s in suggestions[first:first + SUMMARY_ROWS]]
+            table(figure, y, ['Turbine', 'Priority', 'Rules', 'Top recommendation'], rows, [12, 8, 5, 80])
+            pdf.savefig(figure)
+        for section in sections:
+            figure = Figure(figsize=a4)
+            figure.text(0.06, 0.96, f"{section['turbine_id']} — priority {section['priority']:.0f}",
+                        fontsize=14, weight='bold')
+            y = 0.935
+            for a in section['actions']:
+                figure.text(0.06, y, clip(f"[{a['severity'].upper()}] {a['message']} (+{a['points']:.0f})", 120),
+                            fontsize=8)
+                y -= 0.018
+            figure.text(0.06, y, f"Mode history windows: {section['windows']}", fontsize=8)
+            y -= 0.02
+            if section['chart']:
+                section['chart'][1](figure, (0.1, y - 0.24, 0.85, 0.22))
+                y -= 0.28
+            if section['windows']:
+                y = table(figure, y, ['Mode', 'Windows', 'Mean (Hz)', 'Min', 'Max', 'Damping (%)', 'Drift (%)'],
+                          [[m['mode'], m['windows'], number(m['mean'], 4), number(m['min'], 4),
+                            number(m['max'], 4), number(m['damping'], 2),
+                            number(section['drift'][m['mode'] - 1] if m['mode'] <= len(section['drift']) else None,
+                                   2)]
+                           for m in section['modes']], [4, 7, 9, 8, 8, 11, 9])
+            room = int((y - 0.05) / line) - 2       # 페이지에 남은 표 행 수 (최근 이벤트부터)
+            events = section['anomalies'][-room:] if room > 0 else []
+            if events:
+                table(figure, y, ['Anomalous window', 'Score', 'Top feature'],
+                      [[ev['time'], f"{ev['score']:.3f}", ev['feature']] for ev in events], [19, 7, 40])
+            pdf.savefig(figure)
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+def benchmark(turbines=100, days=30, fmt='html', root=None):
+    """
+    월간 fleet 보고서 생성: 모사 모드 이력 (10분 윈도우) + 이상 / 드리프트 → 첫 생성 vs 차트 재사용 생성
+
+    Args:
+        root: 모사 이력과 보고서를 둘 디렉터리 (None이면 임시 디렉터리를 쓰고 끝나면 삭제)
+
+    Returns:
+        dict: 형식, 터빈 / 윈도우 수, 첫 생성 / 재생성 초, 렌더링 / 재사용 차트 수, 파일 크기, 최대 메모리 증가
+              (root를 지정했으면 'root' 포함)
+    """
+    if root is None:
+        with tempfile.TemporaryDirectory(prefix='snugeoshm_report_bench_') as tmp:
+            result = benchmark(turbines, days, fmt, tmp)
+        del result['root']
+        return result
+    import resource
+    from backend.ml.tracking import ModeHistory, ModeHistoryStore
+    histories = ModeHistoryStore(os.path.join(root, 'modes'))
+    os.makedirs(histories.root, exist_ok=True)
+    rng = np.random.default_rng(0)
+    end = float(int(time.time()) // 600 * 600)
+    t = end - days * 86400 + 600 * np.arange(days * 144)
+    turbine_data = {'anomalies': {}, 'drift': {}}
+    for k in range(turbines):
+        tid = f'T{k:03d}'
+        base = np.array([0.3, 1.1, 2.4]) * (1 + 0.02 * rng.standard_normal())
+        frequency = (base * (1 + 0.005 * rng.standard_normal((len(t), 3)))).astype(np.float32)
+        damping = (0.01 + 0.002 * rng.standard_normal((len(t), 3))).astype(np.float32)
+        ModeHistory(time=t, frequency=frequency, damping=damping,
+                    mac=np.ones_like(frequency)).save(histories.path(tid))
+        flagged = rng.choice(len(t), rng.poisson(6), replace=False)
+        turbine_data['anomalies'][tid] = [
+            {'time': _utc(t[i]) + ':00', 'score': 0.1, 'feature': 'ch0:rms'} for i in np.sort(flagged)]
+        turbine_data['drift'][tid] = {'drift': list(100 * rng.normal(0, 0.03, 3)), 'events': []}
+    store = ReportStore(os.path.join(root, 'reports'))
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    first = store.generate(fmt, turbine_data, days=days, end=end, histories=histories)
+    again = store.generate(fmt, turbine_data, days=days, end=end, histories=histories)
+    return {'format': fmt, 'turbines': first['turbines'], 'windows': first['windows'],
+            'first_s': first['seconds'], 'charts_rendered': first['charts_rendered'],
+            'again_s': again['seconds'], 'charts_reused': again['charts_reused'], 'size_kb': first['size_kb'],
+            'max_rss_growth_mb': round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) / 1024, 1),
+            'root': root}
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Fleet report generation throughput")
+    parser.add_argument('--turbines', type=int, default=100)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--format', choices=sorted(FORMATS), default='html')
+    args = parser.parse_args()
+    print(benchmark(args.turbines, args.days, args.format))
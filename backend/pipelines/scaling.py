@@ -0,0 +1,117 @@
+import time
+
+import numpy as np
+
+# ============================================================================
+# Step 2: 추세 제거 / 단위 변환 / 정규화
+# ============================================================================
+STANDARD_GRAVITY = 9.80665   # m/s²
+# 입력 단위(m/s²) → 출력 단위 배율
+UNIT_SCALE = {'ms2': 1.0, 'g': 1.0 / STANDARD_GRAVITY}
+_BLOCK = 1 << 16
+
+
+def _linear_trend(values, block=_BLOCK):
+    """
+    채널별 1차 추세 (결측값 제외 최소제곱)
+
+    시간축을 [-1, 1]로 정규화하고 블록 단위 float64 누적으로 정규방정식을 푼다.
+
+    Returns:
+        tuple: (offset, slope) — 샘플 인덱스 i에서 추세 = offset + slope × i
+    """
+    n_channels, n = values.shape
+    sums = np.zeros((5, n_channels))   # count, Σt, Σt², Σx, Σtx
+    scale = 2.0 / max(n - 1, 1)
+    for start in range(0, n, block):
+        x = values[:, start:start + block].astype(np.float64)
+        t = np.arange(start, start + x.shape[1]) * scale - 1.0
+        finite = np.isfinite(x)
+        x = np.where(finite, x, 0.0)
+        tm = finite * t
+        sums[0] += finite.sum(axis=1)
+        sums[1] += tm.sum(axis=1)
+        sums[2] += (tm * t).sum(axis=1)
+        sums[3] += x.sum(axis=1)
+        sums[4] += x @ t
+    count, st, stt, sx, stx = sums
+    det = count * stt - st ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = np.where(det > 0, (count * stx - st * sx) / det, 0.0)
+        intercept = np.where(count > 0, (sx - slope * st) / count, 0.0)
+    # t = i × scale - 1 → 샘플 인덱스 기준 계수로 변환
+    return intercept - slope, slope * scale
+
+
+def scale_values(values, detrend=True, unit_scale=1.0, normalize=True, block=_BLOCK):
+    """
+    추세 제거 → 단위 변환 → 채널별 표준편차 정규화
+
+    Args:
+        values: (n_channels, n_samples) 배열
+        detrend: 1차 추세 제거 여부
+        unit_scale: 단위 변환 배율
+        normalize: 채널별 평균 제거 후 표준편차로 나눔
+
+    Returns:
+        tuple: (out, std) — std는 정규화 전 채널별 표준편차 (변환 단위)
+    """
+    values = np.asarray(values)
+    n_channels, n = values.shape
+    out = np.empty(values.shape, dtype=values.dtype if values.dtype.kind == 'f' else np.float32)
+    if detrend:
+        offset, slope = _linear_trend(values, block)
+    total = np.zeros(n_channels)
+    sq = np.zeros(n_channels)
+    count = np.zeros(n_channels)
+    for start in range(0, n, block):
+        x = values[:, start:start + block]
+        dst = out[:, start:start + block]
+        if detrend:
+            i = np.arange(start, start + x.shape[1], dtype=np.float64)
+            np.subtract(x, offset[:, None] + slope[:, None] * i, out=dst, casting='unsafe')
+        else:
+            dst[...] = x
+        if unit_scale != 1.0:
+            dst *= unit_scale
+        if normalize:
+            finite = np.isfinite(dst)
+            y = np.where(finite, dst, 0).astype(np.float64)
+            total += y.sum(axis=1)
+            sq += (y * y).sum(axis=1)
+            count += finite.sum(axis=1)
+
+    std = None
+    if normalize:
+        # z-score (추세 제거 후에는 평균이 0에 가까우므로 사실상 분산 정규화)
+        n_valid = np.maximum(count, 1)
+        mean = total / n_valid
+        std = np.sqrt(np.maximum(sq - total * mean, 0) / np.maximum(count - 1, 1))
+        gain = np.where(std > 0, 1.0 / np.where(std > 0, std, 1.0), 1.0)
+        for start in range(0, n, block):
+            dst = out[:, start:start + block]
+            dst -= mean[:, None].astype(out.dtype)
+            dst *= gain[:, None].astype(out.dtype)
+    return out, std
+
+
+def scale_dataset(dataset, detrend='Yes', units='ms2', normalization='Yes'):
+    """
+    Analytics Step 2 드롭다운 값으로 Dataset 스케일링
+
+    Returns:
+        tuple: (Dataset, report dict)
+    """
+    if units not in UNIT_SCALE:
+        raise ValueError(f"Unknown units: {units}")
+    started = time.perf_counter()
+    out, std = scale_values(dataset.values, detrend=detrend == 'Yes',
+                            unit_scale=UNIT_SCALE[units], normalize=normalization == 'Yes')
+    scaled = dataset.replace(values=out, meta={'step2': {
+        'detrend': detrend, 'units': units, 'normalization': normalization,
+    }, 'units': 'normalized' if normalization == 'Yes' else units})
+    report = {
+        'std': None if std is None else dict(zip(dataset.channels, std.tolist())),
+        'seconds': time.perf_counter() - started,
+    }
+    return scaled, report
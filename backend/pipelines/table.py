@@ -0,0 +1,273 @@
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# ============================================================================
+# DataTable 서버 측 paging / sort / filter
+# ============================================================================
+# filter_query 한 항목: {column} operator value
+#   예) {ch1} s> 0.5 && {time} datestartswith 2024-01-01 && {label} icontains ok
+_FILTER_PART = re.compile(
+    r'^\{(?P<column>[^}]+)\}\s*'
+    r'(?P<op>is blank|is not blank|[si]?(?:contains|datestartswith)'
+    r'|[si]?(?:<=|>=|!=|<|>|=)|eq|ne|lt|le|gt|ge)'
+    r'\s*(?P<value>.*)$'
+)
+_OP_ALIASES = {'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>='}
+
+# 정렬/필터 결과(행 인덱스) 캐시 → 같은 조건에서 페이지만 넘길 때 재계산 없음
+_VIEW_CACHE_SIZE = 8
+_view_cache = OrderedDict()
+_view_lock = threading.Lock()
+
+
+class FilterError(ValueError):
+    """filter_query 구문을 해석할 수 없을 때 발생"""
+
+
+def parse_filter_query(filter_query):
+    """
+    Dash DataTable filter_query 문자열 파싱
+
+    Args:
+        filter_query: '{a} s> 3 && {b} contains x' 형식
+
+    Returns:
+        list: [(column, operator, value, case_insensitive), ...]
+    """
+    if not filter_query:
+        return []
+    terms = []
+    for part in filter_query.split(' && '):
+        part = part.strip()
+        match = _FILTER_PART.match(part)
+        if not match:
+            raise FilterError(f"Unsupported filter expression: {part}")
+        op = match.group('op')
+        # s(대소문자 구분) / i(무시) 접두사 처리
+        case_insensitive = op.startswith('i') and op not in ('is blank', 'is not blank')
+        if op[0] in 'si' and op not in ('is blank', 'is not blank'):
+            op = op[1:]
+        op = _OP_ALIASES.get(op, op)
+        value = match.group('value').strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+            value = value[1:-1]
+        terms.append((match.group('column'), op, value, case_insensitive))
+    return terms
+
+
+def _column_array(dataset, column):
+    """컬럼 이름 → 1차원 배열 (시간 / 채널 / 부가 컬럼)"""
+    if dataset.time is not None and column == dataset.time_name:
+        return dataset.time
+    if column in dataset.channels:
+        return dataset.values[dataset.channels.index(column)]
+    if column in dataset.extra:
+        return dataset.extra[column]
+    raise FilterError(f"Unknown column: {column}")
+
+
+def _term_mask(arr, op, value, case_insensitive):
+    """필터 조건 하나를 벡터화된 불리언 마스크로 변환"""
+    if op == 'is blank':
+        return np.isnat(arr) if arr.dtype.kind == 'M' else (
+            np.isnan(arr) if arr.dtype.kind == 'f' else arr == '')
+    if op == 'is not blank':
+        return ~_term_mask(arr, 'is blank', value, case_insensitive)
+
+    if arr.dtype.kind == 'M':
+        try:
+            target = np.datetime64(value)
+        except ValueError as e:
+            raise FilterError(f"Invalid date: {value}") from e
+        if op == 'datestartswith':
+            # 접두사의 정밀도(일/시/분...)로 잘라서 비교
+            unit = np.datetime_data(target.dtype)[0]
+            return arr.astype(f'datetime64[{unit}]') == target
+        lhs, rhs = arr, target
+    elif arr.dtype.kind in 'fiu':
+        if op in ('contains', 'datestartswith'):
+            return np.char.find(arr.astype(str), value) >= 0
+        try:
+            rhs = float(value)
+        except ValueError as e:
+            raise FilterError(f"Not a number: {value}") from e
+        lhs = arr
+    else:
+        lhs = np.char.lower(arr) if case_insensitive else arr
+        rhs = value.lower() if case_insensitive else value
+        if op == 'contains':
+            return np.char.find(lhs, rhs) >= 0
+        if op == 'datestartswith':
+            return np.char.startswith(lhs, rhs)
+
+    if op == '=':
+        return lhs == rhs
+    if op == '!=':
+        return lhs != rhs
+    if op == '<':
+        return lhs < rhs
+    if op == '<=':
+        return lhs <= rhs
+    if op == '>':
+        return lhs > rhs
+    if op == '>=':
+        return lhs >= rhs
+    raise FilterError(f"Unsupported operator: {op}")
+
+
+def _sort_key(arr, descending):
+    """lexsort용 키 (내림차순은 순위를 뒤집어서 처리)"""
+    if arr.dtype.kind == 'f':
+        key = arr.astype(np.float64)
+        return -key if descending else key
+    if arr.dtype.kind == 'M':
+        key = arr.view(np.int64)
+        return -key if descending else key
+    _, ranks = np.unique(arr, return_inverse=True)
+    return -ranks if descending else ranks
+
+
+def query_rows(dataset, sort_by=None, filter_query=None, cache_key=None):
+    """
+    정렬/필터를 적용한 행 인덱스 계산
+
+    Args:
+        dataset: Dataset
+        sort_by: DataTable sort_by ([{'column_id', 'direction'}, ...])
+        filter_query: DataTable filter_query
+        cache_key: 결과 캐시 키 (데이터셋 식별자), None이면 캐시 안 함
+
+    Returns:
+        ndarray 또는 None (정렬/필터가 없으면 None → 원본 순서)
+    """
+    sort_by = sort_by or []
+    terms = parse_filter_query(filter_query)
+    if not sort_by and not terms:
+        return None
+
+    key = None
+    if cache_key is not None:
+        key = (cache_key, filter_query or '',
+               tuple((s['column_id'], s['direction']) for s in sort_by))
+        with _view_lock:
+            if key in _view_cache:
+                _view_cache.move_to_end(key)
+                return _view_cache[key]
+
+    mask = None
+    for column, op, value, case_insensitive in terms:
+        term = _term_mask(_column_array(dataset, column), op, value, case_insensitive)
+        mask = term if mask is None else mask & term
+    rows = np.flatnonzero(mask) if mask is not None else np.arange(dataset.n_samples)
+
+    if sort_by:
+        # lexsort는 마지막 키가 1순위 → 역순으로 전달
+        keys = [_sort_key(_column_array(dataset, s['column_id'])[rows], s['direction'] == 'desc')
+                for s in reversed(sort_by)]
+        rows = rows[np.lexsort(keys)]
+
+    if key is not None:
+        with _view_lock:
+            _view_cache[key] = rows
+            while len(_view_cache) > _VIEW_CACHE_SIZE:
+                _view_cache.popitem(last=False)
+    return rows
+
+
+def page_records(dataset, page_current, page_size, sort_by=None, filter_query=None,
+                 cache_key=None):
+    """
+    현재 페이지에 보이는 행만 records 형태로 반환
+
+    Returns:
+        tuple: (records, page_count, total_rows)
+    """
+    rows = query_rows(dataset, sort_by, filter_query, cache_key)
+    total = dataset.n_samples if rows is None else len(rows)
+    page_count = max(1, -(-total // page_size))
+    start = min(page_current or 0, page_count - 1) * page_size
+    stop = start + page_size
+    selection = slice(start, stop) if rows is None else rows[start:stop]
+
+    frame = dataset.to_frame(selection)
+    if dataset.time is not None and dataset.time.dtype.kind == 'M':
+        frame[dataset.time_name] = np.datetime_as_string(frame[dataset.time_name].to_numpy(), unit='ms')
+    return frame.to_dict('records'), page_count, total
+
+
+def column_specs(dataset):
+    """DataTable columns 정의 (필터 UI가 컬럼 타입을 알 수 있도록 type 지정)"""
+    specs = []
+    if dataset.time is not None:
+        kind = 'datetime' if dataset.time.dtype.kind == 'M' else 'numeric'
+        specs.append({'name': dataset.time_name, 'id': dataset.time_name, 'type': kind})
+    specs += [{'name': c, 'id': c, 'type': 'numeric'} for c in dataset.channels]
+    specs += [{'name': c, 'id': c, 'type': 'text'} for c in dataset.extra]
+    return specs
+
+
+# ============================================================================
+# 요약 통계 (데이터셋당 1회 계산)
+# ============================================================================
+_SUMMARY_BLOCK = 1_000_000
+
+
+def summarize(dataset):
+    """
+    채널별 요약 통계 계산 (모든 채널을 한 번에 벡터 연산)
+
+    Returns:
+        dict: {'rows', 'fs', 'start', 'end', 'channels': [{name, count, missing,
+               mean, std, min, max}, ...]}
+    """
+    values = dataset.values
+    n_channels, n_samples = values.shape
+    count = np.zeros(n_channels, dtype=np.int64)
+    total = np.zeros(n_channels)
+    vmin = np.full(n_channels, np.inf)
+    vmax = np.full(n_channels, -np.inf)
+    # 샘플 축을 블록으로 나눠 누적 (float64 전체 사본을 만들지 않음)
+    for start in range(0, n_samples, _SUMMARY_BLOCK):
+        block = values[:, start:start + _SUMMARY_BLOCK]
+        finite = np.isfinite(block)
+        count += finite.sum(axis=1)
+        total += np.where(finite, block, 0).sum(axis=1, dtype=np.float64)
+        vmin = np.minimum(vmin, np.where(finite, block, np.inf).min(axis=1, initial=np.inf))
+        vmax = np.maximum(vmax, np.where(finite, block, -np.inf).max(axis=1, initial=-np.inf))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+    sq = np.zeros(n_channels)
+    for start in range(0, n_samples, _SUMMARY_BLOCK):
+        block = values[:, start:start + _SUMMARY_BLOCK]
+        dev = block - mean[:, None].astype(block.dtype)
+        sq += (np.where(np.isfinite(dev), dev, 0).astype(np.float64) ** 2).sum(axis=1)
+    var = sq / np.maximum(count - 1, 1)
+
+    def clean(x):
+        return float(x) if np.isfinite(x) else None
+
+    summary = {
+        'rows': int(dataset.n_samples),
+        'fs': dataset.fs,
+        'start': None,
+        'end': None,
+        'channels': [
+            {'name': name, 'count': int(count[i]), 'missing': int(dataset.n_samples - count[i]),
+             'mean': clean(mean[i]), 'std': clean(np.sqrt(var[i])),
+             'min': clean(vmin[i]), 'max': clean(vmax[i])}
+            for i, name in enumerate(dataset.channels)
+        ],
+    }
+    if dataset.time is not None and len(dataset.time):
+        if dataset.time.dtype.kind == 'M':
+            valid = dataset.time[~np.isnat(dataset.time)]
+            if len(valid):
+                summary['start'] = str(np.datetime_as_string(valid.min(), unit='s'))
+                summary['end'] = str(np.datetime_as_string(valid.max(), unit='s'))
+        else:
+            summary['start'] = clean(np.nanmin(dataset.time))
+            summary['end'] = clean(np.nanmax(dataset.time))
+    return summary
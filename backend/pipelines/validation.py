@@ -0,0 +1,337 @@
+import time
+
+import numpy as np
+
+# ============================================================================
+# Step 4: 단일 패스 스트리밍 검증
+# ============================================================================
+# 판정 기준 (채널별)
+ZERO_MEAN_TOLERANCE = 0.05     # |평균| ≤ tolerance × 표준편차
+OUT_OF_BAND_MAX = 0.05         # 통과대역 밖 에너지 비율 상한
+SPIKE_SIGMA = 6.0              # |x - 평균| > SPIKE_SIGMA × 표준편차 → 스파이크
+CLIP_MIN_COUNT = 5             # 최대/최소값에 머무는 샘플 수가 이 이상이면 clipping
+JITTER_MAX = 0.05              # 샘플 간격 표준편차 / 평균 간격 상한
+GAP_FACTOR = 1.5               # 간격 > GAP_FACTOR × 평균 간격 → 누락 구간
+DEFAULT_CHUNK = 1 << 15        # 검증 청크 길이 (샘플)
+MAX_SEGMENT = 1 << 15          # 대역 에너지 FFT 구간 길이 상한
+
+# Step 4 드롭다운으로 켜고 끄는 검사 (나머지는 항상 검사)
+OPTIONAL_CHECKS = ('zero_mean', 'out_of_band', 'spikes')
+ALWAYS_CHECKS = ('non_finite', 'clipping')
+
+
+def _merge_moments(count, mean, m2, chunk):
+    """
+    Welford/Chan 방식으로 청크 통계를 누적 통계에 병합
+
+    Args:
+        count, mean, m2: 누적 (n_channels,) 배열
+        chunk: (n_channels, n) 배열 (NaN/Inf 제외)
+
+    Returns:
+        tuple: (count, mean, m2)
+    """
+    finite = np.isfinite(chunk)
+    n_b = finite.sum(axis=1).astype(np.float64)
+    x = np.where(finite, chunk, 0).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_b = np.where(n_b > 0, x.sum(axis=1) / n_b, 0.0)
+    dev = np.where(finite, x - mean_b[:, None], 0.0)
+    m2_b = (dev * dev).sum(axis=1)
+
+    total = count + n_b
+    delta = mean_b - mean
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(total > 0, n_b / total, 0.0)
+    mean = mean + delta * ratio
+    m2 = m2 + m2_b + delta ** 2 * count * ratio
+    return total, mean, m2
+
+
+def segment_length(fs, low=None, max_length=MAX_SEGMENT):
+    """대역 에너지 FFT 구간 길이 (하한 주파수를 4개 이상 bin으로 분해할 수 있는 2의 거듭제곱)"""
+    if not fs:
+        return 1024
+    resolution = (low / 4.0) if low else 0.05
+    return int(min(max_length, max(256, 2 ** int(np.ceil(np.log2(fs / resolution))))))
+
+
+class StreamingValidator:
+    """
+    청크를 한 번씩만 보면서 채널별 검증 통계를 누적하는 검증기
+
+    - 평균/분산: Welford(Chan 병합) 누적 → 영평균 판정
+    - 스파이크: 누적 평균/표준편차 기준 SPIKE_SIGMA 초과 샘플 수
+    - NaN/Inf, clipping(최대/최소값 반복 횟수)
+    - 대역 밖 에너지: Hann 창 FFT 구간별 파워를 누적한 평균 스펙트럼
+    - 샘플 간격 jitter: 시간 컬럼 간격의 누적 평균/분산과 누락 구간 수
+
+    사용 예:
+        validator = StreamingValidator(channels, fs=16.7, band=(0.1, 3.2))
+        for chunk in chunks:
+            validator.update(chunk.values, chunk.time)
+        report = validator.report()
+    """
+
+    def __init__(self, channels, fs=None, band=None, checks=OPTIONAL_CHECKS):
+        self.channels = list(channels)
+        self.fs = fs
+        self.band = tuple(band) if band else None
+        self.checks = tuple(checks)
+        n = len(self.channels)
+
+        self.samples = 0
+        self.count = np.zeros(n)
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)
+        self.nan = np.zeros(n, dtype=np.int64)
+        self.inf = np.zeros(n, dtype=np.int64)
+        self.spikes = np.zeros(n, dtype=np.int64)
+        self.vmax = np.full(n, -np.inf)
+        self.vmin = np.full(n, np.inf)
+        self.at_max = np.zeros(n, dtype=np.int64)
+        self.at_min = np.zeros(n, dtype=np.int64)
+
+        # 대역 에너지 (구간 단위 FFT, 남은 샘플은 다음 청크로 이월)
+        self.nperseg = segment_length(fs, self.band[0] if self.band else None)
+        self.window = np.hanning(self.nperseg)
+        self.power = np.zeros((n, self.nperseg // 2 + 1))
+        self.segments = 0
+        self._carry = np.empty((n, 0), dtype=np.float64)
+
+        # 샘플 간격 (초)
+        self._last_time = None
+        self.dt_count = 0.0
+        self.dt_mean = 0.0
+        self.dt_m2 = 0.0
+        self.gaps = 0
+
+    # ------------------------------------------------------------------
+    def update(self, values, time=None):
+        """청크 하나 누적 (values: (n_channels, n), time: 같은 길이의 시간 배열)"""
+        values = np.asarray(values)
+        if values.shape[1] == 0:
+            return
+        self.samples += values.shape[1]
+        self.nan += np.isnan(values).sum(axis=1)
+        self.inf += np.isinf(values).sum(axis=1)
+        self.count, self.mean, self.m2 = _merge_moments(self.count, self.mean, self.m2, values)
+
+        # 스파이크: 이 청크까지 누적한 통계 기준 (첫 청크가 짧으면 보수적으로 판정됨)
+        std = np.sqrt(self.m2 / np.maximum(self.count - 1, 1))
+        with np.errstate(invalid='ignore'):
+            dev = np.abs(values - self.mean[:, None].astype(values.dtype))
+            self.spikes += (dev > SPIKE_SIGMA * std[:, None]).sum(axis=1)
+
+        self._update_extremes(values)
+        if 'out_of_band' in self.checks and self.band and self.fs:
+            self._update_spectrum(values)
+        if time is not None:
+            self._update_time(time)
+
+    def _update_extremes(self, values):
+        finite = np.isfinite(values)
+        cmax = np.where(finite, values, -np.inf).max(axis=1)
+        cmin = np.where(finite, values, np.inf).min(axis=1)
+        n_max = np.where(np.isfinite(cmax), (values == cmax[:, None]).sum(axis=1), 0)
+        n_min = np.where(np.isfinite(cmin), (values == cmin[:, None]).sum(axis=1), 0)
+        # 새 최대값이 나오면 반복 횟수를 새로 셈
+        self.at_max = np.where(cmax > self.vmax, n_max,
+                               self.at_max + np.where(cmax == self.vmax, n_max, 0))
+        self.at_min = np.where(cmin < self.vmin, n_min,
+                               self.at_min + np.where(cmin == self.vmin, n_min, 0))
+        self.vmax = np.maximum(self.vmax, cmax)
+        self.vmin = np.minimum(self.vmin, cmin)
+
+    def _update_spectrum(self, values):
+        data = np.concatenate([self._carry, np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)],
+                              axis=1)
+        k = data.shape[1] // self.nperseg
+        if k:
+            seg = data[:, :k * self.nperseg].reshape(data.shape[0], k, self.nperseg)
+            # 구간 평균 제거 → DC 누설이 저주파 bin으로 번지지 않게 (영평균은 별도 검사)
+            seg = seg - seg.mean(axis=-1, keepdims=True)
+            spec = np.fft.rfft(seg * self.window, axis=-1)
+            self.power += (spec.real ** 2 + spec.imag ** 2).sum(axis=1)
+            self.segments += k
+        self._carry = data[:, k * self.nperseg:]
+
+    def _update_time(self, time):
+        if np.issubdtype(time.dtype, np.datetime64):
+            t = time.astype('datetime64[ns]').astype(np.int64)
+            if self._last_time is not None:
+                t = np.concatenate([[self._last_time], t])
+            dt = np.diff(t).astype(np.float64) * 1e-9
+            self._last_time = t[-1]
+        else:
+            t = np.asarray(time, dtype=np.float64)
+            if self._last_time is not None:
+                t = np.concatenate([[self._last_time], t])
+            dt = np.diff(t)
+            self._last_time = t[-1]
+        dt = dt[np.isfinite(dt)]
+        if not len(dt):
+            return
+        n_b = float(len(dt))
+        mean_b = dt.mean()
+        m2_b = ((dt - mean_b) ** 2).sum()
+        total = self.dt_count + n_b
+        delta = mean_b - self.dt_mean
+        self.dt_mean += delta * n_b / total
+        self.dt_m2 += m2_b + delta ** 2 * self.dt_count * n_b / total
+        self.dt_count = total
+        nominal = 1.0 / self.fs if self.fs else self.dt_mean
+        self.gaps += int((dt > GAP_FACTOR * nominal).sum())
+
+    # ------------------------------------------------------------------
+    def _band_fraction(self):
+        """채널별 통과대역 밖 에너지 비율 (DC bin 제외)"""
+        if not self.segments:
+            return None
+        freqs = np.fft.rfftfreq(self.nperseg, 1.0 / self.fs)
+        low, high = self.band
+        power = self.power[:, 1:]
+        freqs = freqs[1:]
+        outside = (freqs < (low or 0)) | (freqs > high)
+        total = power.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, power[:, outside].sum(axis=1) / total, 0.0)
+
+    def report(self):
+        """
+        채널별 검사 결과
+
+        Returns:
+            dict: {'passed', 'samples', 'fs', 'band', 'timing': {...},
+                   'channels': [{'name', 'passed', 'checks': {check: {'value', 'limit', 'passed'}}}]}
+        """
+        std = np.sqrt(self.m2 / np.maximum(self.count - 1, 1))
+        fraction = self._band_fraction() if 'out_of_band' in self.checks else None
+        clip_limit = max(CLIP_MIN_COUNT, int(1e-5 * self.samples))
+
+        def check(value, limit, passed):
+            return {'value': value, 'limit': limit, 'passed': bool(passed)}
+
+        channels = []
+        for i, name in enumerate(self.channels):
+            checks = {
+                'non_finite': check(int(self.nan[i] + self.inf[i]), 0, self.nan[i] + self.inf[i] == 0),
+                'clipping': check(int(max(self.at_max[i], self.at_min[i])), clip_limit,
+                                  max(self.at_max[i], self.at_min[i]) < clip_limit),
+            }
+            if 'zero_mean' in self.checks:
+                ratio = float(abs(self.mean[i]) / std[i]) if std[i] > 0 else float(abs(self.mean[i]) > 0)
+                checks['zero_mean'] = check(ratio, ZERO_MEAN_TOLERANCE, ratio <= ZERO_MEAN_TOLERANCE)
+            if 'out_of_band' in self.checks:
+                if fraction is None:
+                    # 대역 정보가 없거나(Step 3 미실행) 데이터가 FFT 구간보다 짧음
+                    checks['out_of_band'] = check(None, OUT_OF_BAND_MAX, False)
+                else:
+                    checks['out_of_band'] = check(float(fraction[i]), OUT_OF_BAND_MAX,
+                                                  fraction[i] <= OUT_OF_BAND_MAX)
+            if 'spikes' in self.checks:
+                checks['spikes'] = check(int(self.spikes[i]), 0, self.spikes[i] == 0)
+            channels.append({
+                'name': name,
+                'passed': all(c['passed'] for c in checks.values()),
+                'mean': float(self.mean[i]),
+                'std': float(std[i]),
+                'checks': checks,
+            })
+
+        timing = None
+        if self.dt_count:
+            dt_std = np.sqrt(self.dt_m2 / max(self.dt_count - 1, 1))
+            jitter = float(dt_std / self.dt_mean) if self.dt_mean > 0 else float('inf')
+            timing = {
+                'mean_interval': float(self.dt_mean),
+                'jitter': check(jitter, JITTER_MAX, jitter <= JITTER_MAX),
+                'gaps': int(self.gaps),
+            }
+        passed = all(c['passed'] for c in channels) and (timing is None or timing['jitter']['passed'])
+        return {
+            'passed': passed,
+            'samples': int(self.samples),
+            'fs': self.fs,
+            'band': list(self.band) if self.band else None,
+            'timing': timing,
+            'channels': channels,
+        }
+
+
+# ============================================================================
+# Dataset / 청크 스트림 검증
+# ============================================================================
+def _band_of(dataset):
+    """Step 3 메타데이터의 대역통과 범위 (없으면 None)"""
+    step3 = dataset.meta.get('step3') or {}
+    return step3.get('bandpass')
+
+
+def validate_chunks(chunks, channels, fs, band=None, checks=OPTIONAL_CHECKS):
+    """
+    Dataset 청크 스트림 검증 (예: ingest.iter_csv_chunks 출력 → RAM보다 큰 파일)
+
+    Returns:
+        dict: StreamingValidator.report()
+    """
+    validator = StreamingValidator(channels, fs, band, checks)
+    for chunk in chunks:
+        validator.update(chunk.values, chunk.time)
+    return validator.report()
+
+
+def validate_dataset(dataset, checks=OPTIONAL_CHECKS, band=None, chunk=DEFAULT_CHUNK,
+                     progress=None):
+    """
+    Dataset을 청크 단위로 한 번 훑으며 검증
+
+    memory-map된 캐시 항목도 청크만큼만 메모리에 올린다.
+
+    Args:
+        dataset: Dataset
+        checks: 선택 검사 목록 (OPTIONAL_CHECKS 중)
+        band: (low, high) Hz (None이면 Step 3 메타데이터 사용)
+        chunk: 청크 길이 (샘플)
+        progress: progress(fraction, message) — 청크마다 호출 (백그라운드 작업용)
+
+    Returns:
+        dict: StreamingValidator.report() + 'seconds'
+    """
+    started = time.perf_counter()
+    validator = StreamingValidator(dataset.channels, dataset.fs, band or _band_of(dataset), checks)
+    for start in range(0, dataset.n_samples, chunk):
+        if progress is not None:
+            progress(start / max(dataset.n_samples, 1), 'Validating')
+        stop = start + chunk
+        validator.update(dataset.values[:, start:stop],
+                         None if dataset.time is None else dataset.time[start:stop])
+    report = validator.report()
+    report['seconds'] = time.perf_counter() - started
+    return report
+
+
+def selected_checks(zero_mean='Yes', bandpass_filtered='Yes', no_spikes='Yes'):
+    """Step 4 드롭다운 값 → 검사 목록"""
+    flags = {'zero_mean': zero_mean, 'out_of_band': bandpass_filtered, 'spikes': no_spikes}
+    return tuple(name for name in OPTIONAL_CHECKS if flags[name] == 'Yes')
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from backend.pipelines.ingest import iter_csv_chunks
+
+    parser = argparse.ArgumentParser(description="Streaming validation of a (large) CSV record")
+    parser.add_argument('csv')
+    parser.add_argument('--band', type=float, nargs=2, metavar=('LOW', 'HIGH'))
+    parser.add_argument('--fs', type=float, help="sampling rate (default: inferred from first chunk)")
+    args = parser.parse_args()
+
+    chunks = iter_csv_chunks(args.csv)
+    first = next(chunks)
+    validator = StreamingValidator(first.channels, args.fs or first.fs, args.band)
+    validator.update(first.values, first.time)
+    for chunk in chunks:
+        validator.update(chunk.values, chunk.time)
+    print(json.dumps(validator.report(), indent=2))
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import time
+
+import numpy as np
+
+from backend.pipelines.cache import DatasetCache
+from backend.pipelines.cleaning import clean_dataset
+from backend.pipelines.dataset import Dataset
+from backend.pipelines.filtering import filter_dataset
+from backend.pipelines.scaling import scale_dataset
+
+# ============================================================================
+# Data Preparation 파이프라인 (단계별 출력 memoization)
+# ============================================================================
+# 각 단계 출력은 (입력 단계 키, 단계 이름, 버전, 파라미터)의 해시로 캐시된다.
+# 입력 키가 이전 단계 키를 포함하므로 키 자체가 상류 파라미터 전체를 반영하고,
+# Step 3 파라미터만 바꾸면 Step 1/2 키는 그대로여서 캐시된 출력을 재사용한다.
+SOURCE_STAGE = 'raw'
+
+
+class Stage:
+    """
+    파이프라인 단계 하나
+
+    Attributes:
+        name: 단계 이름 ('step1' 등)
+        func: func(dataset, **params) → (Dataset, report dict)
+        label: 화면 표시 이름
+        version: 단계 구현이 바뀌면 올려서 디스크에 남은 이전 결과를 무효화
+    """
+
+    def __init__(self, name, func, label=None, version=1):
+        self.name = name
+        self.func = func
+        self.label = label or name
+        self.version = version
+
+
+def _canonical(params):
+    """해시용 파라미터 직렬화 (3 과 3.0 을 같은 값으로 취급)"""
+    def normalize(value):
+        if isinstance(value, bool) or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return str(value)
+    return json.dumps(normalize(params or {}), sort_keys=True, separators=(',', ':'))
+
+
+class Pipeline:
+    """
+    순서가 있는 단계들의 체인 (각 단계는 직전 단계 출력을 입력으로 사용)
+
+    출력은 DatasetCache에 (session_id, dataset_id, 단계 키)로 저장하므로 Analytics
+    페이지의 세션 캐시를 그대로 memo 저장소로 쓰고, 헤드리스 실행 시에는 메모리
+    전용 DatasetCache를 사용한다.
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.names = [stage.name for stage in self.stages]
+
+    def stage(self, name):
+        return self.stages[self.names.index(name)]
+
+    def keys(self, params, upto=None, source_key=SOURCE_STAGE):
+        """
+        단계별 캐시 키 계산
+
+        Args:
+            params: {stage_name: {param: value}}
+            upto: 마지막으로 실행할 단계 (None이면 전체)
+            source_key: 입력 데이터 키
+
+        Returns:
+            dict: {stage_name: key} (실행 순서대로)
+        """
+        stop = len(self.stages) if upto is None else self.names.index(upto) + 1
+        keys = {}
+        parent = source_key
+        for stage in self.stages[:stop]:
+            payload = f"{parent}|{stage.name}|{stage.version}|{_canonical(params.get(stage.name))}"
+            parent = f"{stage.name}-{hashlib.sha1(payload.encode()).hexdigest()[:16]}"
+            keys[stage.name] = parent
+        return keys
+
+    def cached_key(self, cache, session_id, dataset_id, params, upto=None,
+                   source_key=SOURCE_STAGE):
+        """upto 단계 출력이 이미 캐시에 있으면 그 키, 없으면 None"""
+        key = self.keys(params, upto, source_key)[upto or self.names[-1]]
+        return key if cache.has(session_id, dataset_id, key) else None
+
+    def run(self, cache, session_id, dataset_id, params, upto=None, source=None,
+            source_key=SOURCE_STAGE, finalize=None, progress=None):
+        """
+        upto 단계까지 실행 (캐시에 있는 가장 뒤 단계부터 이어서 계산)
+
+        Args:
+            cache: DatasetCache
+            session_id, dataset_id: 캐시 네임스페이스
+            params: {stage_name: {param: value}}
+            upto: 마지막 단계 이름 (None이면 전체)
+            source: 입력 Dataset (None이면 cache의 source_key 항목)
+            source_key: 입력 데이터 캐시 키
+            finalize: 새로 계산한 출력을 저장하기 직전에 호출할 함수 (요약 통계 등)
+            progress: progress(fraction, message) — 각 단계 시작 전에 호출 (백그라운드 작업용)
+
+        Returns:
+            tuple: (Dataset, runs) — runs는 단계별
+                   {'stage', 'key', 'cached', 'report'} 리스트
+
+        Raises:
+            KeyError: 입력 데이터가 캐시에 없을 때
+            ValueError: 단계 함수가 파라미터를 거부할 때
+        """
+        keys = self.keys(params, upto, source_key)
+        names = list(keys)
+
+        # 캐시된 가장 뒤 단계 찾기 → 그 이후만 재계산
+        dataset, resume = None, 0
+        for i in range(len(names) - 1, -1, -1):
+            dataset = cache.get(session_id, dataset_id, keys[names[i]])
+            if dataset is not None:
+                resume = i + 1
+                break
+        if dataset is None:
+            dataset = source if source is not None else cache.get(session_id, dataset_id, source_key)
+            if dataset is None:
+                raise KeyError(f"Source dataset not found: {dataset_id}/{source_key}")
+
+        # 캐시된 출력의 meta에는 상류 단계 리포트가 모두 누적되어 있음
+        reports = dataset.meta.get('reports') or {}
+        runs = [{'stage': name, 'key': keys[name], 'cached': True, 'report': reports.get(name)}
+                for name in names[:resume]]
+        todo = names[resume:]
+        for i, name in enumerate(todo):
+            stage = self.stage(name)
+            if progress is not None:
+                progress(i / len(todo), f"Running {stage.label}")
+            started = time.perf_counter()
+            dataset, report = stage.func(dataset, **(params.get(name) or {}))
+            report = {**report, 'seconds': time.perf_counter() - started}
+            # 단계 리포트를 출력 meta에 남겨서 캐시 적중 시에도 표시 가능
+            dataset.meta['reports'] = {**(dataset.meta.get('reports') or {}), name: report}
+            if finalize is not None:
+                finalize(dataset)
+            cache.put(session_id, dataset_id, dataset, keys[name])
+            runs.append({'stage': name, 'key': keys[name], 'cached': False, 'report': report})
+        return dataset, runs
+
+
+# ============================================================================
+# Analytics Data Preparation 정의 (Step 1 ~ 3)
+# ============================================================================
+PREPARATION = Pipeline([
+    Stage('step1', clean_dataset, 'Step 1'),
+    Stage('step2', scale_dataset, 'Step 2'),
+    Stage('step3', filter_dataset, 'Step 3'),
+])
+
+
+def fingerprint(dataset):
+    """데이터셋 내용 해시 (헤드리스 실행 시 캐시 네임스페이스로 사용)"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([dataset.channels, dataset.fs, str(dataset.values.dtype),
+                              dataset.values.shape]).encode())
+    digest.update(memoryview(np.ascontiguousarray(dataset.values)).cast('B'))
+    return digest.hexdigest()[:16]
+
+
+def run_preparation(dataset, params, upto=None, cache=None, dataset_id=None):
+    """
+    Data Preparation 헤드리스 실행 (배치 작업용)
+
+    Args:
+        dataset: 원본 Dataset
+        params: {stage_name: {param: value}} (없는 단계는 기본값)
+        upto: 마지막 단계 이름
+        cache: DatasetCache (None이면 메모리 전용 캐시 새로 생성)
+        dataset_id: 캐시 네임스페이스 (None이면 데이터 내용 해시)
+
+    Returns:
+        tuple: (Dataset, runs)
+    """
+    if cache is None:
+        cache = DatasetCache(spill_dir=None)
+    return PREPARATION.run(cache, 'headless', dataset_id or fingerprint(dataset), params, upto,
+                           source=dataset)
+
+
+# ============================================================================
+# 벤치마크 / CLI
+# ============================================================================
+def benchmark(hours=6, fs=100, n_channels=8, seed=0):
+    """전체 실행 후 Step 3 파라미터만 바꿔 재실행했을 때의 소요 시간 비교"""
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 * fs)
+    values = rng.normal(scale=0.02, size=(n_channels, n)).astype(np.float32)
+    dataset = Dataset(values, [f'ch{i}' for i in range(n_channels)], fs=fs)
+    cache = DatasetCache(spill_dir=None)
+    params = {'step3': {'bp_low': 0.1, 'bp_high': 3.2}}
+
+    started = time.perf_counter()
+    run_preparation(dataset, params, cache=cache)
+    cold = time.perf_counter() - started
+
+    params['step3']['bp_high'] = 2.5
+    started = time.perf_counter()
+    _, runs = run_preparation(dataset, params, cache=cache)
+    warm = time.perf_counter() - started
+    return {'samples': n * n_channels, 'cold_seconds': round(cold, 3),
+            'step3_only_seconds': round(warm, 3),
+            'reused': [r['stage'] for r in runs if r['cached']]}
+
+
+if __name__ == '__main__':
+    import argparse
+    from backend.pipelines.ingest import ingest_csv
+
+    parser = argparse.ArgumentParser(description="Data Preparation pipeline (headless)")
+    parser.add_argument('csv', nargs='?', help="input CSV (omit to run the benchmark)")
+    parser.add_argument('--params', help="JSON file: {\"step1\": {...}, \"step2\": {...}, ...}")
+    parser.add_argument('--upto', choices=PREPARATION.names, default=None)
+    parser.add_argument('--out', help="output .npz path")
+    parser.add_argument('--hours', type=float, default=6)
+    parser.add_argument('--channels', type=int, default=8)
+    args = parser.parse_args()
+
+    if not args.csv:
+        print(benchmark(args.hours, n_channels=args.channels))
+    else:
+        params = {}
+        if args.params:
+            with open(args.params, encoding='utf-8') as f:
+                params = json.load(f)
+        result, runs = run_preparation(ingest_csv(args.csv), params, args.upto)
+        for run in runs:
+            seconds = (run['report'] or {}).get('seconds')
+            print(f"{run['stage']}: {'cached' if run['cached'] else f'{seconds:.2f} s'}")
+        if args.out:
+            np.savez(args.out, values=result.values, channels=np.array(result.channels),
+                     fs=result.fs if result.fs is not None else np.nan)
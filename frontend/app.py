@@ -2,15 +2,23 @@ import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 import os
+import sys
+import uuid
 
 # 절대 경로로 pages 폴더 지정
 current_dir = os.path.dirname(os.path.abspath(__file__))
 pages_folder = os.path.join(current_dir, 'pages')
 
+# backend 패키지 import를 위해 프로젝트 루트를 경로에 추가
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
 app = dash.Dash(
     __name__,
     use_pages=True,
     pages_folder=pages_folder,  # ← 절대 경로 사용
+    assets_folder=os.path.join(project_root, 'assets'),  # 샘플 GeoJSON, 지도 레이어 JS (map_layers.js)
     external_stylesheets=[dbc.themes.BOOTSTRAP],
     suppress_callback_exceptions=True
 )
@@ -18,58 +26,72 @@ app = dash.Dash(
 # 서버 (배포용)
 server = app.server
 
-# 전체 레이아웃
-app.layout = html.Div([
-    # ========================================================================
-    # 전역 데이터 저장소 (페이지 간 데이터 공유)
-    # ========================================================================
-    dcc.Store(id='turbine-data', storage_type='session', data={
-        'locations': [],        # Map에서 설정: GeoJSON 데이터
-        'frequencies': {},      # Analytics에서 설정: {turbine_id: {mode1, mode2, damping, timestamp}}
-        'anomalies': {},        # Analytics에서 설정: {turbine_id: [anomaly_list]}
-        'weather': {},          # Weather에서 설정: {timestamp, wind_speed, temperature}
-        'last_updated': None    # 마지막 업데이트 시간
-    }),
-    
-    # 헤더
-    dbc.Navbar(
-        dbc.Container([
-            dbc.Row([
-                dbc.Col(html.H2("🌊 SNUGeoSHM", className="text-white"), width="auto"),
-            ], align="center"),
-        ]),
-        color="primary",
-        dark=True,
-        className="mb-4"
-    ),
+# 보고서 다운로드 등 Dash 콜백 밖의 Flask 라우트
+from backend.api.routes import register_routes
+register_routes(server)
+
+# 전체 레이아웃 (페이지 로드마다 호출 → 새 세션 ID 발급)
+def serve_layout():
+    return html.Div([
+        # ========================================================================
+        # 전역 데이터 저장소 (페이지 간 데이터 공유)
+        # ========================================================================
+        # 브라우저 탭 단위 세션 ID (서버 측 데이터셋 캐시 키)
+        # session storage에 값이 이미 있으면 그 값이 유지됨
+        dcc.Store(id='session-id', storage_type='session', data=uuid.uuid4().hex),
     
-    # 네비게이션 바
-    dbc.Container([
-        dbc.Nav([
-            dbc.NavLink(" Home", href="/", active="exact"),
-            dbc.NavLink(" Map", href="/map-overlay", active="exact"),
-            dbc.NavLink(" Soil", href="/soil-profile", active="exact"),
-            dbc.NavLink(" Foundation", href="/foundation-springs", active="exact"),
-            dbc.NavLink(" FE Sim", href="/fe-simulation", active="exact"),
-            dbc.NavLink(" Analytics", href="/analytics", active="exact"),
-            dbc.NavLink(" Scenario", href="/scenario-builder", active="exact"),
-            dbc.NavLink(" 3D View", href="/wtg-viewer", active="exact"),
-        ], pills=True, className="mb-4"),
-    ]),
+        dcc.Store(id='turbine-data', storage_type='session', data={
+            'locations': [],        # Map에서 설정: GeoJSON 데이터
+            'geometry': None,       # Map에서 설정: {center, bounds, hull, outline, outline_key, counts, features, uploaded} (업로드 시 한 번 계산)
+            'frequencies': {},      # Analytics에서 설정: {turbine_id: {mode1, mode2, mode3, damping(%), damping2, damping3, timestamp}}
+            'anomalies': {},        # Analytics에서 설정: {turbine_id: [{time, score, feature}, ...]} (이상 윈도우, 시간순)
+            'drift': {},            # Analytics에서 설정: {turbine_id: {drift: [모드별 %], events: [{time, mode, detector, change}, ...]}}
+            'weather': {},          # Weather에서 설정: {timestamp, location, wind_speed, temperature}
+            'last_updated': None    # 마지막 업데이트 시간
+        }),
     
-    # 페이지 컨텐츠 (자동 렌더링)
-    dbc.Container(dash.page_container, fluid=True),
+        # 헤더
+        dbc.Navbar(
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col(html.H2("🌊 SNUGeoSHM", className="text-white"), width="auto"),
+                ], align="center"),
+            ]),
+            color="primary",
+            dark=True,
+            className="mb-4"
+        ),
     
-    # 푸터
-    html.Footer(
+        # 네비게이션 바
         dbc.Container([
-            html.Hr(),
-            html.P("© 2025 SNU GeoSHM | Offshore Wind Turbine Digital Twin Platform",
-                   className="text-center text-muted")
+            dbc.Nav([
+                dbc.NavLink(" Home", href="/", active="exact"),
+                dbc.NavLink(" Map", href="/map-overlay", active="exact"),
+                dbc.NavLink(" Soil", href="/soil-profile", active="exact"),
+                dbc.NavLink(" Foundation", href="/foundation-springs", active="exact"),
+                dbc.NavLink(" FE Sim", href="/fe-simulation", active="exact"),
+                dbc.NavLink(" Analytics", href="/analytics", active="exact"),
+                dbc.NavLink(" Scenario", href="/scenario-builder", active="exact"),
+                dbc.NavLink(" 3D View", href="/wtg-viewer", active="exact"),
+            ], pills=True, className="mb-4"),
         ]),
-        className="mt-5"
-    )
-])
+    
+        # 페이지 컨텐츠 (자동 렌더링)
+        dbc.Container(dash.page_container, fluid=True),
+    
+        # 푸터
+        html.Footer(
+            dbc.Container([
+                html.Hr(),
+                html.P("© 2025 SNU GeoSHM | Offshore Wind Turbine Digital Twin Platform",
+                       className="text-center text-muted")
+            ]),
+            className="mt-5"
+        )
+    ])
+
+
+app.layout = serve_layout
 
 if __name__ == '__main__':
     print(f"Pages folder: {pages_folder}")
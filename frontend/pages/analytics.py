@@ -1,14 +1,51 @@
+from datetime import datetime, timezone
+
 import dash
 from dash import html, dcc, dash_table, Input, Output, State, callback
 import dash_bootstrap_components as dbc
-import pandas as pd
-import base64
-import io
+import numpy as np
+import plotly.graph_objects as go
+
+from backend.api.weather import WeatherError, align, get_weather
+from backend.ml import fdd
+from backend.ml.anomaly import CONTAMINATION, MAX_EVENTS, WINDOW_SECONDS, anomaly_events, detect_dataset
+from backend.ml.correlation import ROLLING_STEP, ROLLING_WINDOW, STEP_SECONDS, fleet_correlation, to_grid
+from backend.ml.drift import DRIFT_THRESHOLD, get_monitor
+from backend.ml.rules import score_fleet
+from backend.ml.ssi import (DEFAULT_MAX_ORDER, N_MODES, TRACK_STEP_SECONDS, ssi_dataset, summarize_result,
+                            summarize_tracking, track_dataset)
+from backend.ml.tracking import QUERY_POINTS, get_history, record_start, result_windows
+from backend.pipelines.batch import geojson_turbine_ids, resolve_source, run_fleet
+from backend.pipelines.cache import get_cache, new_dataset_id
+from backend.pipelines.dataset import Dataset
+from backend.pipelines.ingest import IngestError, ingest_upload
+from backend.pipelines.jobs import CANCELLED, DONE, FINISHED, get_jobs
+from backend.pipelines.reports import FORMATS, REPORT_DAYS, get_reports
+from backend.pipelines.table import FilterError, column_specs, page_records, summarize
+from backend.pipelines.validation import selected_checks, validate_dataset
+from backend.pipelines.workflow import PREPARATION, SOURCE_STAGE
 
 dash.register_page(__name__, path='/analytics', name='Analytics')
 
-# 전역 변수로 데이터 저장
-current_data = None
+# 업로드 데이터는 서버 측 캐시에 (session_id, dataset_id, stage) 키로 저장
+# 브라우저에는 dataset_id만 보관 (analytics-dataset Store)
+dataset_cache = get_cache()
+
+# 오래 걸리는 단계는 백그라운드 작업으로 실행 (상태는 공유 SQLite 파일에 기록)
+# 브라우저는 analytics-job Store의 job_id로 진행률을 주기적으로 조회
+jobs = get_jobs()
+
+# 전처리 Step 1~3은 PREPARATION 파이프라인으로 실행 (단계 출력은 파라미터 해시로 캐시)
+# Store에는 현재 표시 중인 단계 이름(stage)과 그 출력의 캐시 키(key)를 보관
+# 단계별 입력 컴포넌트 id → 단계 함수 인자 이름
+STEP_CONTROLS = {
+    'step1': [('remove-outliers', 'remove_outliers'), ('replace-spikes', 'replace_spikes'),
+              ('drop-missing', 'drop_missing'), ('offset-drift', 'offset_drift')],
+    'step2': [('detrend', 'detrend'), ('units', 'units'), ('normalization', 'normalization')],
+    'step3': [('antialiasing', 'antialiasing'), ('downsampling', 'downsampling'),
+              ('bandpass-low', 'bp_low'), ('bandpass-high', 'bp_high'),
+              ('wavelet-denoising', 'wavelet')],
+}
 
 # ============================================================================
 # Section 1: Data Preparation 
@@ -332,13 +369,24 @@ section_1_layout = dbc.Row([
                        })
             ]),
             
-            # 테이블
+            # 요약 통계 (데이터셋당 1회 계산)
+            html.Div(id='data-summary', className="mt-2"),
+            
+            # 테이블 (paging / 정렬 / 필터는 서버에서 처리)
             html.Div([
                 dash_table.DataTable(
                     id='data-table',
                     columns=[],
                     data=[],
+                    page_current=0,
                     page_size=25,
+                    page_count=1,
+                    page_action='custom',
+                    sort_action='custom',
+                    sort_mode='multi',
+                    sort_by=[],
+                    filter_action='custom',
+                    filter_query='',
                     style_table={
                         'overflowX': 'auto',
                         'overflowY': 'auto',
@@ -381,110 +429,325 @@ section_1_layout = dbc.Row([
 
 
 # ============================================================================
-# Section 2: SSI-COV Modal Analysis (빈 레이아웃)
+# Section 2: SSI-COV Modal Analysis
 # ============================================================================
-section_2_layout = dbc.Container([
-    html.H4(" SSI-COV Modal Analysis", className="my-3"),
-    html.P("This section is under development.", className="text-muted", style={'fontSize': '14px'}),
-    html.Hr(),
-    
-    # TODO 주석
-    dbc.Alert([
-        html.H6(" Planned Features:", className="alert-heading"),
-        html.Ul([
-            html.Li("PyOMA SSI-COV algorithm integration"),
-            html.Li("Modal frequency extraction (Mode 1, 2, 3)"),
-            html.Li("Damping ratio calculation"),
-            html.Li("Mode shape visualization"),
-            html.Li("Frequency comparison chart (before/after)"),
-        ], style={'marginBottom': '0'})
-    ], color="info", style={'fontSize': '13px'})
-    
-    # TODO: Add CSV data upload (preprocessed from Tab 1)
-    # TODO: Add PyOMA SSI-COV algorithm integration
-    # TODO: Add modal frequency extraction (Mode 1, 2, 3)
-    # TODO: Add damping ratio calculation
-    # TODO: Add mode shape visualization
-    # TODO: Add frequency comparison chart
-], fluid=True)
+def _number_row(label, component_id, value, step=1, min_value=None, placeholder=None):
+    """라벨 + 숫자 입력 한 줄 (Step 카드와 같은 배치)"""
+    return dbc.Row([
+        dbc.Col(html.Label(label, style={'fontSize': '14px'}), width=7),
+        dbc.Col(
+            dcc.Input(
+                id=component_id,
+                type='number',
+                value=value,
+                step=step,
+                min=min_value,
+                placeholder=placeholder,
+                className="form-control form-control-sm",
+                style={'fontSize': '13px', 'height': '32px'}
+            ),
+            width=5
+        )
+    ], className="mb-2", align="center")
+
+
+section_2_layout = dbc.Row([
+    # 왼쪽: 실행 설정
+    dbc.Col([
+        dbc.Card([
+            dbc.CardHeader(html.H6("SSI-COV Settings", style={'fontWeight': 'bold'})),
+            dbc.CardBody([
+                # 추정 방법: SSI-COV (안정화 다이어그램) / FDD·EFDD (특이값 스펙트럼, 저지연)
+                dbc.Row([
+                    dbc.Col(html.Label("Method:", style={'fontSize': '14px'}), width=7),
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id='ssi-method',
+                            options=[{'label': 'SSI-COV', 'value': 'ssi'},
+                                     {'label': 'FDD/EFDD', 'value': 'fdd'}],
+                            value='ssi',
+                            clearable=False,
+                            style={'fontSize': '13px'}
+                        ),
+                        width=5
+                    )
+                ], className="mb-2", align="center"),
+                # 결과를 기록할 터빈 (Map 팝업의 turbine id)
+                dbc.Row([
+                    dbc.Col(html.Label("Turbine ID:", style={'fontSize': '14px'}), width=7),
+                    dbc.Col(
+                        dcc.Input(
+                            id='ssi-turbine-id',
+                            type='text',
+                            value='T01',
+                            className="form-control form-control-sm",
+                            style={'fontSize': '13px', 'height': '32px'}
+                        ),
+                        width=5
+                    )
+                ], className="mb-2", align="center"),
+                _number_row("Max Model Order:", 'ssi-max-order', DEFAULT_MAX_ORDER, step=2, min_value=2),
+                _number_row("Block Rows:", 'ssi-block-rows', None, min_value=2, placeholder='auto'),
+                # 값이 있으면 연속 윈도우 추적 모드 (비우면 전체 기록 1회 분석)
+                _number_row("Tracking Window (min):", 'ssi-window', None, min_value=1, placeholder='off'),
+                # 윈도우 이동 간격: 윈도우 길이의 약수여야 겹친 구간의 상관 행렬을 증분 갱신
+                _number_row("Window Step (s):", 'ssi-step', TRACK_STEP_SECONDS, min_value=1),
+                # 모드 선택: 극점 계층 클러스터링 / 안정 극점 주파수 그룹
+                dbc.Row([
+                    dbc.Col(html.Label("Mode Selection:", style={'fontSize': '14px'}), width=7),
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id='ssi-selection',
+                            options=[{'label': 'Clustering', 'value': 'cluster'},
+                                     {'label': 'Stability', 'value': 'stable'}],
+                            value='cluster',
+                            clearable=False,
+                            style={'fontSize': '13px'}
+                        ),
+                        width=5
+                    )
+                ], className="mb-2", align="center"),
+                html.Small("Runs on the latest prepared data (Step 3 output recommended). "
+                           "With a tracking window, consecutive windows are identified incrementally "
+                           "and modes keep their numbering across windows. FDD/EFDD picks peaks of the "
+                           "singular value spectrum (much faster; model order and tracking are ignored).",
+                           className="text-muted d-block mb-2"),
+                dbc.Button("Run Modal Analysis", id='run-ssi', color="primary", className="w-100", size="sm")
+            ], style={'padding': '15px'})
+        ], className="mb-3", style={'width': '100%'}),
+
+        # 전체 터빈 일괄 분석 (서버의 디렉터리/압축 파일, 파일 이름 ↔ GeoJSON 터빈 ID)
+        dbc.Card([
+            dbc.CardHeader(html.H6("Fleet Batch", style={'fontWeight': 'bold'})),
+            dbc.CardBody([
+                dcc.Input(
+                    id='fleet-path',
+                    type='text',
+                    placeholder='Directory or .zip/.tar.gz on server',
+                    className="form-control form-control-sm mb-2",
+                    style={'fontSize': '13px', 'height': '32px'}
+                ),
+                html.Small("One CSV per turbine, named after the turbine IDs in the Map GeoJSON "
+                           "(e.g. T01.csv, T01_2024-06-01.csv). Uses the last Step 1-3 settings "
+                           "and the SSI settings above.",
+                           className="text-muted d-block mb-2"),
+                dbc.Button("Run Fleet Batch", id='run-fleet', color="primary", className="w-100", size="sm")
+            ], style={'padding': '15px'})
+        ], className="mb-3", style={'width': '100%'}),
+        html.Div(id='ssi-message', style={'fontSize': '13px'}),
+    ], width=3, style={'paddingRight': '10px'}),
+
+    # 오른쪽: 안정화 다이어그램 + 모드 표
+    dbc.Col([
+        html.Div([
+            html.H5("Stabilization Diagram / Singular Value Spectrum",
+                    style={
+                        'backgroundColor': '#f0f0f0',
+                        'padding': '8px',
+                        'margin': '0',
+                        'borderBottom': '2px solid #ccc',
+                        'fontSize': '16px',
+                        'fontWeight': 'bold'
+                    })
+        ]),
+        html.Div(id='ssi-result', className="mt-2"),
+    ], width=9, style={'paddingLeft': '10px'}),
+])
 
 
 # ============================================================================
-# Section 3: Anomaly Detection (빈 레이아웃)
+# Section 3: Anomaly Detection
 # ============================================================================
-section_3_layout = dbc.Container([
-    html.H4(" Anomaly Detection", className="my-3"),
-    html.P("This section is under development.", className="text-muted", style={'fontSize': '14px'}),
-    html.Hr(),
-    
-    # TODO 주석
-    dbc.Alert([
-        html.H6(" Planned Features:", className="alert-heading"),
-        html.Ul([
-            html.Li("Isolation Forest anomaly detection algorithm"),
-            html.Li("Drift threshold detection (>10%)"),
-            html.Li("Time-series plot with anomaly markers (Plotly)"),
-            html.Li("Anomaly statistics and summary"),
-        ], style={'marginBottom': '0'})
-    ], color="info", style={'fontSize': '13px'})
-    
-    # TODO: Add Isolation Forest anomaly detection algorithm
-    # TODO: Add drift threshold detection (>10%)
-    # TODO: Add time-series plot with anomaly markers
-    # TODO: Add anomaly statistics table
-    # TODO: Add anomaly event log
-], fluid=True)
+section_3_layout = dbc.Row([
+    # 왼쪽: 실행 설정
+    dbc.Col([
+        dbc.Card([
+            dbc.CardHeader(html.H6("Isolation Forest", style={'fontWeight': 'bold'})),
+            dbc.CardBody([
+                dbc.Row([
+                    dbc.Col(html.Label("Turbine ID:", style={'fontSize': '14px'}), width=7),
+                    dbc.Col(
+                        dcc.Input(
+                            id='anomaly-turbine-id',
+                            type='text',
+                            value='T01',
+                            className="form-control form-control-sm",
+                            style={'fontSize': '13px', 'height': '32px'}
+                        ),
+                        width=5
+                    )
+                ], className="mb-2", align="center"),
+                _number_row("Window (s):", 'anomaly-window', WINDOW_SECONDS, min_value=1),
+                _number_row("Contamination (%):", 'anomaly-contamination', 100 * CONTAMINATION,
+                            step=0.1, min_value=0.1),
+                html.Small("Scores fixed-length windows of the latest prepared data with the turbine's "
+                           "model. The first run trains the model; later runs score without refitting "
+                           "and the model is retrained in the background on a sliding window.",
+                           className="text-muted d-block mb-2"),
+                dbc.Button("Run Detection", id='run-anomaly', color="primary", className="w-100", size="sm")
+            ], style={'padding': '15px'})
+        ], className="mb-3", style={'width': '100%'}),
+        html.Div(id='anomaly-message', style={'fontSize': '13px'}),
+    ], width=3, style={'paddingRight': '10px'}),
+
+    # 오른쪽: 윈도우별 이상 점수 + 이상 윈도우 목록
+    dbc.Col([
+        html.Div([
+            html.H5("Anomaly Score",
+                    style={
+                        'backgroundColor': '#f0f0f0',
+                        'padding': '8px',
+                        'margin': '0',
+                        'borderBottom': '2px solid #ccc',
+                        'fontSize': '16px',
+                        'fontWeight': 'bold'
+                    })
+        ]),
+        html.Div(id='anomaly-result', className="mt-2"),
+        html.Div([
+            html.H5(f"Frequency Drift (>{100 * DRIFT_THRESHOLD:g}%)",
+                    style={
+                        'backgroundColor': '#f0f0f0',
+                        'padding': '8px',
+                        'margin': '0',
+                        'borderBottom': '2px solid #ccc',
+                        'fontSize': '16px',
+                        'fontWeight': 'bold'
+                    })
+        ], className="mt-3"),
+        html.Div(id='drift-result', className="mt-2"),
+    ], width=9, style={'paddingLeft': '10px'}),
+])
 
 
 # ============================================================================
-# Section 4: Weather Correlation (빈 레이아웃)
+# Section 4: Weather Correlation
 # ============================================================================
-section_4_layout = dbc.Container([
-    html.H4(" Weather Correlation", className="my-3"),
-    html.P("This section is under development.", className="text-muted", style={'fontSize': '14px'}),
-    html.Hr(),
-    
-    # TODO 주석
-    dbc.Alert([
-        html.H6(" Planned Features:", className="alert-heading"),
-        html.Ul([
-            html.Li("OpenWeatherMap API integration"),
-            html.Li("Wind speed and temperature data fetch"),
-            html.Li("Weather-vibration correlation analysis"),
-            html.Li("Interactive correlation charts"),
-        ], style={'marginBottom': '0'})
-    ], color="info", style={'fontSize': '13px'})
-    
-    # TODO: Add OpenWeatherMap API integration
-    # TODO: Add location input (e.g., Seoul)
-    # TODO: Add weather-vibration correlation chart
-    # TODO: Add wind speed/temperature display
-], fluid=True)
+section_4_layout = dbc.Row([
+    # 왼쪽: 위치 / 터빈 선택
+    dbc.Col([
+        dbc.Card([
+            dbc.CardHeader(html.H6("Weather Source", style={'fontWeight': 'bold'})),
+            dbc.CardBody([
+                dbc.Row([
+                    dbc.Col(html.Label("Location:", style={'fontSize': '14px'}), width=5),
+                    dbc.Col(
+                        dcc.Input(
+                            id='weather-location',
+                            type='text',
+                            value='Seoul',
+                            placeholder='City or lat,lon',
+                            className="form-control form-control-sm",
+                            style={'fontSize': '13px', 'height': '32px'}
+                        ),
+                        width=7
+                    )
+                ], className="mb-2", align="center"),
+                dbc.Row([
+                    dbc.Col(html.Label("Turbine ID:", style={'fontSize': '14px'}), width=5),
+                    dbc.Col(
+                        dcc.Input(
+                            id='weather-turbine-id',
+                            type='text',
+                            value='T01',
+                            className="form-control form-control-sm",
+                            style={'fontSize': '13px', 'height': '32px'}
+                        ),
+                        width=7
+                    )
+                ], className="mb-2", align="center"),
+                dbc.Row([
+                    dbc.Col(html.Label("Correlation:", style={'fontSize': '14px'}), width=5),
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id='weather-method',
+                            options=[{'label': 'Pearson', 'value': 'pearson'},
+                                     {'label': 'Spearman', 'value': 'spearman'}],
+                            value='pearson',
+                            clearable=False,
+                            style={'fontSize': '13px'}
+                        ),
+                        width=7
+                    )
+                ], className="mb-2", align="center"),
+                _number_row("Rolling window (days):", 'weather-window', ROLLING_WINDOW // 144, min_value=1),
+                html.Small("Joins hourly weather onto the mode history windows. Weather is cached locally; "
+                           "only periods not fetched before are requested from the provider. Correlation "
+                           "heatmaps cover every turbine with a mode history.",
+                           className="text-muted d-block mb-2"),
+                dbc.Button("Load Weather", id='run-weather', color="primary", className="w-100", size="sm")
+            ], style={'padding': '15px'})
+        ], className="mb-3", style={'width': '100%'}),
+        html.Div(id='weather-message', style={'fontSize': '13px'}),
+    ], width=3, style={'paddingRight': '10px'}),
+
+    # 오른쪽: 현재 날씨 + 모드 이력과 시간 정렬한 풍속/기온
+    dbc.Col([
+        html.Div([
+            html.H5("Weather vs. Modal Frequency",
+                    style={
+                        'backgroundColor': '#f0f0f0',
+                        'padding': '8px',
+                        'margin': '0',
+                        'borderBottom': '2px solid #ccc',
+                        'fontSize': '16px',
+                        'fontWeight': 'bold'
+                    })
+        ]),
+        html.Div(id='weather-result', className="mt-2"),
+    ], width=9, style={'paddingLeft': '10px'}),
+])
 
 
 # ============================================================================
-# Section 5: AI Suggestion (빈 레이아웃)
+# Section 5: AI Suggestion
 # ============================================================================
 section_5_layout = dbc.Container([
-    html.H4(" AI Suggestion", className="my-3"),
-    html.P("This section is under development.", className="text-muted", style={'fontSize': '14px'}),
+    dbc.Row([
+        dbc.Col(html.H4(" AI Suggestion", className="my-3"), width=9),
+        dbc.Col(dbc.Button("Evaluate Fleet", id='run-suggestion', color="primary", size="sm",
+                           className="w-100 mt-3"), width=3),
+    ], align="center"),
+    html.Small("Maintenance rules (anomaly count, frequency drift, damping change, weather exposure) are "
+               "evaluated over every turbine in the shared turbine data; priority is the weighted sum of the "
+               "fired rules (0-100). Only turbines whose inputs changed are re-evaluated.",
+               className="text-muted d-block mb-2"),
     html.Hr(),
-    
-    # TODO 주석
-    dbc.Alert([
-        html.H6(" Planned Features:", className="alert-heading"),
-        html.Ul([
-            html.Li("Rule-based AI suggestion engine"),
-            html.Li("Maintenance recommendations based on anomaly count"),
-            html.Li("Priority scoring system (0-100)"),
-            html.Li("Export report functionality"),
-        ], style={'marginBottom': '0'})
-    ], color="info", style={'fontSize': '13px'})
-    
-    # TODO: Add rule-based AI suggestion engine
-    # TODO: Add maintenance recommendations
-    # TODO: Add priority scoring (0-100)
-    # TODO: Add export report button
+    html.Div(id='suggestion-result'),
+    html.Hr(),
+
+    # 보고서 내보내기 (백그라운드 작업 → 다운로드 링크)
+    dbc.Row([
+        dbc.Col(html.Label("Report format:", style={'fontSize': '14px'}), width=2),
+        dbc.Col(
+            dcc.Dropdown(
+                id='report-format',
+                options=[{'label': 'HTML', 'value': 'html'},
+                         {'label': 'Excel (.xlsx)', 'value': 'xlsx'},
+                         {'label': 'PDF', 'value': 'pdf'}],
+                value='html',
+                clearable=False,
+                style={'fontSize': '13px'}
+            ),
+            width=2
+        ),
+        dbc.Col(html.Label("Period (days):", style={'fontSize': '14px'}), width=2),
+        dbc.Col(
+            dcc.Input(
+                id='report-days',
+                type='number',
+                value=REPORT_DAYS,
+                min=1,
+                className="form-control form-control-sm",
+                style={'fontSize': '13px', 'height': '32px'}
+            ),
+            width=2
+        ),
+        dbc.Col(dbc.Button("Export Report", id='run-report', color="secondary", size="sm", className="w-100"),
+                width=2),
+    ], className="mb-2", align="center"),
+    html.Div(id='report-message', style={'fontSize': '13px'}),
+    html.Div(id='report-result', className="mt-2"),
 ], fluid=True)
 
 
@@ -494,6 +757,13 @@ section_5_layout = dbc.Container([
 layout = dbc.Container([
     html.H2("Analytics", className="my-3"),
     
+    # 현재 세션의 데이터셋 정보 {dataset_id, filename, stage, key}
+    dcc.Store(id='analytics-dataset', storage_type='session'),
+    
+    # 실행 중인 백그라운드 작업 {job_id, kind, ...} 및 진행률 조회 타이머
+    dcc.Store(id='analytics-job', storage_type='session'),
+    dcc.Interval(id='job-poll', interval=1000, disabled=True),
+    
     # 탭 버튼
     dbc.Tabs([
         dbc.Tab(label=" Data Preparation", tab_id="tab-1"),
@@ -503,6 +773,17 @@ layout = dbc.Container([
         dbc.Tab(label=" AI Suggestion", tab_id="tab-5"),
     ], id="analytics-tabs", active_tab="tab-1", className="mb-3"),
     
+    # 백그라운드 작업 진행 상황 (탭과 무관하게 표시)
+    html.Div([
+        dbc.Row([
+            dbc.Col(dbc.Progress(id='job-progress', value=0, label='', striped=True, animated=True,
+                                 style={'height': '20px'}), width=10),
+            dbc.Col(dbc.Button("Cancel", id='job-cancel', color="secondary", size="sm",
+                               className="w-100"), width=2),
+        ], align="center"),
+    ], id='job-panel', className="mb-2", style={'display': 'none'}),
+    html.Div(id='job-status', className="mb-2", style={'fontSize': '13px'}),
+    
     # 탭 콘텐츠 영역
     html.Div(id="tab-content")
     
@@ -532,124 +813,1305 @@ def render_tab_content(active_tab):
 
 
 
-# CSV 파싱 함수
+# CSV 파싱 함수 (base64 스트리밍 디코딩 + 청크 단위 float32 파싱)
 def parse_csv(contents, filename):
-    content_type, content_string = contents.split(',')
-    decoded = base64.b64decode(content_string)
     try:
-        df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-        return df
-    except Exception as e:
-        print(e)
+        return ingest_upload(contents, filename), None
+    except IngestError as e:
+        return None, str(e)
+
+
+# ============================================================================
+# 캐시 헬퍼
+# ============================================================================
+def step_states(upto):
+    """upto 단계까지 모든 단계 입력 컴포넌트의 State 목록 (상류 파라미터도 캐시 키에 필요)"""
+    names = PREPARATION.names[:PREPARATION.names.index(upto) + 1]
+    return [State(component, 'value') for name in names for component, _ in STEP_CONTROLS[name]]
+
+
+def collect_params(upto, values):
+    """step_states 순서의 값들을 {stage: {param: value}}로 변환"""
+    params, values = {}, list(values)
+    for name in PREPARATION.names[:PREPARATION.names.index(upto) + 1]:
+        params[name] = {param: values.pop(0) for _, param in STEP_CONTROLS[name]}
+    return params
+
+
+def current_dataset(session_id, dataset_info):
+    """Store가 가리키는 단계 출력 조회"""
+    if not dataset_info:
+        return None
+    return dataset_cache.get(session_id, dataset_info.get('dataset_id'),
+                             dataset_info.get('key', SOURCE_STAGE))
+
+
+def _finalize(dataset):
+    # 요약 통계는 단계 출력당 한 번만 계산하여 meta에 보관
+    dataset.meta['summary'] = summarize(dataset)
+
+
+def _preparation_job(progress, session_id, dataset_id, upto, params):
+    """백그라운드 작업: upto 단계까지 파이프라인 실행 후 결과 키 반환"""
+    _, runs = PREPARATION.run(dataset_cache, session_id, dataset_id, params, upto,
+                              finalize=_finalize, progress=progress)
+    return {'stage': upto, 'key': runs[-1]['key'], 'params': params, 'runs': runs}
+
+
+def stage_message(upto, params, runs):
+    """파이프라인 실행 결과 상태 메시지"""
+    last = runs[-1]
+    msg = f"{PREPARATION.stage(upto).label} executed: {STEP_MESSAGES[upto](params[upto], last['report'] or {})}"
+    reused = [PREPARATION.stage(r['stage']).label for r in runs if r['cached']]
+    if last['cached']:
+        msg += ' (cached)'
+    elif reused:
+        msg += f" (reused {', '.join(reused)})"
+    return html.Span(f'✅ {msg}', style={'color': 'green'})
+
+
+def submit_job(session_id, kind, func, *args, **extra):
+    """
+    백그라운드 작업 등록 (세션당 한 번에 하나)
+
+    Returns:
+        tuple: (status 메시지, analytics-job Store 값)
+    """
+    if jobs.store.active(session_id):
+        return (html.Span('⏳ Another job is still running (cancel it or wait)', style={'color': 'orange'}),
+                dash.no_update)
+    job_id = jobs.submit(session_id, kind, func, *args)
+    return '', {'job_id': job_id, 'kind': kind, **extra}
+
+
+def owned_job(job_id, session_id):
+    """
+    호출한 세션이 등록한 작업의 상태 조회 (job_id는 클라이언트 Store 값이므로 소유 세션을 확인)
+
+    Returns:
+        dict 또는 None: 없는 작업이거나 다른 세션의 작업이면 None
+    """
+    status = jobs.status(job_id)
+    if status is None or not session_id or status['session_id'] != session_id:
         return None
+    return status
+
+
+def run_stage(upto, session_id, dataset_info, controls):
+    """
+    upto 단계까지 파이프라인 실행 (캐시된 상류 단계는 재사용)
+
+    최종 단계 출력이 이미 캐시에 있으면 바로 응답하고, 아니면 백그라운드 작업으로 넘긴다.
+
+    Returns:
+        tuple: (status 메시지, analytics-dataset Store 값, analytics-job Store 값)
+    """
+    if not dataset_info or not dataset_info.get('dataset_id'):
+        return NO_DATA_MESSAGE, dash.no_update, dash.no_update
+    params = collect_params(upto, controls)
+    dataset_id = dataset_info['dataset_id']
+    if PREPARATION.cached_key(dataset_cache, session_id, dataset_id, params, upto):
+        _, runs = PREPARATION.run(dataset_cache, session_id, dataset_id, params, upto)
+        return (stage_message(upto, params, runs),
+                {**dataset_info, 'stage': upto, 'key': runs[-1]['key'], 'params': params}, dash.no_update)
+    if not dataset_cache.has(session_id, dataset_id):
+        return NO_DATA_MESSAGE, dash.no_update, dash.no_update
+    message, job = submit_job(session_id, upto, _preparation_job, session_id, dataset_id, upto, params)
+    return message, dash.no_update, job
+
+
+def _total(counts):
+    return sum((counts or {}).values())
+
+
+# 단계별 상태 메시지 (params, report) → 문자열
+STEP_MESSAGES = {
+    'step1': lambda p, r: (
+        f"Outliers={p['remove_outliers']} ({_total(r.get('outliers'))} removed), "
+        f"Spikes={p['replace_spikes']} ({_total(r.get('spikes'))} replaced), "
+        f"Missing={p['drop_missing']} ({_total(r.get('filled'))} filled, "
+        f"{r.get('dropped_rows', 0)} rows dropped), "
+        f"Drift={p['offset_drift']} [{r.get('seconds', 0):.2f} s]"),
+    'step2': lambda p, r: (
+        f"Detrend={p['detrend']}, Units={p['units']}, Normalization={p['normalization']} "
+        f"[{r.get('seconds', 0):.2f} s]"),
+    'step3': lambda p, r: (
+        f"Bandpass {p['bp_low']}-{p['bp_high']} Hz, "
+        f"{r.get('fs_in', 0):.1f} → {r.get('fs_out', 0):.2f} Hz (×1/{r.get('factor', 1)}), "
+        f"Wavelet={p['wavelet']} [{r.get('seconds', 0):.2f} s]"),
+}
+
+
+def render_summary(summary, stage):
+    """요약 통계 헤더 (Data View 상단)"""
+    if not summary:
+        return ''
+    period = f" | {summary['start']} → {summary['end']}" if summary.get('start') is not None else ''
+    fs = f" | {summary['fs']:.2f} Hz" if summary.get('fs') else ''
+    header = html.Div(f"Stage: {stage} | {summary['rows']:,} rows{fs}{period}",
+                      style={'fontSize': '12px', 'color': '#555', 'marginBottom': '4px'})
+
+    def fmt(x):
+        return '-' if x is None else f'{x:.4g}'
+
+    rows = [html.Tr([html.Td(c['name']), html.Td(f"{c['count']:,}"), html.Td(f"{c['missing']:,}"),
+                     html.Td(fmt(c['mean'])), html.Td(fmt(c['std'])),
+                     html.Td(fmt(c['min'])), html.Td(fmt(c['max']))])
+            for c in summary['channels']]
+    table = dbc.Table(
+        [html.Thead(html.Tr([html.Th(h) for h in ['Channel', 'Count', 'Missing', 'Mean', 'Std', 'Min', 'Max']])),
+         html.Tbody(rows)],
+        size='sm', bordered=True, striped=True, className='mb-2', style={'fontSize': '12px'}
+    )
+    return html.Div([header, html.Div(table, style={'maxHeight': '180px', 'overflowY': 'auto'})])
+
+
+# 검증 항목 표시 이름 (표 컬럼 순서)
+CHECK_LABELS = {'zero_mean': '|Mean|/Std', 'out_of_band': 'Out-of-band', 'spikes': 'Spikes',
+                'non_finite': 'NaN/Inf', 'clipping': 'Clipped'}
+
+
+def render_validation(report):
+    """Step 4 검증 결과 표 (채널별 측정값과 통과 여부)"""
+    names = [name for name in CHECK_LABELS if report['channels'] and name in report['channels'][0]['checks']]
+
+    def cell(check):
+        value = check['value']
+        text = 'n/a' if value is None else (f'{value:,}' if isinstance(value, int) else f'{value:.3g}')
+        return html.Td(f"{text} {'✔' if check['passed'] else '✘'}",
+                       style={'color': '#2e7d32' if check['passed'] else '#c62828'})
+
+    rows = [html.Tr([html.Td(c['name'])] + [cell(c['checks'][name]) for name in names]
+                    + [html.Td('PASS' if c['passed'] else 'FAIL',
+                               style={'fontWeight': 'bold', 'color': 'green' if c['passed'] else 'red'})])
+            for c in report['channels']]
+    table = dbc.Table(
+        [html.Thead(html.Tr([html.Th('Channel')] + [html.Th(CHECK_LABELS[n]) for n in names]
+                            + [html.Th('Result')])),
+         html.Tbody(rows)],
+        size='sm', bordered=True, className='mt-2 mb-1', style={'fontSize': '12px'}
+    )
+    notes = []
+    if report.get('band'):
+        notes.append(f"Band {report['band'][0]}-{report['band'][1]} Hz")
+    timing = report.get('timing')
+    if timing:
+        jitter = timing['jitter']
+        notes.append(f"Interval {timing['mean_interval'] * 1e3:.2f} ms, jitter {jitter['value']:.2%} "
+                     f"{'✔' if jitter['passed'] else '✘'}, gaps {timing['gaps']:,}")
+    return html.Div([html.Div(table, style={'maxHeight': '220px', 'overflowY': 'auto'}),
+                     html.Small(' | '.join(notes), className='text-muted')])
+
+
+NO_DATA_MESSAGE = html.Span('❌ No dataset in this session (upload a CSV first)', style={'color': 'red'})
+
+
+def _validation_job(progress, session_id, dataset_id, key, checks):
+    """백그라운드 작업: 단계 출력 검증"""
+    dataset = dataset_cache.get(session_id, dataset_id, key)
+    if dataset is None:
+        raise KeyError('Dataset expired from cache')
+    return {'key': key, 'checks': list(checks), 'report': validate_dataset(dataset, checks, progress=progress)}
+
+
+def _finish_preparation(result, dataset_info):
+    message = stage_message(result['stage'], result['params'], result['runs'])
+    return message, {**dataset_info, 'stage': result['stage'], 'key': result['key'],
+                     'params': result['params']}
+
+
+def _finish_validation(result, dataset_info):
+    report = result['report']
+    # 검증 결과는 작은 dict이므로 Store에 보관 → Check Result에서 재사용
+    dataset_info = {**dataset_info, 'stage': 'step4', 'validation': result}
+    passed = sum(c['passed'] for c in report['channels'])
+    msg = (f"Step 4 executed: {passed}/{len(report['channels'])} channels passed "
+           f"[{report['seconds']:.2f} s]")
+    color = 'green' if report['passed'] else 'orange'
+    return html.Div([html.Span(f"{'✅' if report['passed'] else '⚠️'} {msg}", style={'color': color}),
+                     render_validation(report)]), dataset_info
+
+
+def render_check(report):
+    """Check Result 판정 메시지 (통과/실패 사유 + 검증 표)"""
+    if report['passed']:
+        return html.Div([
+            html.Span('SUCCESS! Validation passed! Data is ready for modal analysis.',
+                      style={'color': 'green', 'fontWeight': 'bold', 'fontSize': '15px'}),
+            render_validation(report)])
+    failed = [c['name'] for c in report['channels'] if not c['passed']]
+    reason = f"{len(failed)} channel(s) failed: {', '.join(failed[:8])}{' ...' if len(failed) > 8 else ''}"
+    if report['timing'] and not report['timing']['jitter']['passed']:
+        reason += '; sample interval jitter too high'
+    return html.Div([
+        html.Span(f'FAILED! {reason}', style={'color': 'red', 'fontWeight': 'bold', 'fontSize': '15px'}),
+        render_validation(report)])
+
+
+def _finish_check(result, dataset_info):
+    # Check Result는 단계를 바꾸지 않고 검증 결과만 Store에 보관
+    return render_check(result['report']), {**dataset_info, 'validation': result}
+
+
+def _ssi_job(progress, session_id, dataset_id, key, turbine_id, block_rows, max_order, window_minutes,
+             selection, method='ssi', step_seconds=None):
+    """백그라운드 작업: 단계 출력에 SSI-COV/FDD 실행 후 화면용 요약 반환 (SSI는 윈도우 지정 시 추적 모드)"""
+    dataset = dataset_cache.get(session_id, dataset_id, key)
+    if dataset is None:
+        raise KeyError('Dataset expired from cache')
+    windows, tracking = None, None
+    if method == 'fdd':
+        result = fdd.fdd_dataset(dataset, progress=progress)
+        summary = fdd.summarize_result(result, dataset.channels)
+    elif window_minutes:
+        windows, result = track_dataset(dataset, 60.0 * window_minutes, step_seconds, block_rows=block_rows,
+                                        max_order=max_order, selection=selection, progress=progress)
+        tracking = summarize_tracking(windows)
+        summary = summarize_result(result, dataset.channels)
+    else:
+        result = ssi_dataset(dataset, block_rows, max_order, selection, progress=progress)
+        summary = summarize_result(result, dataset.channels)
+    # 터빈별 장기 모드 추적 이력에 추가 (Mode History 그래프)
+    get_history().append(turbine_id, result_windows(result, record_start(dataset), windows))
+    return {**summary, 'key': key, 'turbine_id': turbine_id, 'tracking': tracking,
+            'drift': turbine_drift(turbine_id),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def _fleet_job(progress, source, turbine_ids, params, block_rows, max_order, window_minutes, selection,
+               step_seconds=None):
+    """백그라운드 작업: 디렉터리/압축 파일의 터빈별 기록을 프로세스 풀로 일괄 분석"""
+    result = run_fleet(source, turbine_ids, params, block_rows, max_order,
+                       60.0 * window_minutes if window_minutes else None, selection, history=get_history(),
+                       progress=progress, step_seconds=step_seconds)
+    for turbine in result['turbines']:
+        turbine['drift'] = turbine_drift(turbine['turbine_id']) if turbine['modes'] else None
+    return result
+
+
+def turbine_drift(turbine_id):
+    """모드 추적 이력의 새 윈도우를 드리프트 모니터에 반영하고 모드별 드리프트 요약 반환"""
+    monitor = get_monitor()
+    monitor.observe(turbine_id, get_history().get(turbine_id))
+    summary = monitor.summary(turbine_id)
+    # 기록 시각은 데이터의 벽시계 시각 (record_start) → UTC로 해석해 그대로 표시
+    events = [{**e, 'time': datetime.fromtimestamp(e['time'], timezone.utc).strftime('%Y-%m-%d %H:%M')}
+              for e in summary['events']]
+    return {'turbine_id': turbine_id, 'drift': summary['drift'], 'events': events}
+
+
+def _fleet_status(turbine):
+    """배치 표 상태 칸: 실패 / 일부 기록 실패 / 성공"""
+    if turbine['error']:
+        return html.Td(turbine['error'], style={'color': '#c62828'})
+    errors = turbine.get('errors') or []
+    if errors:
+        return html.Td(f"⚠ {len(errors)}/{turbine['files']} record(s) skipped", title='\n'.join(errors),
+                       style={'color': '#ef6c00'})
+    return html.Td('✔', style={'color': '#2e7d32'})
+
+
+def _finish_fleet(result, dataset_info):
+    ok = [r for r in result['turbines'] if not r['error'] and r['modes']]
+    msg = (f"Fleet batch: {len(ok)}/{len(result['turbines'])} turbines identified, "
+           f"{result['turbine_hours']:.1f} turbine-hours in {result['seconds']:.1f} s "
+           f"({result['turbine_hours_per_minute']:.1f} turbine-hours/min, {result['workers']} workers)")
+    notes = []
+    if result['missing']:
+        notes.append(f"No records for: {', '.join(result['missing'])}")
+    if result['unmatched']:
+        notes.append(f"{len(result['unmatched'])} file(s) did not match a turbine ID")
+    rows = [html.Tr([html.Td(r['turbine_id']), html.Td(r['files']), html.Td(f"{r['hours']:.1f}")]
+                    + [html.Td(f"{r['modes'][k]['frequency']:.3f}" if k < len(r['modes']) else '-')
+                       for k in range(N_MODES)]
+                    + [_fleet_status(r)])
+            for r in result['turbines']]
+    table = dbc.Table(
+        [html.Thead(html.Tr([html.Th(h) for h in ['Turbine', 'Files', 'Hours']]
+                            + [html.Th(f'Mode {k + 1} (Hz)') for k in range(N_MODES)] + [html.Th('Status')])),
+         html.Tbody(rows)],
+        size='sm', bordered=True, className='mt-2 mb-1', style={'fontSize': '12px'}
+    )
+    color = 'green' if len(ok) == len(result['turbines']) else 'orange'
+    return (html.Div([html.Span(f"{'✅' if color == 'green' else '⚠️'} {msg}", style={'color': color}),
+                      html.Div(table, style={'maxHeight': '260px', 'overflowY': 'auto'}),
+                      html.Small(' | '.join(notes), className='text-muted')]),
+            {**(dataset_info or {}), 'fleet': result})
+
+
+def turbine_frequencies(result):
+    """SSI 결과 → turbine-data Store의 frequencies 항목 (감쇠비는 %)"""
+    entry = {'timestamp': result['timestamp']}
+    for k in range(N_MODES):
+        mode = result['modes'][k] if k < len(result['modes']) else None
+        suffix = '' if k == 0 else str(k + 1)
+        entry[f'mode{k + 1}'] = mode['frequency'] if mode else None
+        entry[f'damping{suffix}'] = 100 * mode['damping'] if mode and mode['damping'] is not None else None
+    return entry
+
+
+def _damping_text(mode):
+    return '-' if mode['damping'] is None else f"{100 * mode['damping']:.2f}"
+
+
+def _finish_ssi(result, dataset_info):
+    modes = ', '.join(f"Mode {k} {m['frequency']:.3f} Hz ({_damping_text(m)}%)"
+                      for k, m in enumerate(result['modes'], 1)) or 'no stable modes'
+    tracked = f", {len(result['tracking']['start'])} windows tracked" if result.get('tracking') else ''
+    label = 'FDD/EFDD' if result.get('method') == 'fdd' else 'SSI-COV'
+    msg = f"{label} executed ({result['turbine_id']}{tracked}): {modes} [{result['seconds']:.2f} s]"
+    color = 'green' if result['modes'] else 'orange'
+    return (html.Span(f"{'✅' if result['modes'] else '⚠️'} {msg}", style={'color': color}),
+            {**dataset_info, 'ssi': result})
+
+
+def render_ssi(result):
+    """안정화 다이어그램 (차수 vs 주파수) 또는 FDD 특이값 스펙트럼 + 선택된 모드 표"""
+    fdd_result = result.get('method') == 'fdd'
+    fig = render_spectrum(result) if fdd_result else render_diagram(result)
+    for k, mode in enumerate(result['modes'], 1):
+        fig.add_vline(x=mode['frequency'], line_dash='dash', line_color='#1565c0',
+                      annotation_text=f'Mode {k}', annotation_position='top')
+
+    channels = result.get('channels') or []
+    rows = [html.Tr([html.Td(f'Mode {k}'), html.Td(f"{m['frequency']:.4f}"),
+                     html.Td(_damping_text(m)), html.Td(f"{100 * m['support']:.0f}%"),
+                     html.Td('-' if m.get('confidence') is None else f"{m['confidence']:.2f}"),
+                     html.Td(', '.join(f'{name}: {v:+.2f}' for name, v in zip(channels, m['shape'])),
+                             style={'fontSize': '11px'})])
+            for k, m in enumerate(result['modes'], 1)]
+    table = dbc.Table(
+        [html.Thead(html.Tr([html.Th(h) for h in ['Mode', 'Frequency (Hz)', 'Damping (%)',
+                                                  'Orders', 'Confidence', 'Mode shape']])),
+         html.Tbody(rows)],
+        size='sm', bordered=True, striped=True, className='mt-2 mb-1', style={'fontSize': '12px'}
+    )
+    detail = f"segment {result['nperseg']}" if fdd_result else f"block rows {result['block_rows']}"
+    note = (f"{result['turbine_id']} | fs {result['fs']:.2f} Hz | {detail} | "
+            f"{result['seconds']:.2f} s | {result['timestamp']}")
+    children = [dcc.Graph(figure=fig, config={'displaylogo': False}), table,
+                html.Small(note, className='text-muted')]
+    if result.get('tracking'):
+        children.insert(1, render_tracking(result['tracking']))
+    history = render_history(result['turbine_id'])
+    if history is not None:
+        children.append(history)
+    return html.Div(children)
+
+
+def render_spectrum(result):
+    """FDD: 스펙트럼 행렬의 특이값 (dB) — 1번 특이값 피크가 모드"""
+    spectrum = result['spectrum']
+    fig = go.Figure()
+    for k, level in enumerate(spectrum['sv_db'], 1):
+        fig.add_trace(go.Scattergl(
+            x=spectrum['freq'], y=level, mode='lines', name=f'SV {k}',
+            line=dict(width=1.5 if k == 1 else 1),
+            hovertemplate='%{x:.3f} Hz: %{y:.1f} dB<extra></extra>'))
+    fig.update_layout(xaxis_title='Frequency (Hz)', yaxis_title='Singular value (dB)', height=460,
+                      margin=dict(l=50, r=20, t=30, b=40), legend=dict(orientation='h', y=1.08),
+                      template='plotly_white')
+    return fig
+
+
+def render_diagram(result):
+    """SSI: 안정화 다이어그램 (차수 vs 주파수)"""
+    diagram = result['diagram']
+    fig = go.Figure()
+    for stable, name, marker in [
+        (False, 'Unstable', dict(symbol='x', size=5, color='#bbbbbb')),
+        (True, 'Stable', dict(symbol='circle', size=6, color='#2e7d32')),
+    ]:
+        points = [(f, o, d) for f, o, d, s in zip(diagram['freq'], diagram['order'],
+                                                  diagram['damping'], diagram['stable']) if s == stable]
+        fig.add_trace(go.Scattergl(
+            x=[p[0] for p in points], y=[p[1] for p in points], mode='markers', name=name,
+            marker=marker, customdata=[100 * p[2] for p in points],
+            hovertemplate='%{x:.3f} Hz, order %{y}, ζ %{customdata:.2f}%<extra></extra>'))
+    fig.update_layout(xaxis_title='Frequency (Hz)', yaxis_title='Model order', height=460,
+                      margin=dict(l=50, r=20, t=30, b=40), legend=dict(orientation='h', y=1.08),
+                      xaxis=dict(range=[0, result['fs'] / 2]), template='plotly_white')
+    return fig
+
+
+def render_tracking(tracking):
+    """추적 모드: 윈도우별 모드 주파수 추이 (마지막 윈도우가 위의 안정화 다이어그램)"""
+    minutes = [start / 60 for start in tracking['start']]
+    fig = go.Figure()
+    for mode in tracking['modes']:
+        fig.add_trace(go.Scatter(
+            x=minutes, y=mode['frequency'], mode='lines+markers', name=f"Mode {mode['id']}",
+            marker=dict(size=4), connectgaps=False,
+            hovertemplate='%{x:.1f} min: %{y:.4f} Hz<extra></extra>'))
+    fig.update_layout(xaxis_title='Window start (min)', yaxis_title='Frequency (Hz)', height=280,
+                      margin=dict(l=50, r=20, t=30, b=40), legend=dict(orientation='h', y=1.12),
+                      template='plotly_white')
+    return dcc.Graph(figure=fig, config={'displaylogo': False})
+
+
+def render_history(turbine_id):
+    """터빈의 장기 모드 추적 이력 (모든 실행/배치 결과를 MAC으로 연결한 track, 구간 min/max 축약)"""
+    history = get_history().query(turbine_id)
+    if history['windows'] < 2:
+        return None
+    when = (history['time'] * 1e3).astype('datetime64[ms]')
+    fig = go.Figure()
+    for k in range(history['frequency'].shape[1]):
+        fig.add_trace(go.Scattergl(
+            x=when, y=history['frequency'][:, k], mode='lines+markers', name=f'Mode {k + 1}',
+            marker=dict(size=3), line=dict(width=1), connectgaps=False,
+            hovertemplate='%{x}: %{y:.4f} Hz<extra></extra>'))
+    fig.update_layout(title=dict(text=f"Mode history ({history['windows']:,} windows)", font=dict(size=13)),
+                      xaxis_title='Time', yaxis_title='Frequency (Hz)', height=280,
+                      margin=dict(l=50, r=20, t=40, b=40), legend=dict(orientation='h', y=1.15),
+                      template='plotly_white')
+    return dcc.Graph(figure=fig, config={'displaylogo': False})
+
+
+def _anomaly_job(progress, session_id, dataset_id, key, turbine_id, window_seconds, contamination):
+    """백그라운드 작업: 단계 출력을 윈도우로 나누어 터빈 모델로 채점 (모델이 없으면 학습)"""
+    dataset = dataset_cache.get(session_id, dataset_id, key)
+    if dataset is None:
+        raise KeyError('Dataset expired from cache')
+    result = detect_dataset(dataset, turbine_id, window_seconds=window_seconds,
+                            contamination=contamination, progress=progress)
+    start = record_start(dataset)
+    when = ((start + result['starts']) * 1e3).astype('datetime64[ms]').astype(str).tolist()
+    return {
+        'turbine_id': turbine_id,
+        'key': key,
+        'window_seconds': window_seconds,
+        'time': when,
+        'score': [round(float(v), 4) for v in result['score']],
+        'anomaly': [int(k) for k in result['anomaly'].nonzero()[0]],
+        'events': anomaly_events(result, start),
+        'model': result['model'],
+        'seconds': result['seconds'],
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def _finish_anomaly(result, dataset_info):
+    model = result['model']
+    state = ('model trained' if model['trained'] else
+             'background refit started' if model['refit'] else f"{model['since_fit']} windows since last fit")
+    msg = (f"Anomaly detection ({result['turbine_id']}): {len(result['anomaly'])}/{len(result['score'])} "
+           f"windows flagged, {state} [{result['seconds']:.2f} s]")
+    icon, color = ('⚠️', 'orange') if result['anomaly'] else ('✅', 'green')
+    return html.Span(f"{icon} {msg}", style={'color': color}), {**dataset_info, 'anomaly': result}
+
+
+def render_anomaly(result):
+    """윈도우별 이상 점수 (0 초과 = 이상) + 이상 윈도우 표"""
+    flagged = result['anomaly']
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=result['time'], y=result['score'], mode='lines', name='Score',
+                               line=dict(width=1, color='#607d8b'),
+                               hovertemplate='%{x}: %{y:.3f}<extra></extra>'))
+    fig.add_trace(go.Scattergl(x=[result['time'][k] for k in flagged], y=[result['score'][k] for k in flagged],
+                               mode='markers', name='Anomaly', marker=dict(size=7, color='#c62828'),
+                               hovertemplate='%{x}: %{y:.3f}<extra></extra>'))
+    fig.add_hline(y=0, line_dash='dash', line_color='#c62828')
+    fig.update_layout(xaxis_title='Window start', yaxis_title='Anomaly score', height=360,
+                      margin=dict(l=50, r=20, t=30, b=40), legend=dict(orientation='h', y=1.1),
+                      template='plotly_white')
+    rows = [html.Tr([html.Td(e['time']), html.Td(f"{e['score']:.3f}"), html.Td(e['feature'])])
+            for e in reversed(result['events'])]
+    table = dbc.Table(
+        [html.Thead(html.Tr([html.Th(h) for h in ['Window start', 'Score', 'Most deviating feature']])),
+         html.Tbody(rows)],
+        size='sm', bordered=True, striped=True, className='mt-2 mb-1', style={'fontSize': '12px'}
+    )
+    model = result['model']
+    fitted = (datetime.fromtimestamp(model['fitted_at']).strftime('%Y-%m-%d %H:%M:%S')
+              if model['fitted_at'] else '-')
+    note = (f"{result['turbine_id']} | {result['window_seconds']:g} s windows | model fit #{model['fits']} at "
+            f"{fitted} | training buffer {model['buffer']} windows | {result['timestamp']}")
+    return html.Div([dcc.Graph(figure=fig, config={'displaylogo': False}),
+                     html.Div(table, style={'maxHeight': '260px', 'overflowY': 'auto'}) if rows else None,
+                     html.Small(note, className='text-muted')])
+
+
+def drift_summaries(dataset_info):
+    """최근 SSI/FDD·fleet 결과의 터빈별 드리프트 요약 (터빈 ID 순, 같은 터빈은 나중 결과)"""
+    dataset_info = dataset_info or {}
+    results = list((dataset_info.get('fleet') or {}).get('turbines', []))
+    if dataset_info.get('ssi'):
+        results.append(dataset_info['ssi'])
+    drift = {r['turbine_id']: r['drift'] for r in results if r.get('drift')}
+    return [drift[k] for k in sorted(drift)]
+
+
+def _drift_text(value):
+    return '-' if value is None else f"{value:+.2f}"
+
+
+def render_drift(summaries):
+    """터빈/모드별 현재 드리프트 (정상 기준 대비 %) + 최근 드리프트 이벤트"""
+    def cell(value):
+        alarm = value is not None and abs(value) > 100 * DRIFT_THRESHOLD
+        return html.Td(_drift_text(value), style={'color': '#c62828', 'fontWeight': 'bold'} if alarm else {})
+
+    current = dbc.Table(
+        [html.Thead(html.Tr([html.Th('Turbine')] + [html.Th(f'Mode {k + 1} (%)') for k in range(N_MODES)])),
+         html.Tbody([html.Tr([html.Td(s['turbine_id'])]
+                             + [cell(s['drift'][k] if k < len(s['drift']) else None) for k in range(N_MODES)])
+                     for s in summaries])],
+        size='sm', bordered=True, className='mt-2 mb-1', style={'fontSize': '12px'}
+    )
+    events = sorted((e for s in summaries for e in s['events']), key=lambda e: e['time'], reverse=True)
+    rows = [html.Tr([html.Td(e['time']), html.Td(e['turbine_id']), html.Td(e['mode']),
+                     html.Td(e['detector']), html.Td(_drift_text(e['change']))])
+            for e in events[:MAX_EVENTS]]
+    table = dbc.Table(
+        [html.Thead(html.Tr([html.Th(h) for h in ['Window', 'Turbine', 'Mode', 'Detector', 'Change (%)']])),
+         html.Tbody(rows)],
+        size='sm', bordered=True, striped=True, className='mt-2 mb-1', style={'fontSize': '12px'}
+    )
+    return html.Div([html.Div(current, style={'maxHeight': '200px', 'overflowY': 'auto'}),
+                     html.Div(table, style={'maxHeight': '260px', 'overflowY': 'auto'}) if rows else None,
+                     html.Small("Drift is the fast EWMA level relative to the first hours of the mode history; "
+                                "CUSUM / Page-Hinkley events mark smaller sustained changes.",
+                                className='text-muted')])
+
+
+SEVERITY_COLORS = {'critical': '#c62828', 'warning': '#ef6c00', 'info': '#1565c0'}
+
+
+def _priority_badge(priority):
+    color = 'danger' if priority >= 50 else 'warning' if priority >= 20 else 'success'
+    return dbc.Badge(f'{priority:.0f}', color=color, style={'fontSize': '12px'})
+
+
+def render_suggestions(suggestions, limit=MAX_EVENTS):
+    """우선순위 표 (전체 터빈) + 점수가 있는 상위 터빈별 권고"""
+    rows = [html.Tr([html.Td(s['turbine_id']), html.Td(_priority_badge(s['priority'])),
+                     html.Td(len(s['actions'])),
+                     html.Td(s['actions'][0]['message'] if s['actions'] else '-')])
+            for s in suggestions]
+    table = dbc.Table(
+        [html.Thead(html.Tr([html.Th(h) for h in ['Turbine', 'Priority', 'Rules', 'Top recommendation']])),
+         html.Tbody(rows)],
+        size='sm', bordered=True, striped=True, className='mt-2 mb-1', style={'fontSize': '12px'}
+    )
+    details = [dbc.Card([
+        dbc.CardHeader([html.B(s['turbine_id']), ' ', _priority_badge(s['priority'])],
+                       style={'padding': '6px 10px'}),
+        dbc.CardBody(html.Ul([
+            html.Li([html.Span(a['severity'].upper(), style={'color': SEVERITY_COLORS.get(a['severity']),
+                                                              'fontWeight': 'bold'}),
+                     f" {a['message']} (+{a['points']:.0f})"])
+            for a in s['actions']], style={'marginBottom': '0', 'fontSize': '12px'}), style={'padding': '8px'})
+    ], className='mb-2') for s in suggestions[:limit] if s['actions']]
+    return dbc.Row([
+        dbc.Col(html.Div(table, style={'maxHeight': '520px', 'overflowY': 'auto'}), width=6),
+        dbc.Col(html.Div(details or html.Small('No rule fired: no maintenance action suggested.',
+                                               className='text-muted'),
+                         style={'maxHeight': '520px', 'overflowY': 'auto'}), width=6),
+    ])
+
+
+def _report_job(progress, fmt, days, turbine_data):
+    """백그라운드 작업: 모드 이력 / 이상 / 드리프트 / 권고를 보고서 파일로 (터빈 하나씩 써서 메모리 상한)"""
+    turbine_ids = geojson_turbine_ids((turbine_data or {}).get('locations'))
+    return get_reports().generate(fmt, turbine_data, turbine_ids, days, progress=progress)
+
+
+def _finish_report(result, dataset_info):
+    msg = (f"Report ready: {result['turbines']} turbines, {result['windows']:,} windows, "
+           f"{result['size_kb']:,.0f} KB ({result['seconds']} s)")
+    return html.Span(f'✅ {msg}', style={'color': 'green'}), {**(dataset_info or {}), 'report': result}
+
+
+def render_report(result):
+    """마지막 보고서 다운로드 링크 (Flask 라우트가 파일을 스트리밍)"""
+    href = f"/reports/{result['report_id']}.{result['format']}"
+    charts = (f"charts: {result['charts_rendered']} rendered, {result['charts_reused']} reused"
+              if result['charts_rendered'] or result['charts_reused'] else 'charts drawn into the PDF')
+    return html.Div([
+        html.A(f"⬇ Download {result['filename']}", href=href, download=result['filename'],
+               className='btn btn-outline-primary btn-sm'),
+        html.Small(f"  {result['period']} | {result['turbines']} turbines | {result['size_kb']:,.0f} KB | "
+                   f"{charts} | generated {result['timestamp']}", className='text-muted'),
+    ])
+
+
+def _json_values(values):
+    return [None if v != v else round(float(v), 4) for v in values]
+
+
+# 날씨 상관 heatmap 행렬은 서버 측 캐시에 (session_id, 상관 ID, CORRELATION_STAGE) 키로 저장
+# Store에는 상관 ID와 요약만 보관하고, 그릴 때 HEATMAP_ROWS × HEATMAP_COLUMNS 이하로 축약
+CORRELATION_STAGE = 'weather-correlation'
+HEATMAP_ROWS = 200              # heatmap 최대 터빈 행 수 (일정 간격 추출)
+HEATMAP_COLUMNS = 365           # heatmap 최대 열 수 (구간 평균)
+
+
+def _weather_job(progress, session_id, location, turbine_id, method='pearson',
+                 window_days=ROLLING_WINDOW // 144):
+    """
+    백그라운드 작업: 모드 이력 기간의 날씨를 캐시에서 채워 윈도우 시각에 as-of 결합,
+    모드 이력이 있는 모든 터빈의 rolling / 지연 상관 heatmap 계산 (행렬은 서버 측 캐시에 저장)
+    """
+    service = get_weather()
+    history = get_history().get(turbine_id)
+    if not len(history):
+        raise ValueError(f'No mode history for {turbine_id} (run modal analysis or a fleet batch first)')
+    try:
+        current = service.current(location)
+    except WeatherError:
+        current = None              # 현재 날씨가 없어도 (오프라인 기록) 이력 결합은 진행
+    progress(0.2, 'Filling weather cache')
+    requests = service.requests
+    weather = service.history(location, float(history.time[0]), float(history.time[-1]) + 1)
+    progress(0.5, 'Aligning weather to windows')
+    joined = align(history.time, weather)
+    progress(0.6, 'Correlating fleet mode history with weather')
+    correlation = _weather_correlation(session_id, service, location, method,
+                                       int(round(window_days * 86400 / STEP_SECONDS)))
+    # 화면에는 최대 QUERY_POINTS개 윈도우만 (일정 간격 추출)
+    step = max(1, -(-len(history) // QUERY_POINTS))
+    when = (history.time[::step] * 1e3).astype('datetime64[ms]').astype(str).tolist()
+    return {
+        'location': location,
+        'turbine_id': turbine_id,
+        'current': current,
+        'time': when,
+        'frequency': _json_values(history.frequency[::step, 0]),
+        'wind_speed': _json_values(joined['wind_speed'][::step]),
+        'temperature': _json_values(joined['temperature'][::step]),
+        'windows': len(history),
+        'matched': int(np.isfinite(joined['wind_speed']).sum()),
+        'observations': len(weather['time']),
+        'correlation': correlation,
+        'requests': service.requests - requests,
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def _weather_correlation(session_id, service, location, method, window):
+    """
+    모드 이력이 있는 터빈 전체의 1번 track을 공통 10분 격자로 모아 날씨와 상관
+
+    heatmap 행렬은 Dataset 하나로 서버 측 캐시에 저장한다 (values: 필드별 rolling 상관을 이어 붙인
+    (필드 × 터빈, 날짜), extra['xcorr']: (필드 × 터빈, 지연)). 반환값은 캐시 키와 요약뿐이다.
+    """
+    store = get_history()
+    histories = {tid: store.get(tid) for tid in store.turbines()}
+    histories = {tid: h for tid, h in histories.items() if len(h)}
+    start = min(float(h.time[0]) for h in histories.values())
+    n = int((max(float(h.time[-1]) for h in histories.values()) - start) // STEP_SECONDS) + 1
+    if n < window:
+        return None
+    frequency = np.stack([to_grid(h.time, h.frequency[:, 0], start, n) for h in histories.values()])
+    grid = start + STEP_SECONDS * np.arange(n)
+    joined = align(grid, service.history(location, start, float(grid[-1]) + 1))
+    fields = {name: joined[name] for name in ('wind_speed', 'temperature')}
+    result = fleet_correlation(frequency, fields, window, ROLLING_STEP, method=method)
+    ends = ((start + STEP_SECONDS * result['end']) * 1e3).astype('datetime64[ms]').astype('datetime64[D]')
+    turbines = list(histories)
+    key = new_dataset_id()
+    dataset_cache.put(session_id, key, Dataset(
+        np.concatenate([result[name]['rolling'] for name in fields]).astype(np.float32),
+        [f'{name}:{tid}' for name in fields for tid in turbines],
+        extra={'xcorr': np.concatenate([result[name]['xcorr'] for name in fields]).astype(np.float32)},
+        meta={'fields': list(fields), 'turbines': turbines, 'end': ends.astype(str).tolist(),
+              'lag_hours': (result['lag'] * STEP_SECONDS / 3600).tolist()}), CORRELATION_STAGE)
+    return {
+        'key': key,
+        'method': method,
+        'window_days': window * STEP_SECONDS / 86400,
+        'turbines': len(turbines),
+        'days': len(ends),
+    }
+
+
+def _finish_weather(result, dataset_info):
+    msg = (f"Weather ({result['location']}): {result['matched']}/{result['windows']} windows of "
+           f"{result['turbine_id']} matched, {result['observations']} hourly observations "
+           f"({result['requests']} provider requests)")
+    icon, color = ('✅', 'green') if result['matched'] else ('⚠️', 'orange')
+    return html.Span(f"{icon} {msg}", style={'color': color}), {**(dataset_info or {}), 'weather': result}
+
+
+def render_weather(result, session_id):
+    """현재 날씨 + 모드 1 고유진동수와 시간 정렬한 풍속/기온"""
+    current = result['current']
+    cards = []
+    if current:
+        observed = datetime.fromtimestamp(current['time'], timezone.utc).strftime('%Y-%m-%d %H:%M')
+        for label, key, unit in (('Wind speed', 'wind_speed', 'm/s'), ('Temperature', 'temperature', '°C')):
+            value = current.get(key)
+            cards.append(dbc.Col(dbc.Card(dbc.CardBody([
+                html.Small(label, className='text-muted'),
+                html.H5('-' if value is None else f'{value:.1f} {unit}', className='mb-0')
+            ], style={'padding': '8px'})), width=3))
+        cards.append(dbc.Col(html.Small(f"{result['location']} | observed {observed}"
+                                        f"{' (cached)' if current.get('cached') else ''}",
+                                        className='text-muted'), width=6, className='align-self-end'))
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=result['time'], y=result['frequency'], mode='lines', name='Mode 1 (Hz)',
+                               line=dict(width=1, color='#1565c0')))
+    fig.add_trace(go.Scattergl(x=result['time'], y=result['wind_speed'], mode='lines', name='Wind speed (m/s)',
+                               line=dict(width=1, color='#607d8b'), yaxis='y2'))
+    fig.add_trace(go.Scattergl(x=result['time'], y=result['temperature'], mode='lines',
+                               name='Temperature (°C)', line=dict(width=1, color='#ef6c00'), yaxis='y2'))
+    fig.update_layout(xaxis_title='Time', yaxis=dict(title='Frequency (Hz)'),
+                      yaxis2=dict(title='Wind speed / Temperature', overlaying='y', side='right'),
+                      height=360, margin=dict(l=50, r=50, t=30, b=40), legend=dict(orientation='h', y=1.1),
+                      template='plotly_white')
+    return html.Div([dbc.Row(cards, className='mb-2') if cards else None,
+                     dcc.Graph(figure=fig, config={'displaylogo': False}),
+                     html.Small(f"{result['turbine_id']} | {result['windows']} windows | {result['timestamp']}",
+                                className='text-muted'),
+                     render_correlation(result.get('correlation'), session_id)])
+
+
+def _downsample_heatmap(z, x, y, max_rows=HEATMAP_ROWS, max_columns=HEATMAP_COLUMNS):
+    """
+    heatmap 축약: 행은 일정 간격 추출, 열은 구간 평균 (NaN 무시)
+
+    Returns:
+        tuple: (z 리스트 (NaN은 None), x, y)
+    """
+    row_step = max(1, -(-len(y) // max_rows))
+    z, y = np.asarray(z[::row_step], dtype=float), list(y[::row_step])
+    column_step = max(1, -(-len(x) // max_columns))
+    if column_step > 1:
+        starts = np.arange(0, len(x), column_step)
+        valid = np.isfinite(z)
+        total = np.add.reduceat(np.where(valid, z, 0.0), starts, axis=1)
+        count = np.add.reduceat(valid, starts, axis=1)
+        z = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        x = [x[i] for i in starts]
+    return [_json_values(row) for row in z], list(x), y
+
+
+def render_correlation(correlation, session_id):
+    """터빈 × 날짜 rolling 상관, 터빈 × 지연 상호상관 heatmap (풍속 / 기온, 서버 측 캐시에서 읽어 축약)"""
+    if not correlation:
+        return html.Small(' | Mode history is shorter than the rolling window; no correlation computed.',
+                          className='text-muted')
+    try:
+        matrices = dataset_cache.get(session_id, correlation['key'], CORRELATION_STAGE)
+    except (KeyError, TypeError):
+        matrices = None
+    if matrices is None:
+        return html.Small(' | Correlation heatmaps have expired; load weather again.', className='text-muted')
+    meta = matrices.meta
+    n = len(meta['turbines'])
+    method = correlation['method'].capitalize()
+    graphs = []
+    for name, label in (('temperature', 'Temperature'), ('wind_speed', 'Wind speed')):
+        rows = slice(meta['fields'].index(name) * n, (meta['fields'].index(name) + 1) * n)
+        z, ends, turbines = _downsample_heatmap(matrices.values[rows], meta['end'], meta['turbines'])
+        xcorr, lags, lag_turbines = _downsample_heatmap(matrices.extra['xcorr'][rows], meta['lag_hours'],
+                                                        meta['turbines'])
+        rolling = go.Figure(go.Heatmap(z=z, x=ends, y=turbines, zmin=-1, zmax=1, colorscale='RdBu_r',
+                                       colorbar=dict(title='r'),
+                                       hovertemplate='%{y} %{x}: %{z:.2f}<extra></extra>'))
+        rolling.update_layout(title=f"{label}: rolling {method} "
+                                    f"({correlation['window_days']:g}-day window)",
+                              height=300, margin=dict(l=60, r=20, t=40, b=40), template='plotly_white')
+        lagged = go.Figure(go.Heatmap(z=xcorr, x=lags, y=lag_turbines, zmin=-1, zmax=1, colorscale='RdBu_r',
+                                      showscale=False,
+                                      hovertemplate='%{y} lag %{x} h: %{z:.2f}<extra></extra>'))
+        lagged.update_layout(title=f"{label}: lagged correlation", xaxis_title='Frequency lag (h)',
+                             height=300, margin=dict(l=60, r=20, t=40, b=40), template='plotly_white')
+        graphs.append(dbc.Row([dbc.Col(dcc.Graph(figure=rolling, config={'displaylogo': False}), width=8),
+                               dbc.Col(dcc.Graph(figure=lagged, config={'displaylogo': False}), width=4)]))
+    return html.Div(graphs, className='mt-3')
+
+
+# 작업 종류별 완료 처리: (result, analytics-dataset 값) → (메시지, 새 analytics-dataset 값)
+JOB_HANDLERS = {
+    'step1': _finish_preparation,
+    'step2': _finish_preparation,
+    'step3': _finish_preparation,
+    'step4': _finish_validation,
+    'check': _finish_check,
+    'ssi': _finish_ssi,
+    'fleet': _finish_fleet,
+    'anomaly': _finish_anomaly,
+    'weather': _finish_weather,
+    'report': _finish_report,
+}
+JOB_LABELS = {'step1': 'Step 1', 'step2': 'Step 2', 'step3': 'Step 3', 'step4': 'Step 4',
+              'check': 'Check Result', 'ssi': 'Modal analysis', 'fleet': 'Fleet batch',
+              'anomaly': 'Anomaly detection', 'weather': 'Weather', 'report': 'Report export'}
+
 
 # 콜백: CSV 업로드
 @callback(
-    [Output('data-table', 'data'),
-     Output('data-table', 'columns'),
-     Output('status-message', 'children')],
+    [Output('status-message', 'children'),
+     Output('analytics-dataset', 'data'),
+     Output('data-table', 'page_current'),
+     Output('data-table', 'sort_by'),
+     Output('data-table', 'filter_query')],
     Input('upload-csv', 'contents'),
-    State('upload-csv', 'filename')
+    [State('upload-csv', 'filename'),
+     State('session-id', 'data'),
+     State('analytics-dataset', 'data')]
 )
-def upload_csv(contents, filename):
-    global current_data
-    
+def upload_csv(contents, filename, session_id, dataset_info):
     if contents is None:
-        return [], [], ''
+        return '', dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    
+    dataset, error = parse_csv(contents, filename)
     
-    df = parse_csv(contents, filename)
+    if dataset is None:
+        return (html.Span(f'❌ Error: Could not read file ({error})', style={'color': 'red'}),
+                dash.no_update, dash.no_update, dash.no_update, dash.no_update)
     
-    if df is None:
-        return [], [], html.Span('❌ Error: Could not read file', style={'color': 'red'})
+    # 이전 업로드는 캐시에서 해제
+    if dataset_info and dataset_info.get('dataset_id'):
+        dataset_cache.drop(session_id, dataset_info['dataset_id'])
     
-    current_data = df.copy()
+    dataset_id = new_dataset_id()
+    dataset.meta['summary'] = summarize(dataset)
+    dataset_cache.put(session_id, dataset_id, dataset, SOURCE_STAGE)
     
-    columns = [{"name": col, "id": col} for col in df.columns]
-    data = df.to_dict('records')
-    status = html.Span(f'✅ Loaded: {filename} ({len(df)} rows × {len(df.columns)} columns)', 
+    n_columns = len(dataset.column_names)
+    status = html.Span(f'✅ Loaded: {filename} ({dataset.n_samples} rows × {n_columns} columns)', 
                       style={'color': 'green'})
     
-    return data, columns, status
+    return (status, {'dataset_id': dataset_id, 'filename': filename,
+                     'stage': SOURCE_STAGE, 'key': SOURCE_STAGE}, 0, [], '')
+
+# 콜백: Data View (현재 페이지만 서버에서 계산하여 전송)
+@callback(
+    [Output('data-table', 'data'),
+     Output('data-table', 'columns'),
+     Output('data-table', 'page_count'),
+     Output('data-summary', 'children')],
+    [Input('analytics-dataset', 'data'),
+     Input('data-table', 'page_current'),
+     Input('data-table', 'page_size'),
+     Input('data-table', 'sort_by'),
+     Input('data-table', 'filter_query')],
+    State('session-id', 'data')
+)
+def update_data_view(dataset_info, page_current, page_size, sort_by, filter_query, session_id):
+    if not dataset_info or not dataset_info.get('dataset_id'):
+        return [], [], 1, ''
+    stage = dataset_info.get('stage', SOURCE_STAGE)
+    dataset = current_dataset(session_id, dataset_info)
+    if dataset is None:
+        return [], [], 1, NO_DATA_MESSAGE
+    
+    summary = render_summary(dataset.meta.get('summary'), stage)
+    try:
+        records, page_count, total = page_records(
+            dataset, page_current, page_size, sort_by, filter_query,
+            cache_key=(session_id, dataset_info['dataset_id'], dataset_info.get('key', SOURCE_STAGE))
+        )
+    except FilterError as e:
+        return [], column_specs(dataset), 1, html.Div(
+            [summary, html.Span(f'❌ {e}', style={'color': 'red', 'fontSize': '12px'})])
+    
+    if filter_query:
+        summary = html.Div([summary, html.Small(f'Filtered: {total:,} rows', className='text-muted')])
+    return records, column_specs(dataset), page_count, summary
 
 # 콜백: Run Step 1
 @callback(
-    Output('status-message', 'children', allow_duplicate=True),
+    [Output('status-message', 'children', allow_duplicate=True),
+     Output('analytics-dataset', 'data', allow_duplicate=True),
+     Output('analytics-job', 'data', allow_duplicate=True)],
     Input('run-step1', 'n_clicks'),
-    [State('remove-outliers', 'value'),
-     State('replace-spikes', 'value'),
-     State('drop-missing', 'value'),
-     State('offset-drift', 'value')],
+    [State('session-id', 'data'),
+     State('analytics-dataset', 'data')] + step_states('step1'),
     prevent_initial_call=True
 )
-def run_step1(n_clicks, remove_outliers, replace_spikes, drop_missing, offset_drift):
-    if n_clicks and current_data is not None:
-        # TODO: 실제 로직 추가
-        msg = f"Step 1 executed: Outliers={remove_outliers}, Spikes={replace_spikes}, Missing={drop_missing}, Drift={offset_drift}"
-        return html.Span(f'✅ {msg}', style={'color': 'green'})
-    return ''
+def run_step1(n_clicks, session_id, dataset_info, *controls):
+    if not n_clicks:
+        return '', dash.no_update, dash.no_update
+    return run_stage('step1', session_id, dataset_info, controls)
 
 # 콜백: Run Step 2
 @callback(
-    Output('status-message', 'children', allow_duplicate=True),
+    [Output('status-message', 'children', allow_duplicate=True),
+     Output('analytics-dataset', 'data', allow_duplicate=True),
+     Output('analytics-job', 'data', allow_duplicate=True)],
     Input('run-step2', 'n_clicks'),
-    [State('detrend', 'value'),
-     State('units', 'value'),
-     State('normalization', 'value')],
+    [State('session-id', 'data'),
+     State('analytics-dataset', 'data')] + step_states('step2'),
     prevent_initial_call=True
 )
-def run_step2(n_clicks, detrend, units, normalization):
-    if n_clicks and current_data is not None:
-        # TODO: 실제 로직 추가
-        msg = f"Step 2 executed: Detrend={detrend}, Units={units}, Normalization={normalization}"
-        return html.Span(f'✅ {msg}', style={'color': 'green'})
-    return ''
+def run_step2(n_clicks, session_id, dataset_info, *controls):
+    if not n_clicks:
+        return '', dash.no_update, dash.no_update
+    return run_stage('step2', session_id, dataset_info, controls)
 
 # 콜백: Run Step 3
 @callback(
-    Output('status-message', 'children', allow_duplicate=True),
+    [Output('status-message', 'children', allow_duplicate=True),
+     Output('analytics-dataset', 'data', allow_duplicate=True),
+     Output('analytics-job', 'data', allow_duplicate=True)],
     Input('run-step3', 'n_clicks'),
-    [State('antialiasing', 'value'),
-     State('downsampling', 'value'),
-     State('bandpass-low', 'value'),
-     State('bandpass-high', 'value'),
-     State('wavelet-denoising', 'value')],
+    [State('session-id', 'data'),
+     State('analytics-dataset', 'data')] + step_states('step3'),
     prevent_initial_call=True
 )
-def run_step3(n_clicks, antialiasing, downsampling, bp_low, bp_high, wavelet):
-    if n_clicks and current_data is not None:
-        # TODO: 실제 로직 추가
-        msg = f"Step 3 executed: Bandpass {bp_low}-{bp_high} Hz, Wavelet={wavelet}"
-        return html.Span(f'✅ {msg}', style={'color': 'green'})
-    return ''
+def run_step3(n_clicks, session_id, dataset_info, *controls):
+    if not n_clicks:
+        return '', dash.no_update, dash.no_update
+    return run_stage('step3', session_id, dataset_info, controls)
 
 # 콜백: Run Step 4
 @callback(
-    Output('status-message', 'children', allow_duplicate=True),
+    [Output('status-message', 'children', allow_duplicate=True),
+     Output('analytics-job', 'data', allow_duplicate=True)],
     Input('run-step4', 'n_clicks'),
     [State('zero-mean', 'value'),
      State('bandpass-filtered', 'value'),
-     State('no-spikes', 'value')],
+     State('no-spikes', 'value'),
+     State('session-id', 'data'),
+     State('analytics-dataset', 'data')],
     prevent_initial_call=True
 )
-def run_step4(n_clicks, zero_mean, bandpass_filtered, no_spikes):
-    if n_clicks and current_data is not None:
-        # TODO: Step 4 실행 로직 추가
-        msg = f"Step 4 executed: Zero-mean={zero_mean}, Bandpass={bandpass_filtered}, No-spikes={no_spikes}"
-        return html.Span(f'✅ {msg}', style={'color': 'green'})
-    return ''
+def run_step4(n_clicks, zero_mean, bandpass_filtered, no_spikes, session_id, dataset_info):
+    if not n_clicks:
+        return '', dash.no_update
+    if current_dataset(session_id, dataset_info) is None:
+        return NO_DATA_MESSAGE, dash.no_update
+    checks = selected_checks(zero_mean, bandpass_filtered, no_spikes)
+    return submit_job(session_id, 'step4', _validation_job, session_id, dataset_info['dataset_id'],
+                      dataset_info.get('key', SOURCE_STAGE), checks)
+
 
 # 콜백: Check Result
 @callback(
-    Output('status-message', 'children', allow_duplicate=True),
+    [Output('status-message', 'children', allow_duplicate=True),
+     Output('analytics-job', 'data', allow_duplicate=True)],
     Input('check-result', 'n_clicks'),
     [State('zero-mean', 'value'),
      State('bandpass-filtered', 'value'),
-     State('no-spikes', 'value')],
+     State('no-spikes', 'value'),
+     State('session-id', 'data'),
+     State('analytics-dataset', 'data')],
+    prevent_initial_call=True
+)
+def check_result(n_clicks, zero_mean, bandpass_filtered, no_spikes, session_id, dataset_info):
+    if not n_clicks:
+        return '', dash.no_update
+    if not dataset_info:
+        return NO_DATA_MESSAGE, dash.no_update
+    checks = selected_checks(zero_mean, bandpass_filtered, no_spikes)
+    cached = dataset_info.get('validation') or {}
+    if (cached.get('key') == dataset_info.get('key', SOURCE_STAGE)
+            and tuple(cached.get('checks') or ()) == checks):
+        return render_check(cached['report']), dash.no_update
+    # 캐시에 없으면 Step 4와 같은 검증 작업을 백그라운드로 실행
+    if current_dataset(session_id, dataset_info) is None:
+        return NO_DATA_MESSAGE, dash.no_update
+    return submit_job(session_id, 'check', _validation_job, session_id, dataset_info['dataset_id'],
+                      dataset_info.get('key', SOURCE_STAGE), checks)
+
+# 콜백: Run SSI-COV / FDD
+@callback(
+    [Output('ssi-message', 'children'),
+     Output('analytics-job', 'data', allow_duplicate=True)],
+    Input('run-ssi', 'n_clicks'),
+    [State('ssi-method', 'value'),
+     State('ssi-turbine-id', 'value'),
+     State('ssi-max-order', 'value'),
+     State('ssi-block-rows', 'value'),
+     State('ssi-window', 'value'),
+     State('ssi-step', 'value'),
+     State('ssi-selection', 'value'),
+     State('session-id', 'data'),
+     State('analytics-dataset', 'data')],
+    prevent_initial_call=True
+)
+def run_ssi(n_clicks, method, turbine_id, max_order, block_rows, window_minutes, step_seconds, selection,
+            session_id, dataset_info):
+    if not n_clicks:
+        return '', dash.no_update
+    if current_dataset(session_id, dataset_info) is None:
+        return NO_DATA_MESSAGE, dash.no_update
+    if not turbine_id or not str(turbine_id).strip():
+        return html.Span('❌ Enter a turbine ID', style={'color': 'red'}), dash.no_update
+    return submit_job(session_id, 'ssi', _ssi_job, session_id, dataset_info['dataset_id'],
+                      dataset_info.get('key', SOURCE_STAGE), str(turbine_id).strip(),
+                      int(block_rows) if block_rows else None, int(max_order or DEFAULT_MAX_ORDER),
+                      float(window_minutes) if window_minutes else None, selection or 'cluster',
+                      method or 'ssi', float(step_seconds) if step_seconds else None)
+
+# 콜백: SSI 결과 표시 (탭을 다시 열어도 Store의 결과로 복원)
+@callback(
+    Output('ssi-result', 'children'),
+    Input('analytics-dataset', 'data')
+)
+def update_ssi_view(dataset_info):
+    result = (dataset_info or {}).get('ssi')
+    if not result:
+        return html.Small('Run SSI-COV to build the stabilization diagram (or FDD/EFDD for the '
+                          'singular value spectrum).', className='text-muted')
+    return render_ssi(result)
+
+# 콜백: Run Fleet Batch
+@callback(
+    [Output('ssi-message', 'children', allow_duplicate=True),
+     Output('analytics-job', 'data', allow_duplicate=True)],
+    Input('run-fleet', 'n_clicks'),
+    [State('fleet-path', 'value'),
+     State('ssi-max-order', 'value'),
+     State('ssi-block-rows', 'value'),
+     State('ssi-window', 'value'),
+     State('ssi-step', 'value'),
+     State('ssi-selection', 'value'),
+     State('turbine-data', 'data'),
+     State('session-id', 'data'),
+     State('analytics-dataset', 'data')],
+    prevent_initial_call=True
+)
+def run_fleet_batch(n_clicks, path, max_order, block_rows, window_minutes, step_seconds, selection,
+                    turbine_data, session_id, dataset_info):
+    if not n_clicks:
+        return '', dash.no_update
+    try:
+        source = resolve_source(path)
+    except ValueError as e:
+        return html.Span(f'❌ {e}', style={'color': 'red'}), dash.no_update
+    turbine_ids = geojson_turbine_ids((turbine_data or {}).get('locations')) or None
+    params = (dataset_info or {}).get('params') or {}
+    return submit_job(session_id, 'fleet', _fleet_job, source, turbine_ids, params,
+                      int(block_rows) if block_rows else None, int(max_order or DEFAULT_MAX_ORDER),
+                      float(window_minutes) if window_minutes else None, selection or 'cluster',
+                      float(step_seconds) if step_seconds else None)
+
+# 콜백: Run Anomaly Detection
+@callback(
+    [Output('anomaly-message', 'children'),
+     Output('analytics-job', 'data', allow_duplicate=True)],
+    Input('run-anomaly', 'n_clicks'),
+    [State('anomaly-turbine-id', 'value'),
+     State('anomaly-window', 'value'),
+     State('anomaly-contamination', 'value'),
+     State('session-id', 'data'),
+     State('analytics-dataset', 'data')],
+    prevent_initial_call=True
+)
+def run_anomaly(n_clicks, turbine_id, window_seconds, contamination, session_id, dataset_info):
+    if not n_clicks:
+        return '', dash.no_update
+    if current_dataset(session_id, dataset_info) is None:
+        return NO_DATA_MESSAGE, dash.no_update
+    if not turbine_id or not str(turbine_id).strip():
+        return html.Span('❌ Enter a turbine ID', style={'color': 'red'}), dash.no_update
+    contamination = min(float(contamination or 100 * CONTAMINATION), 50.0) / 100
+    return submit_job(session_id, 'anomaly', _anomaly_job, session_id, dataset_info['dataset_id'],
+                      dataset_info.get('key', SOURCE_STAGE), str(turbine_id).strip(),
+                      float(window_seconds or WINDOW_SECONDS), contamination)
+
+# 콜백: 이상 탐지 결과 표시
+@callback(
+    Output('anomaly-result', 'children'),
+    Input('analytics-dataset', 'data')
+)
+def update_anomaly_view(dataset_info):
+    result = (dataset_info or {}).get('anomaly')
+    if not result:
+        return html.Small('Run detection to score the prepared data.', className='text-muted')
+    return render_anomaly(result)
+
+# 콜백: 고유진동수 드리프트 표시
+@callback(
+    Output('drift-result', 'children'),
+    Input('analytics-dataset', 'data')
+)
+def update_drift_view(dataset_info):
+    summaries = drift_summaries(dataset_info)
+    if not summaries:
+        return html.Small('Run modal analysis or a fleet batch to update the mode history.',
+                          className='text-muted')
+    return render_drift(summaries)
+
+# 콜백: Load Weather
+@callback(
+    [Output('weather-message', 'children'),
+     Output('analytics-job', 'data', allow_duplicate=True)],
+    Input('run-weather', 'n_clicks'),
+    [State('weather-location', 'value'),
+     State('weather-turbine-id', 'value'),
+     State('weather-method', 'value'),
+     State('weather-window', 'value'),
+     State('session-id', 'data')],
+    prevent_initial_call=True
+)
+def run_weather(n_clicks, location, turbine_id, method, window_days, session_id):
+    if not n_clicks:
+        return '', dash.no_update
+    if not location or not str(location).strip() or not turbine_id or not str(turbine_id).strip():
+        return html.Span('❌ Enter a location and a turbine ID', style={'color': 'red'}), dash.no_update
+    try:
+        get_weather()
+    except WeatherError as e:
+        return html.Span(f'❌ {e}', style={'color': 'red'}), dash.no_update
+    return submit_job(session_id, 'weather', _weather_job, session_id, str(location).strip(),
+                      str(turbine_id).strip(), method or 'pearson', float(window_days or ROLLING_WINDOW // 144))
+
+# 콜백: 날씨 결과 표시
+@callback(
+    Output('weather-result', 'children'),
+    Input('analytics-dataset', 'data'),
+    State('session-id', 'data')
+)
+def update_weather_view(dataset_info, session_id):
+    result = (dataset_info or {}).get('weather')
+    if not result:
+        return html.Small('Load weather to align it with a turbine\'s mode history.', className='text-muted')
+    return render_weather(result, session_id)
+
+# 콜백: AI Suggestion (turbine-data가 바뀌면 입력이 바뀐 터빈만 다시 평가)
+@callback(
+    Output('suggestion-result', 'children'),
+    [Input('run-suggestion', 'n_clicks'),
+     Input('turbine-data', 'data')]
+)
+def update_suggestions(n_clicks, turbine_data):
+    turbine_ids = geojson_turbine_ids((turbine_data or {}).get('locations'))
+    suggestions = score_fleet(turbine_data, turbine_ids, histories=get_history())
+    if not suggestions:
+        return html.Small('Run modal analysis, anomaly detection or a fleet batch (or load turbine locations '
+                          'on the Map) to score the fleet.', className='text-muted')
+    return render_suggestions(suggestions)
+
+# 콜백: Export Report
+@callback(
+    [Output('report-message', 'children'),
+     Output('analytics-job', 'data', allow_duplicate=True)],
+    Input('run-report', 'n_clicks'),
+    [State('report-format', 'value'),
+     State('report-days', 'value'),
+     State('turbine-data', 'data'),
+     State('session-id', 'data')],
+    prevent_initial_call=True
+)
+def run_report(n_clicks, fmt, days, turbine_data, session_id):
+    if not n_clicks:
+        return '', dash.no_update
+    if fmt not in FORMATS:
+        return html.Span('❌ Choose a report format', style={'color': 'red'}), dash.no_update
+    if not days or days <= 0:
+        return html.Span('❌ Enter a positive period', style={'color': 'red'}), dash.no_update
+    return submit_job(session_id, 'report', _report_job, fmt, float(days), turbine_data or {})
+
+# 콜백: 마지막 보고서 다운로드 링크
+@callback(
+    Output('report-result', 'children'),
+    Input('analytics-dataset', 'data')
+)
+def update_report_view(dataset_info):
+    result = (dataset_info or {}).get('report')
+    if not result:
+        return html.Small('Export a report of the mode history, anomalies and suggestions above.',
+                          className='text-muted')
+    return render_report(result)
+
+# 콜백: SSI 모드 / 이상 윈도우 / 드리프트 / 날씨를 전역 turbine-data Store에 기록 (Map 팝업, AI Suggestion에서 사용)
+@callback(
+    Output('turbine-data', 'data', allow_duplicate=True),
+    Input('analytics-dataset', 'data'),
+    State('turbine-data', 'data'),
+    prevent_initial_call=True
+)
+def publish_frequencies(dataset_info, turbine_data):
+    dataset_info = dataset_info or {}
+    results = [r for r in (dataset_info.get('fleet') or {}).get('turbines', []) if r['modes']]
+    if dataset_info.get('ssi') and dataset_info['ssi']['modes']:
+        results.append(dataset_info['ssi'])
+    turbine_data = turbine_data or {}
+    frequencies = dict(turbine_data.get('frequencies') or {})
+    changed = None
+    for result in results:
+        current = frequencies.get(result['turbine_id'])
+        if current and (current.get('timestamp') or '') >= result['timestamp']:
+            continue
+        frequencies[result['turbine_id']] = turbine_frequencies(result)
+        changed = max(changed or '', result['timestamp'])
+    anomalies = dict(turbine_data.get('anomalies') or {})
+    result = dataset_info.get('anomaly')
+    if result and result['events']:
+        # 같은 윈도우는 한 번만 (다시 publish되어도 결과가 같음), 최근 MAX_EVENTS개 유지
+        current = anomalies.get(result['turbine_id']) or []
+        merged = {e['time']: e for e in current + result['events']}
+        events = [merged[t] for t in sorted(merged)][-MAX_EVENTS:]
+        if events != current:
+            anomalies[result['turbine_id']] = events
+            changed = max(changed or '', result['timestamp'])
+    drift = dict(turbine_data.get('drift') or {})
+    for summary in drift_summaries(dataset_info):
+        entry = {'drift': summary['drift'], 'events': summary['events'][-MAX_EVENTS:]}
+        if drift.get(summary['turbine_id']) != entry:
+            drift[summary['turbine_id']] = entry
+            changed = max(changed or '', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    weather = turbine_data.get('weather') or {}
+    result = dataset_info.get('weather')
+    if result and result['current'] and (weather.get('timestamp') or '') < result['timestamp']:
+        weather = {'timestamp': result['timestamp'], 'location': result['location'],
+                   'wind_speed': result['current'].get('wind_speed'),
+                   'temperature': result['current'].get('temperature')}
+        changed = max(changed or '', result['timestamp'])
+    if changed is None:
+        return dash.no_update
+    return {**turbine_data, 'frequencies': frequencies, 'anomalies': anomalies, 'drift': drift,
+            'weather': weather, 'last_updated': changed}
+
+# 콜백: 작업 등록/종료 시 진행률 패널 표시 및 조회 타이머 on/off
+@callback(
+    [Output('job-poll', 'disabled'),
+     Output('job-panel', 'style')],
+    Input('analytics-job', 'data')
+)
+def toggle_job_poll(job):
+    running = bool(job and job.get('job_id'))
+    return not running, {'display': 'block' if running else 'none'}
+
+# 콜백: 작업 진행률 조회 (끝나면 결과를 Store에 반영)
+@callback(
+    [Output('job-progress', 'value'),
+     Output('job-progress', 'label'),
+     Output('job-status', 'children'),
+     Output('analytics-dataset', 'data', allow_duplicate=True),
+     Output('analytics-job', 'data', allow_duplicate=True)],
+    Input('job-poll', 'n_intervals'),
+    [State('analytics-job', 'data'),
+     State('session-id', 'data'),
+     State('analytics-dataset', 'data')],
+    prevent_initial_call=True
+)
+def poll_job(n_intervals, job, session_id, dataset_info):
+    if not job or not job.get('job_id'):
+        return 0, '', dash.no_update, dash.no_update, dash.no_update
+    status = owned_job(job['job_id'], session_id)
+    label = JOB_LABELS.get(job['kind'], job['kind'])
+    if status is None:
+        return 0, '', html.Span(f'❌ {label}: job not found', style={'color': 'red'}), dash.no_update, None
+    if status['status'] not in FINISHED:
+        percent = round(100 * (status['progress'] or 0))
+        return percent, f"{label}: {status['message']} ({percent}%)", '', dash.no_update, dash.no_update
+    if status['status'] == DONE:
+        message, dataset_info = JOB_HANDLERS[job['kind']](status['result'], dataset_info)
+        return 100, '', message, dataset_info, None
+    if status['status'] == CANCELLED:
+        return 0, '', html.Span(f'{label} cancelled', style={'color': '#666'}), dash.no_update, None
+    return 0, '', html.Span(f"❌ {label} failed: {status['error']}", style={'color': 'red'}), \
+        dash.no_update, None
+
+# 콜백: 작업 취소
+@callback(
+    Output('job-status', 'children', allow_duplicate=True),
+    Input('job-cancel', 'n_clicks'),
+    [State('analytics-job', 'data'),
+     State('session-id', 'data')],
     prevent_initial_call=True
 )
-def check_result(n_clicks, zero_mean, bandpass_filtered, no_spikes):
-    if n_clicks and current_data is not None:
-        # TODO: 실제 검증 로직 추가
-        return html.Span('SUCCESS! Validation passed! Data is ready for modal analysis.', 
-                        style={'color': 'green', 'fontWeight': 'bold', 'fontSize': '15px'})
-    return ''
\ No newline at end of file
+def cancel_job(n_clicks, job, session_id):
+    if not n_clicks or not job or not job.get('job_id'):
+        return dash.no_update
+    if owned_job(job['job_id'], session_id) is None:
+        return html.Span('❌ Job not found', style={'color': 'red'})
+    jobs.cancel(job['job_id'])
+    return html.Span('Cancelling…', style={'color': '#666'})
@@ -1,297 +1,219 @@
+from datetime import datetime
+
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, ctx, no_update, Input, Output, State
 import dash_bootstrap_components as dbc
 import dash_leaflet as dl
-import json
-import base64
+import numpy as np
+
+from backend.pipelines.cache import get_cache
+from backend.pipelines.dataset import Dataset
+from backend.pipelines.geometry import DEFAULT_CENTER, GeometryError, layout_from_geojson, parse_upload
 
 dash.register_page(__name__, path='/map-overlay', name='Map Overlay')
 
+# 서버 측 데이터셋 캐시 (팝업 정보를 세션별로 보관)
+dataset_cache = get_cache()
+
 # ============================================================================
 # GeoJSON 파싱 함수
 # ============================================================================
 def parse_geojson(contents, filename):
     """
-    업로드된 GeoJSON 파일 파싱
-    
+    업로드된 GeoJSON 파일 파싱 + 검증 (터빈 / 변전소 Point, 케이블 LineString, 경계 Polygon)
+
     Args:
         contents: Base64 인코딩된 파일 내용
         filename: 파일명
-        
+
     Returns:
-        tuple: (geojson_dict, error_message)
+        tuple: (FleetLayout, error_message) — 오류는 발견한 것을 모두 모은 목록
     """
     try:
-        # Base64 디코딩
-        content_type, content_string = contents.split(',')
-        decoded = base64.b64decode(content_string)
-        
-        # JSON 파싱
-        geojson = json.loads(decoded.decode('utf-8'))
-        
-        # 유효성 검증
-        if geojson.get('type') != 'FeatureCollection':
-            return None, "❌ Invalid GeoJSON: Must be a FeatureCollection"
-        
-        if not geojson.get('features'):
-            return None, "❌ Invalid GeoJSON: No features found"
-        
-        # 각 feature 검증
-        for idx, feature in enumerate(geojson['features']):
-            # geometry 확인
-            if 'geometry' not in feature:
-                return None, f"❌ Feature {idx+1}: Missing geometry"
-            
-            if feature['geometry'].get('type') != 'Point':
-                return None, f"❌ Feature {idx+1}: Only Point geometry supported"
-            
-            # coordinates 확인
-            coords = feature['geometry'].get('coordinates')
-            if not coords or len(coords) != 2:
-                return None, f"❌ Feature {idx+1}: Invalid coordinates"
-            
-            lon, lat = coords
-            
-            # 좌표 범위 확인
-            if not (-180 <= lon <= 180):
-                return None, f"❌ Feature {idx+1}: Invalid longitude ({lon})"
-            
-            if not (-90 <= lat <= 90):
-                return None, f"❌ Feature {idx+1}: Invalid latitude ({lat})"
-        
-        return geojson, None
-        
-    except json.JSONDecodeError:
-        return None, "❌ Invalid JSON format"
-    except Exception as e:
-        return None, f"❌ Error: {str(e)}"
+        return parse_upload(contents), None
+    except GeometryError as e:
+        return None, str(e)
 
 
-# ============================================================================
-# Convex Hull 알고리즘 (순수 Python, scipy 불필요)
-# ============================================================================
-def convex_hull(points):
+def geometry_summary(turbine_data):
     """
-    Graham Scan 알고리즘으로 Convex Hull 계산 (외곽 점들만 추출)
-    
-    Args:
-        points: [[lat, lon], ...] 좌표 리스트
-        
-    Returns:
-        list: 외곽 점들의 좌표 [[lat, lon], ...]
+    turbine-data의 중심 / 외곽선 (업로드 시 계산)
+
+    이전 세션처럼 없으면 여기서 계산한다 — 외곽선은 좌표 해시로 메모되므로 주파수 / 이상 탐지 결과만
+    바뀌어 지도를 다시 그릴 때는 다시 계산하지 않는다.
     """
-    if len(points) < 3:
-        return points
-    
-    # 1. 가장 아래(남쪽) 점 찾기 (y가 작은 점)
-    start = min(points, key=lambda p: (p[0], p[1]))
-    
-    # 2. 시작점 기준 각도로 정렬
-    import math
-    
-    def polar_angle(p):
-        dx = p[1] - start[1]
-        dy = p[0] - start[0]
-        return math.atan2(dy, dx)
-    
-    sorted_points = sorted(points, key=polar_angle)
-    
-    # 3. Graham Scan
-    hull = []
-    
-    for point in sorted_points:
-        # 반시계방향이 아닌 점들 제거
-        while len(hull) > 1 and cross_product(hull[-2], hull[-1], point) <= 0:
-            hull.pop()
-        hull.append(point)
-    
-    return hull
+    geometry = turbine_data.get('geometry')
+    if geometry is None or 'outline' not in geometry:
+        try:
+            geometry = layout_from_geojson(turbine_data['locations']).summary()
+        except GeometryError:
+            geometry = {'center': list(DEFAULT_CENTER), 'hull': None, 'outline': []}
+    return geometry
 
 
-def cross_product(o, a, b):
-    """
-    외적 계산 (회전 방향 판단)
-    > 0: 반시계방향
-    < 0: 시계방향
-    = 0: 일직선
-    """
-    return (a[1] - o[1]) * (b[0] - o[0]) - (a[0] - o[0]) * (b[1] - o[1])
+def boundary_rings(geometry, mode):
+    """경계 표시 방식('convex' / 'concave') → 외곽선 고리 목록 [[[lat, lon], ...], ...]"""
+    if mode == 'concave':
+        return geometry.get('outline') or []
+    return [geometry['hull']] if geometry.get('hull') else []
 
 
 # ============================================================================
-# 경계 Polygon 자동 생성 함수
+# 지도 레이어 (터빈 / 변전소는 클러스터링 GeoJSON 레이어 하나, 팝업은 클릭 시 생성)
 # ============================================================================
-def create_boundary_polygon(geojson):
+# 마커 모양은 assets/map_layers.js의 pointToLayer가 feature 속성 + hideout으로 브라우저에서 정한다.
+# 서버는 좌표와 최소한의 속성만 보내고, 분석 결과가 바뀌면 hideout(분석 / 이상 ID 목록)만 다시 보낸다.
+ASSET_COLORS = {'turbine': 'blue', 'substation': 'darkorange'}
+ANOMALY_COLOR = 'red'           # 이상 윈도우가 있는 터빈 테두리 색
+MARKER_PROPERTIES = ('id', 'name', 'type')      # 지도로 보내는 feature 속성 (나머지는 팝업에서 조회)
+CLUSTER_OPTIONS = {'radius': 60, 'maxZoom': 14}  # supercluster: 클러스터 반경 (px), 이 줌보다 크면 개별 마커
+POPUP_ANOMALIES = 3             # 팝업에 표시할 최근 이상 윈도우 수
+POPUP_DATASET = 'map'           # 팝업 정보 캐시 키 (dataset_cache의 dataset_id / stage)
+POPUP_STAGE = 'popup'
+POINT_TO_LAYER = {'variable': 'snugeoshm.map.pointToLayer'}
+
+
+def _fmt(value, spec, unit=''):
+    """팝업 수치 표시 (SSI에서 찾지 못한 모드는 '-')"""
+    return '-' if value is None else f"{value:{spec}}{unit}"
+
+
+def marker_collection(geojson):
     """
-    터빈 좌표들의 외곽선을 자동으로 연결하여 Polygon 생성
-    
+    Point 자산 → 클러스터링 레이어용 FeatureCollection (좌표 + MARKER_PROPERTIES만)
+
     Args:
-        geojson: GeoJSON FeatureCollection
-        
+        geojson: GeoJSON FeatureCollection (검증됨)
+
     Returns:
-        list: Polygon 좌표 [[lat, lon], ...]
+        dict: FeatureCollection
     """
-    if not geojson or not geojson.get('features'):
-        return None
-    
-    # Point 좌표만 추출
-    points = []
-    for feature in geojson['features']:
-        if feature['geometry']['type'] == 'Point':
-            lon, lat = feature['geometry']['coordinates']
-            points.append([lat, lon])
-    
-    if len(points) < 3:
-        return None
-    
-    # Convex Hull 계산 (외곽 터빈들만 연결)
-    boundary = convex_hull(points)
-    
-    return boundary
+    features = []
+    for feature in geojson.get('features', []):
+        geometry = feature['geometry']
+        if geometry['type'] != 'Point':
+            continue
+        props = feature.get('properties') or {}
+        features.append({'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': geometry['coordinates'][:2]},
+                         'properties': {key: props[key] for key in MARKER_PROPERTIES if key in props}})
+    return {'type': 'FeatureCollection', 'features': features}
 
 
-# ============================================================================
-# 터빈 레이어 생성 함수 (Polygon + CircleMarker)
-# ============================================================================
-def create_turbine_layers(geojson, frequencies=None):
+def line_collection(geojson):
+    """케이블 / 경계 등 선·면 자산 FeatureCollection"""
+    return {'type': 'FeatureCollection',
+            'features': [f for f in geojson.get('features', []) if f['geometry']['type'] != 'Point']}
+
+
+def marker_hideout(turbine_data):
+    """pointToLayer 스타일 입력: 자산 색, 분석 완료 / 이상 터빈 ID ({id: 1} — JS에서 바로 조회)"""
+    return {'colors': ASSET_COLORS, 'anomaly_color': ANOMALY_COLOR,
+            'analyzed': {turbine_id: 1 for turbine_id in turbine_data.get('frequencies') or {}},
+            'anomalous': {turbine_id: 1 for turbine_id, events in (turbine_data.get('anomalies') or {}).items()
+                          if events}}
+
+
+def boundary_polygons(boundary):
+    """외곽선 고리 목록 → dl.Polygon 목록 (concave hull은 군집별로 여러 개)"""
+    return [dl.Polygon(
+        positions=ring,
+        color='purple',           # 보라색 테두리 (실선)
+        fillColor='lavender',     # 옅은 보라색 채우기
+        fillOpacity=0.4,          # 투명도
+        weight=3                  # 선 두께
+    ) for ring in boundary or []]
+
+
+def popup_details(turbine_data):
     """
-    GeoJSON에서 dash-leaflet 레이어 생성 (경계 Polygon + 터빈 CircleMarker)
-    
-    Args:
-        geojson: GeoJSON FeatureCollection
-        frequencies: 터빈별 주파수 딕셔너리 (optional)
-        
-    Returns:
-        list: [Polygon, CircleMarker, CircleMarker, ...]
+    turbine-data → 터빈 ID별 팝업 정보 {id: {'props', 'freq', 'anomalies'}}
+
+    props에는 지도로 보내지 않은 속성만 담는다 (MARKER_PROPERTIES는 클릭한 feature에 있음).
     """
-    if not geojson or not geojson.get('features'):
-        return []
-    
-    layers = []
-    frequencies = frequencies or {}
-    
-    # 1. 경계 Polygon 생성
-    boundary = create_boundary_polygon(geojson)
-    if boundary:
-        polygon = dl.Polygon(
-            positions=boundary,
-            color='purple',           # 보라색 테두리 (실선)
-            fillColor='lavender',     # 옅은 보라색 채우기
-            fillOpacity=0.4,          # 투명도
-            weight=3                  # 선 두께
-        )
-        layers.append(polygon)
-    
-    # 2. 터빈 CircleMarker 생성
-    for feature in geojson['features']:
+    frequencies = turbine_data.get('frequencies') or {}
+    anomalies = turbine_data.get('anomalies') or {}
+    details = {}
+    for feature in (turbine_data.get('locations') or {}).get('features', []):
         if feature['geometry']['type'] != 'Point':
             continue
-        
-        # 좌표 추출
-        coords = feature['geometry']['coordinates']
-        lon, lat = coords
-        
-        # 속성 추출
-        props = feature.get('properties', {})
-        turbine_id = props.get('id', 'Unknown')
-        name = props.get('name', 'Unknown')
-        capacity = props.get('capacity', 'N/A')
-        install_year = props.get('install_year', 'N/A')
-        status = props.get('status', 'unknown')
-        
-        # 주파수 데이터 확인
-        freq = frequencies.get(turbine_id)
-        
-        # 팝업 내용 생성
-        if freq:
-            # Analytics 완료 후
-            popup_content = html.Div([
-                html.H6(f"{name} ({turbine_id})", style={'marginBottom': '10px', 'fontWeight': 'bold'}),
-                html.Hr(style={'margin': '5px 0'}),
-                html.P([
-                    html.Strong("Capacity: "), f"{capacity}", html.Br(),
-                    html.Strong("Install Year: "), f"{install_year}", html.Br(),
-                    html.Strong("Status: "), f"{status.capitalize()} ✅"
-                ], style={'fontSize': '13px', 'marginBottom': '10px'}),
-                html.Hr(style={'margin': '5px 0'}),
-                html.P([
-                    html.Strong("Modal Analysis:"), html.Br(),
-                    f"  Frequency: {freq['mode1']:.2f} Hz", html.Br(),
-                    f"  Damping: {freq['damping']:.1f}%", html.Br(),
-                    f"  Mode 1: {freq['mode1']:.2f} Hz", html.Br(),
-                    f"  Mode 2: {freq['mode2']:.2f} Hz"
-                ], style={'fontSize': '12px', 'backgroundColor': '#f0f0f0', 'padding': '8px', 'borderRadius': '4px'}),
-                html.Small(f"Last Updated: {freq['timestamp']}", style={'color': '#666', 'fontSize': '11px'})
-            ])
-        else:
-            # Analytics 전
-            popup_content = html.Div([
-                html.H6(f"{name} ({turbine_id})", style={'marginBottom': '10px', 'fontWeight': 'bold'}),
-                html.Hr(style={'margin': '5px 0'}),
-                html.P([
-                    html.Strong("Capacity: "), f"{capacity}", html.Br(),
-                    html.Strong("Install Year: "), f"{install_year}", html.Br(),
-                    html.Strong("Status: "), f"{status.capitalize()}"
-                ], style={'fontSize': '13px', 'marginBottom': '10px'}),
-                html.Hr(style={'margin': '5px 0'}),
-                html.P([
-                    html.Strong("Modal Analysis:"), html.Br(),
-                    "  Frequency: Not analyzed yet", html.Br(),
-                    "  Damping: -"
-                ], style={'fontSize': '12px', 'backgroundColor': '#fff3cd', 'padding': '8px', 'borderRadius': '4px'}),
-                html.Small([
-                    dbc.Button("Go to Analytics →", href="/analytics", size="sm", color="primary", 
-                              style={'marginTop': '5px', 'fontSize': '11px'})
-                ])
-            ])
-        
-        # CircleMarker 생성 (점으로 표시)
-        circle = dl.CircleMarker(
-            center=[lat, lon],
-            radius=8,                 # 점 크기 (픽셀)
-            color='blue',             # 테두리 색
-            fillColor='blue',         # 채우기 색
-            fillOpacity=0.8,          # 투명도
-            weight=2,                 # 테두리 두께
-            children=[
-                dl.Tooltip(name),     # 마우스 오버 시 이름 표시
-                dl.Popup(popup_content, maxWidth=300)  # 클릭 시 상세 정보
-            ]
-        )
-        
-        layers.append(circle)
-    
-    return layers
+        props = feature.get('properties') or {}
+        turbine_id = str(props.get('id'))
+        details[turbine_id] = {'props': {k: v for k, v in props.items() if k not in MARKER_PROPERTIES},
+                               'freq': frequencies.get(turbine_id), 'anomalies': anomalies.get(turbine_id)}
+    return details
 
 
-# ============================================================================
-# 지도 중심 계산 함수
-# ============================================================================
-def calculate_center(geojson):
+def store_popup_details(session_id, turbine_data):
+    """팝업 정보를 서버 캐시에 보관 (turbine-data가 바뀔 때만, 클릭 시에는 ID로 조회만)"""
+    dataset_cache.put(session_id, POPUP_DATASET,
+                      Dataset(np.zeros((0, 0)), [], meta={'turbines': popup_details(turbine_data)}), POPUP_STAGE)
+
+
+def cached_popup_details(session_id, turbine_id):
+    """서버 캐시에서 터빈 하나의 팝업 정보 (캐시 만료 시 빈 dict → 클릭한 feature 속성만 표시)"""
+    cached = dataset_cache.get(session_id, POPUP_DATASET, POPUP_STAGE)
+    return ((cached.meta.get('turbines') or {}) if cached is not None else {}).get(turbine_id) or {}
+
+
+def turbine_popup(props, freq=None, anomalies=None):
     """
-    GeoJSON 터빈들의 중심 좌표 계산
-    
+    터빈 팝업 내용 (기본 정보 + 모달 분석 + 최근 이상 윈도우)
+
     Args:
-        geojson: GeoJSON FeatureCollection
-        
+        props: GeoJSON feature properties
+        freq: turbine-data['frequencies'][id] (없으면 분석 전)
+        anomalies: turbine-data['anomalies'][id] (시간순 이상 윈도우 목록)
+
     Returns:
-        list: [lat, lon]
+        html.Div
     """
-    if not geojson or not geojson.get('features'):
-        return [34.87, 126.17]  # 기본값: 한국 서해안
-    
-    lats = []
-    lons = []
-    
-    for feature in geojson['features']:
-        coords = feature['geometry']['coordinates']
-        lons.append(coords[0])
-        lats.append(coords[1])
-    
-    center_lat = sum(lats) / len(lats)
-    center_lon = sum(lons) / len(lons)
-    
-    return [center_lat, center_lon]
+    turbine_id = props.get('id', 'Unknown')
+    name = props.get('name', 'Unknown')
+    status = str(props.get('status', 'unknown'))
+    header = [
+        html.H6(f"{name} ({turbine_id})", style={'marginBottom': '10px', 'fontWeight': 'bold'}),
+        html.Hr(style={'margin': '5px 0'}),
+        html.P([
+            html.Strong("Type: "), str(props.get('type', 'turbine')).capitalize(), html.Br(),
+            html.Strong("Capacity: "), f"{props.get('capacity', 'N/A')}", html.Br(),
+            html.Strong("Install Year: "), f"{props.get('install_year', 'N/A')}", html.Br(),
+            html.Strong("Status: "), f"{status.capitalize()}{' ✅' if freq else ''}"
+        ], style={'fontSize': '13px', 'marginBottom': '10px'}),
+        html.Hr(style={'margin': '5px 0'}),
+    ]
+    if not freq:
+        # Analytics 전
+        return html.Div(header + [
+            html.P([
+                html.Strong("Modal Analysis:"), html.Br(),
+                "  Frequency: Not analyzed yet", html.Br(),
+                "  Damping: -"
+            ], style={'fontSize': '12px', 'backgroundColor': '#fff3cd', 'padding': '8px', 'borderRadius': '4px'}),
+            html.Small([
+                dbc.Button("Go to Analytics →", href="/analytics", size="sm", color="primary",
+                           style={'marginTop': '5px', 'fontSize': '11px'})
+            ])
+        ])
+    # Analytics 완료 후
+    body = header + [
+        html.P([
+            html.Strong("Modal Analysis:"), html.Br(),
+            f"  Frequency: {_fmt(freq.get('mode1'), '.2f', ' Hz')}", html.Br(),
+            f"  Damping: {_fmt(freq.get('damping'), '.1f', '%')}", html.Br(),
+            f"  Mode 1: {_fmt(freq.get('mode1'), '.2f', ' Hz')}", html.Br(),
+            f"  Mode 2: {_fmt(freq.get('mode2'), '.2f', ' Hz')}", html.Br(),
+            f"  Mode 3: {_fmt(freq.get('mode3'), '.2f', ' Hz')}"
+        ], style={'fontSize': '12px', 'backgroundColor': '#f0f0f0', 'padding': '8px', 'borderRadius': '4px'}),
+    ]
+    if anomalies:
+        recent = [html.Li(f"{e['time']} — score {e['score']:.3f} ({e['feature']})") for e in anomalies[-POPUP_ANOMALIES:]]
+        body.append(html.Div([
+            html.Strong(f"Anomalies: {len(anomalies)} window(s)"),
+            html.Ul(recent, style={'paddingLeft': '16px', 'marginBottom': '0'})
+        ], style={'fontSize': '12px', 'backgroundColor': '#f8d7da', 'padding': '8px', 'borderRadius': '4px',
+                  'marginTop': '6px'}))
+    body.append(html.Small(f"Last Updated: {freq.get('timestamp', '-')}", style={'color': '#666', 'fontSize': '11px'}))
+    return html.Div(body)
 
 
 # ============================================================================
@@ -320,7 +242,15 @@ layout = dbc.Container([
                     )
                 ], width=6)
             ]),
-            html.Div(id='upload-status', className='mt-3')
+            html.Div(id='upload-status', className='mt-3'),
+            dbc.RadioItems(
+                id='boundary-mode',
+                options=[{'label': 'Convex hull', 'value': 'convex'},
+                         {'label': 'Concave (alpha shape)', 'value': 'concave'}],
+                value='convex',
+                inline=True,
+                className='mt-2'
+            )
         ])
     ], className="mb-4"),
     
@@ -331,13 +261,19 @@ layout = dbc.Container([
             html.Div([
                 dl.Map(
                     id='wind-farm-map',
-                    center=[34.87, 126.17],  # 초기 중심 (한국 서해안)
+                    center=list(DEFAULT_CENTER),  # 초기 중심 (한국 서해안)
                     zoom=11,
                     children=[
                         dl.TileLayer(),  # OpenStreetMap 타일
+                        dl.LayerGroup(id='boundary-layer'),     # 외곽 Polygon
+                        dl.GeoJSON(id='asset-lines', style={'color': 'gray', 'weight': 2, 'fillOpacity': 0.05}),
+                        dl.GeoJSON(id='turbine-layer', cluster=True, zoomToBoundsOnClick=True,
+                                   superClusterOptions=CLUSTER_OPTIONS, pointToLayer=POINT_TO_LAYER),
+                        dl.LayerGroup(id='turbine-popup'),      # 클릭한 터빈 팝업
                     ],
                     style={'height': '500px', 'width': '100%'}
-                )
+                ),
+                dcc.Store(id='map-layout-key')  # 지도에 올린 배치 (같으면 마커 데이터 / 시점 유지)
             ], id='map-container')
         ])
     ]),
@@ -360,79 +296,100 @@ def upload_geojson(contents, filename, turbine_data):
     if not contents:
         return "", turbine_data
     
-    # GeoJSON 파싱
-    geojson, error = parse_geojson(contents, filename)
+    # GeoJSON 파싱 + 검증 (오류는 모두 표시)
+    layout, error = parse_geojson(contents, filename)
     
     if error:
-        return dbc.Alert(error, color="danger"), turbine_data
+        return dbc.Alert([html.Strong("❌ Invalid GeoJSON"),
+                          html.Ul([html.Li(line) for line in error.split('\n')],
+                                  style={'marginBottom': '0', 'fontSize': '13px'})], color="danger"), turbine_data
     
     # 성공
-    num_turbines = len(geojson['features'])
+    geometry = layout.summary()
+    counts = ', '.join(f"{n} {kind}(s)" for kind, n in geometry['counts'].items())
     status = dbc.Alert(
         [
             html.Strong(f"✅ Loaded: {filename}"), html.Br(),
-            f"Found {num_turbines} turbine(s)"
+            f"Found {counts}"
         ],
         color="success"
     )
     
-    # 전역 Store에 저장
-    turbine_data['locations'] = geojson
+    # 전역 Store에 저장 (중심 / 외곽선은 여기서 한 번만 계산)
+    turbine_data['locations'] = layout.geojson
+    geometry['uploaded'] = datetime.now().isoformat()  # 지도 레이어 갱신 키 (같은 좌표 재업로드 포함)
+    turbine_data['geometry'] = geometry
     return status, turbine_data
 
 # ============================================================================
 # 콜백: 지도 업데이트
 # ============================================================================
 @callback(
-    Output('wind-farm-map', 'children'),
+    Output('boundary-layer', 'children'),
+    Output('asset-lines', 'data'),
+    Output('turbine-layer', 'data'),
+    Output('turbine-layer', 'hideout'),
     Output('wind-farm-map', 'center'),
     Output('wind-farm-map', 'zoom'),
+    Output('map-layout-key', 'data'),
     Input('turbine-data', 'data'),
-    # TODO: Analytics에서 주파수 데이터 연동
-    # Input('turbine-data', 'data')  # app.py의 전역 Store
+    Input('boundary-mode', 'value'),
+    State('map-layout-key', 'data'),
+    State('session-id', 'data'),
 )
-def update_map(turbine_data):
-    """지도에 경계 Polygon + 터빈 CircleMarker 표시"""
+def update_map(turbine_data, boundary_mode, shown_key, session_id):
+    """
+    지도에 경계 Polygon + 케이블 + 터빈 클러스터 레이어 표시
+
+    같은 배치에서 주파수 / 이상 탐지 결과만 바뀌면 hideout(마커 스타일)만 보내고 마커 데이터와
+    지도 시점은 그대로 둔다. 배치가 바뀔 때만 좌표를 보내고 중심을 옮긴다.
+    turbine-data가 바뀌면 팝업 정보도 서버 캐시에 다시 기록한다.
+    """
     # 전역 Store에서 GeoJSON 데이터 가져오기
     geojson = turbine_data.get('locations') if turbine_data else None
     
     if not geojson:
         # 초기 상태 (데이터 없음)
-        return [dl.TileLayer()], [34.87, 126.17], 11
-    
-    # TODO: 전역 Store에서 주파수 데이터 가져오기
-    # frequencies = turbine_data.get('frequencies', {}) if turbine_data else {}
-    frequencies = None  # 현재는 None (Analytics 미구현)
-    
-    # Polygon + CircleMarker 생성
-    turbine_layers = create_turbine_layers(geojson, frequencies)
+        empty = {'type': 'FeatureCollection', 'features': []}
+        return [], empty, empty, marker_hideout({}), list(DEFAULT_CENTER), 11, None
     
-    # 지도 중심 계산
-    center = calculate_center(geojson)
-    
-    # 지도 레이어 구성
-    map_children = [
-        dl.TileLayer(),
-        *turbine_layers  # Polygon + CircleMarker들 추가
-    ]
-    
-    return map_children, center, 12  # zoom=12로 확대
+    if session_id and ctx.triggered_id != 'boundary-mode':
+        store_popup_details(session_id, turbine_data)
+
+    # 업로드 시 계산한 중심 / 외곽선
+    geometry = geometry_summary(turbine_data)
+    key = geometry.get('uploaded') or geometry.get('outline_key')
+    boundary = boundary_polygons(boundary_rings(geometry, boundary_mode))
+    hideout = marker_hideout(turbine_data)
+    
+    if key is not None and key == shown_key:
+        # 분석 결과 / 경계 표시 방식만 바뀜
+        if ctx.triggered_id == 'boundary-mode':
+            return boundary, no_update, no_update, no_update, no_update, no_update, no_update
+        return no_update, no_update, no_update, hideout, no_update, no_update, no_update
+    
+    return (boundary, line_collection(geojson), marker_collection(geojson), hideout,
+            geometry['center'], 12, key)  # zoom=12로 확대
 
 
 # ============================================================================
-# TODO: 전역 Store 연동 (app.py 수정 후)
+# 콜백: 터빈 클릭 → 팝업 (클릭할 때만 상세 정보 생성)
 # ============================================================================
-# @callback(
-#     Output('wind-farm-map', 'children'),
-#     [Input('map-geojson-store', 'data'),
-#      Input('turbine-data', 'data')]  # app.py의 전역 Store
-# )
-# def update_map_with_frequencies(geojson, turbine_data):
-#     """Analytics 데이터 포함하여 지도 업데이트"""
-#     if not geojson:
-#         return [dl.TileLayer()]
-#     
-#     frequencies = turbine_data.get('frequencies', {}) if turbine_data else {}
-#     turbine_layers = create_turbine_layers(geojson, frequencies)
-#     
-#     return [dl.TileLayer(), *turbine_layers]
\ No newline at end of file
+@callback(
+    Output('turbine-popup', 'children'),
+    Input('turbine-layer', 'n_clicks'),
+    State('turbine-layer', 'clickData'),
+    State('session-id', 'data'),
+    prevent_initial_call=True
+)
+def show_turbine_popup(n_clicks, feature, session_id):
+    """클릭한 마커 속성 + 서버 캐시의 모달 분석 / 이상 윈도우(ID로 조회)로 팝업 표시 (클러스터 클릭은 무시)"""
+    props = (feature or {}).get('properties') or {}
+    if not feature or props.get('cluster'):
+        return no_update
+    turbine_id = str(props.get('id'))
+    details = cached_popup_details(session_id, turbine_id)
+    lon, lat = feature['geometry']['coordinates'][:2]
+    content = turbine_popup({**props, **(details.get('props') or {})}, details.get('freq'), details.get('anomalies'))
+    # 클릭마다 id를 바꿔 같은 터빈을 다시 눌러도 팝업이 새로 열리게 함
+    return [dl.Popup(content, id=f'turbine-popup-{n_clicks}', position=[lat, lon], maxWidth=300)]
@@ -1,9 +1,26 @@
 import dash
-from dash import html, dcc, callback, Input, Output
+from dash import html, dcc, callback, Input, Output, State
 import dash_bootstrap_components as dbc
 
+from backend.ml.rules import score_fleet
+from backend.ml.tracking import get_history
+from backend.pipelines.batch import geojson_turbine_ids
+
 dash.register_page(__name__, path='/scenario-builder', name='Scenario Builder')
 
+# 시나리오 → 규칙 엔진 특징 덮어쓰기 (현재 turbine-data 위에 적용)
+# scour: 기초 스프링 강성 20% 감소 → f ∝ √k 이므로 고유진동수 약 -10.6% (√0.8 - 1)
+# storm: 풍속 / 부하율 슬라이더 값의 하한
+SCENARIO_OVERRIDES = {
+    'normal': {},
+    'scour': {'drift_offset': 100 * (0.8 ** 0.5 - 1)},
+    'storm': {},
+}
+SCENARIO_MINIMUMS = {
+    'storm': {'wind_speed': 25, 'load_factor': 150},
+}
+MAX_SUGGESTIONS = 5             # 표시할 터빈 수 (우선순위 순)
+
 layout = dbc.Container([
     html.H1("Scenario Builder", className="text-center my-4"),
     
@@ -60,7 +77,32 @@ layout = dbc.Container([
     [Output('score-display', 'children'),
      Output('suggestions-output', 'children')],
     Input('btn-run-scenario', 'n_clicks'),
+    [State('dropdown-scenario', 'value'),
+     State('slider-load-factor', 'value'),
+     State('slider-wind', 'value'),
+     State('turbine-data', 'data')],
     prevent_initial_call=True
 )
-def run_scenario(n_clicks):
-    return "🟢 85/100", dbc.Alert("✅ No critical issues detected", color="success")
\ No newline at end of file
+def run_scenario(n_clicks, scenario, load_factor, wind_speed, turbine_data):
+    minimums = SCENARIO_MINIMUMS.get(scenario, {})
+    overrides = {**SCENARIO_OVERRIDES.get(scenario, {}),
+                 'load_factor': max(load_factor or 0, minimums.get('load_factor', 0)),
+                 'wind_speed': max(wind_speed or 0, minimums.get('wind_speed', 0))}
+    turbine_ids = geojson_turbine_ids((turbine_data or {}).get('locations'))
+    suggestions = score_fleet(turbine_data, turbine_ids, histories=get_history(), overrides=overrides)
+    if not suggestions:
+        # 분석 결과가 없으면 시나리오 값만으로 가상 터빈 1기 평가
+        suggestions = score_fleet(None, ['Scenario'], overrides=overrides)
+    # 건전성 점수 = 100 - 가장 높은 유지보수 우선순위
+    worst = suggestions[0]
+    score = 100 - worst['priority']
+    icon = '🟢' if score >= 80 else '🟡' if score >= 50 else '🔴'
+    flagged = [s for s in suggestions if s['actions']][:MAX_SUGGESTIONS]
+    if not flagged:
+        return f"{icon} {score:.0f}/100", dbc.Alert("✅ No critical issues detected", color="success")
+    color = 'danger' if score < 50 else 'warning'
+    return f"{icon} {score:.0f}/100", html.Div([
+        dbc.Alert([html.B(f"{s['turbine_id']} (priority {s['priority']:.0f})"),
+                   html.Ul([html.Li(a['message']) for a in s['actions']], style={'marginBottom': '0'})],
+                  color=color, style={'fontSize': '13px'})
+        for s in flagged])